@@ -0,0 +1,99 @@
+"""ベンチマーク用の合成 Figma ファイル生成"""
+
+import random
+from typing import Any
+
+_LEAF_TYPES = ("TEXT", "RECTANGLE", "INSTANCE", "VECTOR", "COMPONENT", "GROUP")
+_NAME_STEMS = (
+    "Button",
+    "Icon",
+    "Label",
+    "Header",
+    "Card",
+    "Avatar",
+    "Input Field",
+    "Divider",
+    "Badge",
+    "Tooltip",
+)
+
+
+def make_figma_file(
+    node_count: int, *, pages: int = 4, fanout: int = 6, seed: int = 0
+) -> dict[str, Any]:
+    """ノード数を指定して Figma ファイル JSON を生成
+
+    Document > Page (CANVAS) > Frame > ... の構造を幅優先で埋めていく。
+    ノード名は一部が重複するようにし、実ファイルに近い検索負荷にする。
+
+    Args:
+        node_count: 生成するノード数 (おおよそ)
+        pages: ページ数
+        fanout: 1 ノードあたりの子ノード数
+        seed: 乱数シード
+
+    Returns:
+        /files/{file_id} 相当の JSON
+    """
+    rng = random.Random(seed)
+    counter = 0
+
+    def new_node(node_type: str, name: str) -> dict[str, Any]:
+        nonlocal counter
+        counter += 1
+        return {
+            "id": f"{counter // 1000}:{counter % 1000}",
+            "name": name,
+            "type": node_type,
+            "visible": True,
+            "absoluteBoundingBox": {
+                "x": rng.uniform(0, 4000),
+                "y": rng.uniform(0, 4000),
+                "width": rng.uniform(8, 400),
+                "height": rng.uniform(8, 400),
+            },
+            "fills": [{"type": "SOLID", "color": {"r": 1, "g": 1, "b": 1, "a": 1}}],
+            "children": [],
+        }
+
+    document = new_node("DOCUMENT", "Document")
+    queue: list[dict[str, Any]] = []
+    for p in range(pages):
+        page = new_node("CANVAS", f"Page {p + 1}")
+        document["children"].append(page)
+        queue.append(page)
+
+    head = 0
+    while counter < node_count and head < len(queue):
+        parent = queue[head]
+        head += 1
+        for _ in range(fanout):
+            if counter >= node_count:
+                break
+            if parent["type"] == "CANVAS":
+                child = new_node("FRAME", f"Screen {counter}")
+            else:
+                stem = rng.choice(_NAME_STEMS)
+                child = new_node(rng.choice(_LEAF_TYPES), f"{stem} {rng.randrange(200)}")
+            parent["children"].append(child)
+            queue.append(child)
+
+    return {
+        "name": f"Synthetic {node_count}",
+        "lastModified": "2024-01-01T00:00:00Z",
+        "version": "1",
+        "document": document,
+        "components": {},
+        "styles": {},
+    }
+
+
+def iter_node_ids(file_data: dict[str, Any]) -> list[str]:
+    """ファイル内の全ノード ID を返す"""
+    ids: list[str] = []
+    stack = [file_data["document"]]
+    while stack:
+        node = stack.pop()
+        ids.append(node["id"])
+        stack.extend(node.get("children", []))
+    return ids
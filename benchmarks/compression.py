@@ -0,0 +1,93 @@
+"""キャッシュファイルの圧縮形式ごとのディスクサイズと読み込み時間ベンチマーク
+
+file_raw.json と nodes_index.json を各圧縮形式・レベルで保存し、
+合計のディスクサイズと、CacheStore が両方をロードするまでの時間を比較する。
+
+使い方:
+    uv run python benchmarks/compression.py [--sizes 10000,100000]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from _synthetic import make_figma_file
+
+from yet_another_figma_mcp.cache import CacheStore
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file
+from yet_another_figma_mcp.cache.index import build_index, save_index
+
+FILE_ID = "bench"
+
+# (圧縮形式, レベル)。レベル None は形式ごとのデフォルト
+CODECS: list[tuple[Compression, int | None]] = [
+    (Compression.NONE, None),
+    (Compression.GZIP, 1),
+    (Compression.GZIP, None),
+    (Compression.GZIP, 9),
+    (Compression.LZMA, 0),
+    (Compression.LZMA, None),
+]
+
+
+def bench_codec(
+    file_data: dict[str, Any],
+    index: dict[str, Any],
+    compression: Compression,
+    level: int | None,
+) -> tuple[int, float, float]:
+    """指定の圧縮形式で保存し、サイズ・保存時間・読み込み時間を計測
+
+    Returns:
+        (合計ファイルサイズ, 保存秒, 読み込み秒)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        file_dir = cache_dir / FILE_ID
+        file_dir.mkdir()
+
+        start = time.perf_counter()
+        with create_cache_file(file_dir / "file_raw.json", compression, level) as f:
+            json.dump(file_data, f, ensure_ascii=False, indent=2)
+        save_index(index, cache_dir, FILE_ID, compression, level)
+        save = time.perf_counter() - start
+
+        size = sum(path.stat().st_size for path in file_dir.iterdir())
+
+        store = CacheStore(cache_dir)
+        start = time.perf_counter()
+        store.get_file(FILE_ID)
+        store.get_index(FILE_ID)
+        load = time.perf_counter() - start
+    return size, save, load
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を表示"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>10} {'codec':>10} {'size (MB)':>10} {'ratio':>6} {'save (s)':>9} "
+        f"{'load (s)':>9}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        file_data = make_figma_file(size)
+        index = build_index(file_data)
+        baseline: int | None = None
+        for compression, level in CODECS:
+            disk, save, load = bench_codec(file_data, index, compression, level)
+            baseline = baseline or disk
+            label = compression.value if level is None else f"{compression.value}-{level}"
+            print(
+                f"{size:>10} {label:>10} {disk / 1e6:>10.1f} {disk / baseline:>6.2f} "
+                f"{save:>9.3f} {load:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""インデックスの読み込み時間ベンチマーク (JSON 形式 / バイナリ形式)
+
+CacheStore.get_index にかかる時間と、その直後の完全一致検索・ノード情報参照の
+時間を、nodes_index.json と nodes_index.bin で比較する。
+
+使い方:
+    uv run python benchmarks/index_load.py [--sizes 10000,100000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from _synthetic import make_figma_file
+
+from yet_another_figma_mcp.cache import CacheStore
+from yet_another_figma_mcp.cache.index import build_index, save_binary_index, save_index
+from yet_another_figma_mcp.tools import search_figma_nodes_by_name
+
+FILE_ID = "bench"
+
+
+def bench_format(cache_dir: Path, binary: bool) -> tuple[int, float, float]:
+    """指定形式のインデックスの読み込み時間と検索時間を計測
+
+    Returns:
+        (ファイルサイズ, 読み込み秒, 検索 ms)
+    """
+    store = CacheStore(cache_dir)
+    start = time.perf_counter()
+    store.get_index(FILE_ID)
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search_figma_nodes_by_name(store, FILE_ID, "Button 42", "exact")
+    search = (time.perf_counter() - start) * 1e3
+
+    name = "nodes_index.bin" if binary else "nodes_index.json"
+    return (cache_dir / FILE_ID / name).stat().st_size, load, search
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を表示"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>10} {'format':>7} {'size (MB)':>10} {'load (s)':>9} {'first search (ms)':>18}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        index = build_index(make_figma_file(size))
+        for binary in (False, True):
+            with tempfile.TemporaryDirectory() as tmp:
+                cache_dir = Path(tmp)
+                if binary:
+                    save_binary_index(index, cache_dir, FILE_ID)
+                else:
+                    save_index(index, cache_dir, FILE_ID)
+                file_size, load, search = bench_format(cache_dir, binary)
+            label = "binary" if binary else "json"
+            print(f"{size:>10} {label:>7} {file_size / 1e6:>10.1f} {load:>9.4f} {search:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""nodes_index.json のサイズとロード後のメモリ使用量ベンチマーク
+
+ノードごとに名前パスを保存する従来形式と、親ポインタから復元する現在の形式を
+ファイルサイズと tracemalloc で計測したロード後のメモリ使用量で比較する。
+
+使い方:
+    uv run python benchmarks/index_size.py [--sizes 10000,100000]
+"""
+
+import argparse
+import json
+import tracemalloc
+from typing import Any
+
+from _synthetic import make_figma_file
+
+from yet_another_figma_mcp.cache.index import build_index
+from yet_another_figma_mcp.cache.store import resolve_node_path, share_index_strings
+
+
+def with_paths(index: dict[str, Any]) -> dict[str, Any]:
+    """従来形式 (by_id の各エントリに名前パスを持つ) のインデックスを生成"""
+    by_id = index["by_id"]
+    legacy = {
+        node_id: {**entry, "path": resolve_node_path(by_id, node_id)}
+        for node_id, entry in by_id.items()
+    }
+    return {**index, "by_id": legacy}
+
+
+def measure_load(raw: bytes, share: bool) -> int:
+    """JSON をロードしたときに確保されたメモリ (バイト) を計測"""
+    tracemalloc.start()
+    index = json.loads(raw)
+    if share:
+        share_index_strings(index)
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del index
+    return size
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を表示"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>10} {'legacy (MB)':>12} {'compact (MB)':>13}"
+        f" {'legacy RAM (MB)':>16} {'compact RAM (MB)':>17}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        index = build_index(make_figma_file(size))
+        legacy_raw = json.dumps(with_paths(index), ensure_ascii=False, indent=2).encode()
+        compact_raw = json.dumps(index, ensure_ascii=False, indent=2).encode()
+        legacy_mem = measure_load(legacy_raw, share=False)
+        compact_mem = measure_load(compact_raw, share=True)
+        print(
+            f"{size:>10} {len(legacy_raw) / 1e6:>12.1f} {len(compact_raw) / 1e6:>13.1f}"
+            f" {legacy_mem / 1e6:>16.1f} {compact_mem / 1e6:>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
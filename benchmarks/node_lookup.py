@@ -0,0 +1,93 @@
+"""get_cached_figma_node のルックアップ性能ベンチマーク
+
+ファイルサイズを変えながら、1 回あたりのノード取得時間を計測する。
+ID -> ノードのマップにより、ファイルが大きくなってもほぼ一定であることを確認する。
+あわせて、起動直後の初回取得について、ファイル全体をパースする場合と
+インデックスのバイトオフセットで該当範囲だけをデコードする場合を比較する。
+
+使い方:
+    uv run python benchmarks/node_lookup.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from _synthetic import iter_node_ids, make_figma_file
+
+from yet_another_figma_mcp.cache import CacheStore
+from yet_another_figma_mcp.cache.index import build_index, save_index
+from yet_another_figma_mcp.cache.offsets import build_node_offsets
+from yet_another_figma_mcp.tools import get_cached_figma_node
+
+FILE_ID = "bench"
+
+
+def bench_size(cache_dir: Path, node_count: int, lookups: int) -> tuple[float, float, float, float]:
+    """指定ノード数のファイルでルックアップ時間を計測
+
+    Returns:
+        (初回取得秒 [全体パース], 初回取得秒 [オフセット],
+         ルックアップ中央値 µs, ルックアップ p99 µs)
+    """
+    file_data = make_figma_file(node_count)
+    file_dir = cache_dir / FILE_ID
+    file_dir.mkdir(parents=True, exist_ok=True)
+    raw_path = file_dir / "file_raw.json"
+    with open(raw_path, "w", encoding="utf-8") as f:
+        json.dump(file_data, f)
+
+    node_ids = iter_node_ids(file_data)
+    rng = random.Random(1)
+    targets = [rng.choice(node_ids) for _ in range(lookups)]
+
+    # オフセットなしのインデックス: 初回取得でファイル全体をパースする
+    index = build_index(file_data)
+    save_index(index, cache_dir, FILE_ID)
+    store = CacheStore(cache_dir)
+    store.get_index(FILE_ID)
+    start = time.perf_counter()
+    get_cached_figma_node(store, FILE_ID, targets[0])
+    first_full = time.perf_counter() - start
+
+    # オフセット付きのインデックス: 該当範囲だけをデコードする
+    index["offsets"] = build_node_offsets(raw_path)
+    save_index(index, cache_dir, FILE_ID)
+    cold_store = CacheStore(cache_dir)
+    cold_store.get_index(FILE_ID)
+    start = time.perf_counter()
+    get_cached_figma_node(cold_store, FILE_ID, targets[0])
+    first_offsets = time.perf_counter() - start
+
+    samples: list[float] = []
+    for node_id in targets:
+        start = time.perf_counter()
+        get_cached_figma_node(store, FILE_ID, node_id)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return first_full, first_offsets, statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を表示"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>10} {'first/full (s)':>15} {'first/offsets (s)':>18}"
+        f" {'median (µs)':>12} {'p99 (µs)':>10}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            first_full, first_offsets, median, p99 = bench_size(Path(tmp), size, args.lookups)
+        print(f"{size:>10} {first_full:>15.3f} {first_offsets:>18.4f} {median:>12.2f} {p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
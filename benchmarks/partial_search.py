@@ -0,0 +1,80 @@
+"""search_figma_nodes_by_name の部分一致検索ベンチマーク
+
+キー数を変えながら、全キーを走査する場合とトライグラムインデックスで
+候補を絞り込む場合の 1 クエリあたりの時間を比較する。
+
+使い方:
+    uv run python benchmarks/partial_search.py [--sizes 10000,100000,300000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any
+
+from yet_another_figma_mcp.cache import CacheStore
+
+FILE_ID = "bench"
+
+_WORDS = (
+    "primary secondary tertiary button icon label header footer card avatar input field "
+    "divider badge tooltip modal dialog toast banner chip toggle switch slider tab menu "
+    "item list row cell grid nav sidebar logo search filter sort arrow close check"
+).split()
+
+
+def make_index(key_count: int, seed: int = 0) -> dict[str, Any]:
+    """重複しないノード名を key_count 個持つインデックスを生成"""
+    rng = random.Random(seed)
+    by_name: dict[str, list[str]] = {}
+    while len(by_name) < key_count:
+        words = rng.sample(_WORDS, 3)
+        name = f"{words[0].title()} {words[1]} / {words[2]} {rng.randrange(10000)}"
+        by_name.setdefault(name, [f"1:{len(by_name)}"])
+    return {"by_id": {}, "by_name": by_name, "by_frame_title": {}}
+
+
+def bench_size(key_count: int, queries: list[str]) -> tuple[float, float, float]:
+    """指定キー数でクエリ時間を計測
+
+    Returns:
+        (トライグラムインデックス構築秒, 全走査の中央値 ms, トライグラムの中央値 ms)
+    """
+    index = make_index(key_count)
+    store = CacheStore()
+
+    start = time.perf_counter()
+    store.get_trigram_index(FILE_ID, index)
+    build = time.perf_counter() - start
+
+    linear: list[float] = []
+    trigram: list[float] = []
+    for query in queries:
+        lowered = query.lower()
+        start = time.perf_counter()
+        expected = [key for key in index["by_name"] if lowered in key.lower()]
+        linear.append((time.perf_counter() - start) * 1e3)
+
+        start = time.perf_counter()
+        matched = store.match_partial(FILE_ID, index, "by_name", query)
+        trigram.append((time.perf_counter() - start) * 1e3)
+        assert matched == expected
+    return build, statistics.median(linear), statistics.median(trigram)
+
+
+def main() -> None:
+    """ベンチマークを実行して結果を表示"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,300000")
+    args = parser.parse_args()
+
+    queries = ["Modal toast", "slider / chip 12", "4242", "sidebar", "button", "zzz"]
+    print(f"{'keys':>10} {'build (s)':>10} {'linear (ms)':>12} {'trigram (ms)':>13}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        build, linear, trigram = bench_size(size, queries)
+        print(f"{size:>10} {build:>10.2f} {linear:>12.2f} {trigram:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
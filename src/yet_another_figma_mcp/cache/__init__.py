@@ -1,5 +1,10 @@
 """キャッシュ管理モジュール"""
 
-from yet_another_figma_mcp.cache.store import CacheStore, InvalidFileIdError, validate_file_id
+from yet_another_figma_mcp.cache.store import (
+    CacheStore,
+    InvalidFileIdError,
+    resolve_node_path,
+    validate_file_id,
+)
 
-__all__ = ["CacheStore", "InvalidFileIdError", "validate_file_id"]
+__all__ = ["CacheStore", "InvalidFileIdError", "resolve_node_path", "validate_file_id"]
@@ -0,0 +1,362 @@
+"""mmap で読み込むバイナリ形式のノードインデックス (nodes_index.bin)
+
+nodes_index.json と同じ内容を、起動時にパースせずに参照できる形で保存する。
+
+レイアウト (リトルエンディアン、各セクションは 8 バイト境界に配置):
+
+- ヘッダー: マジック、バージョン、フラグ、セクション数、セクションごとの (開始位置, 長さ)
+- strings / string_offsets: 重複を除いた UTF-8 文字列の連結と、その開始位置の配列
+- records: by_id のキー順 (ドキュメント順) に並べた固定長のノードレコード
+  (ID・名前・タイプの文字列番号、親のレコード番号、file_raw.json 内のバイト範囲)
+- id_order: ID のバイト列順に並べたレコード番号 (二分探索用)
+- <section>.keys / <section>.order: by_name などのキー表。キー順のエントリ
+  (キーの文字列番号、postings 内の開始位置と件数) と、キーのバイト列順の並び
+- postings: キー表から参照するレコード番号の配列
+- pages / top_frames: レコード番号の配列
+
+読み込み時は mmap 上の memoryview を配列として解釈するだけで、各セクションを
+dict と同じ Mapping インターフェースのビューとして公開する。
+値はアクセスされたときに初めてデコードする。
+"""
+
+import struct
+from collections.abc import Buffer, Callable, Iterator, Mapping, Sequence
+from typing import Any
+
+BINARY_INDEX_MAGIC = b"YAFMIDX\x00"
+BINARY_INDEX_VERSION = 1
+
+# キー表として保存するセクション (名前 -> ノード ID のリスト)
+KEY_SECTIONS = ("by_name", "by_frame_title", "by_name_folded", "by_frame_title_folded")
+
+_SECTIONS = (
+    "string_offsets",
+    "strings",
+    "records",
+    "id_order",
+    "postings",
+    "pages",
+    "top_frames",
+    *(f"{section}.{part}" for section in KEY_SECTIONS for part in ("keys", "order")),
+)
+
+_HEADER = struct.Struct("<8sIII")  # マジック、バージョン、フラグ、セクション数
+_SECTION_ENTRY = struct.Struct("<QQ")  # 開始位置、長さ
+# ID・名前・タイプの文字列番号、親のレコード番号 (-1 はなし)、バイト範囲 [start, end)
+_RECORD = struct.Struct("<IIIiQQ")
+_KEY_ENTRY_WIDTH = 3  # キーの文字列番号、postings の開始位置、件数
+
+_FLAG_HAS_OFFSETS = 1
+_ALIGNMENT = 8
+
+
+class BinaryIndexError(ValueError):
+    """バイナリ形式のインデックスが壊れているか、未対応のバージョンの場合のエラー"""
+
+
+def is_binary_index(prefix: bytes) -> bool:
+    """先頭バイト列がバイナリ形式のインデックスかを判定"""
+    return prefix[: len(BINARY_INDEX_MAGIC)] == BINARY_INDEX_MAGIC
+
+
+# ---------------------------------------------------------------------------
+# エンコード
+# ---------------------------------------------------------------------------
+
+
+class _StringTable:
+    """文字列の重複を除いて番号を振る"""
+
+    def __init__(self) -> None:
+        self.refs: dict[str, int] = {}
+        self.encoded: list[bytes] = []
+
+    def ref(self, value: str) -> int:
+        ref = self.refs.get(value)
+        if ref is None:
+            ref = len(self.encoded)
+            self.refs[value] = ref
+            self.encoded.append(value.encode("utf-8"))
+        return ref
+
+
+def _u32_array(values: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+def _align(position: int) -> int:
+    return (position + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def encode_binary_index(index: dict[str, Any]) -> bytes:
+    """build_index で生成したノードインデックスをバイナリ形式にエンコード
+
+    Args:
+        index: ノードインデックス (offsets があればバイト範囲も記録する)
+
+    Returns:
+        nodes_index.bin の内容
+    """
+    strings = _StringTable()
+    by_id: dict[str, dict[str, Any]] = index.get("by_id", {})
+    offsets: dict[str, list[int]] | None = index.get("offsets")
+    row_of = {node_id: row for row, node_id in enumerate(by_id)}
+
+    records = bytearray()
+    id_refs: list[int] = []
+    for node_id, entry in by_id.items():
+        parent_id = entry.get("parent_id")
+        span = offsets.get(node_id) if offsets is not None else None
+        start, end = span if span is not None else (0, 0)
+        id_ref = strings.ref(node_id)
+        id_refs.append(id_ref)
+        records += _RECORD.pack(
+            id_ref,
+            strings.ref(entry.get("name", "")),
+            strings.ref(entry.get("type", "")),
+            row_of.get(parent_id, -1) if parent_id is not None else -1,
+            start,
+            end,
+        )
+
+    sections: dict[str, bytes] = {
+        "records": bytes(records),
+        "id_order": _u32_array(
+            sorted(range(len(id_refs)), key=lambda row: strings.encoded[id_refs[row]])
+        ),
+    }
+
+    postings: list[int] = []
+    for section in KEY_SECTIONS:
+        entries: list[int] = []
+        encoded_keys: list[bytes] = []
+        for key, node_ids in index.get(section, {}).items():
+            ref = strings.ref(key)
+            start = len(postings)
+            postings.extend(row_of[node_id] for node_id in node_ids if node_id in row_of)
+            entries.extend((ref, start, len(postings) - start))
+            encoded_keys.append(strings.encoded[ref])
+        order = sorted(range(len(encoded_keys)), key=encoded_keys.__getitem__)
+        sections[f"{section}.keys"] = _u32_array(entries)
+        sections[f"{section}.order"] = _u32_array(order)
+    sections["postings"] = _u32_array(postings)
+
+    for section in ("pages", "top_frames"):
+        sections[section] = _u32_array(
+            [row_of[node_id] for node_id in index.get(section, []) if node_id in row_of]
+        )
+
+    string_offsets = [0]
+    for encoded in strings.encoded:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+    sections["string_offsets"] = _u32_array(string_offsets)
+    sections["strings"] = b"".join(strings.encoded)
+
+    flags = _FLAG_HAS_OFFSETS if offsets is not None else 0
+    header = _HEADER.pack(BINARY_INDEX_MAGIC, BINARY_INDEX_VERSION, flags, len(_SECTIONS))
+    position = _align(len(header) + _SECTION_ENTRY.size * len(_SECTIONS))
+    table = bytearray()
+    body = bytearray()
+    for name in _SECTIONS:
+        data = sections[name]
+        table += _SECTION_ENTRY.pack(position, len(data))
+        body += data + b"\x00" * (_align(len(data)) - len(data))
+        position += _align(len(data))
+
+    head = header + bytes(table)
+    return head + b"\x00" * (_align(len(head)) - len(head)) + bytes(body)
+
+
+# ---------------------------------------------------------------------------
+# 読み込み
+# ---------------------------------------------------------------------------
+
+
+class _IndexData:
+    """mmap 上の各セクションへの memoryview と、共通のデコード処理"""
+
+    def __init__(self, buffer: Buffer) -> None:
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise BinaryIndexError("Binary index is truncated")
+        magic, version, flags, count = _HEADER.unpack_from(view)
+        if magic != BINARY_INDEX_MAGIC:
+            raise BinaryIndexError("Not a binary index")
+        if version != BINARY_INDEX_VERSION or count != len(_SECTIONS):
+            raise BinaryIndexError(f"Unsupported binary index version: {version}")
+
+        self.flags: int = flags
+        sections: dict[str, memoryview] = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = _SECTION_ENTRY.unpack_from(
+                view, _HEADER.size + i * _SECTION_ENTRY.size
+            )
+            if offset + length > len(view):
+                raise BinaryIndexError(f"Binary index section {name!r} is out of range")
+            sections[name] = view[offset : offset + length]
+
+        self.sections = sections
+        self.strings = sections["strings"]
+        self.string_offsets = sections["string_offsets"].cast("I")
+        self.records = sections["records"]
+        self.record_count = len(self.records) // _RECORD.size
+        self.id_order = sections["id_order"].cast("I")
+        self.postings = sections["postings"].cast("I")
+
+    def string_bytes(self, ref: int) -> memoryview:
+        return self.strings[self.string_offsets[ref] : self.string_offsets[ref + 1]]
+
+    def string(self, ref: int) -> str:
+        return str(self.string_bytes(ref), "utf-8")
+
+    def record(self, row: int) -> tuple[int, int, int, int, int, int]:
+        return _RECORD.unpack_from(self.records, row * _RECORD.size)
+
+    def node_id(self, row: int) -> str:
+        return self.string(self.record(row)[0])
+
+    def find(self, order: memoryview, target: bytes, key_ref: Callable[[int], int]) -> int | None:
+        """バイト列順の並び order から、キーが target と一致する要素を二分探索"""
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            item: int = order[mid]
+            current = bytes(self.string_bytes(key_ref(item)))
+            if current == target:
+                return item
+            if current < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def find_row(self, node_id: str) -> int | None:
+        return self.find(self.id_order, node_id.encode("utf-8"), lambda row: self.record(row)[0])
+
+
+class NodeTableView(Mapping[str, dict[str, Any]]):
+    """by_id のビュー (node_id -> {"name", "type", "parent_id"})"""
+
+    def __init__(self, data: _IndexData) -> None:
+        self._data = data
+
+    def __getitem__(self, node_id: str) -> dict[str, Any]:
+        row = self._data.find_row(node_id)
+        if row is None:
+            raise KeyError(node_id)
+        return self._entry(row)
+
+    def _entry(self, row: int) -> dict[str, Any]:
+        data = self._data
+        _id_ref, name_ref, type_ref, parent, _start, _end = data.record(row)
+        return {
+            "name": data.string(name_ref),
+            "type": data.string(type_ref),
+            "parent_id": data.node_id(parent) if parent >= 0 else None,
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        data = self._data
+        return (data.node_id(row) for row in range(data.record_count))
+
+    def __len__(self) -> int:
+        return self._data.record_count
+
+    def resolve_path(self, node_id: str) -> list[str]:
+        """親のレコード番号を辿って名前パスを復元 (ID の検索はノード自身の 1 回のみ)"""
+        data = self._data
+        row = data.find_row(node_id)
+        names: list[str] = []
+        seen: set[int] = set()
+        while row is not None and row >= 0 and row not in seen:
+            seen.add(row)
+            _id_ref, name_ref, _type_ref, parent, _start, _end = data.record(row)
+            names.append(data.string(name_ref))
+            row = parent
+        names.reverse()
+        return names
+
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]:  # type: ignore[override]
+        """レコード順に (node_id, エントリ) を返す (ID ごとの二分探索を省く)"""
+        data = self._data
+        return ((data.node_id(row), self._entry(row)) for row in range(data.record_count))
+
+
+class OffsetTableView(Mapping[str, list[int]]):
+    """offsets のビュー (node_id -> file_raw.json 内の [start, end))"""
+
+    def __init__(self, data: _IndexData) -> None:
+        self._data = data
+
+    def __getitem__(self, node_id: str) -> list[int]:
+        row = self._data.find_row(node_id)
+        if row is None:
+            raise KeyError(node_id)
+        start, end = self._data.record(row)[4:]
+        if end == 0:
+            raise KeyError(node_id)
+        return [start, end]
+
+    def __iter__(self) -> Iterator[str]:
+        data = self._data
+        return (data.node_id(row) for row in range(data.record_count) if data.record(row)[5] != 0)
+
+    def __len__(self) -> int:
+        data = self._data
+        return sum(1 for row in range(data.record_count) if data.record(row)[5] != 0)
+
+
+class KeyTableView(Mapping[str, list[str]]):
+    """by_name などのキー表のビュー (キー -> ノード ID のリスト、キー順を保持)"""
+
+    def __init__(self, data: _IndexData, section: str) -> None:
+        self._data = data
+        self._entries = data.sections[f"{section}.keys"].cast("I")
+        self._order = data.sections[f"{section}.order"].cast("I")
+
+    def __getitem__(self, key: str) -> list[str]:
+        entries = self._entries
+        item = self._data.find(
+            self._order, key.encode("utf-8"), lambda i: entries[i * _KEY_ENTRY_WIDTH]
+        )
+        if item is None:
+            raise KeyError(key)
+        start = entries[item * _KEY_ENTRY_WIDTH + 1]
+        count = entries[item * _KEY_ENTRY_WIDTH + 2]
+        data = self._data
+        return [data.node_id(row) for row in data.postings[start : start + count]]
+
+    def __iter__(self) -> Iterator[str]:
+        entries = self._entries
+        string = self._data.string
+        return (string(entries[i]) for i in range(0, len(entries), _KEY_ENTRY_WIDTH))
+
+    def __len__(self) -> int:
+        return len(self._entries) // _KEY_ENTRY_WIDTH
+
+
+def load_binary_index(buffer: Buffer) -> dict[str, Any]:
+    """バイナリ形式のインデックスを読み込む
+
+    返す dict は nodes_index.json をロードした場合と同じキーを持ち、
+    各セクションは buffer 上のビューになる (buffer は使い終わるまで開いたままにすること)。
+    pages / top_frames のような小さなセクションだけはリストにデコードする。
+
+    Args:
+        buffer: nodes_index.bin の内容 (mmap または bytes)
+
+    Returns:
+        ノードインデックス
+
+    Raises:
+        BinaryIndexError: 形式が不正、または未対応のバージョンの場合
+    """
+    data = _IndexData(buffer)
+    index: dict[str, Any] = {"by_id": NodeTableView(data)}
+    for section in KEY_SECTIONS:
+        index[section] = KeyTableView(data, section)
+    for section in ("pages", "top_frames"):
+        index[section] = [data.node_id(row) for row in data.sections[section].cast("I")]
+    if data.flags & _FLAG_HAS_OFFSETS:
+        index["offsets"] = OffsetTableView(data)
+    return index
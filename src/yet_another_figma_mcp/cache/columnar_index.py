@@ -0,0 +1,310 @@
+"""列指向のインメモリ・ノードインデックス
+
+nodes_index.json をそのままロードすると、ノードごとの dict と ID 文字列、キー表の
+ID リストで 1 ノードあたり 1 KB 近い Python オブジェクトになる。CacheStore は
+ロードした JSON 形式のインデックスを、ノードのレコード番号 (by_id のキー順) を
+添字とする array の列に詰め直して保持する。
+
+- ID: "<数字>:<数字>" 形式は 64 ビット整数に詰め、それ以外 (インスタンス内の
+  "I1:2;3:4" など) は UTF-8 のバイト列を連結したブロブに置く。検索用に ID 順に並べた
+  レコード番号の列を持ち、二分探索で引く
+- 名前・タイプ: 重複を除いた文字列表の番号
+- 親: 親のレコード番号 (-1 はなし)
+- offsets: file_raw.json 内のバイト範囲 [start, end) の組 (0, 0 はなし)
+- by_name などのキー表: キー -> 位置のハッシュマップと、位置ごとの postings 内の範囲
+
+各セクションは dict と同じ Mapping インターフェースのビューとして公開し、値は
+アクセスされたときに組み立てる (binary_index のビューと同じ振る舞い)。
+"""
+
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from yet_another_figma_mcp.cache.binary_index import KEY_SECTIONS
+
+_PACKED_ID_PATTERN = re.compile(r"^(0|[1-9][0-9]{0,9}):(0|[1-9][0-9]{0,9})$")
+_PACKED_PART_LIMIT = 1 << 31
+
+
+def _pack_id(node_id: str) -> int | None:
+    """ID ("<a>:<b>" 形式) を整数に詰める (詰められない形式は None)"""
+    match = _PACKED_ID_PATTERN.match(node_id)
+    if match is None:
+        return None
+    high, low = int(match[1]), int(match[2])
+    if high >= _PACKED_PART_LIMIT or low >= _PACKED_PART_LIMIT:
+        return None
+    return high << 32 | low
+
+
+class _Columns:
+    """ノードの列と文字列表 (各ビューが共有する)"""
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        # レコード番号 -> 詰めた ID (0 以上)、またはブロブ内の ID の番号 k を -(k + 1) で表した値
+        self.ids = array("q")
+        self.names = array("I")
+        self.types = array("H")
+        self.parents = array("i")
+        # offsets がある場合のみ、レコード番号ごとの (start, end)
+        self.spans: array[int] | None = None
+        # 詰められない ID の UTF-8 の連結と開始位置、対応するレコード番号
+        self.other_ids = b""
+        self.other_offsets = array("I", [0])
+        self.other_rows = array("I")
+        # ID 順に並べたレコード番号 / ブロブ内の ID の番号 (二分探索用)
+        self.packed_order = array("I")
+        self.other_order = array("I")
+
+    def other_id(self, ordinal: int) -> bytes:
+        return self.other_ids[self.other_offsets[ordinal] : self.other_offsets[ordinal + 1]]
+
+    def node_id(self, row: int) -> str:
+        packed = self.ids[row]
+        if packed >= 0:
+            return f"{packed >> 32}:{packed & 0xFFFFFFFF}"
+        return self.other_id(-packed - 1).decode("utf-8")
+
+    def find_row(self, node_id: str) -> int | None:
+        packed = _pack_id(node_id)
+        if packed is not None:
+            ids = self.ids
+            order = self.packed_order
+            position = bisect_left(order, packed, key=ids.__getitem__)
+            if position < len(order) and ids[order[position]] == packed:
+                return order[position]
+            return None
+        target = node_id.encode("utf-8")
+        order = self.other_order
+        position = bisect_left(order, target, key=self.other_id)
+        if position < len(order) and self.other_id(order[position]) == target:
+            return self.other_rows[order[position]]
+        return None
+
+    def memory_size(self) -> int:
+        arrays = (
+            self.ids,
+            self.names,
+            self.types,
+            self.parents,
+            self.other_offsets,
+            self.other_rows,
+            self.packed_order,
+            self.other_order,
+        )
+        size = sum(map(sys.getsizeof, arrays)) + sys.getsizeof(self.other_ids)
+        size += sys.getsizeof(self.strings) + sum(map(sys.getsizeof, self.strings))
+        if self.spans is not None:
+            size += sys.getsizeof(self.spans)
+        return size
+
+    def entry(self, row: int) -> dict[str, Any]:
+        parent = self.parents[row]
+        return {
+            "name": self.strings[self.names[row]],
+            "type": self.strings[self.types[row]],
+            "parent_id": self.node_id(parent) if parent >= 0 else None,
+        }
+
+
+class ColumnarNodeTable(Mapping[str, dict[str, Any]]):
+    """by_id のビュー (node_id -> {"name", "type", "parent_id"})"""
+
+    def __init__(self, columns: _Columns) -> None:
+        self._columns = columns
+
+    def __getitem__(self, node_id: str) -> dict[str, Any]:
+        row = self._columns.find_row(node_id)
+        if row is None:
+            raise KeyError(node_id)
+        return self._columns.entry(row)
+
+    def __iter__(self) -> Iterator[str]:
+        columns = self._columns
+        return (columns.node_id(row) for row in range(len(columns.ids)))
+
+    def __len__(self) -> int:
+        return len(self._columns.ids)
+
+    def resolve_path(self, node_id: str) -> list[str]:
+        """親のレコード番号を辿って名前パスを復元 (ID の検索はノード自身の 1 回のみ)"""
+        columns = self._columns
+        row = columns.find_row(node_id)
+        names: list[str] = []
+        seen: set[int] = set()
+        while row is not None and row >= 0 and row not in seen:
+            seen.add(row)
+            names.append(columns.strings[columns.names[row]])
+            row = columns.parents[row]
+        names.reverse()
+        return names
+
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]:  # type: ignore[override]
+        """レコード順に (node_id, エントリ) を返す (ID ごとの二分探索を省く)"""
+        columns = self._columns
+        return ((columns.node_id(row), columns.entry(row)) for row in range(len(columns.ids)))
+
+    def memory_size(self) -> int:
+        """列と文字列表 (offsets を含む) の推定メモリ使用量"""
+        return self._columns.memory_size()
+
+
+class ColumnarOffsetTable(Mapping[str, list[int]]):
+    """offsets のビュー (node_id -> file_raw.json 内の [start, end))"""
+
+    def __init__(self, columns: _Columns, spans: array[int]) -> None:
+        self._columns = columns
+        self._spans = spans
+
+    def __getitem__(self, node_id: str) -> list[int]:
+        row = self._columns.find_row(node_id)
+        if row is None or self._spans[row * 2 + 1] == 0:
+            raise KeyError(node_id)
+        return [self._spans[row * 2], self._spans[row * 2 + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        columns = self._columns
+        spans = self._spans
+        return (columns.node_id(row) for row in range(len(columns.ids)) if spans[row * 2 + 1])
+
+    def __len__(self) -> int:
+        return sum(1 for end in self._spans[1::2] if end)
+
+
+class ColumnarKeyTable(Mapping[str, list[str]]):
+    """by_name などのキー表のビュー (キー -> ノード ID のリスト、キー順を保持)"""
+
+    def __init__(
+        self, columns: _Columns, positions: dict[str, int], starts: array[int], rows: array[int]
+    ) -> None:
+        self._columns = columns
+        self._positions = positions
+        self._starts = starts
+        self._rows = rows
+
+    def __getitem__(self, key: str) -> list[str]:
+        position = self._positions[key]
+        node_id = self._columns.node_id
+        return [
+            node_id(row) for row in self._rows[self._starts[position] : self._starts[position + 1]]
+        ]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def memory_size(self) -> int:
+        """キー表 (ハッシュマップと postings) の推定メモリ使用量"""
+        return sum(map(sys.getsizeof, (self._positions, self._starts, self._rows)))
+
+
+def build_columnar_index(index: dict[str, Any]) -> dict[str, Any] | None:
+    """ロードしたノードインデックスを列指向の表現に変換
+
+    返す dict は元のインデックスと同じキーを持ち、by_id・キー表・offsets は
+    列のビューになる (pages / top_frames などその他のセクションはそのまま)。
+
+    Args:
+        index: nodes_index.json をロードし、casefold 済みマップとページ・上位フレーム一覧を
+            補ったインデックス
+
+    Returns:
+        変換したインデックス。ノードごとのパスを保存していた古いインデックスや、
+        by_id にない ID を参照している場合は None (元の dict のまま使う)
+    """
+    by_id: dict[str, dict[str, Any]] = index.get("by_id", {})
+    columns = _Columns()
+    string_refs: dict[str, int] = {}
+
+    def ref(value: str) -> int:
+        string_ref = string_refs.get(value)
+        if string_ref is None:
+            string_ref = len(columns.strings)
+            string_refs[value] = string_ref
+            columns.strings.append(value)
+        return string_ref
+
+    rows: dict[str, int] = {}
+    other_ids = bytearray()
+    packed_rows: list[int] = []
+    for row, (node_id, entry) in enumerate(by_id.items()):
+        if "parent_id" not in entry or "path" in entry:
+            return None
+        rows[node_id] = row
+        packed = _pack_id(node_id)
+        if packed is None:
+            columns.ids.append(-len(columns.other_rows) - 1)
+            other_ids += node_id.encode("utf-8")
+            columns.other_offsets.append(len(other_ids))
+            columns.other_rows.append(row)
+        else:
+            columns.ids.append(packed)
+            packed_rows.append(row)
+        columns.names.append(ref(entry.get("name", "")))
+        columns.types.append(ref(entry.get("type", "")))
+
+    for entry in by_id.values():
+        parent_id = entry["parent_id"]
+        if parent_id is None:
+            columns.parents.append(-1)
+        elif parent_id in rows:
+            columns.parents.append(rows[parent_id])
+        else:
+            return None
+
+    columns.other_ids = bytes(other_ids)
+    columns.packed_order = array("I", sorted(packed_rows, key=columns.ids.__getitem__))
+    columns.other_order = array("I", sorted(range(len(columns.other_rows)), key=columns.other_id))
+
+    columnar: dict[str, Any] = dict(index)
+    columnar["by_id"] = ColumnarNodeTable(columns)
+    for section in KEY_SECTIONS:
+        positions: dict[str, int] = {}
+        starts = array("I", [0])
+        postings = array("I")
+        for key, node_ids in index.get(section, {}).items():
+            for node_id in node_ids:
+                row = rows.get(node_id)
+                if row is None:
+                    return None
+                postings.append(row)
+            # ノード名と同じキーは文字列表の文字列オブジェクトを共有する
+            shared_key = columns.strings[string_refs[key]] if key in string_refs else key
+            positions[shared_key] = len(starts) - 1
+            starts.append(len(postings))
+        columnar[section] = ColumnarKeyTable(columns, positions, starts, postings)
+
+    offsets: dict[str, list[int]] | None = index.get("offsets")
+    if offsets is not None:
+        spans = array("Q", bytes(16 * len(by_id)))
+        for node_id, (start, end) in offsets.items():
+            row = rows.get(node_id)
+            if row is not None:
+                spans[row * 2] = start
+                spans[row * 2 + 1] = end
+        columns.spans = spans
+        columnar["offsets"] = ColumnarOffsetTable(columns, spans)
+    return columnar
+
+
+def columnar_index_size(index: dict[str, Any]) -> int:
+    """列指向のインデックスの推定メモリ使用量 (列・文字列表・キー表)"""
+    by_id = index["by_id"]
+    if not isinstance(by_id, ColumnarNodeTable):
+        raise TypeError("Not a columnar index")
+    size = by_id.memory_size()
+    for section in KEY_SECTIONS:
+        table = index.get(section)
+        if isinstance(table, ColumnarKeyTable):
+            size += table.memory_size()
+    return size
@@ -0,0 +1,139 @@
+"""キャッシュファイル (file_raw.json / nodes_index.json 等) の圧縮
+
+ファイル名は圧縮の有無にかかわらず同じで、読み込み時に先頭のマジックバイトから
+形式 (非圧縮 / gzip / xz) を判定する。圧縮ファイルは展開しながら読み進めるため、
+圧縮済みのバイト列全体をメモリに載せることはない。
+
+非圧縮の file_raw.json だけがノードのバイト範囲による部分読み込み (mmap) に対応する。
+"""
+
+import gzip
+import io
+import lzma
+import os
+import shutil
+import zlib
+from enum import StrEnum
+from pathlib import Path
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+class Compression(StrEnum):
+    """キャッシュファイルの圧縮形式"""
+
+    NONE = "none"
+    GZIP = "gzip"
+    LZMA = "lzma"
+
+
+def detect_compression(prefix: bytes) -> Compression:
+    """ファイル先頭のバイト列から圧縮形式を判定"""
+    if prefix.startswith(_GZIP_MAGIC):
+        return Compression.GZIP
+    if prefix.startswith(_XZ_MAGIC):
+        return Compression.LZMA
+    return Compression.NONE
+
+
+def open_cache_file(path: Path) -> io.BufferedIOBase:
+    """キャッシュファイルを読み込み用に開く (圧縮されていれば展開しながら読む)
+
+    Raises:
+        OSError: ファイルが開けない場合
+    """
+    with open(path, "rb") as f:
+        compression = detect_compression(f.read(len(_XZ_MAGIC)))
+    if compression is Compression.GZIP:
+        return gzip.GzipFile(path, mode="rb")
+    if compression is Compression.LZMA:
+        return lzma.LZMAFile(path, mode="rb")
+    return open(path, "rb")
+
+
+def read_cache_bytes(path: Path) -> bytes:
+    """キャッシュファイルの内容を (展開して) 読み込む
+
+    Raises:
+        OSError: ファイルが開けない、または圧縮データが壊れている場合
+    """
+    with open_cache_file(path) as f:
+        try:
+            return f.read()
+        except EOFError as e:
+            # 途中で切れた圧縮ファイル
+            raise OSError(f"Truncated compressed file: {path}") from e
+        except (lzma.LZMAError, zlib.error) as e:
+            raise OSError(f"Corrupt compressed file: {path}") from e
+
+
+def _open_compressed_writer(
+    path: Path, compression: Compression, level: int | None
+) -> gzip.GzipFile | lzma.LZMAFile:
+    """圧縮形式のファイルを書き込み用に開く"""
+    if compression is Compression.GZIP:
+        return gzip.GzipFile(path, mode="wb", compresslevel=6 if level is None else level)
+    return lzma.LZMAFile(path, mode="wb", preset=level)
+
+
+def open_cache_writer(
+    path: Path, compression: Compression = Compression.NONE, level: int | None = None
+) -> io.BufferedIOBase:
+    """キャッシュファイルを書き込み用に開く (バイナリモード)
+
+    Args:
+        path: 書き出し先
+        compression: 圧縮形式
+        level: 圧縮レベル (0-9)。None の場合は形式ごとのデフォルト (gzip は 6、lzma は 6)
+
+    Returns:
+        書き込み用のバイナリストリーム
+    """
+    if compression is Compression.NONE:
+        return open(path, "wb")
+    return _open_compressed_writer(path, compression, level)
+
+
+def create_cache_file(
+    path: Path, compression: Compression = Compression.NONE, level: int | None = None
+) -> io.TextIOWrapper:
+    """キャッシュファイルを書き込み用に開く (テキストモード、UTF-8)
+
+    Args:
+        path: 書き出し先
+        compression: 圧縮形式
+        level: 圧縮レベル (None の場合は形式ごとのデフォルト)
+
+    Returns:
+        書き込み用のテキストストリーム (閉じると圧縮ストリームも閉じる)
+    """
+    if compression is Compression.NONE:
+        return open(path, "w", encoding="utf-8")
+    return io.TextIOWrapper(_open_compressed_writer(path, compression, level), encoding="utf-8")
+
+
+def compress_cache_file(
+    path: Path, compression: Compression = Compression.NONE, level: int | None = None
+) -> None:
+    """非圧縮で書き出したキャッシュファイルをその場で圧縮する
+
+    受信中は圧縮せずに書き出し、圧縮の CPU 負荷を受信の後 (スレッド上など) に回すために使う。
+    圧縮した内容は一時ファイル (<path>.compressing) に書き出してから置き換える。
+
+    Raises:
+        OSError: ファイルが読み書きできない場合 (一時ファイルは削除する)
+    """
+    if compression is Compression.NONE:
+        return
+    compressed_path = path.with_name(path.name + ".compressing")
+    try:
+        with (
+            open(path, "rb") as src,
+            _open_compressed_writer(compressed_path, compression, level) as out,
+        ):
+            shutil.copyfileobj(src, out)
+    except BaseException:
+        compressed_path.unlink(missing_ok=True)
+        raise
+    os.replace(compressed_path, path)
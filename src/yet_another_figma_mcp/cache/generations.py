@@ -0,0 +1,212 @@
+"""キャッシュの世代ディレクトリと、世代を指すポインタファイル
+
+cache / reindex コマンドは、稼働中のサーバーが書き込み途中のファイルや新旧の
+組み合わせ (新しい生 JSON と古いインデックスなど) を読まないよう、ファイルごとの
+キャッシュ一式を新しい世代ディレクトリに書き出してから、ポインタファイルを
+置き換えて (os.replace) 一度に切り替える。
+
+- <cache_dir>/<file_id>/CURRENT: 現在の世代の名前
+- <cache_dir>/.generations/<世代>/<file_id>/: 世代ごとのキャッシュ一式
+
+世代ディレクトリは <cache_dir> と同じ構成 (<世代ディレクトリ>/<file_id>/...) なので、
+既存の書き出し関数に cache_dir として渡せる。CURRENT がない (世代導入前の) キャッシュは、
+これまでどおり <cache_dir>/<file_id>/ 直下のファイルを読む。
+
+切り替え後は現在と直前の世代だけを残して古い世代を削除する。直前の世代は、切り替え前に
+読み込みを始めたサーバーが読み終えるまで残しておくためのもの。
+"""
+
+import os
+import re
+import shutil
+import sys
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+CURRENT_NAME = "CURRENT"
+GENERATIONS_DIR_NAME = ".generations"
+LOCK_NAME = ".lock"
+
+_VALID_GENERATION_PATTERN = re.compile(r"^[0-9A-Za-z_-]+$")
+
+# ロック取得を待つ間の再試行間隔 (秒、Windows のみ)
+_LOCK_RETRY_INTERVAL = 0.1
+
+
+def read_current_generation(cache_dir: Path, file_id: str) -> str | None:
+    """ファイルの現在の世代の名前を取得
+
+    Returns:
+        世代の名前 (CURRENT がない、または内容が不正な場合は None)
+    """
+    try:
+        name = (cache_dir / file_id / CURRENT_NAME).read_text(encoding="utf-8").strip()
+    except (OSError, ValueError):
+        return None
+    return name if _VALID_GENERATION_PATTERN.match(name) else None
+
+
+def generation_root(cache_dir: Path, generation: str) -> Path:
+    """世代ディレクトリ (<cache_dir> と同じ構成で <file_id>/ を持つ) のパス"""
+    return cache_dir / GENERATIONS_DIR_NAME / generation
+
+
+def resolve_file_dir(cache_dir: Path, file_id: str) -> Path:
+    """ファイルの現在のキャッシュディレクトリを取得
+
+    CURRENT があれば指している世代の <file_id>/、なければ <cache_dir>/<file_id>/ を返す。
+    ディレクトリが存在するかは確認しない。
+
+    注意: file_id は呼び出し元で検証済みであることを前提とする
+    """
+    generation = read_current_generation(cache_dir, file_id)
+    if generation is None:
+        return cache_dir / file_id
+    return generation_root(cache_dir, generation) / file_id
+
+
+def create_generation(cache_dir: Path, file_id: str) -> str:
+    """ファイルの新しい世代ディレクトリを作成
+
+    Returns:
+        世代の名前 (作成時刻とプロセス ID から生成し、名前順が作成順になる)
+    """
+    while True:
+        generation = f"{time.time_ns():020d}-{os.getpid()}"
+        try:
+            (generation_root(cache_dir, generation) / file_id).mkdir(parents=True)
+        except FileExistsError:
+            continue
+        return generation
+
+
+def discard_generation(cache_dir: Path, file_id: str, generation: str) -> None:
+    """書き出しに失敗した世代ディレクトリを削除 (切り替え済みの場合は何もしない)"""
+    if read_current_generation(cache_dir, file_id) == generation:
+        return
+    root = generation_root(cache_dir, generation)
+    shutil.rmtree(root / file_id, ignore_errors=True)
+    _remove_if_empty(root)
+
+
+def publish_generation(cache_dir: Path, file_id: str, generation: str) -> str | None:
+    """CURRENT を新しい世代に置き換えて読み込み先を切り替える
+
+    一時ファイルに書いてから置き換えるため、読み込み側は切り替えの前後どちらかの
+    世代を必ず完全な状態で読める。
+
+    Returns:
+        直前の世代の名前 (世代導入前のキャッシュ、または初回の場合は None)
+    """
+    file_dir = cache_dir / file_id
+    file_dir.mkdir(parents=True, exist_ok=True)
+    previous = read_current_generation(cache_dir, file_id)
+    tmp_path = file_dir / f"{CURRENT_NAME}.{os.getpid()}.tmp"
+    try:
+        tmp_path.write_text(f"{generation}\n", encoding="utf-8")
+        os.replace(tmp_path, file_dir / CURRENT_NAME)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return previous
+
+
+def prune_generations(cache_dir: Path, file_id: str, previous: str | None) -> None:
+    """現在と直前の世代を残して、ファイルの古い世代を削除
+
+    直前の世代がない (世代導入前のキャッシュから切り替えた) 場合は、<file_id>/ 直下の
+    ファイルを直前の世代とみなして残す。削除に失敗しても (Windows で開かれている等)
+    無視し、次回の切り替えで再度削除する。
+    """
+    current = read_current_generation(cache_dir, file_id)
+    keep = {current, previous}
+    generations_dir = cache_dir / GENERATIONS_DIR_NAME
+    if generations_dir.is_dir():
+        for root in generations_dir.iterdir():
+            if root.name not in keep and (root / file_id).is_dir():
+                shutil.rmtree(root / file_id, ignore_errors=True)
+                _remove_if_empty(root)
+
+    if previous is not None:
+        for path in (cache_dir / file_id).iterdir():
+            if path.name == CURRENT_NAME or path.name.startswith(f"{CURRENT_NAME}."):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+
+def link_cache_files(source_dir: Path, target_dir: Path, names: list[str]) -> None:
+    """前の世代のファイルを新しい世代にハードリンクする (できなければコピー)
+
+    Args:
+        names: source_dir からの相対パス。ディレクトリの場合は中のファイルをすべて対象にする
+    """
+    for name in names:
+        source = source_dir / name
+        paths = sorted(source.rglob("*")) if source.is_dir() else [source]
+        for path in paths:
+            if path.is_dir():
+                continue
+            target = target_dir / path.relative_to(source_dir)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, target)
+            except OSError:
+                shutil.copy2(path, target)
+
+
+def _remove_if_empty(path: Path) -> None:
+    try:
+        path.rmdir()
+    except OSError:
+        pass
+
+
+@contextmanager
+def cache_lock(cache_dir: Path, on_wait: Callable[[], None] | None = None) -> Generator[None]:
+    """キャッシュディレクトリへの書き込みロック (<cache_dir>/.lock) を取得
+
+    同時に実行された cache / reindex コマンドが、同じファイルの世代の切り替えや
+    マニフェストの更新を取り合わないよう直列化する。読み込み側 (サーバー) はロックを取らない。
+
+    Args:
+        on_wait: 他のプロセスがロックを持っていて待つ場合に、待ち始める前に呼ぶ関数
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / LOCK_NAME, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            waited = False
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if not waited and on_wait is not None:
+                        on_wait()
+                    waited = True
+                    time.sleep(_LOCK_RETRY_INTERVAL)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                if on_wait is not None:
+                    on_wait()
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -1,32 +1,64 @@
 """インデックス生成・管理"""
 
 import json
+import mmap
+import os
+import sqlite3
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import Any
 
-from yet_another_figma_mcp.cache.store import validate_file_id
+from yet_another_figma_mcp.cache.binary_index import encode_binary_index
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    create_cache_file,
+    detect_compression,
+    read_cache_bytes,
+)
+from yet_another_figma_mcp.cache.offsets import NodeSpan, iter_node_spans
+from yet_another_figma_mcp.cache.sqlite_index import write_sqlite_index
+from yet_another_figma_mcp.cache.store import (
+    FOLDED_FIELDS,
+    build_folded_map,
+    build_top_level_sections,
+    validate_file_id,
+)
 
 
-def build_index(file_data: dict[str, Any]) -> dict[str, Any]:
-    """Figma ファイル JSON からノードインデックスを生成"""
+type _PartialIndex = tuple[dict[str, dict[str, Any]], dict[str, list[str]], dict[str, list[str]]]
+
+
+def _index_subtree(root: dict[str, Any], parent_id: str | None) -> _PartialIndex:
+    """サブツリーを走査して by_id / by_name / by_frame_title を構築
+
+    深いツリーでも再帰上限に達しないよう、明示的なスタックで前順に走査する。
+    ページ単位の並列化ではワーカープロセスで実行されるため、モジュールレベルに置く。
+
+    Args:
+        root: 走査を開始するノード
+        parent_id: root の親ノード ID
+
+    Returns:
+        (by_id, by_name, by_frame_title)
+    """
     by_id: dict[str, dict[str, Any]] = {}
     by_name: dict[str, list[str]] = {}
     by_frame_title: dict[str, list[str]] = {}
 
-    def traverse(node: dict[str, Any], name_path: list[str], parent_id: str | None) -> None:
-        """ノードツリーを再帰的に走査してインデックスを構築"""
+    stack: list[tuple[dict[str, Any], str | None]] = [(root, parent_id)]
+    while stack:
+        node, node_parent_id = stack.pop()
         node_id = node.get("id", "")
         node_name = node.get("name", "")
         node_type = node.get("type", "")
 
-        current_name_path = [*name_path, node_name]
-
-        # by_id に登録
+        # by_id に登録 (名前パスは保存せず、parent_id を辿って resolve_node_path で復元する)
         by_id[node_id] = {
             "name": node_name,
             "type": node_type,
-            "parent_id": parent_id,
-            "path": current_name_path,
+            "parent_id": node_parent_id,
         }
 
         # by_name に登録
@@ -41,29 +73,188 @@ def build_index(file_data: dict[str, Any]) -> dict[str, Any]:
                 by_frame_title[node_name] = []
             by_frame_title[node_name].append(node_id)
 
-        # 子ノードを再帰処理（現在のノード ID を親 ID として渡す）
+        # 子ノードを積む（前順を保つため逆順、現在のノード ID を親 ID として渡す）
         children = node.get("children", [])
-        for child in children:
-            traverse(child, current_name_path, node_id)
+        stack.extend((child, node_id) for child in reversed(children))
+
+    return by_id, by_name, by_frame_title
+
+
+def _merge_partials(partials: Iterable[_PartialIndex]) -> _PartialIndex:
+    """ドキュメント順に並んだ部分インデックスをマージ
+
+    1 回の走査で構築した場合とキーの順序・ID リストの順序が一致するよう、
+    先頭から順に追加する (重複 ID は後勝ち、キーの位置は最初の出現のまま)。
+    """
+    by_id: dict[str, dict[str, Any]] = {}
+    by_name: dict[str, list[str]] = {}
+    by_frame_title: dict[str, list[str]] = {}
+    for part_by_id, part_by_name, part_by_frame_title in partials:
+        by_id.update(part_by_id)
+        for name, node_ids in part_by_name.items():
+            by_name.setdefault(name, []).extend(node_ids)
+        for title, node_ids in part_by_frame_title.items():
+            by_frame_title.setdefault(title, []).extend(node_ids)
+    return by_id, by_name, by_frame_title
+
 
-    # ドキュメントルートから走査
-    document = file_data.get("document", {})
-    traverse(document, [], None)
+def build_index(file_data: dict[str, Any], *, workers: int = 1) -> dict[str, Any]:
+    """Figma ファイル JSON からノードインデックスを生成
 
-    return {
+    Args:
+        file_data: Figma ファイルの生 JSON
+        workers: ページ (CANVAS) 単位で走査を並列化するプロセス数。
+            1 以下、またはページが 1 つ以下の場合は現在のプロセスで走査する
+
+    Returns:
+        ノードインデックス
+    """
+    document: dict[str, Any] = file_data.get("document", {})
+    pages: list[dict[str, Any]] = document.get("children", [])
+
+    if workers <= 1 or len(pages) <= 1:
+        by_id, by_name, by_frame_title = _index_subtree(document, None)
+    else:
+        # ドキュメントノード自身はここで登録し、ページごとの走査をワーカーに分配する。
+        # executor.map は入力順に結果を返すため、マージ結果は実行順序に依存しない
+        root = {key: value for key, value in document.items() if key != "children"}
+        partials = [_index_subtree(root, None)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(pages))) as executor:
+            partials.extend(executor.map(_index_subtree, pages, repeat(root.get("id", ""))))
+        by_id, by_name, by_frame_title = _merge_partials(partials)
+
+    return _finish_index(by_id, by_name, by_frame_title)
+
+
+def _finish_index(
+    by_id: dict[str, dict[str, Any]],
+    by_name: dict[str, list[str]],
+    by_frame_title: dict[str, list[str]],
+) -> dict[str, Any]:
+    """走査結果に派生セクションを加えてノードインデックスを完成させる"""
+    index: dict[str, Any] = {
         "by_id": by_id,
         "by_name": by_name,
         "by_frame_title": by_frame_title,
     }
+    # 大文字小文字を無視した完全一致を 1 回の参照で済ませるための casefold 済みマップ
+    for field, folded_field in FOLDED_FIELDS.items():
+        index[folded_field] = build_folded_map(index[field])
+    # ファイル概要・フレーム一覧のツールが by_id 全体を走査せずに済むよう事前計算する
+    index.update(build_top_level_sections(by_id))
+    return index
+
+
+def build_index_from_entries(by_id: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """ドキュメント順に並んだ by_id から by_name などのセクションを導出してインデックスを生成
+
+    部分更新でノードを差し替えた by_id から、ツリーを走査し直さずにインデックスを組み立てる。
+
+    Args:
+        by_id: node_id -> {"name", "type", "parent_id"} (ドキュメント順)
+
+    Returns:
+        ノードインデックス
+    """
+    by_name: dict[str, list[str]] = {}
+    by_frame_title: dict[str, list[str]] = {}
+    for node_id, entry in by_id.items():
+        node_name = entry.get("name", "")
+        if node_name:
+            by_name.setdefault(node_name, []).append(node_id)
+            if entry.get("type") == "FRAME":
+                by_frame_title.setdefault(node_name, []).append(node_id)
+    return _finish_index(by_id, by_name, by_frame_title)
+
+
+def build_index_from_spans(
+    spans: Iterable[NodeSpan],
+) -> tuple[dict[str, Any], dict[str, list[int]]]:
+    """iter_node_spans のイベントからノードインデックスを生成
+
+    イベントは後順 (子が先) に届くため、前順の番号でノードの情報だけを控えておき、
+    走査後に前順に並べ直して build_index と同じ順序・同じ規則で登録する。
+
+    Args:
+        spans: iter_node_spans が返すノード
+
+    Returns:
+        (ノードインデックス, ノードのバイト範囲)
+    """
+    records: dict[int, NodeSpan] = {span.seq: span for span in spans}
+
+    by_id: dict[str, dict[str, Any]] = {}
+    by_name: dict[str, list[str]] = {}
+    by_frame_title: dict[str, list[str]] = {}
+    offsets: dict[str, list[int]] = {}
+    for seq in range(len(records)):
+        span = records[seq]
+        node_id = span.node_id or ""
+        node_name = span.name or ""
+        node_type = span.type or ""
+        parent_id = None if span.parent_seq < 0 else records[span.parent_seq].node_id or ""
+
+        by_id[node_id] = {"name": node_name, "type": node_type, "parent_id": parent_id}
+        if node_name:
+            by_name.setdefault(node_name, []).append(node_id)
+            if node_type == "FRAME":
+                by_frame_title.setdefault(node_name, []).append(node_id)
+        # ID 重複時は最初に現れたノードを優先する (CacheStore.get_node と同じ規則)
+        if span.node_id is not None and span.node_id not in offsets:
+            offsets[span.node_id] = [span.start, span.end]
+    return _finish_index(by_id, by_name, by_frame_title), offsets
+
+
+def build_index_from_file(raw_path: Path) -> tuple[dict[str, Any], dict[str, Any]]:
+    """保存済みの file_raw.json をドキュメントツリーに展開せずに走査してインデックスを生成
+
+    非圧縮のファイルは mmap して走査するため、ヒープに載るのはインデックスと
+    走査中のスタック (ツリーの深さに比例) だけになる。圧縮されたファイルは展開後の
+    バイト列をメモリに読み込んでから走査する。
+
+    Args:
+        raw_path: file_raw.json のパス
+
+    Returns:
+        (ノードインデックス, ルート直下の文字列フィールド (name, lastModified, version 等))。
+        インデックスには展開後のバイト列に対する "offsets" も含む
 
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: JSON オブジェクトとして読めない場合
+    """
+    root_fields: dict[str, Any] = {}
+    with open(raw_path, "rb") as f:
+        head = f.read(8)
+        if not head:
+            raise ValueError(f"Empty file: {raw_path}")
+        if detect_compression(head) is not Compression.NONE:
+            buffer = read_cache_bytes(raw_path)
+            index, offsets = build_index_from_spans(iter_node_spans(buffer, root_fields))
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                index, offsets = build_index_from_spans(iter_node_spans(mapped, root_fields))
+        index["offsets"] = offsets
+    if not index["by_id"]:
+        raise ValueError(f"No document found in {raw_path}")
+    return index, root_fields
 
-def save_index(index: dict[str, Any], cache_dir: Path, file_id: str) -> None:
+
+def save_index(
+    index: dict[str, Any],
+    cache_dir: Path,
+    file_id: str,
+    compression: Compression = Compression.NONE,
+    level: int | None = None,
+) -> None:
     """インデックスをディスクに保存
 
     Args:
         index: 保存するインデックスデータ
         cache_dir: キャッシュディレクトリのパス
         file_id: Figma ファイル ID
+        compression: 圧縮形式
+        level: 圧縮レベル (None の場合は形式ごとのデフォルト)
 
     Raises:
         InvalidFileIdError: file_id が無効な形式の場合
@@ -73,5 +264,96 @@ def save_index(index: dict[str, Any], cache_dir: Path, file_id: str) -> None:
     file_dir.mkdir(parents=True, exist_ok=True)
 
     index_path = file_dir / "nodes_index.json"
-    with open(index_path, "w", encoding="utf-8") as f:
+    with create_cache_file(index_path, compression, level) as f:
         json.dump(index, f, ensure_ascii=False, indent=2)
+
+
+def save_binary_index(index: dict[str, Any], cache_dir: Path, file_id: str) -> None:
+    """インデックスをバイナリ形式 (nodes_index.bin) でディスクに保存
+
+    稼働中のサーバーが旧ファイルを mmap している可能性があるため、
+    一時ファイルに書き出してから置き換える。
+
+    Args:
+        index: 保存するインデックスデータ
+        cache_dir: キャッシュディレクトリのパス
+        file_id: Figma ファイル ID
+
+    Raises:
+        InvalidFileIdError: file_id が無効な形式の場合
+    """
+    validate_file_id(file_id)
+    file_dir = cache_dir / file_id
+    file_dir.mkdir(parents=True, exist_ok=True)
+
+    index_path = file_dir / "nodes_index.bin"
+    tmp_path = file_dir / "nodes_index.bin.tmp"
+    tmp_path.write_bytes(encode_binary_index(index))
+    os.replace(tmp_path, index_path)
+
+
+def save_sqlite_index(
+    file_data: dict[str, Any], index: dict[str, Any], cache_dir: Path, file_id: str
+) -> None:
+    """インデックスを SQLite 形式 (nodes_index.sqlite) でディスクに保存
+
+    ノードの生 JSON も DB に入れるため、インデックスに加えて元のファイル JSON を受け取る。
+    稼働中のサーバーが旧ファイルを開いている可能性があるため、
+    一時ファイルに書き出してから置き換える。
+
+    Args:
+        file_data: Figma ファイルの生 JSON
+        index: build_index で生成したインデックス
+        cache_dir: キャッシュディレクトリのパス
+        file_id: Figma ファイル ID
+
+    Raises:
+        InvalidFileIdError: file_id が無効な形式の場合
+        OSError: DB を書き出せない場合 (ディスク不足や、FTS5 の trigram トークナイザを
+            持たない SQLite など。一時ファイルは削除する)
+    """
+    validate_file_id(file_id)
+    file_dir = cache_dir / file_id
+    file_dir.mkdir(parents=True, exist_ok=True)
+
+    index_path = file_dir / "nodes_index.sqlite"
+    tmp_path = file_dir / "nodes_index.sqlite.tmp"
+    try:
+        write_sqlite_index(file_data, index, tmp_path)
+    except sqlite3.Error as e:
+        tmp_path.unlink(missing_ok=True)
+        raise OSError(f"Failed to write SQLite index: {e}") from e
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, index_path)
+
+
+def save_trigram_index(
+    trigram_index: dict[str, Any],
+    cache_dir: Path,
+    file_id: str,
+    compression: Compression = Compression.NONE,
+    level: int | None = None,
+) -> None:
+    """トライグラムインデックスを nodes_index.json と同じディレクトリに保存
+
+    転置リストは大きくなりやすいため、インデントなしで書き出す。
+
+    Args:
+        trigram_index: 保存するトライグラムインデックス
+        cache_dir: キャッシュディレクトリのパス
+        file_id: Figma ファイル ID
+        compression: 圧縮形式
+        level: 圧縮レベル (None の場合は形式ごとのデフォルト)
+
+    Raises:
+        InvalidFileIdError: file_id が無効な形式の場合
+    """
+    validate_file_id(file_id)
+    file_dir = cache_dir / file_id
+    file_dir.mkdir(parents=True, exist_ok=True)
+
+    trigram_path = file_dir / "trigram_index.json"
+    with create_cache_file(trigram_path, compression, level) as f:
+        json.dump(trigram_index, f, ensure_ascii=False, separators=(",", ":"))
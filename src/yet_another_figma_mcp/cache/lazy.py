@@ -0,0 +1,181 @@
+"""必要になった部分だけをデコードする生 JSON のビュー
+
+CacheStore.get_file はファイル全体をパースせず、生 JSON のバイト列を保持した LazyNode を返す。
+LazyNode は dict と同じ Mapping インターフェースを持ち、初回アクセス時に "document" /
+"children" 以外のメンバーだけをデコードする。"document" の値は LazyNode、"children" の値は
+要素ごとのバイト範囲を持つ LazyList として返し、アクセスされた要素だけを LazyNode にする。
+
+インデックスのバイト範囲 (offsets) を渡すと子ノードの中身を走査せずに読み飛ばすため、
+ルートから深いノードまで辿っても、デコードされるのは経路上のノード (子を除く) だけになる。
+JSON として返す (json.dumps する) 場合は to_dict でサブツリーを dict にデコードする。
+"""
+
+import json
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, cast, overload
+
+from yet_another_figma_mcp.cache.offsets import peek_node_id, split_lazy_members
+
+
+class LazyNode(Mapping[str, Any]):
+    """バイト列上の JSON オブジェクトを、アクセスされたメンバーから順にデコードするビュー"""
+
+    __slots__ = ("_buffer", "_end", "_members", "_offsets", "_start")
+
+    def __init__(
+        self,
+        buffer: bytes,
+        start: int = 0,
+        end: int | None = None,
+        offsets: Mapping[str, list[int]] | None = None,
+    ) -> None:
+        """
+        Args:
+            buffer: 生 JSON のバイト列 (ビューが参照している間は保持される)
+            start: オブジェクトの開始位置
+            end: オブジェクトの終了位置 (None の場合はバイト列の末尾)
+            offsets: インデックスの node_id -> [start, end) のマップ (子ノードの読み飛ばしに使う)
+        """
+        self._buffer = buffer
+        self._start = start
+        self._end = len(buffer) if end is None else end
+        self._offsets = offsets
+        self._members: dict[str, Any] | None = None
+
+    def _load(self) -> dict[str, Any]:
+        """子ノード以外のメンバーをデコードする (初回のみ)
+
+        Raises:
+            ValueError: JSON オブジェクトとして読めない場合
+        """
+        members = self._members
+        if members is None:
+            head, lazy = split_lazy_members(self._buffer, self._start, self._end, self._offsets)
+            decoded = json.loads(head)
+            if not isinstance(decoded, dict):
+                raise ValueError(f"Not a JSON object at byte {self._start}")
+            members = cast(dict[str, Any], decoded)
+            for key, member in lazy.items():
+                if member.elements is None:
+                    members[key] = LazyNode(self._buffer, member.start, member.end, self._offsets)
+                else:
+                    members[key] = LazyList(self._buffer, member.elements, self._offsets)
+            self._members = members
+        return members
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __repr__(self) -> str:
+        return f"LazyNode(bytes {self._start}..{self._end})"
+
+    @property
+    def span(self) -> tuple[int, int]:
+        """オブジェクトが占める [start, end) のバイト範囲"""
+        return self._start, self._end
+
+    @property
+    def node_id(self) -> str | None:
+        """ノードの ID ("id" が先頭にあればメンバーをデコードせずに読む)"""
+        if self._members is None:
+            node_id = peek_node_id(self._buffer, self._start)
+            if node_id is not None:
+                return node_id
+        node_id = self._load().get("id")
+        return node_id if isinstance(node_id, str) else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """サブツリー全体を dict にデコードする (呼び出すたびに新しい dict を返す)"""
+        decoded = json.loads(self._buffer[self._start : self._end])
+        if not isinstance(decoded, dict):
+            raise ValueError(f"Not a JSON object at byte {self._start}")
+        return cast(dict[str, Any], decoded)
+
+
+class LazyList(Sequence[Any]):
+    """ "children" 配列のビュー。要素 (ノード) はアクセスされたときに LazyNode にする"""
+
+    __slots__ = ("_buffer", "_nodes", "_offsets", "_spans")
+
+    def __init__(
+        self,
+        buffer: bytes,
+        spans: list[tuple[int, int]],
+        offsets: Mapping[str, list[int]] | None = None,
+    ) -> None:
+        self._buffer = buffer
+        self._spans = spans
+        self._offsets = offsets
+        self._nodes: list[LazyNode | None] = [None] * len(spans)
+
+    def _node(self, position: int) -> LazyNode:
+        node = self._nodes[position]
+        if node is None:
+            start, end = self._spans[position]
+            node = LazyNode(self._buffer, start, end, self._offsets)
+            self._nodes[position] = node
+        return node
+
+    @overload
+    def __getitem__(self, index: int) -> LazyNode: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[LazyNode]: ...
+
+    def __getitem__(self, index: int | slice) -> LazyNode | list[LazyNode]:
+        if isinstance(index, slice):
+            return [self._node(position) for position in range(len(self._spans))[index]]
+        return self._node(range(len(self._spans))[index])
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        items = cast(Sequence[Any], other)
+        return len(self) == len(items) and all(a == b for a, b in zip(self, items, strict=True))
+
+    def __repr__(self) -> str:
+        return f"LazyList({len(self._spans)} nodes)"
+
+    def find(self, node_id: str) -> LazyNode | None:
+        """ID が一致する最初の要素を返す (各要素は先頭の "id" だけを読む)"""
+        for position in range(len(self._spans)):
+            node = self._node(position)
+            if node.node_id == node_id:
+                return node
+        return None
+
+
+def find_lazy_node(root: LazyNode, path: Sequence[str]) -> LazyNode | None:
+    """ドキュメントのルートから ID の列を順に辿ってノードのビューを取得
+
+    Args:
+        root: ファイル全体のビュー
+        path: ドキュメントのルート ("document") からノード自身までの ID の列
+
+    Returns:
+        ノードのビュー (経路上のノードが見つからない場合は None)
+
+    Raises:
+        ValueError: 経路上のオブジェクトが JSON として読めない場合
+    """
+    node = root.get("document")
+    if not path or not isinstance(node, LazyNode) or node.node_id != path[0]:
+        return None
+    for node_id in path[1:]:
+        children = node.get("children")
+        if not isinstance(children, LazyList):
+            return None
+        found = children.find(node_id)
+        if found is None:
+            return None
+        node = found
+    return node
@@ -0,0 +1,268 @@
+"""キャッシュディレクトリ全体のマニフェスト (<cache_dir>/index.json)
+
+cache / reindex コマンドはファイルごとのキャッシュを書き終えるたびに、
+ファイル名・バージョン・ノード数・ファイルサイズ・内容のハッシュ・キャッシュ日時を
+index.json に記録する。status コマンドやサーバーのファイル一覧はこのファイルだけを読み、
+各ファイルの生 JSON やインデックスは開かない。
+
+index.json がない、または壊れている場合は rebuild_manifest でディスク上の
+キャッシュから再構築できる。
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, cast
+
+from yet_another_figma_mcp.cache.binary_index import BinaryIndexError, load_binary_index
+from yet_another_figma_mcp.cache.compression import open_cache_file, read_cache_bytes
+from yet_another_figma_mcp.cache.generations import resolve_file_dir
+from yet_another_figma_mcp.cache.shards import SHARD_ROOT_NAME, is_sharded, iter_assembled_chunks
+from yet_another_figma_mcp.cache.sqlite_index import SqliteIndexError, count_sqlite_index_nodes
+from yet_another_figma_mcp.cache.store import (
+    FILE_METADATA_FIELDS,
+    InvalidFileIdError,
+    validate_file_id,
+)
+
+MANIFEST_NAME = "index.json"
+MANIFEST_VERSION = 1
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_cache_file(path: Path) -> str:
+    """キャッシュファイルの内容 (圧縮されていれば展開後) の SHA-256 を求める
+
+    Returns:
+        "sha256:<16 進数>" 形式のハッシュ
+
+    Raises:
+        OSError: ファイルが読めない場合
+    """
+    digest = hashlib.sha256()
+    with open_cache_file(path) as f:
+        try:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        except EOFError as e:
+            raise OSError(f"Truncated compressed file: {path}") from e
+        except (lzma.LZMAError, zlib.error) as e:
+            raise OSError(f"Corrupt compressed file: {path}") from e
+    return f"sha256:{digest.hexdigest()}"
+
+
+def hash_raw_content(file_dir: Path) -> str:
+    """キャッシュ済みの生 JSON (ページ単位のシャードは結合後) のハッシュを求める
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: シャードのルートファイルが JSON として読めない場合
+    """
+    raw_path = file_dir / "file_raw.json"
+    if raw_path.exists() or not is_sharded(file_dir):
+        return hash_cache_file(raw_path)
+    digest = hashlib.sha256()
+    for chunk in iter_assembled_chunks(file_dir):
+        digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def cache_file_sizes(file_dir: Path) -> dict[str, int]:
+    """キャッシュディレクトリ内のファイルごとのディスク上のサイズ (書き込み中の一時ファイルを除く)"""
+    return {
+        path.relative_to(file_dir).as_posix(): path.stat().st_size
+        for path in sorted(file_dir.rglob("*"))
+        if path.is_file() and path.suffix != ".tmp"
+    }
+
+
+def build_manifest_entry(
+    file_dir: Path, metadata: dict[str, Any], content_hash: str | None
+) -> dict[str, Any]:
+    """cache_meta.json の内容にサイズとハッシュを加えてマニフェストのエントリを生成"""
+    sizes = cache_file_sizes(file_dir)
+    return {
+        **metadata,
+        "content_hash": content_hash,
+        "sizes": sizes,
+        "total_size": sum(sizes.values()),
+    }
+
+
+def load_manifest(cache_dir: Path) -> dict[str, dict[str, Any]] | None:
+    """index.json を読み込む
+
+    Returns:
+        file_id -> エントリのマップ (ない、壊れている、未対応のバージョンの場合は None)
+    """
+    try:
+        with open(cache_dir / MANIFEST_NAME, encoding="utf-8") as f:
+            loaded = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(loaded, dict):
+        return None
+    manifest = cast(dict[str, Any], loaded)
+    files = manifest.get("files")
+    if manifest.get("version") != MANIFEST_VERSION or not isinstance(files, dict):
+        return None
+    return cast(dict[str, dict[str, Any]], files)
+
+
+def write_manifest(cache_dir: Path, files: dict[str, dict[str, Any]]) -> None:
+    """index.json を書き出す
+
+    読み込み中のプロセスが書きかけの内容を見ないよう、一時ファイルに書いてから置き換える。
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "files": dict(sorted(files.items())),
+    }
+    tmp_path = cache_dir / f"{MANIFEST_NAME}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, cache_dir / MANIFEST_NAME)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def update_manifest(cache_dir: Path, file_id: str, entry: dict[str, Any]) -> None:
+    """index.json のエントリを 1 件追加・更新する
+
+    index.json がない (マニフェスト導入前のキャッシュ) 場合は、他のファイルが
+    一覧から漏れないよう、ディスク上のキャッシュから (ハッシュを除いて) 補ってから書き出す。
+    """
+    files = load_manifest(cache_dir)
+    if files is None:
+        files = scan_cache_entries(cache_dir, with_hash=False)
+    files[file_id] = entry
+    write_manifest(cache_dir, files)
+
+
+def _count_index_nodes(file_dir: Path) -> int:
+    """インデックスからノード数を数える (インデックスがない・壊れている場合は 0)"""
+    index_path = file_dir / "nodes_index.json"
+    binary_index_path = file_dir / "nodes_index.bin"
+    sqlite_index_path = file_dir / "nodes_index.sqlite"
+    if index_path.exists():
+        try:
+            return len(json.loads(read_cache_bytes(index_path)).get("by_id", {}))
+        except (ValueError, OSError, AttributeError):
+            return 0
+    if binary_index_path.exists():
+        try:
+            return len(load_binary_index(binary_index_path.read_bytes())["by_id"])
+        except (BinaryIndexError, OSError):
+            return 0
+    if sqlite_index_path.exists():
+        try:
+            return count_sqlite_index_nodes(sqlite_index_path)
+        except SqliteIndexError:
+            return 0
+    return 0
+
+
+def scan_cache_entry(file_dir: Path, with_hash: bool = True) -> dict[str, Any] | None:
+    """ディスク上のキャッシュディレクトリからマニフェストのエントリを生成
+
+    cache_meta.json に必要な項目があればそれを使い、ない (古いキャッシュの) 場合だけ
+    生 JSON やインデックスを読んで補う。
+
+    Args:
+        file_dir: ファイルごとのキャッシュディレクトリ (世代ディレクトリの場合は CURRENT が指す先)
+        with_hash: 生 JSON の内容のハッシュも求めるか
+
+    Returns:
+        エントリ (生 JSON がない、または読めない場合は None)
+    """
+    raw_path = file_dir / "file_raw.json"
+    if not raw_path.exists():
+        # ページ単位に分割したキャッシュはルートファイルにファイル名などを持つ
+        raw_path = file_dir / SHARD_ROOT_NAME
+        if not raw_path.exists():
+            return None
+
+    metadata: dict[str, Any] = {}
+    try:
+        with open(file_dir / "cache_meta.json", encoding="utf-8") as f:
+            loaded = json.load(f)
+        if isinstance(loaded, dict):
+            metadata = cast(dict[str, Any], loaded)
+    except (OSError, ValueError):
+        pass
+
+    if not all(field in metadata for field in FILE_METADATA_FIELDS):
+        try:
+            file_data = json.loads(read_cache_bytes(raw_path))
+        except (ValueError, OSError):
+            return None
+        if not isinstance(file_data, dict):
+            return None
+        fields = cast(dict[str, Any], file_data)
+        metadata.update({field: fields.get(field) for field in FILE_METADATA_FIELDS})
+    if metadata.get("name") is None:
+        metadata["name"] = "Unknown"
+
+    if "node_count" not in metadata:
+        metadata["node_count"] = _count_index_nodes(file_dir)
+
+    if not isinstance(metadata.get("cached_at"), str):
+        # フォールバック: 生 JSON の mtime を使用
+        mtime = raw_path.stat().st_mtime
+        metadata["cached_at"] = datetime.fromtimestamp(mtime, tz=timezone.utc).isoformat()
+        metadata["cached_at_unix"] = mtime
+
+    content_hash: str | None = None
+    if with_hash:
+        try:
+            content_hash = hash_raw_content(file_dir)
+        except (OSError, ValueError):
+            content_hash = None
+    return build_manifest_entry(file_dir, metadata, content_hash)
+
+
+def scan_cache_entries(cache_dir: Path, with_hash: bool = True) -> dict[str, dict[str, Any]]:
+    """キャッシュディレクトリ内の全ファイルのエントリをディスクから生成
+
+    Args:
+        cache_dir: キャッシュディレクトリ
+        with_hash: 生 JSON の内容のハッシュも求めるか
+
+    Returns:
+        file_id -> エントリのマップ
+    """
+    files: dict[str, dict[str, Any]] = {}
+    if not cache_dir.is_dir():
+        return files
+    for file_dir in cache_dir.iterdir():
+        if not file_dir.is_dir():
+            continue
+        # file_id のバリデーション (不正なディレクトリ名をスキップ)
+        try:
+            validate_file_id(file_dir.name)
+        except InvalidFileIdError:
+            continue
+        entry = scan_cache_entry(resolve_file_dir(cache_dir, file_dir.name), with_hash)
+        if entry is not None:
+            files[file_dir.name] = entry
+    return files
+
+
+def rebuild_manifest(cache_dir: Path) -> dict[str, dict[str, Any]]:
+    """ディスク上のキャッシュから index.json を再構築する (修復用)
+
+    Returns:
+        書き出した file_id -> エントリのマップ
+    """
+    files = scan_cache_entries(cache_dir)
+    write_manifest(cache_dir, files)
+    return files
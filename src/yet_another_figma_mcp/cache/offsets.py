@@ -0,0 +1,352 @@
+"""file_raw.json 内のノードのバイトオフセット管理
+
+キャッシュ時に保存済みの file_raw.json をトークン単位で走査し、
+各ノードの JSON オブジェクトが占める [start, end) のバイト範囲を記録する。
+読み込み時はファイルを mmap し、その範囲だけをデコードすることで
+ファイル全体をパースせずに単一ノードを取得できる。範囲は常に展開後のバイト列に対する
+位置で、圧縮されたファイルでは mmap の代わりに遅延デコードするビュー (LazyNode) が
+子ノードの読み飛ばしに使う。
+
+走査はノードを閉じるたびにイベント (NodeSpan) を返すため、ドキュメントツリーを
+メモリに展開せずにノードインデックスを組み立てる用途にも使える。
+
+split_lazy_members は 1 つのオブジェクトを、"document" / "children" の値を除いた部分と
+それらの値のバイト範囲に分ける (遅延デコードするビュー LazyNode 用)。
+"""
+
+import json
+import mmap
+import re
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, NamedTuple, cast
+
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    detect_compression,
+    read_cache_bytes,
+)
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+
+# キー (と、値がスカラーならその値まで) / 配列内の文字列 / 構造文字 をトークンとして拾う。
+# トークン間の空白や区切り文字は先頭の [^"{}\[\]]*+ でまとめて読み飛ばし、
+# スカラー値はキーと一緒に消費することで Python 側で扱うトークン数を減らす
+_TOKEN_PATTERN = re.compile(
+    rb'[^"{}\[\]]*+(?:'
+    rb"(" + _STRING + rb")\s*:\s*(?:(" + _STRING + rb")|[^\s{}\[\],\"]+|(?=[{\[]))"
+    rb"|" + _STRING + rb"|([{}\[\]]))"
+)
+
+_OPEN_BRACKETS = (b"{", b"[")
+
+# 遅延デコードの対象とするメンバー (キー -> 値の開き括弧)
+_LAZY_MEMBERS = {b'"document"': b"{", b'"children"': b"["}
+
+# ノードの先頭の "id" (Figma のノードは "id" から始まる)
+_LEADING_ID_PATTERN = re.compile(rb"\{\s*(" + _STRING + rb")\s*:\s*(" + _STRING + rb")")
+
+
+class NodeSpan(NamedTuple):
+    """走査で見つかったノード (閉じ括弧の時点で確定し、後順に返される)
+
+    フィールドの値は文字列の場合のみ記録し、ない場合は None になる。
+    """
+
+    seq: int  # 前順 (ドキュメント順) の番号
+    parent_seq: int  # 親ノードの番号 (ルートの "document" は -1)
+    start: int
+    end: int
+    node_id: str | None
+    name: str | None
+    type: str | None
+
+
+class _Frame:
+    """走査中のコンテナ (オブジェクト/配列) の状態"""
+
+    __slots__ = (
+        "is_children",
+        "is_node",
+        "key",
+        "name",
+        "node_id",
+        "parent_seq",
+        "seq",
+        "start",
+        "type",
+    )
+
+    def __init__(
+        self, start: int, is_node: bool, is_children: bool, seq: int = -1, parent_seq: int = -1
+    ) -> None:
+        self.start = start
+        self.is_node = is_node
+        self.is_children = is_children
+        self.seq = seq
+        self.parent_seq = parent_seq
+        self.key: bytes | None = None
+        self.node_id: str | None = None
+        self.name: str | None = None
+        self.type: str | None = None
+
+
+def iter_node_spans(
+    buffer: bytes | mmap.mmap, root_fields: dict[str, Any] | None = None
+) -> Iterator[NodeSpan]:
+    """Figma ファイル JSON のバイト列を走査し、ノードを閉じるたびに NodeSpan を返す
+
+    ルートの "document" オブジェクトと、ノードの "children" 配列の要素をノードとみなす。
+    保持するのは走査中のコンテナのスタックだけなので、追加メモリはツリーの深さに比例する。
+
+    Args:
+        buffer: file_raw.json の内容 (bytes または mmap)
+        root_fields: 指定した場合、ルートオブジェクト直下の文字列値 (name, version 等) を格納する
+
+    Raises:
+        ValueError: 括弧の対応が取れない (JSON が途中で切れている) 場合
+    """
+    stack: list[_Frame] = []
+    next_seq = 0
+
+    for match in _TOKEN_PATTERN.finditer(buffer):
+        key, value, bracket = match.groups()
+        top = stack[-1] if stack else None
+
+        if bracket is None:
+            # キー (配列内の文字列は構造に関係しないので無視)
+            if key is None or top is None:
+                continue
+            top.key = key
+            if value is None:
+                continue
+            if top.is_node:
+                if key == b'"id"':
+                    if top.node_id is None:
+                        top.node_id = json.loads(value)
+                elif key == b'"name"':
+                    if top.name is None:
+                        top.name = json.loads(value)
+                elif key == b'"type"' and top.type is None:
+                    top.type = json.loads(value)
+            elif root_fields is not None and len(stack) == 1:
+                root_fields.setdefault(json.loads(key), json.loads(value))
+            continue
+
+        if bracket in _OPEN_BRACKETS:
+            if top is None:
+                stack.append(_Frame(match.end() - 1, False, False))
+            elif bracket == b"{":
+                # ルート直下の "document"、またはノードの "children" 配列の要素
+                if len(stack) == 1 and top.key == b'"document"':
+                    stack.append(_Frame(match.end() - 1, True, False, next_seq, -1))
+                    next_seq += 1
+                elif top.is_children:
+                    parent_seq = stack[-2].seq
+                    stack.append(_Frame(match.end() - 1, True, False, next_seq, parent_seq))
+                    next_seq += 1
+                else:
+                    stack.append(_Frame(match.end() - 1, False, False))
+            else:
+                is_children = top.is_node and top.key == b'"children"'
+                stack.append(_Frame(match.end() - 1, False, is_children))
+            continue
+
+        # '}' または ']'
+        if not stack:
+            raise ValueError(f"Unbalanced bracket at byte {match.end() - 1}")
+        frame = stack.pop()
+        if frame.is_node:
+            yield NodeSpan(
+                frame.seq,
+                frame.parent_seq,
+                frame.start,
+                match.end(),
+                frame.node_id,
+                frame.name,
+                frame.type,
+            )
+
+    if stack:
+        raise ValueError("Unexpected end of JSON data")
+
+
+class LazyMember(NamedTuple):
+    """split_lazy_members で切り出したメンバーの値のバイト範囲"""
+
+    start: int
+    end: int
+    elements: list[tuple[int, int]] | None  # 配列の場合は要素 (ノード) ごとの範囲
+
+
+def peek_node_id(buffer: bytes | mmap.mmap, start: int) -> str | None:
+    """オブジェクトの先頭のメンバーが "id" であれば、その値を返す (オブジェクト全体は読まない)"""
+    match = _LEADING_ID_PATTERN.match(buffer, start)
+    if match is None or match.group(1) != b'"id"':
+        return None
+    return json.loads(match.group(2))
+
+
+def _skip_by_offsets(
+    buffer: bytes | mmap.mmap, start: int, offsets: Mapping[str, list[int]] | None
+) -> int | None:
+    """インデックスのバイト範囲を使ってノードの終了位置を求める (使えない場合は None)"""
+    if offsets is None:
+        return None
+    node_id = peek_node_id(buffer, start)
+    span = offsets.get(node_id) if node_id is not None else None
+    if span is None or span[0] != start or buffer[span[1] - 1 : span[1]] != b"}":
+        return None
+    return span[1]
+
+
+def split_lazy_members(
+    buffer: bytes | mmap.mmap,
+    start: int,
+    end: int,
+    offsets: Mapping[str, list[int]] | None = None,
+) -> tuple[bytes, dict[str, LazyMember]]:
+    """オブジェクトを "document" / "children" の値とそれ以外に分ける
+
+    戻り値の先頭は、それらの値を null に置き換えたオブジェクトのバイト列で、
+    そのまま json.loads すれば残りのメンバーだけがデコードされる。
+    offsets (インデックスのバイト範囲) を渡すと、子ノードの中身を走査せずに読み飛ばす。
+    渡さない場合は子孫ノードのトークンも走査する。
+
+    Args:
+        buffer: file_raw.json の内容 (bytes または mmap)
+        start: オブジェクトの開始位置 ("{")
+        end: オブジェクトの終了位置 ("}" の次)
+        offsets: node_id -> [start, end) のマップ
+
+    Returns:
+        (値を null に置き換えたバイト列, キー -> 値のバイト範囲)
+
+    Raises:
+        ValueError: 範囲がオブジェクトとして閉じていない場合
+    """
+    pieces: list[bytes] = []
+    members: dict[str, LazyMember] = {}
+    position = start
+    depth = 0
+    key: bytes | None = None
+    lazy_key: bytes | None = None
+    lazy_start = 0
+    elements: list[tuple[int, int]] | None = None
+    element_start = 0
+
+    pos = start
+    while (match := _TOKEN_PATTERN.match(buffer, pos, end)) is not None:
+        pos = match.end()
+        token_key, _, bracket = match.groups()
+        if bracket is None:
+            if token_key is not None and depth == 1:
+                key = token_key
+            continue
+
+        bracket_pos = pos - 1
+        if bracket in _OPEN_BRACKETS:
+            depth += 1
+            if depth == 2 and key is not None and _LAZY_MEMBERS.get(key) == bracket:
+                lazy_key, lazy_start = key, bracket_pos
+                elements = [] if bracket == b"[" else None
+                # "document" の値はノードなので、範囲が分かれば丸ごと読み飛ばす
+                skipped = (
+                    _skip_by_offsets(buffer, bracket_pos, offsets) if elements is None else None
+                )
+                if skipped is not None:
+                    pieces.extend((buffer[position:bracket_pos], b"null"))
+                    members[json.loads(lazy_key)] = LazyMember(bracket_pos, skipped, None)
+                    pos = position = skipped
+                    lazy_key = None
+                    depth -= 1
+            elif depth == 3 and elements is not None and lazy_key is not None and bracket == b"{":
+                element_start = bracket_pos
+                if (skipped := _skip_by_offsets(buffer, bracket_pos, offsets)) is not None:
+                    elements.append((bracket_pos, skipped))
+                    pos = skipped
+                    depth -= 1
+            continue
+
+        if depth == 3 and elements is not None and lazy_key is not None:
+            elements.append((element_start, pos))
+        elif depth == 2 and lazy_key is not None:
+            pieces.extend((buffer[position:lazy_start], b"null"))
+            members[json.loads(lazy_key)] = LazyMember(lazy_start, pos, elements)
+            position, lazy_key, elements = pos, None, None
+        depth -= 1
+        if depth == 0:
+            pieces.append(buffer[position:pos])
+            return b"".join(pieces), members
+
+    raise ValueError(f"Unterminated object at byte {start}")
+
+
+def scan_node_offsets(buffer: bytes | mmap.mmap) -> dict[str, list[int]]:
+    """Figma ファイル JSON のバイト列からノードごとのバイト範囲を抽出
+
+    ID が重複する場合は最初に現れたノードを優先する (CacheStore.get_node と同じ規則)。
+    子ノードは親より先に閉じるため、重複判定は前順の番号で行う。
+
+    Args:
+        buffer: file_raw.json の内容 (bytes または mmap)
+
+    Returns:
+        node_id -> [start, end) のマップ
+
+    Raises:
+        ValueError: 括弧の対応が取れない (JSON が途中で切れている) 場合
+    """
+    offsets: dict[str, list[int]] = {}
+    first_seq: dict[str, int] = {}
+    for span in iter_node_spans(buffer):
+        node_id = span.node_id
+        if node_id is None:
+            continue
+        if node_id not in first_seq or span.seq < first_seq[node_id]:
+            first_seq[node_id] = span.seq
+            offsets[node_id] = [span.start, span.end]
+    return offsets
+
+
+def build_node_offsets(raw_path: Path) -> dict[str, list[int]]:
+    """保存済みの file_raw.json を走査してノードのバイト範囲を生成
+
+    圧縮されたファイルは展開後のバイト列に対する範囲を返す。
+
+    Args:
+        raw_path: file_raw.json のパス
+
+    Returns:
+        node_id -> [start, end) のマップ (空ファイルの場合は空)
+    """
+    with open(raw_path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return {}
+        f.seek(0)
+        if detect_compression(f.read(8)) is not Compression.NONE:
+            return scan_node_offsets(read_cache_bytes(raw_path))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return scan_node_offsets(mapped)
+
+
+def read_node_slice(mapped: mmap.mmap, span: list[int]) -> dict[str, Any] | None:
+    """mmap 済みの file_raw.json から指定範囲のノードだけをデコード
+
+    Args:
+        mapped: file_raw.json の mmap
+        span: [start, end) のバイト範囲
+
+    Returns:
+        ノードの JSON (範囲が不正でデコードできない場合は None)
+    """
+    start, end = span
+    if start < 0 or end > len(mapped) or start >= end:
+        return None
+    try:
+        node = json.loads(mapped[start:end])
+    except ValueError:
+        return None
+    if not isinstance(node, dict):
+        return None
+    return cast(dict[str, Any], node)
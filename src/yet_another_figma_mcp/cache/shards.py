@@ -0,0 +1,188 @@
+"""ページ単位に分割した生 JSON (file_root.json + pages/*.json)
+
+cache --shard-pages は、ダウンロードした file_raw.json をドキュメント直下のノード
+(CANVAS = ページ) ごとのシャードと、それ以外 (ドキュメントのメタデータ、components、
+styles 等) を持つ小さなルートファイルに分割して保存する。
+
+- pages/<n>.json: ページノードの JSON。元のファイルのバイト列をそのまま書き出す
+- file_root.json: ページノードをスタブ ({"id", "name", "type", "shard", "shard_offset"})
+  に置き換えた元のファイル
+
+スタブの shard_offset は、ページが元のファイル内で始まる位置。インデックスの offsets は
+元のファイルに対するバイト範囲のままなので、そこから引けばシャード内の範囲になる。
+スタブをシャードの内容で置き換えると元のファイルのバイト列が復元できる。
+"""
+
+import io
+import json
+import mmap
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, cast
+
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    detect_compression,
+    open_cache_writer,
+    read_cache_bytes,
+)
+from yet_another_figma_mcp.cache.offsets import iter_node_spans
+
+SHARD_ROOT_NAME = "file_root.json"
+SHARD_DIR_NAME = "pages"
+
+# ルートの "document" ノードの前順の番号 (ページはこれを親に持つ)
+_DOCUMENT_SEQ = 0
+
+
+def is_sharded(file_dir: Path) -> bool:
+    """キャッシュディレクトリがページ単位に分割されているかを判定"""
+    return (file_dir / SHARD_ROOT_NAME).exists()
+
+
+def _page_spans(buffer: bytes | mmap.mmap) -> list[tuple[int, int]]:
+    """ドキュメント直下のノードのバイト範囲をドキュメント順に列挙"""
+    return sorted(
+        (span.start, span.end)
+        for span in iter_node_spans(buffer)
+        if span.parent_seq == _DOCUMENT_SEQ
+    )
+
+
+def _write_shards(
+    buffer: bytes | mmap.mmap,
+    file_dir: Path,
+    compression: Compression,
+    level: int | None,
+) -> int:
+    """バイト列をシャードとルートファイルに分割して書き出す"""
+    spans = _page_spans(buffer)
+    if not spans:
+        raise ValueError("No pages found in the document")
+
+    shard_dir = file_dir / SHARD_DIR_NAME
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    shard_dir.mkdir()
+
+    root_tmp = file_dir / f"{SHARD_ROOT_NAME}.tmp"
+    with open_cache_writer(root_tmp, compression, level) as root:
+        position = 0
+        for number, (start, end) in enumerate(spans):
+            shard = f"{SHARD_DIR_NAME}/{number}.json"
+            with open_cache_writer(file_dir / shard, compression, level) as out:
+                out.write(buffer[start:end])
+            page: dict[str, Any] = json.loads(buffer[start:end])
+            stub = {
+                "id": page.get("id"),
+                "name": page.get("name"),
+                "type": page.get("type"),
+                "shard": shard,
+                "shard_offset": start,
+            }
+            root.write(buffer[position:start])
+            root.write(json.dumps(stub, ensure_ascii=False).encode())
+            position = end
+        root.write(buffer[position:])
+    root_tmp.replace(file_dir / SHARD_ROOT_NAME)
+    return len(spans)
+
+
+def write_page_shards(
+    raw_path: Path,
+    file_dir: Path,
+    compression: Compression = Compression.NONE,
+    level: int | None = None,
+) -> int:
+    """保存済みの生 JSON をページ単位のシャードとルートファイルに分割して書き出す
+
+    非圧縮のファイルは mmap して走査し、各ページのバイト列をそのままコピーする。
+    既存のシャードは削除してから書き出す。
+
+    Args:
+        raw_path: 分割する生 JSON (file_raw.json またはその一時ファイル)
+        file_dir: 書き出し先のキャッシュディレクトリ
+        compression: シャードとルートファイルの圧縮形式
+        level: 圧縮レベル
+
+    Returns:
+        書き出したシャードの数
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: JSON として読めない、またはページがない場合
+    """
+    with open(raw_path, "rb") as f:
+        head = f.read(8)
+        if not head:
+            raise ValueError(f"Empty file: {raw_path}")
+        if detect_compression(head) is not Compression.NONE:
+            return _write_shards(read_cache_bytes(raw_path), file_dir, compression, level)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _write_shards(mapped, file_dir, compression, level)
+
+
+def remove_page_shards(file_dir: Path) -> None:
+    """ページ単位のシャードとルートファイルを削除 (分割しない形式に切り替える場合)"""
+    (file_dir / SHARD_ROOT_NAME).unlink(missing_ok=True)
+    shutil.rmtree(file_dir / SHARD_DIR_NAME, ignore_errors=True)
+
+
+def _iter_stubs(root: bytes) -> Iterator[tuple[int, int, dict[str, Any]]]:
+    """ルートファイル内のスタブを (開始位置, 終了位置, スタブ) としてドキュメント順に返す"""
+    for start, end in _page_spans(root):
+        stub: dict[str, Any] = json.loads(root[start:end])
+        if "shard" in stub:
+            yield start, end, stub
+
+
+def iter_assembled_chunks(file_dir: Path) -> Iterator[bytes]:
+    """シャードを結合した元の生 JSON のバイト列を、ページ単位の断片で順に返す
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: ルートファイルが JSON として読めない場合
+    """
+    root = read_cache_bytes(file_dir / SHARD_ROOT_NAME)
+    position = 0
+    for start, end, stub in _iter_stubs(root):
+        yield root[position:start]
+        yield read_cache_bytes(file_dir / stub["shard"])
+        position = end
+    yield root[position:]
+
+
+def write_assembled_file(file_dir: Path, out: io.BufferedIOBase) -> None:
+    """シャードを結合して元の生 JSON のバイト列を書き出す
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: ルートファイルが JSON として読めない場合
+    """
+    for chunk in iter_assembled_chunks(file_dir):
+        out.write(chunk)
+
+
+def load_shard_root(file_dir: Path) -> dict[str, Any]:
+    """ルートファイルをパースする (ドキュメント直下のノードはスタブのまま)
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: JSON オブジェクトとして読めない場合
+    """
+    loaded = json.loads(read_cache_bytes(file_dir / SHARD_ROOT_NAME))
+    if not isinstance(loaded, dict):
+        raise ValueError(f"{SHARD_ROOT_NAME} is not a JSON object")
+    return cast(dict[str, Any], loaded)
+
+
+def page_stubs(root: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """パース済みのルートファイルから page_id -> スタブのマップを生成
+
+    ID が重複する場合は最初のページを優先する (CacheStore.get_node と同じ規則)。
+    """
+    stubs: dict[str, dict[str, Any]] = {}
+    for child in root.get("document", {}).get("children", []):
+        if "shard" in child:
+            stubs.setdefault(child.get("id"), child)
+    return stubs
@@ -0,0 +1,181 @@
+"""キャッシュ済みの生 JSON へのノードのサブツリーの差し替え
+
+cache --node-id は GET /files/:key/nodes で取得したサブツリーを、キャッシュ済みの
+file_raw.json (シャードを結合したバイト列) に差し込んで部分的に更新する。
+
+ドキュメントツリーはパースせず、インデックスの offsets が示すノードのバイト範囲を
+新しいノードの JSON で置き換える。生 JSON 全体の再走査も避け、走査するのは差し込む
+JSON だけにする。by_id と offsets は既存のものから、置き換えた範囲内のノードの
+エントリを差し替え、それ以外のノードのバイト範囲を前にある置き換えの長さの差だけ
+ずらして求める。by_name などのキー表は、その by_id から build_index_from_entries で
+作り直す。
+"""
+
+import json
+from bisect import bisect_right
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, cast
+
+from yet_another_figma_mcp.cache.binary_index import load_binary_index
+from yet_another_figma_mcp.cache.compression import read_cache_bytes
+from yet_another_figma_mcp.cache.index import build_index_from_entries, build_index_from_spans
+from yet_another_figma_mcp.cache.offsets import iter_node_spans
+
+# 差し込むノードを iter_node_spans でノードとして走査させるための外側のオブジェクト
+_WRAPPER_PREFIX = b'{"document":'
+_WRAPPER_SUFFIX = b"}"
+
+
+type _Entries = tuple[dict[str, dict[str, Any]], dict[str, list[int]]]
+
+
+def _usable_entries(index: Mapping[str, Any]) -> _Entries | None:
+    """インデックスから by_id と offsets を dict で取り出す (使えない場合は None)
+
+    offsets を持たないインデックスや、ノードごとのパスを保存していた古いインデックスは使わない。
+    """
+    offsets: Mapping[str, list[int]] | None = index.get("offsets")
+    by_id: Mapping[str, dict[str, Any]] = index.get("by_id", {})
+    if offsets is None:
+        return None
+    entries = dict(by_id.items())
+    if any("parent_id" not in entry or "path" in entry for entry in entries.values()):
+        return None
+    return entries, {node_id: list(span) for node_id, span in offsets.items()}
+
+
+def load_index_entries(file_dir: Path, raw: bytes) -> _Entries:
+    """キャッシュ済みのインデックスから、差し替えに使う by_id と offsets を取得
+
+    バイナリ形式・JSON 形式のインデックスに offsets があればそれを使い、なければ
+    (SQLite 形式など) 生 JSON をドキュメントツリーに展開せずに走査して求める。
+
+    Args:
+        file_dir: キャッシュディレクトリ
+        raw: file_raw.json (シャードを結合したもの) の展開後のバイト列
+
+    Returns:
+        (by_id, offsets)
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: 生 JSON の括弧の対応が取れない場合
+    """
+    binary_path = file_dir / "nodes_index.bin"
+    json_path = file_dir / "nodes_index.json"
+    if not (file_dir / "nodes_index.sqlite").exists():
+        entries: _Entries | None = None
+        if binary_path.exists():
+            try:
+                entries = _usable_entries(load_binary_index(binary_path.read_bytes()))
+            except ValueError:
+                entries = None
+        elif json_path.exists():
+            try:
+                loaded: object = json.loads(read_cache_bytes(json_path))
+            except ValueError:
+                loaded = None
+            if isinstance(loaded, dict):
+                entries = _usable_entries(cast(dict[str, Any], loaded))
+        if entries is not None:
+            return entries
+
+    index, offsets = build_index_from_spans(iter_node_spans(raw))
+    return index["by_id"], offsets
+
+
+def splice_nodes(
+    raw: bytes,
+    by_id: dict[str, dict[str, Any]],
+    offsets: dict[str, list[int]],
+    nodes: dict[str, dict[str, Any]],
+) -> tuple[bytes, dict[str, Any]]:
+    """生 JSON のノードを新しいサブツリーで置き換え、インデックスを更新する
+
+    他の置き換え対象の子孫にあたるノードは、祖先の置き換えに含まれるため無視する。
+    ノードの親と、ドキュメント内での位置 (by_id の順序) は置き換え前のものを引き継ぐ。
+
+    Args:
+        raw: file_raw.json (シャードを結合したもの) の展開後のバイト列
+        by_id: raw のノードインデックスの by_id (ドキュメント順)
+        offsets: raw のノードのバイト範囲
+        nodes: node_id -> 新しいノード (GET /files/:key/nodes の "document")
+
+    Returns:
+        (置き換え後のバイト列, 置き換え後のノードインデックス ("offsets" を含む))
+
+    Raises:
+        KeyError: キャッシュにないノードを置き換えようとした場合 (例外の引数はノード ID)
+    """
+    targets: list[tuple[int, int, str]] = []
+    for node_id in nodes:
+        if node_id not in offsets or node_id not in by_id:
+            raise KeyError(node_id)
+        start, end = offsets[node_id]
+        targets.append((start, end, node_id))
+    targets.sort()
+
+    pieces: list[bytes] = []
+    # 置き換えた範囲 (置き換え前の位置) と、そこまでの置き換えによる長さの差の累計
+    replaced_starts: list[int] = []
+    replaced_ends: list[int] = []
+    shifts: list[int] = [0]
+    subtrees: dict[str, _Entries] = {}
+    position = 0
+    for start, end, node_id in targets:
+        if replaced_ends and start < replaced_ends[-1]:
+            continue
+        encoded = json.dumps(nodes[node_id], ensure_ascii=False, separators=(",", ":")).encode()
+        new_start = start + shifts[-1]
+        pieces.append(raw[position:start])
+        pieces.append(encoded)
+        position = end
+
+        # 差し込むバイト列だけを走査して、サブツリーのエントリとバイト範囲を求める
+        sub_index, sub_offsets = build_index_from_spans(
+            iter_node_spans(_WRAPPER_PREFIX + encoded + _WRAPPER_SUFFIX)
+        )
+        base = new_start - len(_WRAPPER_PREFIX)
+        sub_by_id: dict[str, dict[str, Any]] = sub_index["by_id"]
+        root_id = next(iter(sub_by_id))
+        sub_by_id[root_id]["parent_id"] = by_id[node_id]["parent_id"]
+        subtrees[node_id] = (
+            sub_by_id,
+            {sub_id: [s + base, e + base] for sub_id, (s, e) in sub_offsets.items()},
+        )
+
+        replaced_starts.append(start)
+        replaced_ends.append(end)
+        shifts.append(shifts[-1] + len(encoded) - (end - start))
+    pieces.append(raw[position:])
+
+    def is_replaced(start: int) -> bool:
+        i = bisect_right(replaced_starts, start) - 1
+        return i >= 0 and start < replaced_ends[i]
+
+    def shift(offset: int) -> int:
+        return offset + shifts[bisect_right(replaced_ends, offset)]
+
+    new_offsets: dict[str, list[int]] = {}
+    removed: set[str] = set()
+    for node_id, (start, end) in offsets.items():
+        if is_replaced(start):
+            removed.add(node_id)
+        else:
+            new_offsets[node_id] = [shift(start), shift(end)]
+
+    # 置き換えたノードの位置にサブツリーのエントリを前順で差し込む
+    new_by_id: dict[str, dict[str, Any]] = {}
+    for node_id, entry in by_id.items():
+        subtree = subtrees.get(node_id)
+        if subtree is not None:
+            new_by_id.update(subtree[0])
+            for sub_id, span in subtree[1].items():
+                new_offsets.setdefault(sub_id, span)
+        elif node_id not in removed:
+            new_by_id[node_id] = entry
+
+    index = build_index_from_entries(new_by_id)
+    index["offsets"] = new_offsets
+    return b"".join(pieces), index
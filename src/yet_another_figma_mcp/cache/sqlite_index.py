@@ -0,0 +1,378 @@
+"""SQLite に保存するノードインデックス (nodes_index.sqlite)
+
+ノードごとの行 (ID、親、タイプ、名前、深さ、ページ、子を除いた生 JSON) と、
+名前の部分一致検索用の FTS5 (trigram) テーブルを 1 ファイルの DB に保存する。
+検索やノード取得はすべてインデックス付きのクエリになるため、ファイル全体を
+メモリに載せずに応答でき、複数のサーバープロセスが同じ DB を OS のページキャッシュ
+越しに共有できる。
+
+テーブル:
+
+- nodes: ドキュメント順 (前順) の番号 ord を主キーとするノード行。
+  end_ord はサブツリーの最後の子孫の ord で、サブツリーは ord の範囲検索で取り出せる
+- name_keys: by_name / by_frame_title のキー (インデックスのキー順) と casefold 済みのキー
+- name_fts: name_keys の casefold 済みのキーに対する FTS5 (trigram) 索引
+
+cache コマンドは一時ファイルに書き出してから置き換えるため、既存の DB ファイルは
+書き換わらない。読み込み側は immutable モードの読み取り専用で開き、ロックや
+WAL ファイルを使わずに参照する。
+"""
+
+import json
+import sqlite3
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, cast
+
+SQLITE_INDEX_VERSION = 2
+
+# キー表のセクション -> (キーの種類, FRAME に限定するか)
+_KEY_SECTIONS: dict[str, tuple[str, bool]] = {
+    "by_name": ("by_name", False),
+    "by_frame_title": ("by_frame_title", True),
+    "by_name_folded": ("by_name", False),
+    "by_frame_title_folded": ("by_frame_title", True),
+}
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE nodes (
+    ord INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    parent_ord INTEGER,
+    parent_id TEXT,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    page TEXT,
+    end_ord INTEGER NOT NULL,
+    raw_json TEXT NOT NULL
+);
+CREATE TABLE name_keys (
+    section TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    folded TEXT NOT NULL,
+    PRIMARY KEY (section, ord)
+);
+CREATE VIRTUAL TABLE name_fts USING fts5(key_folded, content='', tokenize='trigram case_sensitive 1');
+"""
+
+_INDEXES = """
+CREATE INDEX nodes_id ON nodes (id, ord);
+CREATE INDEX nodes_name ON nodes (name, ord);
+CREATE INDEX nodes_type_depth ON nodes (type, depth, ord);
+CREATE INDEX name_keys_key ON name_keys (section, key);
+CREATE INDEX name_keys_folded ON name_keys (section, folded, ord);
+"""
+
+
+class SqliteIndexError(ValueError):
+    """SQLite 形式のインデックスが開けないか、未対応のバージョンの場合のエラー"""
+
+
+# ---------------------------------------------------------------------------
+# 書き込み
+# ---------------------------------------------------------------------------
+
+
+def _iter_node_rows(file_data: dict[str, Any]) -> Iterator[tuple[Any, ...]]:
+    """ドキュメントを前順に走査して nodes テーブルの行を生成
+
+    end_ord はサブツリーを抜ける時点で確定するため、行は ord の昇順に並ばない。
+    """
+    # (ノード, 親の ord, 親の ID, 深さ, ページ ID, 子を処理済みか)
+    stack: list[tuple[dict[str, Any], int | None, str | None, int, str | None, int]] = [
+        (file_data.get("document", {}), None, None, 0, None, -1)
+    ]
+    next_ord = 0
+    while stack:
+        node, parent_ord, parent_id, depth, page, ord_ = stack.pop()
+        if ord_ >= 0:
+            # サブツリーの走査が終わったので行を確定させる
+            raw = dict(node)
+            if "children" in raw:
+                raw["children"] = []
+            yield (
+                ord_,
+                node.get("id", ""),
+                parent_ord,
+                parent_id,
+                node.get("type", ""),
+                node.get("name", ""),
+                depth,
+                page,
+                next_ord - 1,
+                json.dumps(raw, ensure_ascii=False, separators=(",", ":")),
+            )
+            continue
+
+        ord_ = next_ord
+        next_ord += 1
+        node_id = node.get("id", "")
+        if depth == 1 and node.get("type") == "CANVAS":
+            page = node_id
+        stack.append((node, parent_ord, parent_id, depth, page, ord_))
+        for child in reversed(node.get("children", [])):
+            stack.append((child, ord_, node_id, depth + 1, page, -1))
+
+
+def write_sqlite_index(file_data: dict[str, Any], index: dict[str, Any], db_path: Path) -> None:
+    """Figma ファイルとノードインデックスから SQLite 形式のインデックスを作成
+
+    Args:
+        file_data: Figma ファイルの生 JSON
+        index: build_index で生成したノードインデックス (キー順の基準)
+        db_path: 書き出し先 (既存のファイルは置き換える)
+    """
+    db_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(_SCHEMA)
+        with conn:
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(SQLITE_INDEX_VERSION),))
+            conn.executemany(
+                "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _iter_node_rows(file_data),
+            )
+            for section in ("by_name", "by_frame_title"):
+                conn.executemany(
+                    "INSERT INTO name_keys VALUES (?, ?, ?, ?)",
+                    (
+                        (section, ord_, key, key.casefold())
+                        for ord_, key in enumerate(index.get(section, {}))
+                    ),
+                )
+            # SQLite の lower() は ASCII のみを変換するため、検索側と同じ Python の casefold を使う
+            conn.executemany(
+                "INSERT INTO name_fts (rowid, key_folded) VALUES (?, ?)",
+                conn.execute("SELECT rowid, folded FROM name_keys").fetchall(),
+            )
+        conn.executescript(_INDEXES)
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# 読み込み
+# ---------------------------------------------------------------------------
+
+
+class _Database:
+    """ビュー間で共有する読み取り専用の接続
+
+    ストアはホットリロードや退避の際にインデックスを閉じずに参照を外すだけなので、
+    最後のビューが解放された時点で接続を閉じる。
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __del__(self) -> None:
+        self.conn.close()
+
+
+class SqliteNodeTableView(Mapping[str, dict[str, Any]]):
+    """by_id のビュー (node_id -> {"name", "type", "parent_id"})
+
+    ID が重複する場合は nodes_index.json と同じく最後に現れたノードの情報を返す
+    (サブツリーの取得は build_node_map と同じく最初に現れたノード)。
+    """
+
+    def __init__(self, db: _Database) -> None:
+        self._db = db
+        self._conn = db.conn
+
+    def close(self) -> None:
+        """DB の接続を閉じる (以降、このインデックスのビューは使えない)"""
+        self._conn.close()
+
+    def __getitem__(self, node_id: str) -> dict[str, Any]:
+        row = self._conn.execute(
+            "SELECT name, type, parent_id FROM nodes WHERE id = ? ORDER BY ord DESC LIMIT 1",
+            (node_id,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(node_id)
+        return {"name": row[0], "type": row[1], "parent_id": row[2]}
+
+    def __iter__(self) -> Iterator[str]:
+        seen: set[str] = set()
+        for (node_id,) in self._conn.execute("SELECT id FROM nodes ORDER BY ord"):
+            if node_id not in seen:
+                seen.add(node_id)
+                yield node_id
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(DISTINCT id) FROM nodes").fetchone()[0]
+
+    def resolve_path(self, node_id: str) -> list[str]:
+        """祖先の名前を 1 回のクエリで取得して名前パスを復元"""
+        rows = self._conn.execute(
+            """
+            WITH RECURSIVE ancestors(ord, parent_ord, name, depth) AS (
+                SELECT * FROM (
+                    SELECT ord, parent_ord, name, depth FROM nodes WHERE id = ?
+                    ORDER BY ord DESC LIMIT 1
+                )
+                UNION ALL
+                SELECT n.ord, n.parent_ord, n.name, n.depth
+                    FROM nodes n JOIN ancestors a ON n.ord = a.parent_ord
+            )
+            SELECT name FROM ancestors ORDER BY depth
+            """,
+            (node_id,),
+        ).fetchall()
+        return [name for (name,) in rows]
+
+    def get_subtree(self, node_id: str) -> dict[str, Any] | None:
+        """ノードのサブツリーを ord の範囲検索で取り出して組み立てる"""
+        head = self._conn.execute(
+            "SELECT ord, end_ord FROM nodes WHERE id = ? ORDER BY ord LIMIT 1", (node_id,)
+        ).fetchone()
+        if head is None:
+            return None
+        start, end = head
+        nodes: dict[int, dict[str, Any]] = {}
+        root: dict[str, Any] | None = None
+        for ord_, parent_ord, raw_json in self._conn.execute(
+            "SELECT ord, parent_ord, raw_json FROM nodes WHERE ord BETWEEN ? AND ? ORDER BY ord",
+            (start, end),
+        ):
+            node = cast(dict[str, Any], json.loads(raw_json))
+            nodes[ord_] = node
+            if ord_ == start:
+                root = node
+            else:
+                nodes[parent_ord]["children"].append(node)
+        return root
+
+
+class SqliteKeyTableView(Mapping[str, list[str]]):
+    """by_name などのキー表のビュー (キー -> ノード ID のリスト、キー順を保持)"""
+
+    def __init__(self, db: _Database, section: str) -> None:
+        self._db = db
+        self._conn = db.conn
+        self._source, self._frames_only = _KEY_SECTIONS[section]
+        self._folded = section.endswith("_folded")
+        self._type_filter = " AND n.type = 'FRAME'" if self._frames_only else ""
+
+    def __getitem__(self, key: str) -> list[str]:
+        column = "folded" if self._folded else "key"
+        rows = self._conn.execute(
+            f"""
+            SELECT n.id FROM name_keys k JOIN nodes n ON n.name = k.key
+            WHERE k.section = ? AND k.{column} = ?{self._type_filter}
+            ORDER BY k.ord, n.ord
+            """,
+            (self._source, key),
+        ).fetchall()
+        if not rows:
+            raise KeyError(key)
+        return [node_id for (node_id,) in rows]
+
+    def __iter__(self) -> Iterator[str]:
+        column = "folded" if self._folded else "key"
+        seen: set[str] = set()
+        for (key,) in self._conn.execute(
+            f"SELECT {column} FROM name_keys WHERE section = ? ORDER BY ord", (self._source,)
+        ):
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def __len__(self) -> int:
+        column = "folded" if self._folded else "key"
+        return self._conn.execute(
+            f"SELECT COUNT(DISTINCT {column}) FROM name_keys WHERE section = ?", (self._source,)
+        ).fetchone()[0]
+
+    def match_partial(self, query: str) -> list[str]:
+        """キーのうち、クエリを部分文字列として含むものをキー順に返す (大文字小文字は区別しない)
+
+        3 文字以上のクエリは FTS5 の trigram 索引で絞り込み、それより短いクエリは
+        キー表を走査する。いずれも Python の casefold で最終確認する。
+        """
+        query_folded = query.casefold()
+        if len(query_folded) >= 3:
+            phrase = '"' + query_folded.replace('"', '""') + '"'
+            rows = self._conn.execute(
+                """
+                SELECT k.key FROM name_fts f JOIN name_keys k ON k.rowid = f.rowid
+                WHERE name_fts MATCH ? AND k.section = ? ORDER BY k.ord
+                """,
+                (phrase, self._source),
+            )
+        else:
+            rows = self._conn.execute(
+                "SELECT key FROM name_keys WHERE section = ? ORDER BY ord", (self._source,)
+            )
+        return [key for (key,) in rows if query_folded in key.casefold()]
+
+
+def load_sqlite_index(db_path: Path) -> dict[str, Any]:
+    """SQLite 形式のインデックスを読み取り専用で開く
+
+    返す dict は nodes_index.json をロードした場合と同じキーを持ち、
+    各セクションは DB へのクエリで値を返すビューになる。
+    pages / top_frames のような小さなセクションだけはリストとして読み込む。
+
+    Args:
+        db_path: nodes_index.sqlite のパス
+
+    Returns:
+        ノードインデックス
+
+    Raises:
+        SqliteIndexError: DB が開けない、または未対応のバージョンの場合
+    """
+    try:
+        conn = sqlite3.connect(
+            f"{db_path.resolve().as_uri()}?mode=ro&immutable=1",
+            uri=True,
+            check_same_thread=False,
+        )
+    except sqlite3.Error as e:
+        raise SqliteIndexError(f"Cannot open SQLite index: {e}") from e
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    except sqlite3.Error as e:
+        conn.close()
+        raise SqliteIndexError(f"Cannot read SQLite index: {e}") from e
+    if row is None or row[0] != str(SQLITE_INDEX_VERSION):
+        conn.close()
+        raise SqliteIndexError(f"Unsupported SQLite index version: {row[0] if row else None}")
+
+    db = _Database(conn)
+    index: dict[str, Any] = {"by_id": SqliteNodeTableView(db)}
+    for section in _KEY_SECTIONS:
+        index[section] = SqliteKeyTableView(db, section)
+    index["pages"] = [
+        node_id
+        for (node_id,) in conn.execute(
+            "SELECT id FROM nodes WHERE type = 'CANVAS' AND depth = 1 ORDER BY ord"
+        )
+    ]
+    index["top_frames"] = [
+        node_id
+        for (node_id,) in conn.execute(
+            "SELECT id FROM nodes WHERE type = 'FRAME' AND depth <= 2 ORDER BY ord"
+        )
+    ]
+    return index
+
+
+def count_sqlite_index_nodes(db_path: Path) -> int:
+    """SQLite 形式のインデックスのノード数 (重複 ID は 1 つとして数える) を返す
+
+    Raises:
+        SqliteIndexError: DB が開けない、または未対応のバージョンの場合
+    """
+    by_id = load_sqlite_index(db_path)["by_id"]
+    try:
+        return len(by_id)
+    finally:
+        by_id.close()
@@ -1,8 +1,57 @@
 """キャッシュストア実装"""
 
+import json
+import logging
+import mmap
 import re
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal, cast
+
+from yet_another_figma_mcp.cache.binary_index import (
+    BinaryIndexError,
+    NodeTableView,
+    load_binary_index,
+)
+from yet_another_figma_mcp.cache.columnar_index import (
+    ColumnarNodeTable,
+    build_columnar_index,
+    columnar_index_size,
+)
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    detect_compression,
+    read_cache_bytes,
+)
+from yet_another_figma_mcp.cache.generations import resolve_file_dir
+from yet_another_figma_mcp.cache.lazy import LazyNode, find_lazy_node
+from yet_another_figma_mcp.cache.offsets import read_node_slice
+from yet_another_figma_mcp.cache.shards import (
+    SHARD_ROOT_NAME,
+    is_sharded,
+    iter_assembled_chunks,
+    load_shard_root,
+    page_stubs,
+)
+from yet_another_figma_mcp.cache.sqlite_index import (
+    SqliteIndexError,
+    SqliteKeyTableView,
+    SqliteNodeTableView,
+    load_sqlite_index,
+)
+from yet_another_figma_mcp.cache.trigram import (
+    TRIGRAM_FIELDS,
+    build_trigram_index,
+    candidate_ordinals,
+    is_compatible,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 class InvalidFileIdError(ValueError):
@@ -35,53 +84,919 @@ def validate_file_id(file_id: str) -> None:
         )
 
 
+def build_node_map(file_data: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """ドキュメントツリーから node_id -> ノード参照のマップを生成
+
+    ノードはコピーせず参照を保持するため、追加メモリはマップ自体の分のみ。
+    深いツリーでも再帰上限に達しないよう明示的なスタックで走査する。
+    ID が重複する場合は深さ優先の前順で最初に現れたノードを優先する。
+
+    Args:
+        file_data: Figma ファイルの生 JSON
+
+    Returns:
+        node_id -> ノードのマップ
+    """
+    node_map: dict[str, dict[str, Any]] = {}
+    stack: list[dict[str, Any]] = [file_data.get("document", {})]
+    while stack:
+        node = stack.pop()
+        node_id = node.get("id")
+        if node_id is not None and node_id not in node_map:
+            node_map[node_id] = node
+        # 前順を保つため子ノードは逆順に積む
+        stack.extend(reversed(node.get("children", [])))
+    return node_map
+
+
+def resolve_node_path(by_id: dict[str, dict[str, Any]], node_id: str) -> list[str]:
+    """parent_id を辿ってノードの名前パス (ドキュメントルートから自身まで) を復元
+
+    インデックスはノードごとのパスを持たず、親ポインタからその都度組み立てる。
+    パスを保存していた古いインデックスの場合は保存済みのパスを返す。
+
+    Args:
+        by_id: インデックスの by_id セクション
+        node_id: ノード ID
+
+    Returns:
+        名前パス (ノードが存在しない場合は空)
+    """
+    if isinstance(by_id, (NodeTableView, ColumnarNodeTable, SqliteNodeTableView)):
+        return by_id.resolve_path(node_id)
+    entry = by_id.get(node_id)
+    if entry is None:
+        return []
+    if "path" in entry:
+        return list(entry["path"])
+
+    names: list[str] = [entry.get("name", "")]
+    seen = {node_id}
+    parent_id: str | None = entry.get("parent_id")
+    # 重複 ID による循環に備えて訪問済みのノードで打ち切る
+    while parent_id is not None and parent_id not in seen:
+        entry = by_id.get(parent_id)
+        if entry is None:
+            break
+        seen.add(parent_id)
+        names.append(entry.get("name", ""))
+        parent_id = entry.get("parent_id")
+    names.reverse()
+    return names
+
+
+def share_index_strings(index: dict[str, Any]) -> None:
+    """by_id のノード名・タイプの文字列を共有オブジェクトに置き換える
+
+    json.loads は同じ文字列でも別オブジェクトを生成するため、by_name のキーを
+    文字列表として使い、by_id 側の名前を同一オブジェクトに差し替えて重複を解放する。
+    """
+    names: dict[str, str] = {name: name for name in index.get("by_name", {})}
+    for entry in index.get("by_id", {}).values():
+        name = entry.get("name")
+        if name is not None:
+            entry["name"] = names.get(name, name)
+        node_type = entry.get("type")
+        if node_type is not None:
+            entry["type"] = sys.intern(node_type)
+
+
+def build_top_level_sections(by_id: dict[str, dict[str, Any]]) -> dict[str, list[str]]:
+    """by_id からページ一覧と上位フレーム一覧を生成
+
+    - pages: ドキュメント直下の CANVAS ノードの ID
+    - top_frames: 深さ 3 以下 (Document > Page > Frame まで) の FRAME ノードの ID
+
+    いずれも by_id のキー順 (ドキュメント順) に並べる。
+
+    Args:
+        by_id: インデックスの by_id セクション
+
+    Returns:
+        {"pages": [...], "top_frames": [...]}
+    """
+    roots = {node_id for node_id, entry in by_id.items() if entry.get("parent_id") is None}
+    pages: list[str] = []
+    top_frames: list[str] = []
+    for node_id, entry in by_id.items():
+        node_type = entry.get("type")
+        if node_type == "CANVAS" and entry.get("parent_id") in roots:
+            pages.append(node_id)
+        elif node_type == "FRAME" and len(resolve_node_path(by_id, node_id)) <= 3:
+            top_frames.append(node_id)
+    return {"pages": pages, "top_frames": top_frames}
+
+
+# cache_meta.json に書き出す Figma ファイルのトップレベル項目
+FILE_METADATA_FIELDS = ("name", "lastModified", "version")
+
+# プロファイルを記録していない (プロファイル導入前の) キャッシュの取得プロファイル
+DEFAULT_FETCH_PROFILE = "full"
+
+# 大文字小文字を無視した完全一致用のマップ: 元のセクション -> casefold 済みのセクション
+FOLDED_FIELDS = {"by_name": "by_name_folded", "by_frame_title": "by_frame_title_folded"}
+
+
+def build_folded_map(name_map: dict[str, list[str]]) -> dict[str, list[str]]:
+    """名前 -> ノード ID のマップから casefold した名前 -> ノード ID のマップを生成
+
+    casefold 後に同じになる名前のノード ID は、元のマップのキー順に連結する。
+
+    Args:
+        name_map: by_name または by_frame_title
+
+    Returns:
+        casefold した名前 -> ノード ID のリスト
+    """
+    folded: dict[str, list[str]] = {}
+    for name, node_ids in name_map.items():
+        folded.setdefault(name.casefold(), []).extend(node_ids)
+    return folded
+
+
+# JSON テキスト (空白を除く) に対する Python オブジェクト化後のメモリ使用量の概算倍率。
+# dict/list/str のオーバーヘッドにより、Figma の生 JSON・インデックスとも実測で 4〜6 倍程度
+_JSON_MEMORY_RATIO = 5
+
+# ディスク上のキャッシュ更新を確認する間隔のデフォルト (秒)
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+# 遅延構築したトライグラムインデックスの転置リスト 1 要素あたりの推定メモリ (int + ポインタ)
+_POSTING_ENTRY_BYTES = 36
+
+type EntryKind = Literal["file", "index", "page"]
+# (種別, file_id, page_id)。page_id はページ単位のシャード以外では空文字列
+type EntryKey = tuple[EntryKind, str, str]
+type PartialField = Literal["by_name", "by_frame_title"]
+
+
+def estimate_json_memory(raw: bytes) -> int:
+    """JSON テキストをロードした際のメモリ使用量を概算
+
+    オブジェクトを走査せずに済むよう、インデントや改行の空白を除いた
+    テキスト長に一定の倍率を掛けて見積もる。
+
+    Args:
+        raw: JSON テキストのバイト列
+
+    Returns:
+        推定メモリ使用量 (バイト)
+    """
+    content_size = len(raw) - raw.count(b" ") - raw.count(b"\n")
+    return content_size * _JSON_MEMORY_RATIO
+
+
+@dataclass
+class CacheStats:
+    """メモリ上限の調整に使うキャッシュの統計カウンタ"""
+
+    loads: int = 0  # ディスクからのロード回数 (再ロードを含む)
+    reloads: int = 0  # 退避済みエントリの再ロード回数
+    file_evictions: int = 0  # 生 JSON の退避回数
+    index_evictions: int = 0  # インデックスの退避回数
+    page_evictions: int = 0  # ページ単位のシャードの退避回数
+    current_bytes: int = 0  # 現在の推定メモリ使用量
+    peak_bytes: int = 0  # 推定メモリ使用量の最大値
+    hot_reloads: int = 0  # ディスク上の更新を検知して破棄した回数
+
+
 class CacheStore:
-    """Figma ファイルキャッシュのインメモリストア"""
+    """Figma ファイルキャッシュのインメモリストア
+
+    max_memory を指定すると、生 JSON とインデックスをそれぞれ独立したエントリとして
+    推定サイズで管理し、上限を超えた場合は最も長く使われていないものから退避する。
+
+    ロード済みのファイルについては、reload_interval 秒に一度だけディスク上の
+    キャッシュ更新 (cache --refresh) を確認し、更新されていれば次のアクセスで
+    新しい世代をロードする。取得済みの dict は差し替えずに参照を外すだけなので、
+    処理中の呼び出しは古い世代をそのまま使い続けられる。
+    """
 
-    def __init__(self, cache_dir: Path | None = None) -> None:
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_memory: int | None = None,
+        reload_interval: float | None = DEFAULT_RELOAD_INTERVAL,
+    ) -> None:
         """キャッシュストアを初期化
 
         Args:
             cache_dir: キャッシュディレクトリ (デフォルト: ~/.yet_another_figma_mcp)
+            max_memory: 推定メモリ使用量の上限 (バイト)。None の場合は無制限
+            reload_interval: ディスク上の更新を確認する間隔 (秒)。None の場合は確認しない
         """
         self.cache_dir = cache_dir or Path.home() / ".yet_another_figma_mcp"
-        self.files: dict[str, dict[str, Any]] = {}  # file_id -> raw JSON
+        self.max_memory = max_memory
+        self.reload_interval = reload_interval
+        self.files: dict[str, LazyNode] = {}  # file_id -> raw JSON (遅延デコードするビュー)
         self.indexes: dict[str, dict[str, Any]] = {}  # file_id -> nodes_index
+        # file_id -> node_id -> get_node でデコードしたノード
+        self.node_maps: dict[str, dict[str, dict[str, Any]]] = {}
+        self.metadata: dict[str, dict[str, Any]] = {}  # file_id -> cache_meta.json
+        # (file_id, page_id) -> ページ単位のシャードから読み込んだページノードと、その ID マップ
+        self.pages: dict[tuple[str, str], dict[str, Any]] = {}
+        self.page_node_maps: dict[tuple[str, str], dict[str, dict[str, Any]]] = {}
+        self.stats = CacheStats()
+        # node_maps のうち、インデックスなしでファイル全体から構築した (全ノードを持つ) もの
+        self._full_node_maps: set[str] = set()
+        # (file_id, page_id) -> file_raw.json (page_id は空文字列) またはシャードの mmap
+        self._raw_maps: dict[tuple[str, str], mmap.mmap] = {}
+        # 圧縮されていて mmap で範囲を読めない file_raw.json / シャード
+        self._compressed_raws: set[tuple[str, str]] = set()
+        # file_id -> page_id -> file_root.json 内のスタブ (シャードのパスと元のファイル内の位置)
+        self._page_stubs: dict[str, dict[str, dict[str, Any]]] = {}
+        # エントリ -> 推定サイズ。先頭ほど最近使われていない
+        self._lru: OrderedDict[EntryKey, int] = OrderedDict()
+        self._evicted: set[EntryKey] = set()
+        # file_id -> ロード時点の (キャッシュディレクトリ, 世代スタンプ) / 最後に確認した時刻
+        # (monotonic)。ロード済みのエントリがある間は、同じディレクトリから読み続ける
+        self._stamps: dict[str, tuple[Path, object]] = {}
+        self._checked_at: dict[str, float] = {}
+
+    def get_stats(self) -> dict[str, int]:
+        """統計カウンタを辞書で取得"""
+        return asdict(self.stats)
 
-    def get_file(self, file_id: str) -> dict[str, Any] | None:
-        """ファイルの生 JSON を取得"""
+    def has_file(self, file_id: str) -> bool:
+        """ファイルがキャッシュに存在するかを (生 JSON をロードせずに) 判定"""
         validate_file_id(file_id)
-        if file_id not in self.files:
+        file_dir = self._file_dir(file_id)
+        return (
+            file_id in self.files or (file_dir / "file_raw.json").exists() or is_sharded(file_dir)
+        )
+
+    def get_file(self, file_id: str) -> LazyNode | None:
+        """ファイルの生 JSON を取得
+
+        ファイル全体はパースせず、アクセスされた部分だけをデコードするビューを返す。
+        """
+        validate_file_id(file_id)
+        self._check_for_update(file_id)
+        if file_id in self.files:
+            self._touch("file", file_id)
+        else:
             self._load_file(file_id)
         return self.files.get(file_id)
 
+    def get_file_metadata(self, file_id: str) -> dict[str, Any] | None:
+        """ファイルのトップレベル情報 (name, lastModified, version 等) を取得
+
+        cache コマンドが書き出した cache_meta.json から返し、file_raw.json はパースしない。
+        ファイル情報を持たない古いメタデータの場合のみ、生 JSON をロードして補う。
+        取得プロファイル (fetch_profile) を記録していない場合は DEFAULT_FETCH_PROFILE とする。
+        """
+        validate_file_id(file_id)
+        self._check_for_update(file_id)
+        metadata = self.metadata.get(file_id)
+        if metadata is not None:
+            return metadata
+
+        file_dir = self._file_dir(file_id)
+        if file_id not in self._stamps:
+            self._record_stamp(file_id, file_dir)
+        meta_path = file_dir / "cache_meta.json"
+        loaded: Any = None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                loaded = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if isinstance(loaded, dict) and all(field in loaded for field in FILE_METADATA_FIELDS):
+            metadata = cast(dict[str, Any], loaded)
+        else:
+            file_data = self.get_file(file_id)
+            if file_data is None:
+                return None
+            metadata = {field: file_data.get(field) for field in FILE_METADATA_FIELDS}
+        if not metadata.get("fetch_profile"):
+            metadata["fetch_profile"] = DEFAULT_FETCH_PROFILE
+        self.metadata[file_id] = metadata
+        return metadata
+
     def get_index(self, file_id: str) -> dict[str, Any] | None:
         """ファイルのノードインデックスを取得"""
         validate_file_id(file_id)
-        if file_id not in self.indexes:
+        self._check_for_update(file_id)
+        if file_id in self.indexes:
+            self._touch("index", file_id)
+        else:
             self._load_index(file_id)
         return self.indexes.get(file_id)
 
+    def get_node(self, file_id: str, node_id: str) -> dict[str, Any] | None:
+        """ファイル内のノードを ID で取得
+
+        生 JSON が未ロードでインデックスにバイトオフセットがあれば、file_raw.json を
+        mmap して該当範囲だけをデコードする (ファイル全体はパースしない)。
+        ページ単位に分割したキャッシュでは、ノードを含むページのシャードだけを読む。
+        SQLite 形式のインデックスでは、DB に保存したノード行からサブツリーを組み立てる。
+        それ以外 (圧縮されたキャッシュなど) は生 JSON のビューをインデックスの parent_id に
+        沿って辿り、経路上のノードと返すサブツリーだけをデコードする。
+        デコードしたノードは ID -> ノードのマップに保持し、2 回目以降は O(1) で返す。
+
+        Returns:
+            ノードの生 JSON (ファイルまたはノードが存在しない場合は None)
+        """
+        validate_file_id(file_id)
+        self._check_for_update(file_id)
+        node_map = self.node_maps.get(file_id)
+        if file_id in self.files and node_map is not None and node_id in node_map:
+            self._touch("file", file_id)
+            return node_map[node_id]
+
+        index = self.get_index(file_id)
+        if file_id not in self.files:
+            by_id = index.get("by_id") if index else None
+            if isinstance(by_id, SqliteNodeTableView):
+                return by_id.get_subtree(node_id)
+            if index is not None and is_sharded(self._file_dir(file_id)):
+                page_id = _find_page_id(index["by_id"], node_id)
+                if page_id is None and node_id not in index["by_id"]:
+                    return None
+                stub = self._get_page_stubs(file_id).get(page_id) if page_id else None
+                if stub is not None:
+                    return self._get_page_node(file_id, index, node_id, page_id or "", stub)
+            else:
+                offsets = index.get("offsets") if index else None
+                if offsets is not None:
+                    span = offsets.get(node_id)
+                    if span is None:
+                        return None
+                    node = self._read_node_slice(file_id, "", node_id, span)
+                    if node is not None:
+                        return node
+
+        # インデックスの参照は保持しているので、ここでのロードで退避されても構わない
+        file_data = self.get_file(file_id)
+        if file_data is None:
+            return None
+        node_map = self.node_maps.get(file_id)
+        if node_map is None:
+            node_map = {}
+            self.node_maps[file_id] = node_map
+        node = node_map.get(node_id)
+        if node is None:
+            node = self._decode_node(file_id, file_data, index, node_map, node_id)
+        return node
+
+    def _decode_node(
+        self,
+        file_id: str,
+        file_data: LazyNode,
+        index: dict[str, Any] | None,
+        node_map: dict[str, dict[str, Any]],
+        node_id: str,
+    ) -> dict[str, Any] | None:
+        """生 JSON のビューからノードのサブツリーだけをデコードして node_map に追加
+
+        インデックスの parent_id からドキュメントのルートまでの経路を求め、
+        経路上のノードだけを辿る。インデックスがない、または経路を辿れない
+        (パスを保存していた古いインデックスなど) 場合は、ファイル全体をデコードして
+        全ノードのマップを構築する。
+        """
+        by_id = index.get("by_id") if index else None
+        if by_id is not None:
+            if node_id not in by_id:
+                return None
+            path = _node_id_path(by_id, node_id)
+            lazy_node = find_lazy_node(file_data, path) if path else None
+            if lazy_node is not None:
+                node = lazy_node.to_dict()
+                node_map[node_id] = node
+                self._account("file", file_id, _decoded_size(lazy_node))
+                return node
+
+        if file_id not in self._full_node_maps:
+            node_map.update(build_node_map(file_data.to_dict()))
+            self._full_node_maps.add(file_id)
+            # ノードはデコードしたファイル全体の参照なので、それまでに部分的にデコードした
+            # サブツリーの分を、バイト列・ファイル全体・マップの分に置き換える
+            start, end = file_data.span
+            size = (end - start) + _decoded_size(file_data) + sys.getsizeof(node_map)
+            self._account("file", file_id, max(0, size - self._lru.get(("file", file_id, ""), 0)))
+        return node_map.get(node_id)
+
+    def _get_page_stubs(self, file_id: str) -> dict[str, dict[str, Any]]:
+        """file_root.json からページのスタブを読み込む (スタブ以外の内容は保持しない)"""
+        stubs = self._page_stubs.get(file_id)
+        if stubs is None:
+            try:
+                stubs = page_stubs(load_shard_root(self._file_dir(file_id)))
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable %s of %s: %s", SHARD_ROOT_NAME, file_id, e)
+                stubs = {}
+            self._page_stubs[file_id] = stubs
+        return stubs
+
+    def _get_page_node(
+        self,
+        file_id: str,
+        index: dict[str, Any],
+        node_id: str,
+        page_id: str,
+        stub: dict[str, Any],
+    ) -> dict[str, Any] | None:
+        """ページ単位のシャードからノードを取得
+
+        インデックスにバイトオフセットがあればシャードを mmap して該当範囲だけを
+        デコードし、読めなければ (オフセットがない、圧縮されたシャードなど) ページ全体をロードする。
+        """
+        key = (file_id, page_id)
+        if key not in self.pages:
+            offsets = index.get("offsets")
+            span = offsets.get(node_id) if offsets is not None else None
+            if span is not None:
+                # オフセットは元のファイルに対する位置なので、ページの開始位置を引く
+                shard_offset: int = stub.get("shard_offset", 0)
+                shard_span = [span[0] - shard_offset, span[1] - shard_offset]
+                node = self._read_node_slice(file_id, page_id, node_id, shard_span)
+                if node is not None:
+                    return node
+            if not self._load_page(file_id, page_id, stub):
+                return None
+        else:
+            self._touch("page", file_id, page_id)
+
+        node_map = self.page_node_maps.get(key)
+        if node_map is None:
+            node_map = build_node_map({"document": self.pages[key]})
+            self.page_node_maps[key] = node_map
+            self._account("page", file_id, sys.getsizeof(node_map), page_id)
+        return node_map.get(node_id)
+
+    def match_partial(
+        self, file_id: str, index: dict[str, Any], field: PartialField, query: str
+    ) -> list[str]:
+        """インデックスのキーのうち、クエリを部分文字列として含むものを返す
+
+        大文字小文字は区別しない。3 文字以上のクエリはトライグラムインデックスで
+        候補を絞り込んでから確認し、それより短いクエリは全キーを走査する。
+        SQLite 形式のインデックスでは DB の FTS5 索引に問い合わせる。
+
+        Args:
+            file_id: Figma ファイル ID
+            index: get_index で取得したノードインデックス
+            field: 検索対象のセクション ("by_name" または "by_frame_title")
+            query: 検索文字列
+
+        Returns:
+            一致したキー (インデックスのキー順)
+        """
+        keys: dict[str, Any] = index.get(field, {})
+        if isinstance(keys, SqliteKeyTableView):
+            return keys.match_partial(query)
+        query_folded = query.casefold()
+
+        section: dict[str, Any] = self.get_trigram_index(file_id, index)[field]
+        ordinals = candidate_ordinals(section["postings"], query_folded)
+        if ordinals is None:
+            return [key for key in keys if query_folded in key.casefold()]
+
+        key_list: list[str] = section["keys"]
+        return [
+            key
+            for key in (key_list[ordinal] for ordinal in ordinals)
+            if query_folded in key.casefold()
+        ]
+
+    def get_trigram_index(self, file_id: str, index: dict[str, Any]) -> dict[str, Any]:
+        """ノードインデックスに対応するトライグラムインデックスを取得
+
+        初回は trigram_index.json をロードし、ないかノードインデックスと対応しない
+        (古いキャッシュ) 場合はノードインデックスからメモリ上に構築する。
+        結果はノードインデックス自体に保持するため、ホットリロード中の古い世代とも
+        取り違えず、インデックスの退避と一緒に解放される。
+
+        Args:
+            file_id: Figma ファイル ID
+            index: get_index で取得したノードインデックス
+
+        Returns:
+            トライグラムインデックス
+        """
+        validate_file_id(file_id)
+        trigram_index: dict[str, Any] | None = index.get("trigram_index")
+        if trigram_index is not None:
+            return trigram_index
+
+        trigram_path = self._file_dir(file_id) / "trigram_index.json"
+        loaded: Any = None
+        size = 0
+        if trigram_path.exists():
+            try:
+                raw = read_cache_bytes(trigram_path)
+                loaded = json.loads(raw)
+                size = estimate_json_memory(raw)
+            except (OSError, ValueError):
+                loaded = None
+        if isinstance(loaded, dict) and is_compatible(cast(dict[str, Any], loaded), index):
+            trigram_index = cast(dict[str, Any], loaded)
+        else:
+            trigram_index = build_trigram_index(index)
+            size = sum(
+                len(posting) * _POSTING_ENTRY_BYTES
+                for field in TRIGRAM_FIELDS
+                for posting in trigram_index[field]["postings"].values()
+            )
+
+        # 転置リストのキー番号 -> キーの対応 (ノードインデックスのキー順)
+        for field in TRIGRAM_FIELDS:
+            keys = list(index.get(field, {}))
+            trigram_index[field]["keys"] = keys
+            size += sys.getsizeof(keys)
+
+        index["trigram_index"] = trigram_index
+        if self.indexes.get(file_id) is index:
+            self._account("index", file_id, size)
+        return trigram_index
+
+    def _read_node_slice(
+        self, file_id: str, page_id: str, node_id: str, span: list[int]
+    ) -> dict[str, Any] | None:
+        """file_raw.json (page_id が空文字列の場合) またはページのシャードを mmap して
+        指定バイト範囲のノードだけをデコード
+
+        範囲のデコード結果が要求した ID と一致しない (インデックスと生 JSON の不整合) 場合や
+        圧縮されたファイルの場合は None を返し、呼び出し元でビュー・全体のロードに
+        フォールバックさせる。
+        """
+        key = (file_id, page_id)
+        if key in self._compressed_raws:
+            return None
+        mapped = self._raw_maps.get(key)
+        if mapped is None:
+            if page_id:
+                stub = self._get_page_stubs(file_id)[page_id]
+                file_path = self._file_dir(file_id) / stub["shard"]
+            else:
+                file_path = self._file_dir(file_id) / "file_raw.json"
+            try:
+                with open(file_path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+            if detect_compression(mapped[:8]) is not Compression.NONE:
+                mapped.close()
+                self._compressed_raws.add(key)
+                return None
+            self._raw_maps[key] = mapped
+
+        node = read_node_slice(mapped, span)
+        if node is None or node.get("id") != node_id:
+            # 生 JSON が差し替えられた可能性があるため mmap を捨てる
+            self._raw_maps.pop(key).close()
+            return None
+        return node
+
+    def _load_page(self, file_id: str, page_id: str, stub: dict[str, Any]) -> bool:
+        """ディスクからページのシャードをロード
+
+        Returns:
+            ロードできた場合は True
+        """
+        file_dir = self._file_dir(file_id)
+        shard_path = file_dir / stub["shard"]
+        try:
+            raw = read_cache_bytes(shard_path)
+            page = json.loads(raw)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable page shard %s: %s", shard_path, e)
+            return False
+        if file_id not in self._stamps:
+            self._record_stamp(file_id, file_dir)
+        self.pages[(file_id, page_id)] = page
+        self._register("page", file_id, estimate_json_memory(raw), page_id)
+        return True
+
     def _load_file(self, file_id: str) -> None:
-        """ディスクからファイル JSON をロード
+        """ディスクからファイル JSON をロード (圧縮されていれば展開しながら読む)
+
+        バイト列はパースせず、遅延デコードするビューとして保持する。ロード済みの
+        インデックスにバイトオフセットがあれば、ビューが子ノードを読み飛ばすのに使う。
+        ページ単位に分割したキャッシュは、file_root.json のスタブをシャードの内容で
+        置き換えて元のファイルと同じバイト列に組み立てる。
+        ロード時はバイト列の大きさだけを計上し、デコードしたノードの分は
+        _decode_node でデコードした時点で加算する。
 
         注意: file_id は呼び出し元で検証済みであることを前提とする
         """
-        file_path = self.cache_dir / file_id / "file_raw.json"
+        file_dir = self._file_dir(file_id)
+        file_path = file_dir / "file_raw.json"
         if file_path.exists():
-            import json
-
-            with open(file_path, encoding="utf-8") as f:
-                self.files[file_id] = json.load(f)
+            self._record_stamp(file_id, file_dir)
+            raw = read_cache_bytes(file_path)
+        elif is_sharded(file_dir):
+            self._record_stamp(file_id, file_dir)
+            raw = b"".join(iter_assembled_chunks(file_dir))
+        else:
+            return
+        index = self.indexes.get(file_id)
+        offsets = index.get("offsets") if index is not None else None
+        self.files[file_id] = LazyNode(raw, offsets=offsets)
+        self._register("file", file_id, len(raw))
 
     def _load_index(self, file_id: str) -> None:
         """ディスクからインデックスをロード
 
+        nodes_index.sqlite (SQLite 形式) があれば読み取り専用で開き、
+        nodes_index.bin (バイナリ形式) があれば mmap してビューとして読み込み、
+        どちらもなければ nodes_index.json をパースし、列指向の表現に変換して保持する。
+
         注意: file_id は呼び出し元で検証済みであることを前提とする
         """
-        index_path = self.cache_dir / file_id / "nodes_index.json"
+        file_dir = self._file_dir(file_id)
+        sqlite_path = file_dir / "nodes_index.sqlite"
+        if sqlite_path.exists():
+            self._record_stamp(file_id, file_dir)
+            try:
+                sqlite_index = load_sqlite_index(sqlite_path)
+            except SqliteIndexError as e:
+                logger.warning("Ignoring unreadable SQLite index %s: %s", sqlite_path, e)
+            else:
+                self.indexes[file_id] = sqlite_index
+                # ノード行は DB 側にあるため、メモリに載せたページ・上位フレーム一覧だけを計上
+                self._register(
+                    "index",
+                    file_id,
+                    sum(
+                        sys.getsizeof(ids)
+                        for ids in (sqlite_index["pages"], sqlite_index["top_frames"])
+                    ),
+                )
+                return
+
+        binary_path = file_dir / "nodes_index.bin"
+        if binary_path.exists():
+            self._record_stamp(file_id, file_dir)
+            binary_index = self._load_binary_index(binary_path)
+            if binary_index is not None:
+                self.indexes[file_id] = binary_index
+                # 本体は mmap (OS のページキャッシュ) なので、デコード済みの部分だけを計上
+                self._register("index", file_id, sys.getsizeof(binary_index))
+                return
+
+        index_path = file_dir / "nodes_index.json"
         if index_path.exists():
-            import json
+            self._record_stamp(file_id, file_dir)
+            raw = read_cache_bytes(index_path)
+            index: dict[str, Any] = json.loads(raw)
+            size = estimate_json_memory(raw)
+            # casefold 済みマップを持たない古いインデックスはここで補う
+            for field, folded_field in FOLDED_FIELDS.items():
+                if folded_field not in index:
+                    folded = build_folded_map(index.get(field, {}))
+                    index[folded_field] = folded
+                    size += sys.getsizeof(folded)
+            # ページ・上位フレーム一覧を持たない古いインデックスも同様
+            if "pages" not in index or "top_frames" not in index:
+                sections = build_top_level_sections(index.get("by_id", {}))
+                index.update(sections)
+                size += sum(sys.getsizeof(ids) for ids in sections.values())
+            # ノードごとの dict を持たない列指向の表現に詰め直す (パスを保存していた
+            # 古いインデックスなど、詰め直せない場合は dict のまま保持する)
+            columnar = build_columnar_index(index)
+            if columnar is not None:
+                index = columnar
+                size = columnar_index_size(index)
+            else:
+                share_index_strings(index)
+            self.indexes[file_id] = index
+            self._register("index", file_id, size)
+
+    def _load_binary_index(self, binary_path: Path) -> dict[str, Any] | None:
+        """nodes_index.bin を mmap して読み込む (壊れている場合は None)"""
+        try:
+            with open(binary_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return load_binary_index(mapped)
+        except BinaryIndexError as e:
+            # mmap はビューの参照が外れた時点で解放される
+            logger.warning("Ignoring unreadable binary index %s: %s", binary_path, e)
+            return None
+
+    def _file_dir(self, file_id: str) -> Path:
+        """ファイルのキャッシュディレクトリ (cache コマンドが切り替えた世代) を取得
+
+        ロード済みのエントリがある間は、ロード時に記録したディレクトリを返す。
+        読み込みの途中で世代が切り替わっても、新しい生 JSON と古いインデックスのように
+        別の世代のファイルを組み合わせないため。記録したディレクトリが (更新の確認より先に
+        古い世代として) 削除されていれば、現在の世代を破棄して読み直させる。
+        """
+        stamp = self._stamps.get(file_id)
+        if stamp is not None and any(key[1] == file_id for key in self._lru):
+            if stamp[0].is_dir():
+                return stamp[0]
+            logger.info("Generation of %s was removed, reloading", file_id)
+            self.invalidate(file_id)
+            self.stats.hot_reloads += 1
+        return resolve_file_dir(self.cache_dir, file_id)
+
+    def _read_stamp(self, file_dir: Path) -> tuple[Path, object]:
+        """キャッシュの世代を表すスタンプを取得
+
+        世代ディレクトリ (CURRENT が指す先) に加えて cache_meta.json の cached_at_unix を
+        優先し (cache コマンドが最後に書くため、生 JSON とインデックスの書き込み完了後にだけ
+        変化する)、メタデータがない場合は生 JSON とインデックスの mtime を使う。
+        """
+        try:
+            with open(file_dir / "cache_meta.json", encoding="utf-8") as f:
+                cached_at = json.load(f).get("cached_at_unix")
+            if cached_at is not None:
+                return file_dir, cached_at
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        mtimes: list[int | None] = []
+        for name in (
+            "file_raw.json",
+            SHARD_ROOT_NAME,
+            "nodes_index.json",
+            "nodes_index.bin",
+            "nodes_index.sqlite",
+        ):
+            try:
+                mtimes.append((file_dir / name).stat().st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return file_dir, tuple(mtimes)
+
+    def _record_stamp(self, file_id: str, file_dir: Path) -> None:
+        """ロード開始時に読み込み元のディレクトリと世代スタンプを記録
+        (既に同じファイルのエントリがあれば維持)"""
+        if any(key[1] == file_id for key in self._lru):
+            return
+        stamp = self._read_stamp(file_dir)
+        if self._stamps.get(file_id, stamp) != stamp:
+            # 退避後に別の世代を読み込む場合、前の世代のメタデータは使わない
+            self.metadata.pop(file_id, None)
+        self._stamps[file_id] = stamp
+        self._checked_at[file_id] = time.monotonic()
+
+    def _check_for_update(self, file_id: str) -> None:
+        """ロード済みのファイルがディスク上で更新されていれば現在の世代を破棄
+
+        確認は file_id ごとに reload_interval 秒に一度だけ行う。
+        """
+        if self.reload_interval is None or file_id not in self._stamps:
+            return
+        now = time.monotonic()
+        if now - self._checked_at.get(file_id, 0.0) < self.reload_interval:
+            return
+        self._checked_at[file_id] = now
+
+        stamp = self._read_stamp(resolve_file_dir(self.cache_dir, file_id))
+        if stamp == self._stamps[file_id]:
+            return
+        logger.info("Cache for %s was updated on disk, reloading", file_id)
+        self.invalidate(file_id)
+        self.stats.hot_reloads += 1
+
+    def invalidate(self, file_id: str) -> None:
+        """ファイルのロード済みデータを破棄し、次のアクセスでディスクから読み直させる
+
+        処理中の呼び出しが保持している dict や mmap は閉じずに参照を外すだけなので、
+        それらは古い世代のまま最後まで使える。
+        """
+        validate_file_id(file_id)
+        for key in [key for key in self._lru if key[1] == file_id]:
+            self.stats.current_bytes -= self._lru.pop(key)
+        self.files.pop(file_id, None)
+        self.indexes.pop(file_id, None)
+        self.node_maps.pop(file_id, None)
+        self._full_node_maps.discard(file_id)
+        self.metadata.pop(file_id, None)
+        for key in [key for key in self.pages if key[0] == file_id]:
+            self.pages.pop(key)
+            self.page_node_maps.pop(key, None)
+        for key in [key for key in self._raw_maps if key[0] == file_id]:
+            self._raw_maps.pop(key)
+        self._compressed_raws = {key for key in self._compressed_raws if key[0] != file_id}
+        self._page_stubs.pop(file_id, None)
+        self._stamps.pop(file_id, None)
+        self._checked_at.pop(file_id, None)
 
-            with open(index_path, encoding="utf-8") as f:
-                self.indexes[file_id] = json.load(f)
+    def close(self) -> None:
+        """ロード済みの SQLite 形式のインデックスの接続を閉じ、ロード済みのデータを破棄する
+
+        invalidate と異なり、取得済みの SQLite のビューも使えなくなるため、処理中の
+        呼び出しがなくなってから (終了時などに) 呼ぶ。以降のアクセスはディスクから読み直す。
+        """
+        for index in self.indexes.values():
+            by_id = index.get("by_id")
+            if isinstance(by_id, SqliteNodeTableView):
+                by_id.close()
+        file_ids = {key[1] for key in self._lru} | set(self.indexes) | set(self.files)
+        for file_id in file_ids | set(self.metadata) | set(self._stamps):
+            self.invalidate(file_id)
+
+    def _touch(self, kind: EntryKind, file_id: str, page_id: str = "") -> None:
+        """エントリを最近使われたものとして記録"""
+        key = (kind, file_id, page_id)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+
+    def _register(self, kind: EntryKind, file_id: str, size: int, page_id: str = "") -> None:
+        """ロードしたエントリを登録し、必要に応じて他のエントリを退避"""
+        key = (kind, file_id, page_id)
+        self.stats.loads += 1
+        if key in self._evicted:
+            self._evicted.discard(key)
+            self.stats.reloads += 1
+        self._lru[key] = 0
+        self._account(kind, file_id, size, page_id)
+
+    def _account(self, kind: EntryKind, file_id: str, size: int, page_id: str = "") -> None:
+        """エントリの推定サイズを加算し、上限を超えていれば古いものから退避
+
+        ロード直後のエントリ自体は、単体で上限を超える場合でも退避しない
+        (呼び出し元がすぐに使うため)。
+        """
+        key = (kind, file_id, page_id)
+        if key not in self._lru:
+            return
+        self._lru[key] += size
+        self._lru.move_to_end(key)
+        self.stats.current_bytes += size
+        self.stats.peak_bytes = max(self.stats.peak_bytes, self.stats.current_bytes)
+
+        if self.max_memory is None:
+            return
+        while self.stats.current_bytes > self.max_memory and len(self._lru) > 1:
+            self._evict(*next(iter(self._lru)))
+
+    def _evict(self, kind: EntryKind, file_id: str, page_id: str = "") -> None:
+        """エントリをメモリから退避"""
+        key = (kind, file_id, page_id)
+        size = self._lru.pop(key)
+        self.stats.current_bytes -= size
+        self._evicted.add(key)
+        if kind == "file":
+            self.files.pop(file_id, None)
+            self.node_maps.pop(file_id, None)
+            self._full_node_maps.discard(file_id)
+            self.stats.file_evictions += 1
+        elif kind == "page":
+            self.pages.pop((file_id, page_id), None)
+            self.page_node_maps.pop((file_id, page_id), None)
+            self.stats.page_evictions += 1
+        else:
+            self.indexes.pop(file_id, None)
+            self.stats.index_evictions += 1
+        logger.debug("Evicted %s of %s (%d bytes estimated)", kind, file_id, size)
+
+
+def _decoded_size(node: LazyNode) -> int:
+    """ビューのサブツリーを dict にデコードした場合の推定メモリ使用量"""
+    start, end = node.span
+    return (end - start) * _JSON_MEMORY_RATIO
+
+
+def _node_id_path(by_id: Mapping[str, dict[str, Any]], node_id: str) -> list[str] | None:
+    """parent_id を辿ってドキュメントのルートからノード自身までの ID の列を求める
+
+    Returns:
+        ID の列 (ノードが存在しないか、重複 ID により循環する場合は None)
+    """
+    path = [node_id]
+    entry = by_id.get(node_id)
+    while entry is not None:
+        parent_id: str | None = entry.get("parent_id")
+        if parent_id is None:
+            path.reverse()
+            return path
+        if parent_id in path:
+            return None
+        path.append(parent_id)
+        entry = by_id.get(parent_id)
+    return None
+
+
+def _find_page_id(by_id: Mapping[str, dict[str, Any]], node_id: str) -> str | None:
+    """parent_id を辿ってノードを含むページ (ドキュメント直下のノード) の ID を求める
+
+    Returns:
+        ページの ID (ノード自身がページならその ID)。ノードが存在しないか
+        ドキュメントのルートの場合は None
+    """
+    entry = by_id.get(node_id)
+    if entry is None:
+        return None
+    seen = {node_id}
+    parent_id: str | None = entry.get("parent_id")
+    if parent_id is None:
+        return None
+    # 重複 ID による循環に備えて訪問済みのノードで打ち切る
+    while True:
+        parent = by_id.get(parent_id)
+        if parent is None:
+            return None
+        grandparent_id: str | None = parent.get("parent_id")
+        if grandparent_id is None:
+            return node_id
+        if grandparent_id in seen:
+            return None
+        seen.add(parent_id)
+        node_id, parent_id = parent_id, grandparent_id
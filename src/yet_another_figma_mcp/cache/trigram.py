@@ -0,0 +1,119 @@
+"""部分一致検索用のトライグラム (3-gram) インデックス
+
+ノード名・フレーム名を casefold した文字列の 3 文字ずつの部分文字列から、
+その部分文字列を含むキーの番号 (nodes_index.json の by_name / by_frame_title の
+キー順) への転置リストを作る。部分一致クエリはクエリのトライグラムの転置リストを
+積集合で絞り込み、残った候補だけを実際の部分文字列判定で確認する。
+
+正規表現検索などでも、リテラル部分のトライグラムで候補を前絞りする用途に使える。
+"""
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Any, cast
+
+TRIGRAM_INDEX_VERSION = 2
+TRIGRAM_SIZE = 3
+
+# トライグラムインデックスの対象とする nodes_index.json のセクション
+TRIGRAM_FIELDS = ("by_name", "by_frame_title")
+
+
+def iter_trigrams(text: str) -> set[str]:
+    """文字列に含まれるトライグラムの集合を返す (3 文字未満の場合は空)"""
+    return {text[i : i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def build_postings(keys: Iterable[str]) -> dict[str, list[int]]:
+    """キー列からトライグラム -> キー番号 (昇順) の転置リストを生成
+
+    Args:
+        keys: 検索対象のキー (この順序の番号が転置リストに入る)
+
+    Returns:
+        トライグラム -> キー番号のリスト
+    """
+    postings: dict[str, list[int]] = {}
+    for ordinal, key in enumerate(keys):
+        for trigram in iter_trigrams(key.casefold()):
+            postings.setdefault(trigram, []).append(ordinal)
+    return postings
+
+
+def build_trigram_index(index: dict[str, Any]) -> dict[str, Any]:
+    """ノードインデックスからトライグラムインデックスを生成
+
+    Args:
+        index: build_index で生成したノードインデックス
+
+    Returns:
+        セクションごとのキー数と転置リスト
+    """
+    trigram_index: dict[str, Any] = {"version": TRIGRAM_INDEX_VERSION}
+    for field in TRIGRAM_FIELDS:
+        keys = index.get(field, {})
+        trigram_index[field] = {"key_count": len(keys), "postings": build_postings(keys)}
+    return trigram_index
+
+
+def is_compatible(trigram_index: dict[str, Any], index: dict[str, Any]) -> bool:
+    """トライグラムインデックスがノードインデックスと対応しているかを判定
+
+    キー番号はノードインデックスのキー順に依存するため、
+    バージョンと各セクションのキー数が一致しない場合は使えない。
+    """
+    if trigram_index.get("version") != TRIGRAM_INDEX_VERSION:
+        return False
+    for field in TRIGRAM_FIELDS:
+        section = trigram_index.get(field)
+        if not isinstance(section, dict):
+            return False
+        section = cast(dict[str, Any], section)
+        if "postings" not in section or section.get("key_count") != len(index.get(field, {})):
+            return False
+    return True
+
+
+def _intersect(postings: list[list[int]]) -> list[int]:
+    """昇順の転置リスト群の積集合を昇順で返す
+
+    最短のリストの各要素を、他のリストに二分探索で問い合わせる。
+    """
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        if not result:
+            break
+        size = len(other)
+        lo = 0
+        kept: list[int] = []
+        for ordinal in result:
+            lo = bisect_left(other, ordinal, lo)
+            if lo == size:
+                break
+            if other[lo] == ordinal:
+                kept.append(ordinal)
+        result = kept
+    return result
+
+
+def candidate_ordinals(postings: dict[str, list[int]], literal: str) -> list[int] | None:
+    """リテラル文字列を含みうるキー番号の候補を返す
+
+    Args:
+        postings: build_postings で生成した転置リスト
+        literal: casefold 済みのリテラル文字列
+
+    Returns:
+        候補のキー番号 (昇順)。リテラルが 3 文字未満で絞り込めない場合は None
+    """
+    trigrams = iter_trigrams(literal)
+    if not trigrams:
+        return None
+    lists: list[list[int]] = []
+    for trigram in trigrams:
+        posting = postings.get(trigram)
+        if not posting:
+            return []
+        lists.append(posting)
+    return _intersect(lists)
@@ -72,6 +72,7 @@ def _register_commands() -> None:
     from yet_another_figma_mcp.cli import cache, serve, status
 
     app.command()(cache.cache)
+    app.command()(cache.reindex)
     app.command()(serve.serve)
     app.command()(status.status)
 
@@ -1,42 +1,232 @@
 """cache コマンド実装"""
 
+import asyncio
 import json
+import math
+import os
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from enum import StrEnum
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, cast
 
 import typer
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from yet_another_figma_mcp.cache import InvalidFileIdError, validate_file_id
-from yet_another_figma_mcp.cache.index import build_index, save_index
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    compress_cache_file,
+    detect_compression,
+    open_cache_writer,
+    read_cache_bytes,
+)
+from yet_another_figma_mcp.cache.generations import (
+    cache_lock,
+    create_generation,
+    discard_generation,
+    generation_root,
+    link_cache_files,
+    prune_generations,
+    publish_generation,
+    resolve_file_dir,
+)
+from yet_another_figma_mcp.cache.store import FILE_METADATA_FIELDS
+from yet_another_figma_mcp.cache.index import (
+    build_index,
+    build_index_from_file,
+    save_binary_index,
+    save_index,
+    save_sqlite_index,
+    save_trigram_index,
+)
+from yet_another_figma_mcp.cache.manifest import (
+    build_manifest_entry,
+    hash_cache_file,
+    hash_raw_content,
+    load_manifest,
+    update_manifest,
+)
+from yet_another_figma_mcp.cache.offsets import build_node_offsets
+from yet_another_figma_mcp.cache.shards import (
+    SHARD_DIR_NAME,
+    SHARD_ROOT_NAME,
+    is_sharded,
+    iter_assembled_chunks,
+    write_assembled_file,
+    write_page_shards,
+)
+from yet_another_figma_mcp.cache.splice import load_index_entries, splice_nodes
+from yet_another_figma_mcp.cache.trigram import build_trigram_index
 from yet_another_figma_mcp.cli.app import DEFAULT_CACHE_DIR
 from yet_another_figma_mcp.cli.i18n import t
 from yet_another_figma_mcp.figma import (
+    AsyncFigmaClient,
+    FetchProfile,
     FigmaAPIError,
     FigmaAuthenticationError,
     FigmaClient,
     FigmaFileNotFoundError,
     FigmaRateLimitError,
+    RateLimiter,
 )
+from yet_another_figma_mcp.figma.rate_limit import RATE_LIMIT_STATE_NAME
 
 console = Console()
 
 
-def _save_file_raw(file_data: dict[str, object], file_id: str, cache_dir: Path) -> Path:
-    """ファイル JSON をディスクに保存"""
-    validate_file_id(file_id)
+class IndexFormat(StrEnum):
+    """ノードインデックスの保存形式"""
+
+    JSON = "json"
+    BINARY = "binary"
+    SQLITE = "sqlite"
+
+
+# 保存形式ごとのインデックスファイル名
+_INDEX_FILE_NAMES = {
+    IndexFormat.JSON: "nodes_index.json",
+    IndexFormat.BINARY: "nodes_index.bin",
+    IndexFormat.SQLITE: "nodes_index.sqlite",
+}
+
+
+# 世代の切り替えとマニフェストの更新を直列化するロック (--jobs のスレッド間)
+_publish_lock = threading.Lock()
+
+
+def _has_raw_file(file_dir: Path) -> bool:
+    """キャッシュディレクトリに生 JSON (またはページ単位のシャード) があるかを判定"""
+    return (file_dir / "file_raw.json").exists() or is_sharded(file_dir)
+
+
+def _writer_lock(cache_dir: Path) -> AbstractContextManager[None]:
+    """同じキャッシュディレクトリに書き込む cache / reindex コマンドを直列化するロック"""
+    return cache_lock(
+        cache_dir,
+        on_wait=lambda: console.print(
+            f"[yellow]{t('cache.waiting_for_lock', path=cache_dir)}[/yellow]"
+        ),
+    )
+
+
+def _download_file_raw(
+    client: FigmaClient,
+    file_id: str,
+    cache_dir: Path,
+    compression: Compression = Compression.NONE,
+    level: int | None = None,
+    profile: FetchProfile = FetchProfile.FULL,
+) -> Path:
+    """Figma API のレスポンス本文をそのまま一時ファイル (file_raw.json.tmp) に書き出す
+
+    レスポンスをパースして整形し直すことはせず、受信したバイト列を (圧縮する場合は
+    圧縮しながら) 書き込む。
+
+    Returns:
+        一時ファイルのパス
+
+    Raises:
+        FigmaAPIError: API エラー (一時ファイルは削除する)
+    """
     file_dir = cache_dir / file_id
     file_dir.mkdir(parents=True, exist_ok=True)
-    file_path = file_dir / "file_raw.json"
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(file_data, f, ensure_ascii=False, indent=2)
-    return file_path
+    tmp_path = file_dir / "file_raw.json.tmp"
+    try:
+        with open_cache_writer(tmp_path, compression, level) as out:
+            client.download_file(file_id, out, profile)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+def _build_cache_index(
+    raw_path: Path, index_format: IndexFormat, workers: int = 1
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any] | None]:
+    """保存済みの file_raw.json (一時ファイルを含む) からノードインデックスを生成
+
+    JSON / バイナリ形式で並列化しない場合は、ドキュメントツリーを展開しない
+    ストリーミング走査でインデックスとノードのバイト範囲を 1 回の走査で求める。
+    ページ単位の並列化や SQLite 形式 (ノードの生 JSON を DB に入れる) では全体をパースする。
+
+    Returns:
+        (ノードインデックス, ファイルのトップレベル情報, パースしたファイルデータ)。
+        ストリーミング走査の場合、ファイルデータは None
+
+    Raises:
+        OSError: ファイルが読めない場合
+        ValueError: JSON オブジェクトとして読めない場合
+    """
+    if workers <= 1 and index_format is not IndexFormat.SQLITE:
+        index, file_fields = build_index_from_file(raw_path)
+        return index, file_fields, None
 
+    loaded = json.loads(read_cache_bytes(raw_path))
+    if not isinstance(loaded, dict):
+        raise ValueError("Response is not a JSON object")
+    file_data = cast(dict[str, Any], loaded)
+    index = build_index(file_data, workers=workers)
+    if index_format is not IndexFormat.SQLITE:
+        index["offsets"] = build_node_offsets(raw_path)
+    return index, file_data, file_data
 
-def _save_cache_metadata(file_id: str, cache_dir: Path) -> None:
-    """キャッシュのメタデータ (タイムスタンプ等) を保存"""
+
+def _save_index_files(
+    file_id: str,
+    cache_dir: Path,
+    index: dict[str, Any],
+    file_data: dict[str, Any] | None,
+    index_format: IndexFormat,
+    compression: Compression = Compression.NONE,
+    compression_level: int | None = None,
+) -> None:
+    """ノードインデックスを指定形式で保存し、他の形式の古いファイルを削除する
+
+    Args:
+        file_data: パースしたファイルデータ (SQLite 形式でのみ必要)
+    """
+    if index_format is IndexFormat.SQLITE:
+        # ノードの生 JSON と FTS5 索引を DB に持つため、オフセットとトライグラムは不要
+        if file_data is None:
+            raise ValueError("SQLite index requires the parsed file data")
+        save_sqlite_index(file_data, index, cache_dir, file_id)
+    elif index_format is IndexFormat.BINARY:
+        save_binary_index(index, cache_dir, file_id)
+    else:
+        save_index(index, cache_dir, file_id, compression, compression_level)
+    # 形式を切り替えた場合に、古い形式のインデックスが読まれないよう削除する
+    for other_format, file_name in _INDEX_FILE_NAMES.items():
+        if other_format is not index_format:
+            (cache_dir / file_id / file_name).unlink(missing_ok=True)
+    if index_format is IndexFormat.SQLITE:
+        (cache_dir / file_id / "trigram_index.json").unlink(missing_ok=True)
+    else:
+        save_trigram_index(
+            build_trigram_index(index), cache_dir, file_id, compression, compression_level
+        )
+
+
+def _save_cache_metadata(
+    file_id: str,
+    cache_dir: Path,
+    file_data: dict[str, Any] | None = None,
+    index: dict[str, Any] | None = None,
+    fetch_profile: str | None = None,
+) -> dict[str, object]:
+    """キャッシュのメタデータ (タイムスタンプ、ファイル概要、件数) を保存
+
+    get_cached_figma_file が file_raw.json 全体をパースせずに応答できるよう、
+    ファイルのトップレベル情報とページ・フレーム・ノード数も書き出す。
+    fetch_profile は取得時のプロファイルで、キャッシュがどこまでの詳細を持つかを示す。
+
+    Returns:
+        書き出したメタデータ
+    """
     validate_file_id(file_id)
     file_dir = cache_dir / file_id
     file_dir.mkdir(parents=True, exist_ok=True)
@@ -47,80 +237,615 @@ def _save_cache_metadata(file_id: str, cache_dir: Path) -> None:
         "cached_at": now.isoformat(),
         "cached_at_unix": now.timestamp(),
     }
+    if file_data is not None:
+        metadata.update({field: file_data.get(field) for field in FILE_METADATA_FIELDS})
+    if index is not None:
+        metadata["page_count"] = len(index.get("pages", []))
+        metadata["frame_count"] = sum(len(ids) for ids in index.get("by_frame_title", {}).values())
+        metadata["node_count"] = len(index.get("by_id", {}))
+    if fetch_profile is not None:
+        metadata["fetch_profile"] = fetch_profile
 
     with open(meta_path, "w", encoding="utf-8") as f:
         json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return metadata
+
+
+def _publish_cache(
+    file_id: str,
+    cache_dir: Path,
+    generation: str,
+    metadata: dict[str, object],
+    content_hash: str | None,
+) -> None:
+    """書き終えた世代に読み込み先を切り替え、古い世代を削除する
+
+    切り替えた世代のファイルサイズと生 JSON のハッシュを加えて、
+    キャッシュディレクトリ全体のマニフェスト (index.json) も更新する。
+    --jobs で並行して保存するスレッドが同じマニフェストを書き換えないよう、切り替えと
+    更新はスレッド間で直列化する。
+    """
+    file_dir = generation_root(cache_dir, generation) / file_id
+    entry = build_manifest_entry(file_dir, metadata, content_hash)
+    with _publish_lock:
+        previous = publish_generation(cache_dir, file_id, generation)
+        prune_generations(cache_dir, file_id, previous)
+        update_manifest(cache_dir, file_id, entry)
+
+
+@dataclass(frozen=True)
+class _CacheOptions:
+    """cache コマンドのファイルごとの保存オプション"""
+
+    refresh: bool = False
+    workers: int = 1
+    index_format: IndexFormat = IndexFormat.JSON
+    compression: Compression = Compression.NONE
+    compression_level: int | None = None
+    shard_pages: bool = False
+    profile: FetchProfile = FetchProfile.FULL
+
+
+# 処理の段階の表示を更新する関数 (引数は表示する説明)
+StageCallback = Callable[[str], None]
+
+
+def _check_before_fetch(file_id: str, cache_dir: Path, refresh: bool) -> tuple[bool, str] | None:
+    """取得する前の検証と既存キャッシュのチェック
+
+    Returns:
+        取得しない場合は (成功か, 結果の表示)、取得する場合は None
+    """
+    try:
+        validate_file_id(file_id)
+    except InvalidFileIdError as e:
+        return False, f"[red]✗[/red] {t('cache.invalid_file_id', file_id=file_id, error=e)}"
+
+    if _has_raw_file(resolve_file_dir(cache_dir, file_id)) and not refresh:
+        return True, f"[yellow]⊘[/yellow] {t('cache.already_cached', file_id=file_id)}"
+    return None
+
+
+def _load_cache_metadata(file_dir: Path) -> dict[str, Any]:
+    """既存キャッシュのメタデータ (読めない場合は空)"""
+    try:
+        with open(file_dir / "cache_meta.json", encoding="utf-8") as f:
+            loaded: object = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cast(dict[str, Any], loaded) if isinstance(loaded, dict) else {}
+
+
+def _cached_fetch_profile(file_dir: Path) -> FetchProfile | None:
+    """既存キャッシュを取得したプロファイル (記録のない古いキャッシュは full、不明な値は None)"""
+    value = _load_cache_metadata(file_dir).get("fetch_profile", FetchProfile.FULL.value)
+    try:
+        return FetchProfile(value)
+    except ValueError:
+        return None
+
+
+def _reusable_cache_dir(cache_dir: Path, file_id: str, options: _CacheOptions) -> Path | None:
+    """リフレッシュ時に内容が同じなら書き直さずに済む、既存キャッシュのディレクトリを取得
+
+    既存キャッシュが指定と同じプロファイルで取得され、同じ保存形式 (インデックス形式・
+    圧縮形式・シャード分割の有無) で書かれている場合のみ返す。プロファイルや形式を
+    切り替える場合は内容が同じでも書き直す。
+
+    Returns:
+        既存キャッシュのディレクトリ (ない、または形式が違う場合は None)
+    """
+    file_dir = resolve_file_dir(cache_dir, file_id)
+    raw_path = file_dir / "file_raw.json"
+    sharded = not raw_path.exists() and is_sharded(file_dir)
+    if not raw_path.exists() and not sharded:
+        return None
+    if sharded != options.shard_pages or _cached_fetch_profile(file_dir) is not options.profile:
+        return None
+    if not (file_dir / _INDEX_FILE_NAMES[options.index_format]).exists():
+        return None
+    try:
+        with open(file_dir / SHARD_ROOT_NAME if sharded else raw_path, "rb") as f:
+            if detect_compression(f.read(8)) is not options.compression:
+                return None
+    except OSError:
+        return None
+    return file_dir
+
+
+def _is_same_version(file_dir: Path, remote: dict[str, Any]) -> bool:
+    """既存キャッシュのバージョン・最終更新日時が API のものと一致するかを判定"""
+    try:
+        with open(file_dir / "cache_meta.json", encoding="utf-8") as f:
+            loaded: object = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(loaded, dict):
+        return False
+    metadata = cast(dict[str, Any], loaded)
+    return all(
+        metadata.get(field) is not None and metadata.get(field) == remote.get(field)
+        for field in ("version", "lastModified")
+    )
+
+
+def _cached_content_hash(cache_dir: Path, file_id: str, file_dir: Path) -> str | None:
+    """既存キャッシュの生 JSON のハッシュ (マニフェストになければ計算する)"""
+    entry = (load_manifest(cache_dir) or {}).get(file_id, {})
+    content_hash = entry.get("content_hash")
+    if isinstance(content_hash, str):
+        return content_hash
+    try:
+        return hash_raw_content(file_dir)
+    except (OSError, ValueError):
+        return None
+
+
+def _unchanged_message(file_id: str, file_dir: Path) -> str:
+    """既存キャッシュと変わらなかった場合の結果の表示"""
+    version: object = None
+    try:
+        with open(file_dir / "cache_meta.json", encoding="utf-8") as f:
+            loaded: object = json.load(f)
+        if isinstance(loaded, dict):
+            version = cast(dict[str, Any], loaded).get("version")
+    except (OSError, ValueError):
+        pass
+    return f"[yellow]⊘[/yellow] {t('cache.unchanged', file_id=file_id, version=version or '-')}"
+
+
+def _fetch_error_message(file_id: str, error: FigmaAPIError) -> str:
+    """API エラーの結果の表示"""
+    if isinstance(error, FigmaAuthenticationError):
+        return f"[red]✗[/red] {t('cache.auth_error', file_id=file_id)}"
+    if isinstance(error, FigmaFileNotFoundError):
+        return f"[red]✗[/red] {t('cache.not_found', file_id=file_id)}"
+    if isinstance(error, FigmaRateLimitError):
+        retry_msg = (
+            t("cache.rate_limit_retry", seconds=error.retry_after) if error.retry_after else ""
+        )
+        return f"[red]✗[/red] {t('cache.rate_limit', file_id=file_id, retry_msg=retry_msg)}"
+    return f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=error)}"
+
+
+def _store_downloaded_file(
+    file_id: str,
+    cache_dir: Path,
+    generation: str,
+    tmp_path: Path,
+    options: _CacheOptions,
+    on_stage: StageCallback,
+    current_dir: Path | None = None,
+) -> tuple[bool, str]:
+    """世代ディレクトリに受信した生 JSON からインデックスを生成し、読み込み先を切り替える
+
+    Args:
+        current_dir: 同じ形式で書かれた既存キャッシュのディレクトリ。受信した内容の
+            ハッシュが既存キャッシュと同じなら、生 JSON もインデックスも書き直さない
+
+    Returns:
+        (成功か, 結果の表示)
+    """
+    generation_dir = generation_root(cache_dir, generation)
+    file_dir = generation_dir / file_id
+
+    try:
+        content_hash = hash_cache_file(tmp_path)
+    except OSError as e:
+        return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+    if current_dir is not None and content_hash == _cached_content_hash(
+        cache_dir, file_id, current_dir
+    ):
+        return True, _unchanged_message(file_id, current_dir)
+
+    # インデックス生成 (受信したバイト列が JSON として読めることの検証を兼ねる)
+    on_stage(t("cache.indexing", file_id=file_id))
+    try:
+        index, file_fields, file_data = _build_cache_index(
+            tmp_path, options.index_format, options.workers
+        )
+        if options.shard_pages:
+            # ページ単位のシャードとルートファイルに分割し、file_raw.json は残さない
+            on_stage(t("cache.saving", file_id=file_id))
+            write_page_shards(tmp_path, file_dir, options.compression, options.compression_level)
+    except (OSError, ValueError) as e:
+        return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+
+    # ファイル保存
+    on_stage(t("cache.saving", file_id=file_id))
+    try:
+        if options.shard_pages:
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, file_dir / "file_raw.json")
+        _save_index_files(
+            file_id,
+            generation_dir,
+            index,
+            file_data,
+            options.index_format,
+            options.compression,
+            options.compression_level,
+        )
+    except (OSError, ValueError) as e:
+        return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+
+    # キャッシュメタデータ保存 (タイムスタンプ記録) と世代の切り替え
+    try:
+        metadata = _save_cache_metadata(
+            file_id, generation_dir, file_fields, index, options.profile.value
+        )
+        _publish_cache(file_id, cache_dir, generation, metadata, content_hash)
+    except (OSError, ValueError) as e:
+        return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+    return True, f"[green]✓[/green] {file_id}: {file_fields.get('name', 'Unknown')}"
+
+
+def _compress_and_store_file(
+    file_id: str,
+    cache_dir: Path,
+    generation: str,
+    tmp_path: Path,
+    options: _CacheOptions,
+    on_stage: StageCallback,
+    current_dir: Path | None = None,
+) -> tuple[bool, str]:
+    """非圧縮で受信した生 JSON を圧縮してから _store_downloaded_file で保存する
+
+    ページ単位に分割する場合は、シャードを書き出す際に圧縮するため一時ファイルは圧縮しない。
+
+    Returns:
+        (成功か, 結果の表示)
+    """
+    if not options.shard_pages:
+        try:
+            compress_cache_file(tmp_path, options.compression, options.compression_level)
+        except OSError as e:
+            return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+    return _store_downloaded_file(
+        file_id, cache_dir, generation, tmp_path, options, on_stage, current_dir
+    )
 
 
 def _cache_single_file(
     client: FigmaClient,
     file_id: str,
     cache_dir: Path,
-    refresh: bool,
-) -> bool:
+    options: _CacheOptions,
+    on_stage: StageCallback,
+) -> tuple[bool, str]:
     """単一ファイルをキャッシュする
 
     Returns:
-        True: 成功、False: 失敗
+        (成功か, 結果の表示)
+    """
+    checked = _check_before_fetch(file_id, cache_dir, options.refresh)
+    if checked is not None:
+        return checked
+
+    # リフレッシュ時はファイル全体を取得する前に、バージョンだけを取得して変更の有無を確認する
+    current_dir = _reusable_cache_dir(cache_dir, file_id, options)
+    if current_dir is not None:
+        on_stage(t("cache.checking_version", file_id=file_id))
+        try:
+            remote = client.get_file_version(file_id)
+        except FigmaAPIError as e:
+            return False, _fetch_error_message(file_id, e)
+        if _is_same_version(current_dir, remote):
+            return True, _unchanged_message(file_id, current_dir)
+
+    # 稼働中のサーバーが書き込み途中のファイルを読まないよう、新しい世代に一式を書き出してから
+    # 読み込み先を切り替える。切り替える前に失敗した場合は世代ごと削除する
+    generation = create_generation(cache_dir, file_id)
+    try:
+        on_stage(t("cache.fetching", file_id=file_id))
+        try:
+            tmp_path = _download_file_raw(
+                client,
+                file_id,
+                generation_root(cache_dir, generation),
+                options.compression,
+                options.compression_level,
+                options.profile,
+            )
+        except FigmaAPIError as e:
+            return False, _fetch_error_message(file_id, e)
+        return _store_downloaded_file(
+            file_id, cache_dir, generation, tmp_path, options, on_stage, current_dir
+        )
+    finally:
+        discard_generation(cache_dir, file_id, generation)
+
+
+async def _cache_single_file_async(
+    client: AsyncFigmaClient,
+    file_id: str,
+    cache_dir: Path,
+    options: _CacheOptions,
+    on_stage: StageCallback,
+) -> tuple[bool, str]:
+    """単一ファイルをキャッシュする (_cache_single_file の非同期版)
+
+    受信はイベントループ上で (圧縮せずに) 行い、圧縮・インデックス生成と保存は
+    他のファイルの受信を止めないようスレッドで実行する。
+
+    Returns:
+        (成功か, 結果の表示)
+    """
+    checked = _check_before_fetch(file_id, cache_dir, options.refresh)
+    if checked is not None:
+        return checked
+
+    current_dir = _reusable_cache_dir(cache_dir, file_id, options)
+    if current_dir is not None:
+        on_stage(t("cache.checking_version", file_id=file_id))
+        try:
+            remote = await client.get_file_version(file_id)
+        except FigmaAPIError as e:
+            return False, _fetch_error_message(file_id, e)
+        if _is_same_version(current_dir, remote):
+            return True, _unchanged_message(file_id, current_dir)
+
+    generation = create_generation(cache_dir, file_id)
+    try:
+        on_stage(t("cache.fetching", file_id=file_id))
+        file_dir = generation_root(cache_dir, generation) / file_id
+        tmp_path = file_dir / "file_raw.json.tmp"
+        # 圧縮の CPU 負荷でイベントループを止めないよう、受信中は圧縮せずに書き出す
+        try:
+            with open_cache_writer(tmp_path) as out:
+                await client.download_file(file_id, out, options.profile)
+        except FigmaAPIError as e:
+            return False, _fetch_error_message(file_id, e)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+        return await asyncio.to_thread(
+            _compress_and_store_file,
+            file_id,
+            cache_dir,
+            generation,
+            tmp_path,
+            options,
+            on_stage,
+            current_dir,
+        )
+    finally:
+        discard_generation(cache_dir, file_id, generation)
+
+
+def _cached_index_format(file_dir: Path) -> IndexFormat:
+    """既存キャッシュのインデックス形式 (CacheStore と同じ優先順、ない場合は JSON)"""
+    for index_format in (IndexFormat.SQLITE, IndexFormat.BINARY, IndexFormat.JSON):
+        if (file_dir / _INDEX_FILE_NAMES[index_format]).exists():
+            return index_format
+    return IndexFormat.JSON
+
+
+def _refresh_nodes(
+    client: FigmaClient,
+    file_id: str,
+    cache_dir: Path,
+    node_ids: list[str],
+    on_stage: StageCallback,
+) -> tuple[bool, str]:
+    """キャッシュ済みのファイルの指定ノードだけを取得し直して差し替える
+
+    GET /files/:key/nodes で取得したサブツリーを生 JSON に差し込む。インデックスは生 JSON
+    全体を走査し直さず、既存の by_id と offsets を差し替えた上でキー表を作り直す
+    (splice_nodes。SQLite 形式では DB の作成のために生 JSON 全体をパースする)。
+    生 JSON (またはシャード) とインデックスファイルは一式を新しい世代に書き出して
+    切り替える。保存形式 (インデックス形式・圧縮形式・シャード分割の有無) と
+    プロファイルは既存キャッシュのものを引き継ぐ。
+
+    メタデータのバージョンと最終更新日時は更新しない (他のノードは古いままなので、
+    次の --refresh ではファイル全体の変更を確認させる)。
+
+    Returns:
+        (成功か, 結果の表示)
     """
-    # file_id のバリデーション
     try:
         validate_file_id(file_id)
     except InvalidFileIdError as e:
-        console.print(f"[red]✗[/red] {t('cache.invalid_file_id', file_id=file_id, error=e)}")
-        return False
+        return False, f"[red]✗[/red] {t('cache.invalid_file_id', file_id=file_id, error=e)}"
+
+    file_dir = resolve_file_dir(cache_dir, file_id)
+    raw_path = file_dir / "file_raw.json"
+    sharded = not raw_path.exists() and is_sharded(file_dir)
+    if not raw_path.exists() and not sharded:
+        return False, f"[red]✗[/red] {t('cache.nodes_not_cached', file_id=file_id)}"
 
-    # 既存キャッシュのチェック
-    file_path = cache_dir / file_id / "file_raw.json"
-    if file_path.exists() and not refresh:
-        console.print(f"[yellow]⊘[/yellow] {t('cache.already_cached', file_id=file_id)}")
-        return True
+    # アウトラインのキャッシュは上位の階層しか持たないため、サブツリーを差し込まない
+    profile = _cached_fetch_profile(file_dir) or FetchProfile.FULL
+    if profile is FetchProfile.OUTLINE:
+        return False, f"[red]✗[/red] {t('cache.node_id_outline', file_id=file_id)}"
+
+    # 子孫を切り詰めると差し替えたノードの下が欠けるため、サブツリー全体を取得する
+    on_stage(t("cache.fetching_nodes", file_id=file_id, count=len(node_ids)))
+    try:
+        response = client.get_nodes(file_id, node_ids, profile=profile)
+    except FigmaAPIError as e:
+        return False, _fetch_error_message(file_id, e)
+    except ValueError as e:
+        return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+    found: dict[str, Any] = response.get("nodes") or {}
+    nodes: dict[str, dict[str, Any]] = {}
+    for node_id in node_ids:
+        # 存在しないノードは null で返される
+        entry: dict[str, Any] = found.get(node_id) or {}
+        document: object = entry.get("document")
+        if not isinstance(document, dict):
+            message = t("cache.node_not_found", file_id=file_id, node_id=node_id)
+            return False, f"[red]✗[/red] {message}"
+        nodes[node_id] = cast(dict[str, Any], document)
+
+    on_stage(t("cache.indexing", file_id=file_id))
+    try:
+        with open(file_dir / SHARD_ROOT_NAME if sharded else raw_path, "rb") as f:
+            compression = detect_compression(f.read(8))
+        raw = b"".join(iter_assembled_chunks(file_dir)) if sharded else read_cache_bytes(raw_path)
+        by_id, offsets = load_index_entries(file_dir, raw)
+        new_raw, index = splice_nodes(raw, by_id, offsets, nodes)
+    except KeyError as e:
+        message = t("cache.node_not_cached", file_id=file_id, node_id=e.args[0])
+        return False, f"[red]✗[/red] {message}"
+    except (OSError, ValueError) as e:
+        return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+    del raw, by_id, offsets
 
-    with Progress(
+    index_format = _cached_index_format(file_dir)
+    previous_metadata = _load_cache_metadata(file_dir)
+    generation = create_generation(cache_dir, file_id)
+    generation_dir = generation_root(cache_dir, generation)
+    try:
+        on_stage(t("cache.saving", file_id=file_id))
+        tmp_path = generation_dir / file_id / "file_raw.json.tmp"
+        try:
+            if sharded:
+                tmp_path.write_bytes(new_raw)
+                write_page_shards(tmp_path, generation_dir / file_id, compression)
+                tmp_path.unlink()
+            else:
+                with open_cache_writer(tmp_path, compression) as out:
+                    out.write(new_raw)
+                os.replace(tmp_path, generation_dir / file_id / "file_raw.json")
+            file_data: dict[str, Any] | None = None
+            if index_format is IndexFormat.SQLITE:
+                del index["offsets"]
+                file_data = cast(dict[str, Any], json.loads(new_raw))
+            _save_index_files(file_id, generation_dir, index, file_data, index_format, compression)
+            content_hash = hash_raw_content(generation_dir / file_id)
+        except (OSError, ValueError) as e:
+            tmp_path.unlink(missing_ok=True)
+            return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+
+        try:
+            metadata = _save_cache_metadata(
+                file_id, generation_dir, previous_metadata, index, profile.value
+            )
+            _publish_cache(file_id, cache_dir, generation, metadata, content_hash)
+        except (OSError, ValueError) as e:
+            return False, f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}"
+    finally:
+        discard_generation(cache_dir, file_id, generation)
+
+    name = previous_metadata.get("name") or "Unknown"
+    message = t("cache.nodes_refreshed", file_id=file_id, name=name, count=len(nodes))
+    return True, f"[green]✓[/green] {message}"
+
+
+def _progress() -> Progress:
+    """処理中のファイルごとに段階を表示する進捗表示"""
+    return Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
         transient=True,
-    ) as progress:
-        # Figma API からファイル取得
-        task = progress.add_task(t("cache.fetching", file_id=file_id), total=None)
+    )
+
+
+def _cache_files(
+    file_ids: list[str], cache_dir: Path, options: _CacheOptions, rate_limiter: RateLimiter
+) -> list[bool]:
+    """ファイルを 1 件ずつ順にキャッシュする
+
+    Returns:
+        ファイルごとの成否
+    """
+    results: list[bool] = []
+    with FigmaClient(rate_limiter=rate_limiter) as client, _progress() as progress:
+        for idx, fid in enumerate(file_ids, start=1):
+            task = progress.add_task("", total=None)
+            try:
+                succeeded, message = _cache_single_file(
+                    client,
+                    fid,
+                    cache_dir,
+                    options,
+                    lambda description: progress.update(task, description=description),
+                )
+            finally:
+                progress.remove_task(task)
+            # 進捗表示
+            console.print(f"[dim]({idx}/{len(file_ids)})[/dim] {message}")
+            results.append(succeeded)
+    return results
+
+
+def _cache_nodes(
+    file_id: str, node_ids: list[str], cache_dir: Path, rate_limiter: RateLimiter
+) -> list[bool]:
+    """キャッシュ済みのファイルの指定ノードだけを更新する (cache --node-id)
+
+    Returns:
+        ファイルごとの成否 (1 件)
+    """
+    with FigmaClient(rate_limiter=rate_limiter) as client, _progress() as progress:
+        task = progress.add_task("", total=None)
         try:
-            file_data = client.get_file(file_id)
-        except FigmaAuthenticationError:
-            progress.remove_task(task)
-            console.print(f"[red]✗[/red] {t('cache.auth_error', file_id=file_id)}")
-            return False
-        except FigmaFileNotFoundError:
-            progress.remove_task(task)
-            console.print(f"[red]✗[/red] {t('cache.not_found', file_id=file_id)}")
-            return False
-        except FigmaRateLimitError as e:
-            progress.remove_task(task)
-            retry_msg = t("cache.rate_limit_retry", seconds=e.retry_after) if e.retry_after else ""
-            console.print(
-                f"[red]✗[/red] {t('cache.rate_limit', file_id=file_id, retry_msg=retry_msg)}"
+            succeeded, message = _refresh_nodes(
+                client,
+                file_id,
+                cache_dir,
+                node_ids,
+                lambda description: progress.update(task, description=description),
             )
-            return False
-        except FigmaAPIError as e:
+        finally:
             progress.remove_task(task)
-            console.print(f"[red]✗[/red] {t('cache.api_error', file_id=file_id, error=e)}")
-            return False
+    console.print(f"[dim](1/1)[/dim] {message}")
+    return [succeeded]
 
-        # ファイル保存
-        progress.update(task, description=t("cache.saving", file_id=file_id))
-        _save_file_raw(file_data, file_id, cache_dir)
 
-        # インデックス生成
-        progress.update(task, description=t("cache.indexing", file_id=file_id))
-        index = build_index(file_data)
-        save_index(index, cache_dir, file_id)
+async def _cache_files_concurrently(
+    file_ids: list[str],
+    cache_dir: Path,
+    options: _CacheOptions,
+    rate_limiter: RateLimiter,
+    jobs: int,
+) -> list[bool]:
+    """最大 jobs 件のファイルを並行してキャッシュする
 
-        # キャッシュメタデータ保存 (タイムスタンプ記録)
-        _save_cache_metadata(file_id, cache_dir)
+    結果は完了した順に (完了件数/全件数) を付けて表示する。並行して取得するリクエストは
+    rate_limiter を共有し、429 を受けた場合はまとめて待つ。
 
-    file_name = file_data.get("name", "Unknown")
-    console.print(f"[green]✓[/green] {file_id}: {file_name}")
-    return True
+    Returns:
+        ファイルごとの成否 (file_ids の順)
+    """
+    semaphore = asyncio.Semaphore(jobs)
+    results: list[bool] = [False] * len(file_ids)
+    completed = 0
+
+    async def cache_one(position: int, fid: str) -> None:
+        nonlocal completed
+        async with semaphore:
+            task = progress.add_task("", total=None)
+            try:
+                succeeded, message = await _cache_single_file_async(
+                    client,
+                    fid,
+                    cache_dir,
+                    options,
+                    lambda description: progress.update(task, description=description),
+                )
+            except Exception as e:
+                # 1 件の想定外の失敗で TaskGroup ごと他のファイルを取り消さないよう、そのファイルの
+                # 失敗として記録する
+                succeeded = False
+                message = f"[red]✗[/red] {t('cache.unexpected_error', file_id=fid, error=e)}"
+            finally:
+                progress.remove_task(task)
+        completed += 1
+        console.print(f"[dim]({completed}/{len(file_ids)})[/dim] {message}")
+        results[position] = succeeded
+
+    with _progress() as progress:
+        async with (
+            AsyncFigmaClient(rate_limiter=rate_limiter) as client,
+            asyncio.TaskGroup() as group,
+        ):
+            for position, fid in enumerate(file_ids):
+                group.create_task(cache_one(position, fid))
+    return results
 
 
 def cache(
@@ -145,6 +870,42 @@ def cache(
         Path | None,
         typer.Option("--cache-dir", "-d", help=t("cache.cache_dir_help")),
     ] = None,
+    workers: Annotated[
+        int,
+        typer.Option("--workers", "-w", min=1, help=t("cache.workers_help")),
+    ] = 1,
+    index_format: Annotated[
+        IndexFormat,
+        typer.Option("--index-format", help=t("cache.index_format_help")),
+    ] = IndexFormat.JSON,
+    compression: Annotated[
+        Compression,
+        typer.Option("--compression", help=t("cache.compression_help")),
+    ] = Compression.NONE,
+    compression_level: Annotated[
+        int | None,
+        typer.Option("--compression-level", min=0, max=9, help=t("cache.compression_level_help")),
+    ] = None,
+    shard_pages: Annotated[
+        bool,
+        typer.Option("--shard-pages", help=t("cache.shard_pages_help")),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help=t("cache.jobs_help")),
+    ] = 1,
+    requests_per_minute: Annotated[
+        float | None,
+        typer.Option("--requests-per-minute", min=0.1, help=t("cache.requests_per_minute_help")),
+    ] = None,
+    node_id: Annotated[
+        list[str] | None,
+        typer.Option("--node-id", "-n", help=t("cache.node_id_help")),
+    ] = None,
+    profile: Annotated[
+        FetchProfile,
+        typer.Option("--profile", "-p", help=t("cache.profile_help")),
+    ] = FetchProfile.FULL,
 ) -> None:
     """Figma ファイルのキャッシュを生成"""
     # ファイル ID の収集
@@ -173,6 +934,11 @@ def cache(
     # 重複除去
     file_ids = list(dict.fromkeys(file_ids))
 
+    # ノード単位の更新は 1 ファイルのみ
+    if node_id and len(file_ids) != 1:
+        console.print(f"[red]{t('cache.node_id_single_file')}[/red]")
+        raise typer.Exit(1)
+
     # キャッシュディレクトリ
     target_cache_dir = cache_dir or DEFAULT_CACHE_DIR
 
@@ -180,24 +946,178 @@ def cache(
     console.print(f"[bold]{t('cache.target_files_label')}[/bold] {len(file_ids)}")
     console.print()
 
-    # FigmaClient でファイル取得
+    options = _CacheOptions(
+        refresh=refresh,
+        workers=workers,
+        index_format=index_format,
+        compression=compression,
+        compression_level=compression_level,
+        shard_pages=shard_pages,
+        profile=profile,
+    )
+    with _writer_lock(target_cache_dir):
+        # 前回までの実行で使った枠と 429 による一時停止を引き継ぐ
+        rate_limiter = RateLimiter(
+            requests_per_minute, state_path=target_cache_dir / RATE_LIMIT_STATE_NAME
+        )
+        paused_for = rate_limiter.paused_for()
+        if paused_for > 0:
+            console.print(
+                f"[yellow]{t('cache.rate_limit_paused', seconds=math.ceil(paused_for))}[/yellow]"
+            )
+        try:
+            if node_id:
+                results = _cache_nodes(
+                    file_ids[0], list(dict.fromkeys(node_id)), target_cache_dir, rate_limiter
+                )
+            elif jobs > 1 and len(file_ids) > 1:
+                results = asyncio.run(
+                    _cache_files_concurrently(
+                        file_ids, target_cache_dir, options, rate_limiter, jobs
+                    )
+                )
+            else:
+                results = _cache_files(file_ids, target_cache_dir, options, rate_limiter)
+        finally:
+            # 使った枠は次の実行に引き継ぐため、終了時にまとめて保存する
+            rate_limiter.save()
+    success_count = results.count(True)
+    fail_count = results.count(False)
+
+    # 結果サマリー
+    console.print()
+    if fail_count == 0:
+        console.print(f"[green]{t('cache.complete_all_success', count=success_count)}[/green]")
+    else:
+        console.print(
+            f"[yellow]{t('cache.complete_with_failures', success=success_count, fail=fail_count)}[/yellow]"
+        )
+        raise typer.Exit(1)
+
+
+def _reindex_single_file(file_id: str, cache_dir: Path, index_format: IndexFormat) -> bool:
+    """キャッシュ済みの file_raw.json からインデックスを再生成する
+
+    インデックスの圧縮形式は file_raw.json と揃える。ページ単位に分割したキャッシュは
+    シャードを一時ファイルに結合してから走査する。
+
+    Returns:
+        True: 成功、False: 失敗
+    """
+    try:
+        validate_file_id(file_id)
+    except InvalidFileIdError as e:
+        console.print(f"[red]✗[/red] {t('cache.invalid_file_id', file_id=file_id, error=e)}")
+        return False
+
+    file_dir = resolve_file_dir(cache_dir, file_id)
+    file_path = file_dir / "file_raw.json"
+    sharded = not file_path.exists() and is_sharded(file_dir)
+    if not file_path.exists() and not sharded:
+        console.print(f"[red]✗[/red] {t('reindex.not_cached', file_id=file_id)}")
+        return False
+
+    # 生 JSON (シャード) は新しい世代にリンクし、インデックスとメタデータだけを書き直す
+    generation = create_generation(cache_dir, file_id)
+    generation_dir = generation_root(cache_dir, generation)
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+            transient=True,
+        ) as progress:
+            task = progress.add_task(t("cache.indexing", file_id=file_id), total=None)
+            raw_path = file_path
+            try:
+                if sharded:
+                    link_cache_files(
+                        file_dir, generation_dir / file_id, [SHARD_ROOT_NAME, SHARD_DIR_NAME]
+                    )
+                    raw_path = generation_dir / file_id / "file_raw.json.tmp"
+                    with open(raw_path, "wb") as out:
+                        write_assembled_file(file_dir, out)
+                else:
+                    link_cache_files(file_dir, generation_dir / file_id, [file_path.name])
+                with open(file_dir / SHARD_ROOT_NAME if sharded else file_path, "rb") as f:
+                    compression = detect_compression(f.read(8))
+                index, file_fields, file_data = _build_cache_index(raw_path, index_format)
+                content_hash = hash_cache_file(raw_path)
+                _save_index_files(
+                    file_id, generation_dir, index, file_data, index_format, compression
+                )
+            except (OSError, ValueError) as e:
+                progress.remove_task(task)
+                console.print(f"[red]✗[/red] {t('reindex.error', file_id=file_id, error=e)}")
+                return False
+            finally:
+                if sharded:
+                    raw_path.unlink(missing_ok=True)
+            # 稼働中のサーバーが再読み込みするようメタデータも更新する (プロファイルは引き継ぐ)
+            metadata = _save_cache_metadata(
+                file_id,
+                generation_dir,
+                file_fields,
+                index,
+                _load_cache_metadata(file_dir).get("fetch_profile"),
+            )
+            _publish_cache(file_id, cache_dir, generation, metadata, content_hash)
+    finally:
+        discard_generation(cache_dir, file_id, generation)
+
+    console.print(f"[green]✓[/green] {file_id}: {file_fields.get('name', 'Unknown')}")
+    return True
+
+
+def reindex(
+    file_id: Annotated[
+        list[str] | None,
+        typer.Option("--file-id", "-f", help=t("reindex.file_id_help")),
+    ] = None,
+    cache_dir: Annotated[
+        Path | None,
+        typer.Option("--cache-dir", "-d", help=t("cache.cache_dir_help")),
+    ] = None,
+    index_format: Annotated[
+        IndexFormat,
+        typer.Option("--index-format", help=t("cache.index_format_help")),
+    ] = IndexFormat.JSON,
+) -> None:
+    """キャッシュ済みの file_raw.json からインデックスを再生成"""
+    target_cache_dir = cache_dir or DEFAULT_CACHE_DIR
+
+    if file_id:
+        file_ids = list(dict.fromkeys(file_id))
+    elif target_cache_dir.is_dir():
+        file_ids = sorted(
+            path.name
+            for path in target_cache_dir.iterdir()
+            if path.is_dir() and _has_raw_file(resolve_file_dir(target_cache_dir, path.name))
+        )
+    else:
+        file_ids = []
+
+    if not file_ids:
+        console.print(f"[yellow]{t('reindex.no_cache_found')}[/yellow]")
+        raise typer.Exit(1)
+
+    console.print(f"[bold]{t('cache.cache_dir_label')}[/bold] {target_cache_dir}")
+    console.print(f"[bold]{t('cache.target_files_label')}[/bold] {len(file_ids)}")
+    console.print()
+
     success_count = 0
     fail_count = 0
-    total_count = len(file_ids)
-
-    with FigmaClient() as client:
+    with _writer_lock(target_cache_dir):
         for idx, fid in enumerate(file_ids, start=1):
-            # 進捗表示
-            console.print(f"[dim]({idx}/{total_count})[/dim] ", end="")
-            if _cache_single_file(client, fid, target_cache_dir, refresh):
+            console.print(f"[dim]({idx}/{len(file_ids)})[/dim] ", end="")
+            if _reindex_single_file(fid, target_cache_dir, index_format):
                 success_count += 1
             else:
                 fail_count += 1
 
-    # 結果サマリー
     console.print()
     if fail_count == 0:
-        console.print(f"[green]{t('cache.complete_all_success', count=success_count)}[/green]")
+        console.print(f"[green]{t('reindex.complete_all_success', count=success_count)}[/green]")
     else:
         console.print(
             f"[yellow]{t('cache.complete_with_failures', success=success_count, fail=fail_count)}[/yellow]"
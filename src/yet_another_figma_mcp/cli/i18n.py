@@ -117,13 +117,59 @@ MESSAGES: dict[str, dict[str, str]] = {
         "en": "Text file containing list of file IDs",
     },
     "cache.refresh_help": {
-        "ja": "キャッシュを強制的に更新",
-        "en": "Force refresh cache",
+        "ja": "キャッシュ済みのファイルも更新（バージョンが同じファイルは取得せずにスキップ）",
+        "en": "Refresh cached files too (files whose version is unchanged are skipped)",
     },
     "cache.cache_dir_help": {
         "ja": "キャッシュディレクトリ",
         "en": "Cache directory",
     },
+    "cache.workers_help": {
+        "ja": "インデックス生成をページ単位で並列化するプロセス数（1 で並列化しない）",
+        "en": "Number of processes used to build the index per page (1 disables parallelism)",
+    },
+    "cache.jobs_help": {
+        "ja": "並行して取得・保存・インデックス生成するファイル数（1 で 1 件ずつ処理）",
+        "en": "Number of files fetched, saved and indexed concurrently (1 processes one at a time)",
+    },
+    "cache.requests_per_minute_help": {
+        "ja": "Figma API へのリクエスト数の上限（1 分あたり。--jobs の並行取得と続けて実行した cache コマンドで共有）",
+        "en": "Maximum Figma API requests per minute (shared by --jobs workers and consecutive cache runs)",
+    },
+    "cache.index_format_help": {
+        "ja": (
+            "インデックスの保存形式（binary は起動時にパースせず mmap で読み込む、"
+            "sqlite は検索・ノード取得を SQLite のクエリで行う）"
+        ),
+        "en": (
+            "Index storage format (binary is memory-mapped instead of parsed at startup, "
+            "sqlite answers searches and node lookups with SQLite queries)"
+        ),
+    },
+    "cache.compression_help": {
+        "ja": "file_raw.json と JSON 形式のインデックスの圧縮形式（読み込み時は自動判定）",
+        "en": "Compression for file_raw.json and JSON indexes (detected automatically on load)",
+    },
+    "cache.compression_level_help": {
+        "ja": "圧縮レベル（0-9、省略時は形式ごとのデフォルト）",
+        "en": "Compression level (0-9, defaults to the codec's default)",
+    },
+    "cache.shard_pages_help": {
+        "ja": "file_raw.json をページ単位のシャード (pages/) とルートファイル (file_root.json) に分割して保存",
+        "en": "Split file_raw.json into per-page shards (pages/) and a root file (file_root.json)",
+    },
+    "cache.node_id_help": {
+        "ja": "キャッシュ済みのファイルのうち、指定したノード（フレーム等）のサブツリーだけを取得して差し替える（複数指定可）",
+        "en": "Fetch only the subtrees of these nodes (frames, etc.) and splice them into the cached file (repeatable)",
+    },
+    "cache.node_id_single_file": {
+        "ja": "エラー: --node-id はファイル ID を 1 つだけ指定した場合に使用できます",
+        "en": "Error: --node-id requires exactly one file ID",
+    },
+    "cache.profile_help": {
+        "ja": "取得する詳細度（outline: ページと上位フレームまで、full: 全体、full+geometry: 全体とベクターのパス）",
+        "en": "Level of detail to fetch (outline: pages and top-level frames, full: whole tree, full+geometry: whole tree with vector paths)",
+    },
     "cache.invalid_file_id": {
         "ja": "{file_id}: 無効なファイル ID - {error}",
         "en": "{file_id}: Invalid file ID - {error}",
@@ -148,6 +194,10 @@ MESSAGES: dict[str, dict[str, str]] = {
         "ja": "{file_id}: レート制限{retry_msg}",
         "en": "{file_id}: Rate limited{retry_msg}",
     },
+    "cache.rate_limit_paused": {
+        "ja": "Figma API のレート制限により、{seconds} 秒後まで取得を待ちます",
+        "en": "Rate limited by the Figma API; waiting {seconds} seconds before fetching",
+    },
     "cache.rate_limit_retry": {
         "ja": "（{seconds}秒後に再試行）",
         "en": " (retry after {seconds} seconds)",
@@ -156,6 +206,42 @@ MESSAGES: dict[str, dict[str, str]] = {
         "ja": "{file_id}: API エラー - {error}",
         "en": "{file_id}: API error - {error}",
     },
+    "cache.unexpected_error": {
+        "ja": "{file_id}: 予期しないエラー - {error}",
+        "en": "{file_id}: Unexpected error - {error}",
+    },
+    "cache.checking_version": {
+        "ja": "{file_id}: 更新を確認中...",
+        "en": "{file_id}: Checking for updates...",
+    },
+    "cache.unchanged": {
+        "ja": "{file_id}: 変更なし（バージョン {version}）、スキップしました",
+        "en": "{file_id}: Unchanged (version {version}), skipped",
+    },
+    "cache.fetching_nodes": {
+        "ja": "{file_id}: Figma API から {count} 件のノードを取得中...",
+        "en": "{file_id}: Fetching {count} node(s) from Figma API...",
+    },
+    "cache.nodes_not_cached": {
+        "ja": "{file_id}: キャッシュされていません（先に --node-id なしで cache を実行してください）",
+        "en": "{file_id}: Not cached (run cache without --node-id first)",
+    },
+    "cache.node_not_found": {
+        "ja": "{file_id}: ノード {node_id} が見つかりません",
+        "en": "{file_id}: Node {node_id} not found",
+    },
+    "cache.node_not_cached": {
+        "ja": "{file_id}: ノード {node_id} はキャッシュにありません（--refresh でファイル全体を更新してください）",
+        "en": "{file_id}: Node {node_id} is not in the cache (use --refresh to update the whole file)",
+    },
+    "cache.node_id_outline": {
+        "ja": "{file_id}: outline プロファイルのキャッシュはノード単位で更新できません（--refresh でファイル全体を更新してください）",
+        "en": "{file_id}: Caches fetched with the outline profile cannot be refreshed per node (use --refresh instead)",
+    },
+    "cache.nodes_refreshed": {
+        "ja": "{file_id}: {name}（{count} 件のノードを更新）",
+        "en": "{file_id}: {name} ({count} node(s) refreshed)",
+    },
     "cache.saving": {
         "ja": "{file_id}: ファイルを保存中...",
         "en": "{file_id}: Saving file...",
@@ -164,6 +250,10 @@ MESSAGES: dict[str, dict[str, str]] = {
         "ja": "{file_id}: インデックスを生成中...",
         "en": "{file_id}: Generating index...",
     },
+    "cache.waiting_for_lock": {
+        "ja": "他の cache / reindex コマンドが {path} に書き込み中のため、終了を待っています...",
+        "en": "Waiting for another cache / reindex command writing to {path}...",
+    },
     "cache.file_list_read_error": {
         "ja": "エラー: ファイルリストの読み込みに失敗しました（UTF-8 でエンコードしてください）",
         "en": "Error: Failed to read file list (please encode in UTF-8)",
@@ -192,6 +282,30 @@ MESSAGES: dict[str, dict[str, str]] = {
         "ja": "完了: {success} 成功, {fail} 失敗",
         "en": "Complete: {success} succeeded, {fail} failed",
     },
+    "reindex.help": {
+        "ja": "キャッシュ済みの file_raw.json からインデックスを再生成 (API は呼ばない)",
+        "en": "Rebuild indexes from cached file_raw.json (no API calls)",
+    },
+    "reindex.file_id_help": {
+        "ja": "再生成するファイル ID (複数指定可、省略時はキャッシュ済みの全ファイル)",
+        "en": "File ID to reindex (can specify multiple, default: all cached files)",
+    },
+    "reindex.not_cached": {
+        "ja": "{file_id}: キャッシュされていません",
+        "en": "{file_id}: Not cached",
+    },
+    "reindex.error": {
+        "ja": "{file_id}: インデックスの生成に失敗しました: {error}",
+        "en": "{file_id}: Failed to build index: {error}",
+    },
+    "reindex.no_cache_found": {
+        "ja": "キャッシュされたファイルがありません",
+        "en": "No cached files found",
+    },
+    "reindex.complete_all_success": {
+        "ja": "完了: {count} ファイルのインデックスを再生成しました",
+        "en": "Complete: Reindexed {count} file(s)",
+    },
     # ============================================================
     # serve.py - serve command
     # ============================================================
@@ -203,6 +317,22 @@ MESSAGES: dict[str, dict[str, str]] = {
         "ja": "詳細ログを出力（DEBUG レベル）",
         "en": "Enable verbose logging (DEBUG level)",
     },
+    "serve.max_memory_help": {
+        "ja": "キャッシュの推定メモリ使用量の上限（例: 2GB, 512MB）。超過分は古いものから退避",
+        "en": "Memory budget for cached data (e.g. 2GB, 512MB); least recently used data is evicted",
+    },
+    "serve.reload_interval_help": {
+        "ja": "キャッシュ更新（cache --refresh）を確認する間隔（秒）。更新があれば再ロード",
+        "en": "Interval in seconds between checks for refreshed cache files; updates are reloaded",
+    },
+    "serve.invalid_memory_size": {
+        "ja": "無効なサイズ指定です: {value}（例: 2GB, 512MB）",
+        "en": "Invalid size: {value} (e.g. 2GB, 512MB)",
+    },
+    "serve.max_memory": {
+        "ja": "メモリ上限: {size} バイト",
+        "en": "Memory budget: {size} bytes",
+    },
     "serve.starting": {
         "ja": "MCP サーバーを起動中...",
         "en": "Starting MCP server...",
@@ -230,6 +360,10 @@ MESSAGES: dict[str, dict[str, str]] = {
         "ja": "JSON 形式で出力",
         "en": "Output in JSON format",
     },
+    "status.rebuild_manifest_help": {
+        "ja": "ディスク上のキャッシュから index.json (マニフェスト) を再構築してから表示",
+        "en": "Rebuild index.json (the cache manifest) from the cache on disk before listing",
+    },
     "status.no_cache_found": {
         "ja": "キャッシュが見つかりません: {path}",
         "en": "No cache found: {path}",
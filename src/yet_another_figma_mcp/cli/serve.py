@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+import re
 import signal
 import sys
 from pathlib import Path
@@ -9,10 +10,30 @@ from typing import Annotated
 
 import typer
 
+from yet_another_figma_mcp.cache.store import DEFAULT_RELOAD_INTERVAL
 from yet_another_figma_mcp.cli.app import DEFAULT_CACHE_DIR
 from yet_another_figma_mcp.cli.i18n import t
 
 
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_memory_size(value: str | None) -> int | None:
+    """サイズ指定 (例: "2GB", "512MiB") をバイト数に変換 (単位は 1024 倍)
+
+    Raises:
+        typer.BadParameter: 解釈できない形式の場合
+    """
+    if value is None:
+        return None
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        raise typer.BadParameter(t("serve.invalid_memory_size", value=value))
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit.upper()])
+
+
 def serve(
     cache_dir: Annotated[
         Path | None,
@@ -22,13 +43,32 @@ def serve(
         bool,
         typer.Option("--verbose", "-V", help=t("serve.verbose_help")),
     ] = False,
+    max_memory: Annotated[
+        int | None,
+        typer.Option(
+            "--max-memory",
+            "-m",
+            parser=parse_memory_size,
+            metavar="SIZE",
+            help=t("serve.max_memory_help"),
+        ),
+    ] = None,
+    reload_interval: Annotated[
+        float,
+        typer.Option(
+            "--reload-interval",
+            min=0.0,
+            help=t("serve.reload_interval_help"),
+        ),
+    ] = DEFAULT_RELOAD_INTERVAL,
 ) -> None:
     """MCP サーバーを起動 (stdio モード)"""
-    from yet_another_figma_mcp.server import run_server, set_cache_dir
+    from yet_another_figma_mcp.server import run_server, set_cache_dir, set_store_options
 
     # キャッシュディレクトリの設定
     target_cache_dir = cache_dir or DEFAULT_CACHE_DIR
     set_cache_dir(target_cache_dir)
+    set_store_options(max_memory=max_memory, reload_interval=reload_interval)
 
     # stderr にログ出力を設定 (MCP は stdout を使用するため)
     log_level = logging.DEBUG if verbose else logging.INFO
@@ -41,6 +81,8 @@ def serve(
 
     logger.info(t("serve.starting"))
     logger.info(t("serve.cache_dir", path=target_cache_dir))
+    if max_memory is not None:
+        logger.info(t("serve.max_memory", size=max_memory))
 
     # SIGTERM ハンドラを設定 (SIGINT は KeyboardInterrupt で処理)
     def sigterm_handler(_signum: int, _frame: object) -> None:
@@ -1,7 +1,7 @@
 """status コマンド実装"""
 
 import json
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
 from typing import Annotated
 
@@ -10,85 +10,53 @@ from rich import print as rprint
 from rich.console import Console
 from rich.table import Table
 
-from yet_another_figma_mcp.cache import InvalidFileIdError, validate_file_id
+from yet_another_figma_mcp.cache.generations import cache_lock
+from yet_another_figma_mcp.cache.manifest import (
+    load_manifest,
+    rebuild_manifest,
+    scan_cache_entries,
+)
 from yet_another_figma_mcp.cli.app import DEFAULT_CACHE_DIR
 from yet_another_figma_mcp.cli.i18n import t
 
 console = Console()
 
 
-def _get_cached_files_info(cache_dir: Path) -> list[dict[str, object]]:
+def _get_cached_files_info(cache_dir: Path, rebuild: bool = False) -> list[dict[str, object]]:
     """キャッシュディレクトリ内のファイル情報を取得
 
+    マニフェスト (index.json) だけを読み、各ファイルの生 JSON やインデックスは開かない。
+    マニフェストがない古いキャッシュの場合のみ、ディスク上のキャッシュを走査する。
+
+    Args:
+        cache_dir: キャッシュディレクトリ
+        rebuild: ディスク上のキャッシュからマニフェストを再構築するか
+
     Returns:
         ファイル情報のリスト
     """
-    files_info: list[dict[str, object]] = []
-
     if not cache_dir.exists():
-        return files_info
-
-    for file_dir in cache_dir.iterdir():
-        if not file_dir.is_dir():
-            continue
-
-        file_id = file_dir.name
-
-        # file_id のバリデーション (不正なディレクトリ名をスキップ)
-        try:
-            validate_file_id(file_id)
-        except InvalidFileIdError:
-            continue
-
-        file_raw_path = file_dir / "file_raw.json"
-        index_path = file_dir / "nodes_index.json"
-        meta_path = file_dir / "cache_meta.json"
-
-        if not file_raw_path.exists():
-            continue
-
-        # ファイル情報を読み込み
-        try:
-            with open(file_raw_path, encoding="utf-8") as f:
-                file_data = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            continue
-
-        file_name = file_data.get("name", "Unknown")
-
-        # ノード数をインデックスから取得
-        node_count = 0
-        if index_path.exists():
-            try:
-                with open(index_path, encoding="utf-8") as f:
-                    index_data = json.load(f)
-                    node_count = len(index_data.get("by_id", {}))
-            except (json.JSONDecodeError, OSError):
-                pass
-
-        # キャッシュ日時をメタデータから取得
-        cached_at: str | None = None
-        if meta_path.exists():
-            try:
-                with open(meta_path, encoding="utf-8") as f:
-                    meta_data = json.load(f)
-                    cached_at = meta_data.get("cached_at")
-            except (json.JSONDecodeError, OSError):
-                pass
-
-        # フォールバック: file_raw.json の mtime を使用
-        if not cached_at:
-            mtime = file_raw_path.stat().st_mtime
-            cached_at = datetime.fromtimestamp(mtime, tz=timezone.utc).isoformat()
-
-        files_info.append(
-            {
-                "file_id": file_id,
-                "name": file_name,
-                "cached_at": cached_at,
-                "node_count": node_count,
-            }
-        )
+        return []
+
+    if rebuild:
+        # 実行中の cache / reindex コマンドの更新を上書きしないようロックを取る
+        with cache_lock(cache_dir):
+            files = rebuild_manifest(cache_dir)
+    else:
+        files = load_manifest(cache_dir)
+        if files is None:
+            files = scan_cache_entries(cache_dir, with_hash=False)
+
+    files_info: list[dict[str, object]] = [
+        {
+            "file_id": file_id,
+            "name": entry.get("name", "Unknown"),
+            "cached_at": entry.get("cached_at"),
+            "node_count": entry.get("node_count", 0),
+            "total_size": entry.get("total_size", 0),
+        }
+        for file_id, entry in files.items()
+    ]
 
     # キャッシュ日時で降順ソート (新しい順)
     files_info.sort(key=lambda x: str(x.get("cached_at", "")), reverse=True)
@@ -107,6 +75,16 @@ def _format_datetime(iso_string: str) -> str:
         return iso_string
 
 
+def _format_size(size: object) -> str:
+    """バイト数を読みやすい単位に変換"""
+    value = float(size) if isinstance(size, (int, float)) else 0.0
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
 def status(
     cache_dir: Annotated[
         Path | None,
@@ -116,11 +94,15 @@ def status(
         bool,
         typer.Option("--json", "-j", help=t("status.json_help")),
     ] = False,
+    rebuild: Annotated[
+        bool,
+        typer.Option("--rebuild-manifest", help=t("status.rebuild_manifest_help")),
+    ] = False,
 ) -> None:
     """キャッシュ済みファイルの一覧と状態を表示"""
     target_cache_dir = cache_dir or DEFAULT_CACHE_DIR
 
-    files_info = _get_cached_files_info(target_cache_dir)
+    files_info = _get_cached_files_info(target_cache_dir, rebuild)
 
     if output_json:
         # JSON 出力
@@ -137,6 +119,7 @@ def status(
     table.add_column("Name", style="green")
     table.add_column("Cached At", style="yellow")
     table.add_column("Nodes", justify="right", style="magenta")
+    table.add_column("Size", justify="right", style="blue")
 
     for info in files_info:
         cached_at_str = _format_datetime(str(info.get("cached_at", "")))
@@ -145,6 +128,7 @@ def status(
             str(info.get("name", "")),
             cached_at_str,
             str(info.get("node_count", 0)),
+            _format_size(info.get("total_size", 0)),
         )
 
     console.print(table)
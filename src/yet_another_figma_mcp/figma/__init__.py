@@ -1,6 +1,6 @@
 """Figma API クライアントモジュール"""
 
-from yet_another_figma_mcp.figma.client import FigmaClient
+from yet_another_figma_mcp.figma.client import AsyncFigmaClient, FetchProfile, FigmaClient
 from yet_another_figma_mcp.figma.exceptions import (
     FigmaAPIError,
     FigmaAuthenticationError,
@@ -8,9 +8,13 @@ from yet_another_figma_mcp.figma.exceptions import (
     FigmaRateLimitError,
     FigmaServerError,
 )
+from yet_another_figma_mcp.figma.rate_limit import RateLimiter
 
 __all__ = [  # noqa: RUF022
     "FigmaClient",
+    "AsyncFigmaClient",
+    "FetchProfile",
+    "RateLimiter",
     "FigmaAPIError",
     "FigmaAuthenticationError",
     "FigmaFileNotFoundError",
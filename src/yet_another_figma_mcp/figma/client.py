@@ -1,12 +1,19 @@
 """Figma API クライアント"""
 
+import asyncio
+import io
 import logging
+import math
 import os
 import platform
 import random
 import time
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
 from types import TracebackType
-from typing import Any
+from typing import Any, cast
 
 import httpx
 
@@ -19,6 +26,7 @@ from yet_another_figma_mcp.figma.exceptions import (
     FigmaRateLimitError,
     FigmaServerError,
 )
+from yet_another_figma_mcp.figma.rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +37,63 @@ DEFAULT_RETRY_BASE_DELAY = 1.0  # 秒
 DEFAULT_RETRY_MAX_DELAY = 30.0  # 秒
 
 
+class FetchProfile(StrEnum):
+    """ファイルを取得する際の詳細度 (Figma API のクエリの組み合わせ)"""
+
+    # ページとその直下のノード (上位フレーム等) まで。一覧・カタログ用途向け
+    OUTLINE = "outline"
+    # ドキュメントツリー全体 (ベクターのパスは含まない)
+    FULL = "full"
+    # ドキュメントツリー全体と、ベクターのパス (fillGeometry / strokeGeometry)
+    FULL_GEOMETRY = "full+geometry"
+
+
+# プロファイルごとの GET /files/:key (/nodes) のクエリ
+FETCH_PROFILE_PARAMS: dict[FetchProfile, dict[str, str]] = {
+    FetchProfile.OUTLINE: {"depth": "2"},
+    FetchProfile.FULL: {},
+    FetchProfile.FULL_GEOMETRY: {"geometry": "paths"},
+}
+
+# バージョンの確認に使う、ドキュメントツリーをページ一覧だけに絞るクエリ
+VERSION_PROBE_PARAMS = {"depth": "1"}
+
+# バージョンの確認で返す項目
+VERSION_FIELDS = ("name", "version", "lastModified")
+
+
+def _version_fields(response: httpx.Response) -> dict[str, Any]:
+    """レスポンスからバージョンの確認に使う項目を取り出す
+
+    Raises:
+        FigmaAPIError: レスポンスが JSON オブジェクトでない場合
+    """
+    try:
+        data: object = response.json()
+    except ValueError as e:
+        raise FigmaAPIError(f"Invalid response: {e}") from e
+    if not isinstance(data, dict):
+        raise FigmaAPIError("Invalid response: not a JSON object")
+    fields = cast(dict[str, Any], data)
+    return {field: fields.get(field) for field in VERSION_FIELDS}
+
+
+def _nodes_params(ids: Sequence[str], depth: int | None, profile: FetchProfile) -> dict[str, str]:
+    """GET /files/:key/nodes のクエリを組み立てる (depth はプロファイルの深さより優先する)
+
+    Raises:
+        ValueError: ids が空、またはカンマを含む ID がある場合
+    """
+    if not ids:
+        raise ValueError("ids must not be empty")
+    if any(not node_id or "," in node_id for node_id in ids):
+        raise ValueError("Node IDs must be non-empty and must not contain commas")
+    params = {**FETCH_PROFILE_PARAMS[profile], "ids": ",".join(ids)}
+    if depth is not None:
+        params["depth"] = str(depth)
+    return params
+
+
 def build_user_agent() -> str:
     """Build User-Agent string for API requests
 
@@ -42,8 +107,8 @@ def build_user_agent() -> str:
     return f"yet-another-figma-mcp/{__version__} (Python/{py_version}; httpx/{httpx_version})"
 
 
-class FigmaClient:
-    """Figma REST API クライアント
+class _FigmaClientBase:
+    """同期・非同期クライアントに共通の設定、リトライ方針、エラーの対応付け
 
     Attributes:
         token: Figma API トークン
@@ -51,6 +116,7 @@ class FigmaClient:
         max_retries: 最大リトライ回数
         retry_base_delay: リトライ基本待機時間 (秒)
         retry_max_delay: リトライ最大待機時間 (秒)
+        rate_limiter: リクエスト数の制限
     """
 
     BASE_URL = "https://api.figma.com/v1"
@@ -63,8 +129,9 @@ class FigmaClient:
         max_retries: int = DEFAULT_MAX_RETRIES,
         retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
         retry_max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
-        """FigmaClient を初期化
+        """クライアントを初期化
 
         Args:
             token: Figma API トークン。未指定時は環境変数 FIGMA_API_TOKEN から取得
@@ -72,6 +139,7 @@ class FigmaClient:
             max_retries: 最大リトライ回数 (レート制限・サーバーエラー時)
             retry_base_delay: リトライ基本待機時間 (秒)
             retry_max_delay: リトライ最大待機時間 (秒)
+            rate_limiter: リクエスト数の制限 (複数のクライアントで共有できる。None の場合は制限しない)
 
         Raises:
             ValueError: API トークンが未設定の場合
@@ -86,25 +154,30 @@ class FigmaClient:
         self.max_retries = max_retries
         self.retry_base_delay = retry_base_delay
         self.retry_max_delay = retry_max_delay
+        self.rate_limiter = rate_limiter
 
-        self._client = httpx.Client(
-            base_url=self.BASE_URL,
-            headers={
+    def _client_options(self) -> dict[str, Any]:
+        """httpx.Client / httpx.AsyncClient に渡す共通の引数"""
+        return {
+            "base_url": self.BASE_URL,
+            "headers": {
                 "X-Figma-Token": self.token,
                 "User-Agent": build_user_agent(),
             },
-            timeout=self.timeout,
-        )
+            "timeout": self.timeout,
+        }
 
     @staticmethod
     def _parse_retry_after_header(response: httpx.Response) -> int | None:
         """Retry-After ヘッダーをパースして秒数を取得
 
+        秒数と HTTP-date (RFC 9110) の両方の形式に対応する。
+
         Args:
             response: httpx レスポンス
 
         Returns:
-            待機秒数 (ヘッダーがない、または解析不能な場合は None)
+            待機秒数 (ヘッダーがない、または解析不能な場合は None。過去の日時は 0)
         """
         retry_after = response.headers.get("Retry-After")
         if not retry_after:
@@ -112,8 +185,15 @@ class FigmaClient:
         try:
             return int(retry_after)
         except ValueError:
-            # HTTP-date format (RFC 7231) は現時点では未サポート
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
             return None
+        if retry_at.tzinfo is None:
+            # タイムゾーンのない日付は仕様上 GMT
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0, math.ceil((retry_at - datetime.now(timezone.utc)).total_seconds()))
 
     def _calculate_retry_delay(self, attempt: int, retry_after: int | None = None) -> float:
         """リトライ待機時間を計算 (指数バックオフ + ジッター)
@@ -176,12 +256,128 @@ class FigmaClient:
 
         raise FigmaAPIError(message, status_code=status_code)
 
+    def _retry_delay_for_response(self, response: httpx.Response, attempt: int) -> float | None:
+        """エラーレスポンスをリトライする場合の待機時間を取得
+
+        Retry-After 付きの 429 は、リトライするかに関わらず RateLimiter を一時停止して
+        同じ制限を共有する他のリクエストもまとめて待たせる。この場合の待機は次の
+        リクエストの前に RateLimiter が行うため、0 を返す。
+
+        Returns:
+            待機時間 (秒)。リトライ対象外またはリトライ回数超過の場合は None
+        """
+        if response.status_code not in (429, 500, 502, 503, 504):
+            return None
+        retry_after = self._parse_retry_after_header(response)
+        shared_pause = response.status_code == 429 and bool(retry_after)
+        if shared_pause and self.rate_limiter is not None:
+            self.rate_limiter.pause(float(retry_after or 0))
+        if attempt >= self.max_retries:
+            return None
+        delay = self._calculate_retry_delay(attempt, retry_after)
+        logger.warning(
+            "Request failed with status %d, retrying in %.1f seconds (attempt %d/%d)",
+            response.status_code,
+            delay,
+            attempt + 1,
+            self.max_retries,
+        )
+        if shared_pause and self.rate_limiter is not None:
+            return 0.0
+        return delay
+
+    def _rate_limit_delay(self) -> float:
+        """次のリクエストの送信枠を予約し、送るまでに待つ秒数を取得"""
+        if self.rate_limiter is None:
+            return 0.0
+        return self.rate_limiter.reserve()
+
+    def _retry_delay_for_error(self, error: httpx.RequestError, attempt: int) -> float:
+        """タイムアウト・接続エラーをリトライする場合の待機時間を取得
+
+        Returns:
+            待機時間 (秒)
+
+        Raises:
+            FigmaAPIError: リトライ回数を超過した場合
+        """
+        if attempt >= self.max_retries:
+            if isinstance(error, httpx.TimeoutException):
+                raise FigmaAPIError(
+                    f"Request timed out after {self.max_retries + 1} attempts"
+                ) from error
+            raise FigmaAPIError(f"Request failed: {error}") from error
+        delay = self._calculate_retry_delay(attempt)
+        if isinstance(error, httpx.TimeoutException):
+            logger.warning(
+                "Request timed out, retrying in %.1f seconds (attempt %d/%d)",
+                delay,
+                attempt + 1,
+                self.max_retries,
+            )
+        else:
+            logger.warning(
+                "Request failed: %s, retrying in %.1f seconds (attempt %d/%d)",
+                str(error),
+                delay,
+                attempt + 1,
+                self.max_retries,
+            )
+        return delay
+
+
+class FigmaClient(_FigmaClientBase):
+    """Figma REST API クライアント
+
+    Attributes:
+        token: Figma API トークン
+        timeout: リクエストタイムアウト (秒)
+        max_retries: 最大リトライ回数
+        retry_base_delay: リトライ基本待機時間 (秒)
+        retry_max_delay: リトライ最大待機時間 (秒)
+        rate_limiter: リクエスト数の制限
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        retry_max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        """FigmaClient を初期化
+
+        Args:
+            token: Figma API トークン。未指定時は環境変数 FIGMA_API_TOKEN から取得
+            timeout: リクエストタイムアウト (秒)
+            max_retries: 最大リトライ回数 (レート制限・サーバーエラー時)
+            retry_base_delay: リトライ基本待機時間 (秒)
+            retry_max_delay: リトライ最大待機時間 (秒)
+            rate_limiter: リクエスト数の制限 (複数のクライアントで共有できる。None の場合は制限しない)
+
+        Raises:
+            ValueError: API トークンが未設定の場合
+        """
+        super().__init__(
+            token,
+            timeout=timeout,
+            max_retries=max_retries,
+            retry_base_delay=retry_base_delay,
+            retry_max_delay=retry_max_delay,
+            rate_limiter=rate_limiter,
+        )
+        self._client = httpx.Client(**self._client_options())
+
     def _request_with_retry(
         self,
         method: str,
         path: str,
         *,
         file_id: str | None = None,
+        stream: bool = False,
         **kwargs: Any,
     ) -> httpx.Response:
         """リトライ付きでリクエストを実行
@@ -190,6 +386,7 @@ class FigmaClient:
             method: HTTP メソッド
             path: API パス
             file_id: ファイル ID（エラーメッセージ用）
+            stream: True の場合、成功レスポンスの本文を読まずに返す (呼び出し元で閉じる)
             **kwargs: httpx.Client.request に渡す追加引数
 
         Returns:
@@ -198,74 +395,42 @@ class FigmaClient:
         Raises:
             FigmaAPIError: API エラー（リトライ後も失敗した場合を含む）
         """
-        last_exception: Exception | None = None
-
         for attempt in range(self.max_retries + 1):
+            delay = self._rate_limit_delay()
+            if delay > 0:
+                time.sleep(delay)
             try:
-                response = self._client.request(method, path, **kwargs)
-
-                if response.is_success:
-                    return response
-
-                # リトライ対象のエラー
-                if response.status_code in (429, 500, 502, 503, 504):
-                    retry_after_int = self._parse_retry_after_header(response)
-
-                    if attempt < self.max_retries:
-                        delay = self._calculate_retry_delay(attempt, retry_after_int)
-                        logger.warning(
-                            "Request failed with status %d, retrying in %.1f seconds "
-                            "(attempt %d/%d)",
-                            response.status_code,
-                            delay,
-                            attempt + 1,
-                            self.max_retries,
-                        )
-                        time.sleep(delay)
-                        continue
-
-                # リトライ対象外またはリトライ回数超過
-                self._handle_response_error(response, file_id)
-
-            except httpx.TimeoutException as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    delay = self._calculate_retry_delay(attempt)
-                    logger.warning(
-                        "Request timed out, retrying in %.1f seconds (attempt %d/%d)",
-                        delay,
-                        attempt + 1,
-                        self.max_retries,
-                    )
-                    time.sleep(delay)
-                    continue
-                raise FigmaAPIError(
-                    f"Request timed out after {self.max_retries + 1} attempts"
-                ) from e
-
+                if stream:
+                    request = self._client.build_request(method, path, **kwargs)
+                    response = self._client.send(request, stream=True)
+                else:
+                    response = self._client.request(method, path, **kwargs)
             except httpx.RequestError as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    delay = self._calculate_retry_delay(attempt)
-                    logger.warning(
-                        "Request failed: %s, retrying in %.1f seconds (attempt %d/%d)",
-                        str(e),
-                        delay,
-                        attempt + 1,
-                        self.max_retries,
-                    )
-                    time.sleep(delay)
-                    continue
-                raise FigmaAPIError(f"Request failed: {e}") from e
+                time.sleep(self._retry_delay_for_error(e, attempt))
+                continue
+
+            if response.is_success:
+                return response
+            if stream:
+                # エラーレスポンスの本文は小さいので読み切ってから処理する
+                response.read()
+                response.close()
+
+            delay = self._retry_delay_for_response(response, attempt)
+            if delay is None:
+                self._handle_response_error(response, file_id)
+            elif delay > 0:
+                time.sleep(delay)
 
         # ここには到達しないはずだが、念のため
-        raise FigmaAPIError("Max retries exceeded") from last_exception
+        raise FigmaAPIError("Max retries exceeded")
 
-    def get_file(self, file_id: str) -> dict[str, Any]:
+    def get_file(self, file_id: str, profile: FetchProfile = FetchProfile.FULL) -> dict[str, Any]:
         """Figma ファイルを取得
 
         Args:
             file_id: Figma ファイル ID
+            profile: 取得する詳細度
 
         Returns:
             ファイルデータ（ドキュメント構造含む）
@@ -279,10 +444,105 @@ class FigmaClient:
             FigmaAPIError: その他の API エラー
         """
         validate_file_id(file_id)
-        response = self._request_with_retry("GET", f"/files/{file_id}", file_id=file_id)
+        response = self._request_with_retry(
+            "GET", f"/files/{file_id}", file_id=file_id, params=FETCH_PROFILE_PARAMS[profile]
+        )
         result: dict[str, Any] = response.json()
         return result
 
+    def get_file_version(self, file_id: str) -> dict[str, Any]:
+        """ファイルのバージョンと最終更新日時だけを取得
+
+        ドキュメントツリーを 1 階層 (ページ一覧) に絞ったリクエストで、変更の有無を
+        ファイル全体を取得せずに確認する。
+
+        Returns:
+            "name" / "version" / "lastModified" のマップ (レスポンスにない項目は None)
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            FigmaAPIError: API エラー (get_file と同じ派生クラス)
+        """
+        validate_file_id(file_id)
+        response = self._request_with_retry(
+            "GET", f"/files/{file_id}", file_id=file_id, params=VERSION_PROBE_PARAMS
+        )
+        return _version_fields(response)
+
+    def get_nodes(
+        self,
+        file_id: str,
+        ids: Sequence[str],
+        depth: int | None = None,
+        profile: FetchProfile = FetchProfile.FULL,
+    ) -> dict[str, Any]:
+        """指定したノードのサブツリーだけを取得 (GET /files/:key/nodes)
+
+        Args:
+            file_id: Figma ファイル ID
+            ids: 取得するノード ID
+            depth: 各ノードから辿る階層の深さ (None の場合はサブツリー全体)
+            profile: 取得する詳細度 (深さは各ノードから数える)
+
+        Returns:
+            レスポンスの JSON。"nodes" は node_id -> {"document": ノード, ...} のマップで、
+            存在しないノードの値は None になる
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            ValueError: ids が空、またはカンマを含む ID がある場合
+            FigmaAPIError: API エラー (get_file と同じ派生クラス)
+        """
+        validate_file_id(file_id)
+        params = _nodes_params(ids, depth, profile)
+        response = self._request_with_retry(
+            "GET", f"/files/{file_id}/nodes", file_id=file_id, params=params
+        )
+        result: dict[str, Any] = response.json()
+        return result
+
+    def download_file(
+        self, file_id: str, out: io.BufferedIOBase, profile: FetchProfile = FetchProfile.FULL
+    ) -> int:
+        """Figma ファイルの JSON をパースせずにそのまま書き出す
+
+        レスポンス本文をチャンク単位で out に書き込むため、
+        本文全体やパース済みの dict をメモリに載せない。
+
+        Args:
+            file_id: Figma ファイル ID
+            out: 書き込み先のバイナリストリーム
+            profile: 取得する詳細度
+
+        Returns:
+            書き込んだバイト数
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            FigmaAuthenticationError: 認証エラー
+            FigmaFileNotFoundError: ファイルが存在しない
+            FigmaRateLimitError: レート制限
+            FigmaServerError: サーバーエラー
+            FigmaAPIError: その他の API エラー (本文の受信中に接続が切れた場合を含む)
+        """
+        validate_file_id(file_id)
+        response = self._request_with_retry(
+            "GET",
+            f"/files/{file_id}",
+            file_id=file_id,
+            params=FETCH_PROFILE_PARAMS[profile],
+            stream=True,
+        )
+        written = 0
+        try:
+            for chunk in response.iter_bytes():
+                written += out.write(chunk)
+        except httpx.HTTPError as e:
+            raise FigmaAPIError(f"Download interrupted: {e}") from e
+        finally:
+            response.close()
+        return written
+
     def close(self) -> None:
         """クライアントを閉じる"""
         self._client.close()
@@ -299,3 +559,192 @@ class FigmaClient:
     ) -> None:
         """コンテキストマネージャの終了"""
         self.close()
+
+
+class AsyncFigmaClient(_FigmaClientBase):
+    """httpx.AsyncClient を使う Figma REST API クライアント
+
+    複数ファイルを並行して取得するためのクライアント。リトライ方針とエラーの対応付けは
+    FigmaClient と共通で、リトライの待機は asyncio.sleep で行う。
+
+    Attributes:
+        token: Figma API トークン
+        timeout: リクエストタイムアウト (秒)
+        max_retries: 最大リトライ回数
+        retry_base_delay: リトライ基本待機時間 (秒)
+        retry_max_delay: リトライ最大待機時間 (秒)
+        rate_limiter: リクエスト数の制限
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        retry_max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        """AsyncFigmaClient を初期化
+
+        Args:
+            token: Figma API トークン。未指定時は環境変数 FIGMA_API_TOKEN から取得
+            timeout: リクエストタイムアウト (秒)
+            max_retries: 最大リトライ回数 (レート制限・サーバーエラー時)
+            retry_base_delay: リトライ基本待機時間 (秒)
+            retry_max_delay: リトライ最大待機時間 (秒)
+            rate_limiter: リクエスト数の制限 (複数のクライアントで共有できる。None の場合は制限しない)
+
+        Raises:
+            ValueError: API トークンが未設定の場合
+        """
+        super().__init__(
+            token,
+            timeout=timeout,
+            max_retries=max_retries,
+            retry_base_delay=retry_base_delay,
+            retry_max_delay=retry_max_delay,
+            rate_limiter=rate_limiter,
+        )
+        self._client = httpx.AsyncClient(**self._client_options())
+
+    async def _request_with_retry(
+        self,
+        method: str,
+        path: str,
+        *,
+        file_id: str | None = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """リトライ付きでリクエストを実行 (FigmaClient._request_with_retry の非同期版)
+
+        Raises:
+            FigmaAPIError: API エラー（リトライ後も失敗した場合を含む）
+        """
+        for attempt in range(self.max_retries + 1):
+            delay = self._rate_limit_delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                if stream:
+                    request = self._client.build_request(method, path, **kwargs)
+                    response = await self._client.send(request, stream=True)
+                else:
+                    response = await self._client.request(method, path, **kwargs)
+            except httpx.RequestError as e:
+                await asyncio.sleep(self._retry_delay_for_error(e, attempt))
+                continue
+
+            if response.is_success:
+                return response
+            if stream:
+                await response.aread()
+                await response.aclose()
+
+            delay = self._retry_delay_for_response(response, attempt)
+            if delay is None:
+                self._handle_response_error(response, file_id)
+            elif delay > 0:
+                await asyncio.sleep(delay)
+
+        raise FigmaAPIError("Max retries exceeded")
+
+    async def get_file(
+        self, file_id: str, profile: FetchProfile = FetchProfile.FULL
+    ) -> dict[str, Any]:
+        """Figma ファイルを取得 (FigmaClient.get_file の非同期版)
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            FigmaAPIError: API エラー (FigmaClient.get_file と同じ派生クラス)
+        """
+        validate_file_id(file_id)
+        response = await self._request_with_retry(
+            "GET", f"/files/{file_id}", file_id=file_id, params=FETCH_PROFILE_PARAMS[profile]
+        )
+        result: dict[str, Any] = response.json()
+        return result
+
+    async def get_file_version(self, file_id: str) -> dict[str, Any]:
+        """ファイルのバージョンと最終更新日時だけを取得 (FigmaClient.get_file_version の非同期版)
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            FigmaAPIError: API エラー (get_file と同じ派生クラス)
+        """
+        validate_file_id(file_id)
+        response = await self._request_with_retry(
+            "GET", f"/files/{file_id}", file_id=file_id, params=VERSION_PROBE_PARAMS
+        )
+        return _version_fields(response)
+
+    async def get_nodes(
+        self,
+        file_id: str,
+        ids: Sequence[str],
+        depth: int | None = None,
+        profile: FetchProfile = FetchProfile.FULL,
+    ) -> dict[str, Any]:
+        """指定したノードのサブツリーだけを取得 (FigmaClient.get_nodes の非同期版)
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            ValueError: ids が空、またはカンマを含む ID がある場合
+            FigmaAPIError: API エラー (get_file と同じ派生クラス)
+        """
+        validate_file_id(file_id)
+        params = _nodes_params(ids, depth, profile)
+        response = await self._request_with_retry(
+            "GET", f"/files/{file_id}/nodes", file_id=file_id, params=params
+        )
+        result: dict[str, Any] = response.json()
+        return result
+
+    async def download_file(
+        self, file_id: str, out: io.BufferedIOBase, profile: FetchProfile = FetchProfile.FULL
+    ) -> int:
+        """Figma ファイルの JSON をパースせずにそのまま書き出す (FigmaClient.download_file の非同期版)
+
+        Returns:
+            書き込んだバイト数
+
+        Raises:
+            InvalidFileIdError: file_id が無効な形式の場合
+            FigmaAPIError: API エラー (本文の受信中に接続が切れた場合を含む)
+        """
+        validate_file_id(file_id)
+        response = await self._request_with_retry(
+            "GET",
+            f"/files/{file_id}",
+            file_id=file_id,
+            params=FETCH_PROFILE_PARAMS[profile],
+            stream=True,
+        )
+        written = 0
+        try:
+            async for chunk in response.aiter_bytes():
+                written += out.write(chunk)
+        except httpx.HTTPError as e:
+            raise FigmaAPIError(f"Download interrupted: {e}") from e
+        finally:
+            await response.aclose()
+        return written
+
+    async def aclose(self) -> None:
+        """クライアントを閉じる"""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncFigmaClient":
+        """非同期コンテキストマネージャの開始"""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """非同期コンテキストマネージャの終了"""
+        await self.aclose()
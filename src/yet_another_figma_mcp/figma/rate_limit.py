@@ -0,0 +1,170 @@
+"""Figma API へのリクエスト数を制限するトークンバケット
+
+同じ RateLimiter を共有するクライアント (並行して取得するスレッド・タスクを含む) は、
+リクエストを送る前に reserve で送信枠を予約し、返された秒数だけ待ってから送る。
+枠は 1 分あたりのリクエスト数から決まる間隔で補充され、補充を待たずに送れるのは
+バケットの容量 (burst) 件まで。
+
+バケットは補充が追いつく時刻 (理論到着時刻) 1 つで表す (GCRA)。429 を受けて pause した
+場合は、その時刻まですべての予約を止め、再開後は空のバケットから補充し直す。
+状態をキャッシュディレクトリのファイルに保存すると、続けて実行した CLI も同じ枠と
+一時停止を引き継ぐ (時刻は壁時計の UNIX 時間で保存する)。ファイルはリクエストごとには
+書かず、pause した時と save を呼んだ時 (コマンドの終了時) だけ書く。同時に動く別の
+プロセスとは排他しないため、保存した状態は次の実行への目安として扱い、書く際は
+ファイル上の状態と時刻の遅い方を残す。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, cast
+
+logger = logging.getLogger(__name__)
+
+# キャッシュディレクトリに保存する状態ファイルの名前
+RATE_LIMIT_STATE_NAME = ".rate_limit.json"
+
+
+class RateLimiter:
+    """クライアント全体で共有するリクエスト数の制限
+
+    Attributes:
+        requests_per_minute: 1 分あたりのリクエスト数の上限 (None の場合は 429 による一時停止のみ)
+        burst: 間隔を空けずに続けて送れるリクエスト数 (バケットの容量)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        *,
+        burst: int | None = None,
+        state_path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """RateLimiter を初期化
+
+        Args:
+            requests_per_minute: 1 分あたりのリクエスト数の上限 (None の場合は制限しない)
+            burst: バケットの容量 (未指定時は 1 分あたりの上限と同じ件数、最低 1)
+            state_path: 状態を保存するファイル (既存の状態があれば引き継ぐ)
+            clock: 現在時刻 (UNIX 時間) を返す関数
+
+        Raises:
+            ValueError: requests_per_minute または burst が正でない場合
+        """
+        if requests_per_minute is not None and requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, int(requests_per_minute or 1))
+        self._state_path = state_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        # バケットが満杯に戻る時刻 (理論到着時刻) と、429 による一時停止の終了時刻
+        self._tat = 0.0
+        self._paused_until = 0.0
+        if state_path is not None:
+            self._load(state_path)
+
+    @property
+    def _interval(self) -> float:
+        """枠が 1 件補充される間隔 (秒)"""
+        return 60.0 / self.requests_per_minute if self.requests_per_minute else 0.0
+
+    @property
+    def _tolerance(self) -> float:
+        """満杯のバケットを使い切るまでに先行できる時間 (秒)"""
+        return (self.burst - 1) * self._interval
+
+    def reserve(self) -> float:
+        """リクエストを 1 件送る枠を予約
+
+        Returns:
+            リクエストを送るまでに待つ秒数 (すぐに送れる場合は 0)
+        """
+        with self._lock:
+            now = self._clock()
+            send_at = max(now, self._paused_until)
+            if self.requests_per_minute is not None:
+                send_at = max(send_at, self._tat - self._tolerance)
+                self._tat = max(self._tat, send_at) + self._interval
+            return send_at - now
+
+    def pause(self, seconds: float) -> None:
+        """429 の Retry-After に従って、すべての予約を seconds 秒後まで止める
+
+        再開した直後に止めていたリクエストが一斉に送られないよう、バケットを空にする。
+        """
+        with self._lock:
+            until = self._clock() + seconds
+            if until <= self._paused_until:
+                return
+            self._paused_until = until
+            if self.requests_per_minute is not None:
+                self._tat = max(self._tat, until + self._tolerance)
+            self._save()
+
+    def save(self) -> None:
+        """状態をファイルに保存 (予約した枠は保存しないため、使い終えた時に呼ぶ)"""
+        with self._lock:
+            self._save()
+
+    def paused_for(self) -> float:
+        """一時停止の残り秒数 (止めていない場合は 0)"""
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock())
+
+    def _load(self, state_path: Path) -> None:
+        """保存した状態を読み込む (読めない・不正な場合は無視する)"""
+        tat, paused_until = _read_state(state_path)
+        if tat is not None:
+            # 前回と上限が違う場合や時計がずれた場合も、引き継ぐ予約は満杯のバケット 1 つ分まで
+            self._tat = tat
+            if self.requests_per_minute is not None:
+                self._tat = min(self._tat, self._clock() + self._tolerance + self._interval)
+        if paused_until is not None:
+            self._paused_until = paused_until
+
+    def _save(self) -> None:
+        """状態をファイルに保存 (失敗しても制限自体は続ける)
+
+        別のプロセスが保存した状態を巻き戻さないよう、ファイル上の状態と時刻の遅い方を書く。
+        """
+        if self._state_path is None:
+            return
+        saved_tat, saved_paused_until = _read_state(self._state_path)
+        state = {
+            "tat": max(self._tat, saved_tat or 0.0),
+            "paused_until": max(self._paused_until, saved_paused_until or 0.0),
+        }
+        tmp_path = self._state_path.with_name(f"{self._state_path.name}.{os.getpid()}.tmp")
+        try:
+            self._state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self._state_path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning("Failed to save rate limit state to %s: %s", self._state_path, e)
+
+
+def _read_state(state_path: Path) -> tuple[float | None, float | None]:
+    """保存した (tat, paused_until) を読む (読めない・不正な値は None)"""
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            loaded: object = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(loaded, dict):
+        return None, None
+    state = cast(dict[str, Any], loaded)
+    values: list[float | None] = []
+    for name in ("tat", "paused_until"):
+        value = state.get(name)
+        values.append(float(value) if isinstance(value, (int, float)) else None)
+    return values[0], values[1]
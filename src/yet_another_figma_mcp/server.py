@@ -10,6 +10,7 @@ from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
 from yet_another_figma_mcp.cache import CacheStore
+from yet_another_figma_mcp.cache.store import DEFAULT_RELOAD_INTERVAL
 from yet_another_figma_mcp.tools import (
     get_cached_figma_file,
     get_cached_figma_node,
@@ -23,6 +24,8 @@ logger = getLogger(__name__)
 # グローバルなキャッシュストアとキャッシュディレクトリ
 _store: CacheStore | None = None
 _cache_dir: Path | None = None
+_max_memory: int | None = None
+_reload_interval: float | None = DEFAULT_RELOAD_INTERVAL
 
 
 def set_cache_dir(cache_dir: Path) -> None:
@@ -33,11 +36,29 @@ def set_cache_dir(cache_dir: Path) -> None:
     _store = None
 
 
+def set_store_options(
+    *,
+    max_memory: int | None = None,
+    reload_interval: float | None = DEFAULT_RELOAD_INTERVAL,
+) -> None:
+    """キャッシュストアのオプションを設定
+
+    Args:
+        max_memory: 推定メモリ使用量の上限 (バイト)。None の場合は無制限
+        reload_interval: ディスク上の更新を確認する間隔 (秒)。None の場合は確認しない
+    """
+    global _max_memory, _reload_interval, _store
+    _max_memory = max_memory
+    _reload_interval = reload_interval
+    # オプションが変更されたらストアをリセット
+    _store = None
+
+
 def get_store() -> CacheStore:
     """キャッシュストアを取得（シングルトン）"""
     global _store
     if _store is None:
-        _store = CacheStore(_cache_dir)
+        _store = CacheStore(_cache_dir, max_memory=_max_memory, reload_interval=_reload_interval)
     return _store
 
 
@@ -54,6 +75,9 @@ def create_server() -> Server:
                 description=(
                     "Get cached Figma file metadata and top-level frames. "
                     "Returns file name, version, last modified date, and a list of main frames. "
+                    "fetch_profile tells how much detail was cached: 'outline' holds only pages "
+                    "and top-level frames, 'full' the whole tree, and 'full+geometry' also "
+                    "vector paths. "
                     "Use this tool first to understand the structure of a Figma file."
                 ),
                 inputSchema={
@@ -269,5 +293,9 @@ def create_server() -> Server:
 async def run_server() -> None:
     """MCP サーバーを起動"""
     server = create_server()
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        if _store is not None:
+            logger.info("Cache stats: %s", _store.get_stats())
@@ -2,7 +2,13 @@
 
 from typing import Any, Literal
 
-from yet_another_figma_mcp.cache import CacheStore, InvalidFileIdError, validate_file_id
+from yet_another_figma_mcp.cache import (
+    CacheStore,
+    InvalidFileIdError,
+    resolve_node_path,
+    validate_file_id,
+)
+from yet_another_figma_mcp.cache.manifest import load_manifest
 
 
 def _handle_invalid_file_id(file_id: str) -> dict[str, Any]:
@@ -17,6 +23,36 @@ def _handle_invalid_file_id(file_id: str) -> dict[str, Any]:
     }
 
 
+def _handle_file_not_found(store: CacheStore, file_id: str) -> dict[str, Any]:
+    """Generate error response for a file missing from the cache
+
+    Lists the cached files from the cache manifest (index.json) so the caller can
+    pick a valid file_id. Only the manifest is read; no raw file or index is opened.
+    """
+    result: dict[str, Any] = {
+        "error": "file_not_found",
+        "message": (
+            f"File '{file_id}' not found in cache. "
+            f"Run 'yet-another-figma-mcp cache -f {file_id}' to cache it first."
+        ),
+        "file_id": file_id,
+    }
+    files = load_manifest(store.cache_dir)
+    if files:
+        result["cached_files"] = [
+            {"file_id": cached_id, "name": entry.get("name")} for cached_id, entry in files.items()
+        ]
+    return result
+
+
+def _node_result(by_id: dict[str, Any], node_id: str) -> dict[str, Any]:
+    """Build a search result entry (index info plus the resolved name path)"""
+    node_info = by_id.get(node_id)
+    if node_info is None:
+        return {"id": node_id}
+    return {"id": node_id, **node_info, "path": resolve_node_path(by_id, node_id)}
+
+
 def get_cached_figma_file(store: CacheStore, file_id: str) -> dict[str, Any]:
     """Get Figma file metadata and frame list
 
@@ -34,17 +70,11 @@ def get_cached_figma_file(store: CacheStore, file_id: str) -> dict[str, Any]:
 
     index = store.get_index(file_id)
     if not index:
-        return {
-            "error": "file_not_found",
-            "message": (
-                f"File '{file_id}' not found in cache. "
-                f"Run 'yet-another-figma-mcp cache -f {file_id}' to cache it first."
-            ),
-            "file_id": file_id,
-        }
+        return _handle_file_not_found(store, file_id)
 
-    file_data = store.get_file(file_id)
-    if not file_data:
+    # Answer from the metadata sidecar so the full raw tree is never parsed here
+    metadata = store.get_file_metadata(file_id) if store.has_file(file_id) else None
+    if not metadata:
         return {
             "error": "file_data_missing",
             "message": f"File data for '{file_id}' is missing from cache.",
@@ -53,24 +83,25 @@ def get_cached_figma_file(store: CacheStore, file_id: str) -> dict[str, Any]:
 
     # Return file metadata and main frame list
     frames: list[dict[str, Any]] = []
-    for node_id, node_info in index.get("by_id", {}).items():
-        if node_info.get("type") == "FRAME":
-            # Include frames up to depth 3 (Document > Page > Frame or shallower)
-            # This captures top-level frames and allows for edge cases
-            if len(node_info.get("path", [])) <= 3:
-                frames.append(
-                    {
-                        "id": node_id,
-                        "name": node_info.get("name"),
-                        "type": node_info.get("type"),
-                        "path": node_info.get("path"),
-                    }
-                )
+    by_id = index.get("by_id", {})
+    # top_frames: frames up to depth 3 (Document > Page > Frame or shallower), in document order
+    for node_id in index.get("top_frames", []):
+        node_info = by_id.get(node_id, {})
+        frames.append(
+            {
+                "id": node_id,
+                "name": node_info.get("name"),
+                "type": node_info.get("type"),
+                "path": resolve_node_path(by_id, node_id),
+            }
+        )
 
     return {
-        "name": file_data.get("name"),
-        "lastModified": file_data.get("lastModified"),
-        "version": file_data.get("version"),
+        "name": metadata.get("name"),
+        "lastModified": metadata.get("lastModified"),
+        "version": metadata.get("version"),
+        # How much detail the cache holds ("outline", "full" or "full+geometry")
+        "fetch_profile": metadata.get("fetch_profile"),
         "frames": frames,
     }
 
@@ -91,29 +122,10 @@ def get_cached_figma_node(store: CacheStore, file_id: str, node_id: str) -> dict
     except InvalidFileIdError:
         return _handle_invalid_file_id(file_id)
 
-    file_data = store.get_file(file_id)
-    if not file_data:
-        return {
-            "error": "file_not_found",
-            "message": (
-                f"File '{file_id}' not found in cache. "
-                f"Run 'yet-another-figma-mcp cache -f {file_id}' to cache it first."
-            ),
-            "file_id": file_id,
-        }
-
-    def find_node(node: dict[str, Any], target_id: str) -> dict[str, Any] | None:
-        """Recursively search for a node by ID in the node tree"""
-        if node.get("id") == target_id:
-            return node
-        for child in node.get("children", []):
-            result = find_node(child, target_id)
-            if result:
-                return result
-        return None
+    if not store.has_file(file_id):
+        return _handle_file_not_found(store, file_id)
 
-    document = file_data.get("document", {})
-    result = find_node(document, node_id)
+    result = store.get_node(file_id, node_id)
 
     if not result:
         return {
@@ -163,26 +175,19 @@ def search_figma_nodes_by_name(
 
     if match_mode == "exact":
         if ignore_case:
-            # 大文字小文字を無視した完全一致
-            name_lower = name.lower()
-            for node_name, node_ids in by_name.items():
-                if node_name.lower() == name_lower:
-                    for node_id in node_ids:
-                        node_info = by_id.get(node_id, {})
-                        results.append({"id": node_id, **node_info})
+            # 大文字小文字を無視した完全一致 (casefold 済みマップを 1 回参照)
+            node_ids = index.get("by_name_folded", {}).get(name.casefold(), [])
+            for node_id in node_ids:
+                results.append(_node_result(by_id, node_id))
         else:
             node_ids = by_name.get(name, [])
             for node_id in node_ids:
-                node_info = by_id.get(node_id, {})
-                results.append({"id": node_id, **node_info})
+                results.append(_node_result(by_id, node_id))
     else:
-        # partial match (always case-insensitive)
-        name_lower = name.lower()
-        for node_name, node_ids in by_name.items():
-            if name_lower in node_name.lower():
-                for node_id in node_ids:
-                    node_info = by_id.get(node_id, {})
-                    results.append({"id": node_id, **node_info})
+        # partial match (always case-insensitive, narrowed by the trigram index)
+        for node_name in store.match_partial(file_id, index, "by_name", name):
+            for node_id in by_name[node_name]:
+                results.append(_node_result(by_id, node_id))
 
     if limit is not None:
         results = results[:limit]
@@ -227,26 +232,19 @@ def search_figma_frames_by_title(
 
     if match_mode == "exact":
         if ignore_case:
-            # 大文字小文字を無視した完全一致
-            title_lower = title.lower()
-            for frame_title, node_ids in by_frame_title.items():
-                if frame_title.lower() == title_lower:
-                    for node_id in node_ids:
-                        node_info = by_id.get(node_id, {})
-                        results.append({"id": node_id, **node_info})
+            # 大文字小文字を無視した完全一致 (casefold 済みマップを 1 回参照)
+            node_ids = index.get("by_frame_title_folded", {}).get(title.casefold(), [])
+            for node_id in node_ids:
+                results.append(_node_result(by_id, node_id))
         else:
             node_ids = by_frame_title.get(title, [])
             for node_id in node_ids:
-                node_info = by_id.get(node_id, {})
-                results.append({"id": node_id, **node_info})
+                results.append(_node_result(by_id, node_id))
     else:
-        # partial match (always case-insensitive)
-        title_lower = title.lower()
-        for frame_title, node_ids in by_frame_title.items():
-            if title_lower in frame_title.lower():
-                for node_id in node_ids:
-                    node_info = by_id.get(node_id, {})
-                    results.append({"id": node_id, **node_info})
+        # partial match (always case-insensitive, narrowed by the trigram index)
+        for frame_title in store.match_partial(file_id, index, "by_frame_title", title):
+            for node_id in by_frame_title[frame_title]:
+                results.append(_node_result(by_id, node_id))
 
     if limit is not None:
         results = results[:limit]
@@ -268,17 +266,16 @@ def list_figma_frames(store: CacheStore, file_id: str) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
     by_id = index.get("by_id", {})
 
-    for node_id, node_info in by_id.items():
-        if node_info.get("type") == "FRAME":
-            # Only page-level frames (short path)
-            path = node_info.get("path", [])
-            if len(path) == 3:  # Document > Page > Frame
-                results.append(
-                    {
-                        "id": node_id,
-                        "name": node_info.get("name"),
-                        "path": path,
-                    }
-                )
+    for node_id in index.get("top_frames", []):
+        # Only page-level frames (short path)
+        path = resolve_node_path(by_id, node_id)
+        if len(path) == 3:  # Document > Page > Frame
+            results.append(
+                {
+                    "id": node_id,
+                    "name": by_id.get(node_id, {}).get("name"),
+                    "path": path,
+                }
+            )
 
     return results
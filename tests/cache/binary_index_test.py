@@ -0,0 +1,121 @@
+"""cache/binary_index モジュールのテスト"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.binary_index import (
+    BINARY_INDEX_MAGIC,
+    KEY_SECTIONS,
+    BinaryIndexError,
+    encode_binary_index,
+    is_binary_index,
+    load_binary_index,
+)
+from yet_another_figma_mcp.cache.index import build_index, save_binary_index
+from yet_another_figma_mcp.cache.offsets import build_node_offsets
+
+
+@pytest.fixture
+def index_with_offsets(tmp_path: Path, sample_design_system: dict[str, Any]) -> dict[str, Any]:
+    """バイト範囲付きのノードインデックス"""
+    raw_path = tmp_path / "file_raw.json"
+    with open(raw_path, "w", encoding="utf-8") as f:
+        json.dump(sample_design_system, f, ensure_ascii=False, indent=2)
+    index = build_index(sample_design_system)
+    index["offsets"] = build_node_offsets(raw_path)
+    return index
+
+
+class TestBinaryIndexRoundTrip:
+    """エンコードと読み込みの往復のテスト"""
+
+    def test_by_id_matches(self, index_with_offsets: dict[str, Any]) -> None:
+        """by_id の内容とキー順が一致する"""
+        loaded = load_binary_index(encode_binary_index(index_with_offsets))
+        assert dict(loaded["by_id"].items()) == index_with_offsets["by_id"]
+        assert list(loaded["by_id"]) == list(index_with_offsets["by_id"])
+
+    @pytest.mark.parametrize("section", KEY_SECTIONS)
+    def test_key_sections_match(self, index_with_offsets: dict[str, Any], section: str) -> None:
+        """キー表の内容とキー順が一致する"""
+        loaded = load_binary_index(encode_binary_index(index_with_offsets))
+        assert list(loaded[section]) == list(index_with_offsets[section])
+        for key, node_ids in index_with_offsets[section].items():
+            assert loaded[section][key] == node_ids
+
+    def test_top_level_sections_match(self, index_with_offsets: dict[str, Any]) -> None:
+        """pages / top_frames が一致する"""
+        loaded = load_binary_index(encode_binary_index(index_with_offsets))
+        assert loaded["pages"] == index_with_offsets["pages"]
+        assert loaded["top_frames"] == index_with_offsets["top_frames"]
+
+    def test_offsets_match(self, index_with_offsets: dict[str, Any]) -> None:
+        """ノードのバイト範囲が一致する"""
+        loaded = load_binary_index(encode_binary_index(index_with_offsets))
+        assert dict(loaded["offsets"]) == index_with_offsets["offsets"]
+
+    def test_without_offsets(self, sample_design_system: dict[str, Any]) -> None:
+        """バイト範囲がないインデックスでは offsets を持たない"""
+        loaded = load_binary_index(encode_binary_index(build_index(sample_design_system)))
+        assert "offsets" not in loaded
+
+    def test_lookup_of_unicode_keys(self, index_with_offsets: dict[str, Any]) -> None:
+        """非 ASCII のキーも引ける"""
+        loaded = load_binary_index(encode_binary_index(index_with_offsets))
+        assert (
+            loaded["by_name"]["プライマリボタン"]
+            == index_with_offsets["by_name"]["プライマリボタン"]
+        )
+
+    def test_missing_keys(self, index_with_offsets: dict[str, Any]) -> None:
+        """存在しないキーは dict と同じく扱う"""
+        loaded = load_binary_index(encode_binary_index(index_with_offsets))
+        assert loaded["by_id"].get("999:999") is None
+        assert "999:999" not in loaded["offsets"]
+        assert loaded["by_name"].get("No Such Node") is None
+        with pytest.raises(KeyError):
+            loaded["by_frame_title"]["No Such Frame"]
+
+    def test_empty_index(self) -> None:
+        """空のインデックスも扱える"""
+        loaded = load_binary_index(encode_binary_index(build_index({})))
+        assert dict(loaded["by_id"].items()) == {"": {"name": "", "type": "", "parent_id": None}}
+        assert len(loaded["by_name"]) == 0
+
+
+class TestLoadBinaryIndexErrors:
+    """不正なバイナリの読み込みのテスト"""
+
+    def test_rejects_other_format(self) -> None:
+        """マジックが異なるものはエラー"""
+        with pytest.raises(BinaryIndexError):
+            load_binary_index(b'{"by_id": {}, "by_name": {}, "by_frame_title": {}}')
+
+    def test_rejects_truncated(self, index_with_offsets: dict[str, Any]) -> None:
+        """途中で切れたものはエラー"""
+        encoded = encode_binary_index(index_with_offsets)
+        with pytest.raises(BinaryIndexError):
+            load_binary_index(encoded[: len(encoded) // 2])
+
+    def test_rejects_unknown_version(self, index_with_offsets: dict[str, Any]) -> None:
+        """未対応のバージョンはエラー"""
+        encoded = bytearray(encode_binary_index(index_with_offsets))
+        struct.pack_into("<I", encoded, len(BINARY_INDEX_MAGIC), 999)
+        with pytest.raises(BinaryIndexError):
+            load_binary_index(bytes(encoded))
+
+
+class TestSaveBinaryIndex:
+    """save_binary_index 関数のテスト"""
+
+    def test_writes_binary_file(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """nodes_index.bin をバイナリ形式で保存する"""
+        save_binary_index(build_index(sample_design_system), tmp_path, "ds")
+
+        index_path = tmp_path / "ds" / "nodes_index.bin"
+        assert is_binary_index(index_path.read_bytes())
+        assert not (tmp_path / "ds" / "nodes_index.bin.tmp").exists()
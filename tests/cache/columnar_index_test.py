@@ -0,0 +1,164 @@
+"""cache/columnar_index モジュールのテスト"""
+
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.binary_index import KEY_SECTIONS
+from yet_another_figma_mcp.cache.columnar_index import (
+    ColumnarNodeTable,
+    build_columnar_index,
+    columnar_index_size,
+)
+from yet_another_figma_mcp.cache.index import build_index
+from yet_another_figma_mcp.cache.offsets import build_node_offsets
+
+
+@pytest.fixture
+def index_with_offsets(tmp_path: Path, sample_design_system: dict[str, Any]) -> dict[str, Any]:
+    """バイト範囲付きのノードインデックス"""
+    raw_path = tmp_path / "file_raw.json"
+    with open(raw_path, "w", encoding="utf-8") as f:
+        json.dump(sample_design_system, f, ensure_ascii=False, indent=2)
+    index = build_index(sample_design_system)
+    index["offsets"] = build_node_offsets(raw_path)
+    return index
+
+
+def _columnar(index: dict[str, Any]) -> dict[str, Any]:
+    columnar = build_columnar_index(index)
+    assert columnar is not None
+    return columnar
+
+
+def _synthetic_file(page_count: int, frames_per_page: int, nodes_per_frame: int) -> dict[str, Any]:
+    """インスタンス内の ID を含む、同じ名前のノードが繰り返されるファイル"""
+    pages: list[dict[str, Any]] = []
+    for p in range(page_count):
+        frames: list[dict[str, Any]] = []
+        for f in range(frames_per_page):
+            frame_id = f"{p + 1}:{f}"
+            children: list[dict[str, Any]] = [
+                {
+                    "id": f"I{frame_id};{n}:{n}" if n % 3 == 0 else f"{p + 1}:{1000 + f * 100 + n}",
+                    "name": f"Item {n % 20}",
+                    "type": "INSTANCE" if n % 3 == 0 else "TEXT",
+                    "children": [],
+                }
+                for n in range(nodes_per_frame)
+            ]
+            frames.append(
+                {"id": frame_id, "name": f"Screen {f}", "type": "FRAME", "children": children}
+            )
+        pages.append(
+            {"id": f"0:{p + 1}", "name": f"Page {p}", "type": "CANVAS", "children": frames}
+        )
+    return {
+        "name": "Synthetic",
+        "document": {"id": "0:0", "name": "Document", "type": "DOCUMENT", "children": pages},
+    }
+
+
+class TestColumnarIndexRoundTrip:
+    """列指向への変換で内容が変わらないことのテスト"""
+
+    def test_by_id_matches(self, index_with_offsets: dict[str, Any]) -> None:
+        """by_id の内容とキー順が一致する"""
+        columnar = _columnar(index_with_offsets)
+        assert isinstance(columnar["by_id"], ColumnarNodeTable)
+        assert dict(columnar["by_id"].items()) == index_with_offsets["by_id"]
+        assert list(columnar["by_id"]) == list(index_with_offsets["by_id"])
+        for node_id, entry in index_with_offsets["by_id"].items():
+            assert columnar["by_id"][node_id] == entry
+
+    @pytest.mark.parametrize("section", KEY_SECTIONS)
+    def test_key_sections_match(self, index_with_offsets: dict[str, Any], section: str) -> None:
+        """キー表の内容とキー順が一致する"""
+        columnar = _columnar(index_with_offsets)
+        assert list(columnar[section]) == list(index_with_offsets[section])
+        for key, node_ids in index_with_offsets[section].items():
+            assert columnar[section][key] == node_ids
+
+    def test_other_sections_match(self, index_with_offsets: dict[str, Any]) -> None:
+        """pages / top_frames と offsets が一致する"""
+        columnar = _columnar(index_with_offsets)
+        assert columnar["pages"] == index_with_offsets["pages"]
+        assert columnar["top_frames"] == index_with_offsets["top_frames"]
+        assert dict(columnar["offsets"]) == index_with_offsets["offsets"]
+
+    def test_without_offsets(self, sample_design_system: dict[str, Any]) -> None:
+        """バイト範囲がないインデックスでは offsets を持たない"""
+        assert "offsets" not in _columnar(build_index(sample_design_system))
+
+    def test_ids_that_cannot_be_packed(self) -> None:
+        """インスタンス内の ID や先頭が 0 の数字を含む ID もそのまま引ける"""
+        file_data = _synthetic_file(1, 2, 4)
+        file_data["document"]["children"][0]["children"][0]["children"][1]["id"] = "01:2"
+        index = build_index(file_data)
+        columnar = _columnar(index)
+
+        assert dict(columnar["by_id"].items()) == index["by_id"]
+        assert columnar["by_id"]["I1:0;0:0"]["parent_id"] == "1:0"
+        assert columnar["by_id"]["01:2"]["name"] == "Item 1"
+        assert columnar["by_id"].get("1:2") is None
+
+    def test_missing_keys(self, index_with_offsets: dict[str, Any]) -> None:
+        """存在しないキーは dict と同じく扱う"""
+        columnar = _columnar(index_with_offsets)
+        assert columnar["by_id"].get("999:999") is None
+        assert columnar["by_id"].get("I999:999;1:1") is None
+        assert "999:999" not in columnar["offsets"]
+        assert columnar["by_name"].get("No Such Node") is None
+        with pytest.raises(KeyError):
+            columnar["by_type"]["NO_SUCH_TYPE"]
+
+    def test_resolve_path(self, index_with_offsets: dict[str, Any]) -> None:
+        """親を辿った名前パスを返す (存在しないノードは空)"""
+        by_id = _columnar(index_with_offsets)["by_id"]
+        node_id = next(iter(index_with_offsets["by_id"]))
+        for candidate, entry in index_with_offsets["by_id"].items():
+            if entry["parent_id"] is not None:
+                node_id = candidate
+
+        path = by_id.resolve_path(node_id)
+
+        assert path[-1] == index_with_offsets["by_id"][node_id]["name"]
+        assert len(path) > 1
+        assert by_id.resolve_path("999:999") == []
+
+
+class TestBuildColumnarIndex:
+    """build_columnar_index 関数のテスト"""
+
+    def test_legacy_index_with_paths(self, sample_design_system: dict[str, Any]) -> None:
+        """ノードごとのパスを保存していた古いインデックスは変換しない"""
+        index = build_index(sample_design_system)
+        for entry in index["by_id"].values():
+            entry["path"] = [entry["name"]]
+        assert build_columnar_index(index) is None
+
+    def test_unknown_node_id(self, sample_design_system: dict[str, Any]) -> None:
+        """by_id にない ID を参照しているインデックスは変換しない"""
+        index = build_index(sample_design_system)
+        index["by_name"]["Ghost"] = ["999:999"]
+        assert build_columnar_index(index) is None
+
+    def test_uses_less_memory_than_dict(self) -> None:
+        """tracemalloc で計測したメモリ使用量が JSON からロードした dict の 1/5 以下"""
+        index_json = json.dumps(build_index(_synthetic_file(4, 25, 60)))
+
+        tracemalloc.start()
+        try:
+            index = json.loads(index_json)
+            dict_size = tracemalloc.get_traced_memory()[0]
+            columnar = _columnar(index)
+            del index
+            columnar_size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        assert columnar_size * 5 <= dict_size
+        assert columnar_index_size(columnar) < dict_size
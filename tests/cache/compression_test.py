@@ -0,0 +1,90 @@
+"""cache/compression モジュールのテスト"""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    compress_cache_file,
+    create_cache_file,
+    detect_compression,
+    open_cache_file,
+    read_cache_bytes,
+)
+
+
+class TestCompressionRoundTrip:
+    """書き込みと読み込みの往復のテスト"""
+
+    @pytest.mark.parametrize("compression", list(Compression))
+    def test_round_trip(self, tmp_path: Path, compression: Compression) -> None:
+        """どの形式で書いても同じ内容を読み込める"""
+        path = tmp_path / "data.json"
+        data = {"name": "デザイン", "values": list(range(100))}
+        with create_cache_file(path, compression) as f:
+            json.dump(data, f, ensure_ascii=False)
+
+        assert json.loads(read_cache_bytes(path)) == data
+        with open_cache_file(path) as f:
+            assert json.load(f) == data
+
+    @pytest.mark.parametrize("compression", list(Compression))
+    def test_detects_format_from_content(self, tmp_path: Path, compression: Compression) -> None:
+        """ファイル名ではなく内容から形式を判定する"""
+        path = tmp_path / "data.json"
+        with create_cache_file(path, compression) as f:
+            f.write("{}")
+
+        assert detect_compression(path.read_bytes()[:8]) is compression
+
+    @pytest.mark.parametrize("compression", [Compression.GZIP, Compression.LZMA])
+    def test_level_changes_output(self, tmp_path: Path, compression: Compression) -> None:
+        """圧縮レベルを指定できる"""
+        text = json.dumps([{"id": f"1:{i}", "name": f"Node {i % 7}"} for i in range(2000)])
+        sizes: list[int] = []
+        for level in (0, 9):
+            path = tmp_path / f"data-{level}.json"
+            with create_cache_file(path, compression, level) as f:
+                f.write(text)
+            sizes.append(path.stat().st_size)
+            assert read_cache_bytes(path).decode() == text
+
+        assert sizes[1] < sizes[0]
+
+
+class TestCompressCacheFile:
+    """compress_cache_file 関数のテスト"""
+
+    @pytest.mark.parametrize("compression", list(Compression))
+    def test_compresses_in_place(self, tmp_path: Path, compression: Compression) -> None:
+        """非圧縮のファイルを指定した形式で圧縮し直し、一時ファイルを残さない"""
+        path = tmp_path / "file_raw.json.tmp"
+        data = json.dumps({"name": "デザイン", "values": list(range(100))}).encode()
+        path.write_bytes(data)
+
+        compress_cache_file(path, compression, 1)
+
+        assert detect_compression(path.read_bytes()[:8]) is compression
+        assert read_cache_bytes(path) == data
+        assert [p.name for p in tmp_path.iterdir()] == ["file_raw.json.tmp"]
+
+
+class TestReadCacheBytesErrors:
+    """壊れた圧縮ファイルの読み込みのテスト"""
+
+    def test_truncated_gzip_raises_oserror(self, tmp_path: Path) -> None:
+        """途中で切れたファイルは OSError"""
+        path = tmp_path / "data.json"
+        path.write_bytes(gzip.compress(b'{"a": 1}' * 100)[:20])
+        with pytest.raises(OSError):
+            read_cache_bytes(path)
+
+    def test_corrupt_lzma_raises_oserror(self, tmp_path: Path) -> None:
+        """壊れたデータは OSError"""
+        path = tmp_path / "data.json"
+        path.write_bytes(b"\xfd7zXZ\x00" + b"\x00" * 32)
+        with pytest.raises(OSError):
+            read_cache_bytes(path)
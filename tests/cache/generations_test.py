@@ -0,0 +1,153 @@
+"""cache/generations モジュールのテスト"""
+
+import threading
+from pathlib import Path
+
+from yet_another_figma_mcp.cache.generations import (
+    CURRENT_NAME,
+    GENERATIONS_DIR_NAME,
+    cache_lock,
+    create_generation,
+    discard_generation,
+    generation_root,
+    link_cache_files,
+    prune_generations,
+    publish_generation,
+    read_current_generation,
+    resolve_file_dir,
+)
+
+
+def _write_generation(cache_dir: Path, file_id: str, content: str) -> str:
+    """file_raw.json だけを持つ世代を作成する"""
+    generation = create_generation(cache_dir, file_id)
+    (generation_root(cache_dir, generation) / file_id / "file_raw.json").write_text(content)
+    return generation
+
+
+class TestResolveFileDir:
+    """resolve_file_dir 関数のテスト"""
+
+    def test_legacy_layout(self, tmp_path: Path) -> None:
+        """CURRENT がなければ <file_id>/ 直下を読む"""
+        assert resolve_file_dir(tmp_path, "abc") == tmp_path / "abc"
+
+    def test_follows_current(self, tmp_path: Path) -> None:
+        """CURRENT が指す世代の <file_id>/ を読む"""
+        generation = _write_generation(tmp_path, "abc", "{}")
+        publish_generation(tmp_path, "abc", generation)
+
+        file_dir = resolve_file_dir(tmp_path, "abc")
+
+        assert file_dir == tmp_path / GENERATIONS_DIR_NAME / generation / "abc"
+        assert (file_dir / "file_raw.json").read_text() == "{}"
+
+    def test_ignores_invalid_pointer(self, tmp_path: Path) -> None:
+        """CURRENT の内容が世代の名前として不正なら <file_id>/ 直下を読む"""
+        (tmp_path / "abc").mkdir()
+        (tmp_path / "abc" / CURRENT_NAME).write_text("../../etc")
+
+        assert read_current_generation(tmp_path, "abc") is None
+        assert resolve_file_dir(tmp_path, "abc") == tmp_path / "abc"
+
+
+class TestPublishGeneration:
+    """publish_generation / prune_generations 関数のテスト"""
+
+    def test_returns_previous_generation(self, tmp_path: Path) -> None:
+        """切り替え前の世代を返し、一時ファイルを残さない"""
+        first = _write_generation(tmp_path, "abc", "1")
+        second = _write_generation(tmp_path, "abc", "2")
+
+        assert publish_generation(tmp_path, "abc", first) is None
+        assert publish_generation(tmp_path, "abc", second) == first
+        assert read_current_generation(tmp_path, "abc") == second
+        assert [path.name for path in (tmp_path / "abc").iterdir()] == [CURRENT_NAME]
+
+    def test_keeps_current_and_previous(self, tmp_path: Path) -> None:
+        """現在と直前の世代だけを残し、他のファイルの世代には触れない"""
+        other = _write_generation(tmp_path, "other", "x")
+        publish_generation(tmp_path, "other", other)
+        generations: list[str] = []
+        for n in range(3):
+            generations.append(_write_generation(tmp_path, "abc", str(n)))
+            previous = publish_generation(tmp_path, "abc", generations[-1])
+            prune_generations(tmp_path, "abc", previous)
+
+        assert not generation_root(tmp_path, generations[0]).exists()
+        assert (generation_root(tmp_path, generations[1]) / "abc").is_dir()
+        assert (resolve_file_dir(tmp_path, "abc") / "file_raw.json").read_text() == "2"
+        assert (resolve_file_dir(tmp_path, "other") / "file_raw.json").read_text() == "x"
+
+    def test_migrates_legacy_layout(self, tmp_path: Path) -> None:
+        """世代導入前のファイルは直前の世代として 1 回分残し、次の切り替えで削除する"""
+        (tmp_path / "abc").mkdir()
+        (tmp_path / "abc" / "file_raw.json").write_text("legacy")
+
+        first = _write_generation(tmp_path, "abc", "1")
+        prune_generations(tmp_path, "abc", publish_generation(tmp_path, "abc", first))
+        assert (tmp_path / "abc" / "file_raw.json").exists()
+
+        second = _write_generation(tmp_path, "abc", "2")
+        prune_generations(tmp_path, "abc", publish_generation(tmp_path, "abc", second))
+        assert [path.name for path in (tmp_path / "abc").iterdir()] == [CURRENT_NAME]
+
+    def test_discard_keeps_published_generation(self, tmp_path: Path) -> None:
+        """切り替え前の世代は削除し、切り替え済みの世代は削除しない"""
+        published = _write_generation(tmp_path, "abc", "1")
+        publish_generation(tmp_path, "abc", published)
+        failed = _write_generation(tmp_path, "abc", "2")
+
+        discard_generation(tmp_path, "abc", failed)
+        discard_generation(tmp_path, "abc", published)
+
+        assert not generation_root(tmp_path, failed).exists()
+        assert (resolve_file_dir(tmp_path, "abc") / "file_raw.json").read_text() == "1"
+
+
+class TestLinkCacheFiles:
+    """link_cache_files 関数のテスト"""
+
+    def test_links_files_and_directories(self, tmp_path: Path) -> None:
+        """ファイルとディレクトリ内のファイルを同じ相対パスにリンクする"""
+        source = tmp_path / "source"
+        (source / "pages").mkdir(parents=True)
+        (source / "file_root.json").write_text("root")
+        (source / "pages" / "0.json").write_text("page")
+
+        link_cache_files(source, tmp_path / "target", ["file_root.json", "pages"])
+
+        assert (tmp_path / "target" / "file_root.json").read_text() == "root"
+        assert (tmp_path / "target" / "pages" / "0.json").read_text() == "page"
+        assert (tmp_path / "target" / "file_root.json").stat().st_ino == (
+            source / "file_root.json"
+        ).stat().st_ino
+
+
+class TestCacheLock:
+    """cache_lock 関数のテスト"""
+
+    def test_serializes_writers(self, tmp_path: Path) -> None:
+        """他の書き込みがロックを持っている間は、on_wait を呼んでから解放まで待つ"""
+        waiting = threading.Event()
+        acquired = threading.Event()
+
+        def writer() -> None:
+            with cache_lock(tmp_path, on_wait=waiting.set):
+                acquired.set()
+
+        with cache_lock(tmp_path):
+            thread = threading.Thread(target=writer)
+            thread.start()
+            assert waiting.wait(timeout=5)
+            assert not acquired.is_set()
+        thread.join(timeout=5)
+
+        assert acquired.is_set()
+
+    def test_does_not_wait_without_contention(self, tmp_path: Path) -> None:
+        """他にロックを持つものがなければ on_wait は呼ばない"""
+        calls: list[None] = []
+        with cache_lock(tmp_path / "new", on_wait=lambda: calls.append(None)):
+            pass
+        assert calls == []
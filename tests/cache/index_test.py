@@ -1,13 +1,17 @@
 """cache/index モジュールのテスト"""
 
 import json
+import sys
 from pathlib import Path
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 
-from yet_another_figma_mcp.cache.index import build_index, save_index
-from yet_another_figma_mcp.cache.store import InvalidFileIdError
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file, read_cache_bytes
+from yet_another_figma_mcp.cache.index import build_index, build_index_from_file, save_index
+from yet_another_figma_mcp.cache.offsets import build_node_offsets, scan_node_offsets
+from yet_another_figma_mcp.cache.store import InvalidFileIdError, resolve_node_path
 
 
 @pytest.fixture
@@ -105,23 +109,29 @@ class TestBuildIndex:
         # Component の親は Frame
         assert index["by_id"]["1:2"]["parent_id"] == "1:1"
 
-    def test_build_index_generates_path(self, sample_figma_file: dict[str, Any]) -> None:
-        """by_id に path 情報が生成される (Document > Page > Frame > ... 形式)"""
+    def test_build_index_resolves_path(self, sample_figma_file: dict[str, Any]) -> None:
+        """parent_id から path を復元できる (Document > Page > Frame > ... 形式)"""
         index = build_index(sample_figma_file)
+        by_id = index["by_id"]
         # Document
-        assert index["by_id"]["0:0"]["path"] == ["Document"]
+        assert resolve_node_path(by_id, "0:0") == ["Document"]
         # Page
-        assert index["by_id"]["0:1"]["path"] == ["Document", "Page 1"]
+        assert resolve_node_path(by_id, "0:1") == ["Document", "Page 1"]
         # Frame
-        assert index["by_id"]["1:1"]["path"] == ["Document", "Page 1", "Login Screen"]
+        assert resolve_node_path(by_id, "1:1") == ["Document", "Page 1", "Login Screen"]
         # Component
-        assert index["by_id"]["1:2"]["path"] == [
+        assert resolve_node_path(by_id, "1:2") == [
             "Document",
             "Page 1",
             "Login Screen",
             "Primary Button",
         ]
 
+    def test_build_index_does_not_store_path(self, sample_figma_file: dict[str, Any]) -> None:
+        """by_id にはノードごとの path を保存しない"""
+        index = build_index(sample_figma_file)
+        assert all("path" not in entry for entry in index["by_id"].values())
+
     def test_build_index_handles_duplicate_names(self) -> None:
         """同じ名前のノードが複数ある場合、by_name に全て登録される"""
         file_data: dict[str, Any] = {
@@ -158,7 +168,7 @@ class TestBuildIndex:
         """空のドキュメントを処理できる"""
         file_data: dict[str, Any] = {"document": {}}
         index = build_index(file_data)
-        assert index["by_id"] == {"": {"name": "", "type": "", "parent_id": None, "path": [""]}}
+        assert index["by_id"] == {"": {"name": "", "type": "", "parent_id": None}}
         assert index["by_name"] == {}
         assert index["by_frame_title"] == {}
 
@@ -166,7 +176,7 @@ class TestBuildIndex:
         """document キーがない場合も処理できる"""
         file_data: dict[str, Any] = {"name": "Test"}
         index = build_index(file_data)
-        assert index["by_id"] == {"": {"name": "", "type": "", "parent_id": None, "path": [""]}}
+        assert index["by_id"] == {"": {"name": "", "type": "", "parent_id": None}}
         assert index["by_name"] == {}
         assert index["by_frame_title"] == {}
 
@@ -204,6 +214,197 @@ class TestBuildIndex:
         expected_ids = {"0:0", "0:1", "1:1", "1:2", "1:3"}
         assert set(index["by_id"].keys()) == expected_ids
 
+    def test_build_index_creates_folded_maps(self, sample_figma_file: dict[str, Any]) -> None:
+        """casefold した名前のマップが生成される"""
+        index = build_index(sample_figma_file)
+        assert index["by_name_folded"]["login screen"] == ["1:1"]
+        assert index["by_frame_title_folded"]["login screen"] == ["1:1"]
+
+    def test_build_index_folded_maps_merge_names(self) -> None:
+        """casefold 後に同じになる名前のノード ID は元のキー順に連結される"""
+        file_data: dict[str, Any] = {
+            "document": {
+                "id": "0:0",
+                "name": "Document",
+                "type": "DOCUMENT",
+                "children": [
+                    {"id": "1:1", "name": "STRASSE", "type": "FRAME"},
+                    {"id": "1:2", "name": "Straße", "type": "FRAME"},
+                    {"id": "1:3", "name": "strasse", "type": "FRAME"},
+                ],
+            }
+        }
+        index = build_index(file_data)
+        assert index["by_name_folded"]["strasse"] == ["1:1", "1:2", "1:3"]
+
+    def test_build_index_creates_top_level_sections(
+        self, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """ページ一覧と上位フレーム一覧がドキュメント順に生成される"""
+        index = build_index(sample_figma_file)
+        assert index["pages"] == ["0:1"]
+        assert index["top_frames"] == ["1:1", "1:3"]
+
+    def test_build_index_top_frames_exclude_nested_frames(self) -> None:
+        """フレーム内のフレームは上位フレームに含めない"""
+        file_data: dict[str, Any] = {
+            "document": {
+                "id": "0:0",
+                "name": "Document",
+                "type": "DOCUMENT",
+                "children": [
+                    {
+                        "id": "0:1",
+                        "name": "Page",
+                        "type": "CANVAS",
+                        "children": [
+                            {
+                                "id": "1:1",
+                                "name": "Outer",
+                                "type": "FRAME",
+                                "children": [{"id": "1:2", "name": "Inner", "type": "FRAME"}],
+                            }
+                        ],
+                    }
+                ],
+            }
+        }
+        index = build_index(file_data)
+        assert index["top_frames"] == ["1:1"]
+
+    def test_build_index_handles_deep_tree(self) -> None:
+        """再帰上限を超える深さのツリーも処理できる"""
+        depth = sys.getrecursionlimit() * 2
+        root: dict[str, Any] = {"id": "0:0", "name": "Document", "type": "DOCUMENT"}
+        node = root
+        for i in range(1, depth):
+            child: dict[str, Any] = {"id": f"1:{i}", "name": f"Group {i}", "type": "GROUP"}
+            node["children"] = [child]
+            node = child
+
+        index = build_index({"document": root})
+        assert len(index["by_id"]) == depth
+        assert index["by_id"][f"1:{depth - 1}"]["parent_id"] == f"1:{depth - 2}"
+
+
+class TestBuildIndexParallel:
+    """build_index のページ単位並列化のテスト"""
+
+    @pytest.fixture
+    def multi_page_file(self) -> dict[str, Any]:
+        """ページをまたいで同名ノード・重複 ID を含むファイル"""
+        pages: list[dict[str, Any]] = []
+        for p in range(3):
+            frames: list[dict[str, Any]] = [
+                {
+                    "id": f"{p + 1}:{i}",
+                    "name": f"Screen {i}",
+                    "type": "FRAME",
+                    "children": [
+                        {"id": f"{p + 1}:{i}0", "name": "Button", "type": "INSTANCE"},
+                    ],
+                }
+                for i in range(1, 4)
+            ]
+            pages.append(
+                {"id": f"0:{p + 1}", "name": f"Page {p + 1}", "type": "CANVAS", "children": frames}
+            )
+        # ページをまたいだ重複 ID
+        pages[2]["children"].append({"id": "1:1", "name": "Duplicate", "type": "FRAME"})
+        return {
+            "document": {"id": "0:0", "name": "Document", "type": "DOCUMENT", "children": pages}
+        }
+
+    def test_matches_sequential_build(self, multi_page_file: dict[str, Any]) -> None:
+        """並列構築の結果はキーの順序も含めて逐次構築と一致する"""
+        sequential = build_index(multi_page_file)
+        parallel = build_index(multi_page_file, workers=2)
+        assert parallel == sequential
+        for field in ("by_id", "by_name", "by_frame_title"):
+            assert list(parallel[field]) == list(sequential[field])
+
+    def test_merges_names_in_document_order(self, multi_page_file: dict[str, Any]) -> None:
+        """同名ノードの ID はドキュメント順に並ぶ"""
+        index = build_index(multi_page_file, workers=3)
+        assert index["by_name"]["Screen 1"] == ["1:1", "2:1", "3:1"]
+        assert index["by_id"]["0:2"]["parent_id"] == "0:0"
+
+    def test_single_page_runs_in_process(self, sample_figma_file: dict[str, Any]) -> None:
+        """ページが 1 つならプロセスプールを使わない"""
+        with patch("yet_another_figma_mcp.cache.index.ProcessPoolExecutor") as mock_executor:
+            index = build_index(sample_figma_file, workers=4)
+        mock_executor.assert_not_called()
+        assert index == build_index(sample_figma_file)
+
+
+class TestBuildIndexFromFile:
+    """build_index_from_file 関数のテスト"""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_matches_build_index(
+        self, tmp_path: Path, sample_design_system: dict[str, Any], indent: int | None
+    ) -> None:
+        """パースしたツリーから構築した結果とキーの順序も含めて一致する"""
+        raw_path = tmp_path / "file_raw.json"
+        raw_path.write_text(
+            json.dumps(sample_design_system, ensure_ascii=False, indent=indent), encoding="utf-8"
+        )
+
+        index, root_fields = build_index_from_file(raw_path)
+
+        expected = build_index(sample_design_system)
+        expected["offsets"] = build_node_offsets(raw_path)
+        assert index == expected
+        for field in ("by_id", "by_name", "by_frame_title", "by_name_folded"):
+            assert list(index[field]) == list(expected[field])
+        assert root_fields["name"] == sample_design_system["name"]
+
+    def test_duplicate_ids(self, tmp_path: Path) -> None:
+        """ID 重複時の扱い (by_id は後勝ち、オフセットは先勝ち) が一致する"""
+        file_data = {
+            "document": {
+                "id": "0:0",
+                "name": "Doc",
+                "type": "DOCUMENT",
+                "children": [
+                    {"id": "1:1", "name": "First", "type": "FRAME"},
+                    {"id": "1:1", "name": "Second", "type": "GROUP"},
+                ],
+            }
+        }
+        raw_path = tmp_path / "file_raw.json"
+        raw_path.write_text(json.dumps(file_data), encoding="utf-8")
+
+        index, _ = build_index_from_file(raw_path)
+
+        assert {k: v for k, v in index.items() if k != "offsets"} == build_index(file_data)
+        assert index["offsets"] == build_node_offsets(raw_path)
+
+    @pytest.mark.parametrize("compression", [Compression.GZIP, Compression.LZMA])
+    def test_compressed_file_offsets(
+        self, tmp_path: Path, sample_design_system: dict[str, Any], compression: Compression
+    ) -> None:
+        """圧縮ファイルも走査でき、バイト範囲は展開後のバイト列に対する位置になる"""
+        raw_path = tmp_path / "file_raw.json"
+        with create_cache_file(raw_path, compression) as f:
+            json.dump(sample_design_system, f, ensure_ascii=False)
+
+        index, _ = build_index_from_file(raw_path)
+
+        offsets = index.pop("offsets")
+        assert index == build_index(sample_design_system)
+        assert offsets == scan_node_offsets(read_cache_bytes(raw_path))
+
+    @pytest.mark.parametrize(
+        "content", [b"", b"<html></html>", b'{"name": "x"}', b'{"document": {']
+    )
+    def test_rejects_invalid_content(self, tmp_path: Path, content: bytes) -> None:
+        """空・非 JSON・ドキュメントなし・途中で切れたファイルは ValueError"""
+        raw_path = tmp_path / "file_raw.json"
+        raw_path.write_bytes(content)
+        with pytest.raises(ValueError):
+            build_index_from_file(raw_path)
+
 
 class TestSaveIndex:
     """save_index 関数のテスト"""
@@ -0,0 +1,99 @@
+"""cache/lazy モジュールのテスト"""
+
+# pyright: reportPrivateUsage=false
+
+import json
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.lazy import LazyList, LazyNode, find_lazy_node
+from yet_another_figma_mcp.cache.offsets import scan_node_offsets
+
+
+def _encode(file_data: dict[str, Any]) -> bytes:
+    return json.dumps(file_data, ensure_ascii=False, indent=2).encode()
+
+
+class TestLazyNode:
+    """LazyNode クラスのテスト"""
+
+    def test_behaves_like_dict(self, sample_design_system: dict[str, Any]) -> None:
+        """dict と同じ内容の Mapping として振る舞う"""
+        view = LazyNode(_encode(sample_design_system))
+
+        assert view == sample_design_system
+        assert sample_design_system == view
+        assert set(view) == set(sample_design_system)
+        assert len(view) == len(sample_design_system)
+        assert view["name"] == sample_design_system["name"]
+        assert view.get("missing") is None
+        pages = view["document"]["children"]
+        assert isinstance(pages, LazyList)
+        assert len(pages) == len(sample_design_system["document"]["children"])
+        assert pages[-1] == sample_design_system["document"]["children"][-1]
+        assert pages[:1] == sample_design_system["document"]["children"][:1]
+
+    def test_decodes_only_accessed_members(self, sample_design_system: dict[str, Any]) -> None:
+        """トップレベルのメンバーを読んでもドキュメントツリーはデコードしない"""
+        view = LazyNode(_encode(sample_design_system))
+
+        assert view["name"] == sample_design_system["name"]
+
+        document = view["document"]
+        assert isinstance(document, LazyNode)
+        assert document._members is None
+
+    def test_to_dict_is_json_serializable(self, sample_design_system: dict[str, Any]) -> None:
+        """to_dict はサブツリーを通常の dict にデコードする"""
+        view = LazyNode(_encode(sample_design_system))
+        page = view["document"]["children"][0]
+
+        decoded = page.to_dict()
+
+        assert type(decoded) is dict
+        assert json.loads(json.dumps(decoded)) == sample_design_system["document"]["children"][0]
+
+    def test_rejects_non_object(self) -> None:
+        """オブジェクトでない JSON は ValueError"""
+        with pytest.raises(ValueError):
+            len(LazyNode(b"[1, 2]"))
+
+
+class TestFindLazyNode:
+    """find_lazy_node 関数のテスト"""
+
+    @staticmethod
+    def _path(file_data: dict[str, Any], depth: int) -> list[dict[str, Any]]:
+        """ドキュメントから先頭の子ノードを depth 段辿ったノードの列"""
+        nodes = [file_data["document"]]
+        for _ in range(depth):
+            nodes.append(nodes[-1]["children"][0])
+        return nodes
+
+    @pytest.mark.parametrize("use_offsets", [False, True])
+    def test_decodes_only_path(
+        self, sample_design_system: dict[str, Any], use_offsets: bool
+    ) -> None:
+        """経路上のノードだけをデコードし、兄弟ノードや返すノードの子はデコードしない"""
+        raw = _encode(sample_design_system)
+        view = LazyNode(raw, offsets=scan_node_offsets(raw) if use_offsets else None)
+        nodes = self._path(sample_design_system, 2)
+
+        found = find_lazy_node(view, [node["id"] for node in nodes])
+
+        assert found is not None
+        assert found.to_dict() == nodes[-1]
+        assert found._members is None
+        pages = view["document"]["children"]
+        assert pages[0]._members is not None
+        assert all(page._members is None for page in pages[1:])
+
+    def test_missing_node(self, sample_design_system: dict[str, Any]) -> None:
+        """経路上のノードが見つからなければ None"""
+        view = LazyNode(_encode(sample_design_system))
+        document_id = sample_design_system["document"]["id"]
+
+        assert find_lazy_node(view, [document_id, "missing"]) is None
+        assert find_lazy_node(view, ["missing"]) is None
+        assert find_lazy_node(view, []) is None
@@ -0,0 +1,196 @@
+"""cache/manifest モジュールのテスト"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file
+from yet_another_figma_mcp.cache.index import build_index, save_index
+from yet_another_figma_mcp.cache.manifest import (
+    MANIFEST_NAME,
+    build_manifest_entry,
+    hash_cache_file,
+    hash_raw_content,
+    load_manifest,
+    rebuild_manifest,
+    scan_cache_entry,
+    update_manifest,
+    write_manifest,
+)
+from yet_another_figma_mcp.cache.shards import write_page_shards
+
+
+def _write_cache(
+    cache_dir: Path,
+    file_id: str,
+    file_data: dict[str, Any],
+    compression: Compression = Compression.NONE,
+) -> Path:
+    """file_raw.json とインデックスだけを持つキャッシュを書き出す"""
+    file_dir = cache_dir / file_id
+    file_dir.mkdir(parents=True)
+    with create_cache_file(file_dir / "file_raw.json", compression) as f:
+        json.dump(file_data, f, ensure_ascii=False)
+    save_index(build_index(file_data), cache_dir, file_id)
+    return file_dir
+
+
+class TestHashRawContent:
+    """生 JSON のハッシュのテスト"""
+
+    @pytest.mark.parametrize("compression", [Compression.GZIP, Compression.LZMA])
+    def test_ignores_compression(
+        self, tmp_path: Path, sample_design_system: dict[str, Any], compression: Compression
+    ) -> None:
+        """圧縮形式にかかわらず展開後の内容が同じなら同じハッシュになる"""
+        plain = _write_cache(tmp_path, "plain", sample_design_system)
+        packed = _write_cache(tmp_path, "packed", sample_design_system, compression)
+
+        expected = hash_cache_file(plain / "file_raw.json")
+        assert expected.startswith("sha256:")
+        assert hash_cache_file(packed / "file_raw.json") == expected
+
+    def test_sharded_cache_hashes_original_bytes(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """ページ単位に分割したキャッシュは結合後のバイト列のハッシュになる"""
+        file_dir = _write_cache(tmp_path, "sharded", sample_design_system)
+        expected = hash_raw_content(file_dir)
+        write_page_shards(file_dir / "file_raw.json", file_dir)
+        (file_dir / "file_raw.json").unlink()
+
+        assert hash_raw_content(file_dir) == expected
+
+
+class TestLoadManifest:
+    """load_manifest / write_manifest 関数のテスト"""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """書き出したエントリを読み込める"""
+        write_manifest(tmp_path, {"b": {"name": "B"}, "a": {"name": "A"}})
+        assert load_manifest(tmp_path) == {"a": {"name": "A"}, "b": {"name": "B"}}
+        assert not list(tmp_path.glob("*.tmp"))
+
+    @pytest.mark.parametrize(
+        "content", ["broken", "[]", '{"version": 999, "files": {}}', '{"version": 1}']
+    )
+    def test_rejects_invalid_manifest(self, tmp_path: Path, content: str) -> None:
+        """壊れている・未対応のバージョンのマニフェストは None"""
+        (tmp_path / MANIFEST_NAME).write_text(content)
+        assert load_manifest(tmp_path) is None
+
+    def test_missing_manifest(self, tmp_path: Path) -> None:
+        """マニフェストがなければ None"""
+        assert load_manifest(tmp_path) is None
+
+
+class TestUpdateManifest:
+    """update_manifest 関数のテスト"""
+
+    def test_keeps_other_entries(self, tmp_path: Path) -> None:
+        """他のファイルのエントリを保持したまま 1 件を更新する"""
+        write_manifest(tmp_path, {"a": {"name": "A"}, "b": {"name": "B"}})
+        update_manifest(tmp_path, "b", {"name": "B2"})
+        assert load_manifest(tmp_path) == {"a": {"name": "A"}, "b": {"name": "B2"}}
+
+    def test_fills_missing_manifest_from_disk(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """マニフェストがなければ既存のキャッシュを走査して補う (ハッシュは求めない)"""
+        _write_cache(tmp_path, "existing", sample_design_system)
+
+        update_manifest(tmp_path, "new", {"name": "New"})
+
+        files = load_manifest(tmp_path)
+        assert files is not None
+        assert files["new"] == {"name": "New"}
+        assert files["existing"]["name"] == sample_design_system["name"]
+        assert files["existing"]["content_hash"] is None
+
+
+class TestScanCacheEntry:
+    """scan_cache_entry 関数のテスト"""
+
+    def test_reads_legacy_cache(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """メタデータのない古いキャッシュは生 JSON とインデックスから補う"""
+        file_dir = _write_cache(tmp_path, "legacy", sample_design_system)
+        (file_dir / "file_raw.json.tmp").write_text("partial")
+
+        entry = scan_cache_entry(file_dir)
+
+        assert entry is not None
+        assert entry["name"] == sample_design_system["name"]
+        assert entry["version"] == sample_design_system["version"]
+        assert entry["node_count"] == len(build_index(sample_design_system)["by_id"])
+        assert entry["content_hash"] == hash_cache_file(file_dir / "file_raw.json")
+        assert set(entry["sizes"]) == {"file_raw.json", "nodes_index.json"}
+        assert entry["total_size"] == sum(entry["sizes"].values())
+        assert entry["cached_at"]
+
+    def test_prefers_metadata(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """cache_meta.json に項目があれば生 JSON は読まない"""
+        file_dir = _write_cache(tmp_path, "meta", sample_design_system)
+        metadata = {
+            "cached_at": "2024-01-01T00:00:00+00:00",
+            "name": "From Meta",
+            "lastModified": None,
+            "version": "9",
+            "node_count": 42,
+        }
+        (file_dir / "cache_meta.json").write_text(json.dumps(metadata))
+        (file_dir / "file_raw.json").write_text("broken")
+
+        entry = scan_cache_entry(file_dir, with_hash=False)
+
+        assert entry is not None
+        assert entry["name"] == "From Meta"
+        assert entry["node_count"] == 42
+        assert entry["content_hash"] is None
+
+    def test_skips_unreadable_cache(self, tmp_path: Path) -> None:
+        """生 JSON がない・読めないディレクトリは None"""
+        (tmp_path / "empty").mkdir()
+        broken = tmp_path / "broken"
+        broken.mkdir()
+        (broken / "file_raw.json").write_text("broken")
+
+        assert scan_cache_entry(tmp_path / "empty") is None
+        assert scan_cache_entry(broken) is None
+
+
+class TestRebuildManifest:
+    """rebuild_manifest 関数のテスト"""
+
+    def test_rebuilds_from_disk(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """ディスク上のキャッシュからマニフェストを書き出す"""
+        _write_cache(tmp_path, "one", sample_design_system)
+        _write_cache(tmp_path, "two", sample_design_system, Compression.GZIP)
+        (tmp_path / "not a file id").mkdir()
+        (tmp_path / MANIFEST_NAME).write_text("broken")
+
+        files = rebuild_manifest(tmp_path)
+
+        assert set(files) == {"one", "two"}
+        assert files["one"]["content_hash"] == files["two"]["content_hash"]
+        assert load_manifest(tmp_path) == files
+
+
+class TestBuildManifestEntry:
+    """build_manifest_entry 関数のテスト"""
+
+    def test_adds_sizes_and_hash(self, tmp_path: Path) -> None:
+        """メタデータにファイルサイズとハッシュを加える"""
+        (tmp_path / "pages").mkdir()
+        (tmp_path / "pages" / "0.json").write_bytes(b"12345")
+        (tmp_path / "file_root.json").write_bytes(b"12")
+
+        entry = build_manifest_entry(tmp_path, {"name": "X"}, "sha256:abc")
+
+        assert entry == {
+            "name": "X",
+            "content_hash": "sha256:abc",
+            "sizes": {"file_root.json": 2, "pages/0.json": 5},
+            "total_size": 7,
+        }
@@ -0,0 +1,240 @@
+"""cache/offsets モジュールのテスト"""
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file, read_cache_bytes
+from yet_another_figma_mcp.cache.offsets import (
+    build_node_offsets,
+    iter_node_spans,
+    peek_node_id,
+    read_node_slice,
+    scan_node_offsets,
+    split_lazy_members,
+)
+from yet_another_figma_mcp.cache.store import build_node_map
+
+
+@pytest.fixture
+def tricky_figma_file() -> dict[str, Any]:
+    """エスケープや紛らわしいキーを含む Figma ファイルデータ"""
+    return {
+        "name": 'File with "quotes" and {braces}',
+        "document": {
+            "id": "0:0",
+            "name": "Document",
+            "type": "DOCUMENT",
+            "children": [
+                {
+                    "id": "0:1",
+                    "name": "Page [1]",
+                    "type": "CANVAS",
+                    "children": [
+                        {
+                            "id": "1:1",
+                            "name": 'Say "hi" \\ {ok}',
+                            "type": "TEXT",
+                            "characters": "改行\nと } や ] を含む",
+                            "style": {"id": "not-a-node", "children": [{"id": "x"}]},
+                            "children": [],
+                        },
+                        {"id": "1:2", "name": "ログイン", "type": "FRAME"},
+                    ],
+                }
+            ],
+        },
+        "components": {"1:1": {"id": "c", "children": [{"id": "y"}]}},
+    }
+
+
+class TestScanNodeOffsets:
+    """scan_node_offsets 関数のテスト"""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_slices_decode_to_nodes(
+        self, sample_design_system: dict[str, Any], indent: int | None
+    ) -> None:
+        """各範囲をデコードすると元のノードと一致する"""
+        raw = json.dumps(sample_design_system, ensure_ascii=False, indent=indent).encode()
+        offsets = scan_node_offsets(raw)
+
+        node_map = build_node_map(sample_design_system)
+        assert set(offsets) == set(node_map)
+        for node_id, (start, end) in offsets.items():
+            assert json.loads(raw[start:end]) == node_map[node_id]
+
+    def test_handles_escapes_and_non_node_objects(self, tricky_figma_file: dict[str, Any]) -> None:
+        """文字列内の構造文字やノード以外のオブジェクトに惑わされない"""
+        raw = json.dumps(tricky_figma_file, ensure_ascii=False, indent=2).encode()
+        offsets = scan_node_offsets(raw)
+
+        assert set(offsets) == {"0:0", "0:1", "1:1", "1:2"}
+        start, end = offsets["1:1"]
+        assert json.loads(raw[start:end])["characters"] == "改行\nと } や ] を含む"
+
+    def test_prefers_first_duplicate(self) -> None:
+        """ID 重複時は最初に現れたノードを優先する"""
+        file_data = {
+            "document": {
+                "id": "0:0",
+                "children": [{"id": "9:9", "name": "A"}, {"id": "9:9", "name": "B"}],
+            }
+        }
+        raw = json.dumps(file_data).encode()
+        start, end = scan_node_offsets(raw)["9:9"]
+        assert json.loads(raw[start:end])["name"] == "A"
+
+
+class TestIterNodeSpans:
+    """iter_node_spans 関数のテスト"""
+
+    def test_yields_nodes_in_post_order(self, tricky_figma_file: dict[str, Any]) -> None:
+        """子ノードを親より先に、親の通し番号付きで返す"""
+        raw = json.dumps(tricky_figma_file, ensure_ascii=False).encode()
+        spans = list(iter_node_spans(raw))
+
+        assert [span.node_id for span in spans] == ["1:1", "1:2", "0:1", "0:0"]
+        by_id = {span.node_id: span for span in spans}
+        assert by_id["0:0"].seq == 0
+        assert by_id["0:0"].parent_seq == -1
+        assert by_id["1:1"].parent_seq == by_id["0:1"].seq
+        assert by_id["1:1"].name == 'Say "hi" \\ {ok}'
+        assert by_id["1:2"].type == "FRAME"
+        start, end = by_id["1:2"].start, by_id["1:2"].end
+        assert json.loads(raw[start:end]) == {"id": "1:2", "name": "ログイン", "type": "FRAME"}
+
+    def test_collects_root_fields(self, tricky_figma_file: dict[str, Any]) -> None:
+        """ルート直下の文字列フィールドを収集する"""
+        root_fields: dict[str, Any] = {}
+        list(iter_node_spans(json.dumps(tricky_figma_file).encode(), root_fields))
+        assert root_fields == {"name": 'File with "quotes" and {braces}'}
+
+    def test_truncated_input_raises(self, tricky_figma_file: dict[str, Any]) -> None:
+        """途中で切れた JSON は ValueError"""
+        raw = json.dumps(tricky_figma_file).encode()
+        with pytest.raises(ValueError):
+            list(iter_node_spans(raw[: len(raw) // 2]))
+
+
+class TestBuildNodeOffsets:
+    """build_node_offsets 関数のテスト"""
+
+    def test_reads_file_from_disk(self, tmp_path: Path, tricky_figma_file: dict[str, Any]) -> None:
+        """ディスク上のファイルを走査できる"""
+        raw_path = tmp_path / "file_raw.json"
+        raw_path.write_text(json.dumps(tricky_figma_file, ensure_ascii=False), encoding="utf-8")
+        offsets = build_node_offsets(raw_path)
+        assert "1:2" in offsets
+
+    def test_reads_compressed_file(self, tmp_path: Path, tricky_figma_file: dict[str, Any]) -> None:
+        """圧縮ファイルは展開後のバイト列に対する範囲を返す"""
+        raw_path = tmp_path / "file_raw.json"
+        with create_cache_file(raw_path, Compression.GZIP) as f:
+            json.dump(tricky_figma_file, f, ensure_ascii=False)
+        offsets = build_node_offsets(raw_path)
+        start, end = offsets["1:2"]
+        assert json.loads(read_cache_bytes(raw_path)[start:end])["name"] == "ログイン"
+
+    def test_empty_file_returns_empty(self, tmp_path: Path) -> None:
+        """空ファイルは空のマップを返す"""
+        raw_path = tmp_path / "file_raw.json"
+        raw_path.write_bytes(b"")
+        assert build_node_offsets(raw_path) == {}
+
+
+class TestReadNodeSlice:
+    """read_node_slice 関数のテスト"""
+
+    @pytest.fixture
+    def mapped(self, tmp_path: Path) -> Any:
+        """テスト用の mmap"""
+        raw_path = tmp_path / "file_raw.json"
+        raw_path.write_bytes(b'{"document": {"id": "0:0"}}')
+        with open(raw_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            yield m
+
+    def test_decodes_range(self, mapped: mmap.mmap) -> None:
+        """指定範囲をデコードする"""
+        assert read_node_slice(mapped, [13, 26]) == {"id": "0:0"}
+
+    def test_out_of_range_returns_none(self, mapped: mmap.mmap) -> None:
+        """範囲外は None"""
+        assert read_node_slice(mapped, [13, 1000]) is None
+
+    def test_invalid_json_returns_none(self, mapped: mmap.mmap) -> None:
+        """デコードできない範囲は None"""
+        assert read_node_slice(mapped, [0, 5]) is None
+
+    def test_non_object_returns_none(self, mapped: mmap.mmap) -> None:
+        """オブジェクト以外は None"""
+        assert read_node_slice(mapped, [20, 25]) is None
+
+
+class TestSplitLazyMembers:
+    """split_lazy_members 関数のテスト"""
+
+    @pytest.mark.parametrize("use_offsets", [False, True])
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_splits_children(
+        self, tricky_figma_file: dict[str, Any], indent: int | None, use_offsets: bool
+    ) -> None:
+        """children の値を null に置き換え、要素ごとの範囲を返す"""
+        raw = json.dumps(tricky_figma_file, ensure_ascii=False, indent=indent).encode()
+        offsets = scan_node_offsets(raw) if use_offsets else None
+        start, end = scan_node_offsets(raw)["0:1"]
+
+        head, members = split_lazy_members(raw, start, end, offsets)
+
+        page = tricky_figma_file["document"]["children"][0]
+        assert json.loads(head) == {**page, "children": None}
+        assert list(members) == ["children"]
+        elements = members["children"].elements
+        assert elements is not None
+        assert [json.loads(raw[s:e]) for s, e in elements] == page["children"]
+
+    @pytest.mark.parametrize("use_offsets", [False, True])
+    def test_splits_document(self, tricky_figma_file: dict[str, Any], use_offsets: bool) -> None:
+        """ルートオブジェクトの document はオブジェクトとして範囲を返す"""
+        raw = json.dumps(tricky_figma_file, ensure_ascii=False).encode()
+        offsets = scan_node_offsets(raw) if use_offsets else None
+
+        head, members = split_lazy_members(raw, 0, len(raw), offsets)
+
+        assert json.loads(head) == {**tricky_figma_file, "document": None}
+        document = members["document"]
+        assert document.elements is None
+        assert json.loads(raw[document.start : document.end]) == tricky_figma_file["document"]
+
+    def test_ignores_stale_offsets(self, tricky_figma_file: dict[str, Any]) -> None:
+        """バイト範囲が合わないオフセットは使わずに走査する"""
+        raw = json.dumps(tricky_figma_file, ensure_ascii=False).encode()
+        offsets = {
+            node_id: [start, end - 1] for node_id, (start, end) in scan_node_offsets(raw).items()
+        }
+
+        head, members = split_lazy_members(raw, 0, len(raw), offsets)
+
+        assert json.loads(head)["name"] == tricky_figma_file["name"]
+        document = members["document"]
+        assert json.loads(raw[document.start : document.end]) == tricky_figma_file["document"]
+
+    def test_rejects_truncated_object(self) -> None:
+        """閉じていないオブジェクトは ValueError"""
+        with pytest.raises(ValueError):
+            split_lazy_members(b'{"id": "1:1", "children": [{"id": "1:2"}', 0, 40)
+
+
+class TestPeekNodeId:
+    """peek_node_id 関数のテスト"""
+
+    def test_reads_leading_id(self) -> None:
+        """先頭のメンバーが id ならその値を返す"""
+        assert peek_node_id(b'[{ "id" : "1:\\"2\\"", "children": []}]', 1) == '1:"2"'
+
+    def test_ignores_other_leading_member(self) -> None:
+        """先頭が id 以外なら None"""
+        assert peek_node_id(b'{"name": "a", "id": "1:2"}', 0) is None
@@ -0,0 +1,107 @@
+"""cache/shards モジュールのテスト"""
+
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file, read_cache_bytes
+from yet_another_figma_mcp.cache.offsets import scan_node_offsets
+from yet_another_figma_mcp.cache.shards import (
+    SHARD_DIR_NAME,
+    SHARD_ROOT_NAME,
+    is_sharded,
+    load_shard_root,
+    page_stubs,
+    remove_page_shards,
+    write_assembled_file,
+    write_page_shards,
+)
+
+
+def _write_raw(path: Path, file_data: dict[str, Any], compression: Compression) -> bytes:
+    """生 JSON を書き出し、展開後のバイト列を返す"""
+    with create_cache_file(path, compression) as f:
+        json.dump(file_data, f, ensure_ascii=False, indent=2)
+    return read_cache_bytes(path)
+
+
+class TestWritePageShards:
+    """write_page_shards 関数のテスト"""
+
+    @pytest.mark.parametrize("compression", list(Compression))
+    def test_splits_pages_and_restores_original(
+        self, tmp_path: Path, sample_design_system: dict[str, Any], compression: Compression
+    ) -> None:
+        """ページごとのシャードに分割し、結合すると元のバイト列に戻る"""
+        raw = _write_raw(tmp_path / "file_raw.json", sample_design_system, compression)
+
+        count = write_page_shards(tmp_path / "file_raw.json", tmp_path, compression)
+
+        pages = sample_design_system["document"]["children"]
+        assert count == len(pages)
+        assert is_sharded(tmp_path)
+        for number, page in enumerate(pages):
+            shard_path = tmp_path / SHARD_DIR_NAME / f"{number}.json"
+            assert json.loads(read_cache_bytes(shard_path)) == page
+        out = io.BytesIO()
+        write_assembled_file(tmp_path, out)
+        assert out.getvalue() == raw
+
+    def test_root_keeps_metadata_and_stubs(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """ルートファイルはページ以外の内容を保持し、ページはスタブになる"""
+        raw = _write_raw(tmp_path / "file_raw.json", sample_design_system, Compression.NONE)
+        write_page_shards(tmp_path / "file_raw.json", tmp_path)
+
+        root = load_shard_root(tmp_path)
+        assert root["name"] == sample_design_system["name"]
+        assert root.get("components") == sample_design_system.get("components")
+        stubs = page_stubs(root)
+        first_page = sample_design_system["document"]["children"][0]
+        stub = stubs[first_page["id"]]
+        assert stub["name"] == first_page["name"]
+        assert stub["shard"] == f"{SHARD_DIR_NAME}/0.json"
+        assert stub["shard_offset"] == scan_node_offsets(raw)[first_page["id"]][0]
+        assert (tmp_path / SHARD_ROOT_NAME).stat().st_size < len(raw)
+
+    def test_replaces_existing_shards(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """前回のシャードは削除してから書き出す"""
+        stale = tmp_path / SHARD_DIR_NAME / "99.json"
+        stale.parent.mkdir()
+        stale.write_text("{}")
+        _write_raw(tmp_path / "file_raw.json", sample_design_system, Compression.NONE)
+
+        write_page_shards(tmp_path / "file_raw.json", tmp_path)
+
+        assert not stale.exists()
+
+    @pytest.mark.parametrize("content", [b"", b"<html>", b'{"document": {"id": "0:0"}}'])
+    def test_rejects_invalid_content(self, tmp_path: Path, content: bytes) -> None:
+        """空・非 JSON・ページのないファイルは ValueError"""
+        (tmp_path / "file_raw.json").write_bytes(content)
+        with pytest.raises(ValueError):
+            write_page_shards(tmp_path / "file_raw.json", tmp_path)
+        assert not is_sharded(tmp_path)
+
+
+class TestRemovePageShards:
+    """remove_page_shards 関数のテスト"""
+
+    def test_removes_root_and_shards(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """ルートファイルとシャードのディレクトリを削除する"""
+        _write_raw(tmp_path / "file_raw.json", sample_design_system, Compression.NONE)
+        write_page_shards(tmp_path / "file_raw.json", tmp_path)
+
+        remove_page_shards(tmp_path)
+
+        assert not is_sharded(tmp_path)
+        assert not (tmp_path / SHARD_DIR_NAME).exists()
+        remove_page_shards(tmp_path)
@@ -0,0 +1,131 @@
+"""cache/splice モジュールのテスト"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.index import build_index_from_spans, save_binary_index, save_index
+from yet_another_figma_mcp.cache.offsets import iter_node_spans
+from yet_another_figma_mcp.cache.splice import load_index_entries, splice_nodes
+
+
+def _scan(raw: bytes) -> dict[str, Any]:
+    """生 JSON 全体を走査して作り直したインデックス (offsets を含む)"""
+    index, offsets = build_index_from_spans(iter_node_spans(raw))
+    index["offsets"] = offsets
+    return index
+
+
+def _find(node: dict[str, Any], node_id: str) -> dict[str, Any] | None:
+    if node.get("id") == node_id:
+        return node
+    for child in node.get("children", []):
+        found = _find(child, node_id)
+        if found is not None:
+            return found
+    return None
+
+
+@pytest.fixture
+def raw(sample_design_system: dict[str, Any]) -> bytes:
+    """整形して保存した file_raw.json の内容"""
+    return json.dumps(sample_design_system, ensure_ascii=False, indent=2).encode()
+
+
+class TestSpliceNodes:
+    """splice_nodes 関数のテスト"""
+
+    def test_matches_full_rebuild(self, raw: bytes) -> None:
+        """差し替え後のインデックスが、差し替え後の生 JSON 全体を走査した結果と一致する"""
+        index = _scan(raw)
+        nodes: dict[str, dict[str, Any]] = {
+            "1:10": {
+                "id": "1:10",
+                "name": "Toggle Buttons",
+                "type": "FRAME",
+                "children": [
+                    {"id": "9:1", "name": "On", "type": "INSTANCE"},
+                    {"id": "9:2", "name": "オフ", "type": "FRAME", "children": []},
+                ],
+            },
+            "4:1": {"id": "4:1", "name": "Dashboard v2", "type": "FRAME", "children": []},
+        }
+
+        new_raw, new_index = splice_nodes(raw, index["by_id"], index["offsets"], nodes)
+
+        expected = _scan(new_raw)
+        assert new_index == expected
+        assert list(new_index["by_id"]) == list(expected["by_id"])
+        assert new_index["by_id"]["1:10"]["parent_id"] == "1:0"
+        assert new_index["by_frame_title"]["Dashboard v2"] == ["4:1"]
+        document = json.loads(new_raw)["document"]
+        assert _find(document, "1:10") == nodes["1:10"]
+        assert _find(document, "4:1") == nodes["4:1"]
+
+    def test_keeps_other_bytes(self, raw: bytes) -> None:
+        """差し替えたノード以外のバイト列は変えない"""
+        index = _scan(raw)
+        start, end = index["offsets"]["5:1"]
+        node = {"id": "5:1", "name": "ボタン", "type": "FRAME"}
+
+        new_raw, new_index = splice_nodes(raw, index["by_id"], index["offsets"], {"5:1": node})
+
+        encoded = json.dumps(node, ensure_ascii=False, separators=(",", ":")).encode()
+        assert new_raw == raw[:start] + encoded + raw[end:]
+        new_start, new_end = new_index["offsets"]["5:1"]
+        assert new_raw[new_start:new_end] == encoded
+
+    def test_nested_targets(self, raw: bytes) -> None:
+        """祖先と子孫を両方指定した場合は祖先のサブツリーで差し替える"""
+        index = _scan(raw)
+        page: dict[str, Any] = {"id": "3:0", "name": "Screens", "type": "CANVAS", "children": []}
+        frame = {"id": "3:1", "name": "Ignored", "type": "FRAME"}
+
+        new_raw, new_index = splice_nodes(
+            raw, index["by_id"], index["offsets"], {"3:1": frame, "3:0": page}
+        )
+
+        assert new_index == _scan(new_raw)
+        assert "3:1" not in new_index["by_id"]
+        assert "Ignored" not in new_index["by_name"]
+
+    def test_unknown_node(self, raw: bytes) -> None:
+        """キャッシュにないノードは KeyError"""
+        index = _scan(raw)
+        with pytest.raises(KeyError) as excinfo:
+            splice_nodes(raw, index["by_id"], index["offsets"], {"9:9": {"id": "9:9"}})
+        assert excinfo.value.args == ("9:9",)
+
+
+class TestLoadIndexEntries:
+    """load_index_entries 関数のテスト"""
+
+    @pytest.mark.parametrize("index_format", ["json", "binary", "none"])
+    def test_loads_entries(self, tmp_path: Path, raw: bytes, index_format: str) -> None:
+        """保存済みのインデックス (なければ生 JSON の走査) から by_id と offsets を取得する"""
+        index = _scan(raw)
+        if index_format == "json":
+            save_index(index, tmp_path, "abc")
+        elif index_format == "binary":
+            save_binary_index(index, tmp_path, "abc")
+        (tmp_path / "abc").mkdir(exist_ok=True)
+
+        by_id, offsets = load_index_entries(tmp_path / "abc", raw)
+
+        assert by_id == index["by_id"]
+        assert list(by_id) == list(index["by_id"])
+        assert offsets == index["offsets"]
+
+    def test_ignores_index_without_offsets(self, tmp_path: Path, raw: bytes) -> None:
+        """offsets を持たないインデックスは使わずに生 JSON を走査する"""
+        index = _scan(raw)
+        save_index(
+            {key: value for key, value in index.items() if key != "offsets"}, tmp_path, "abc"
+        )
+
+        by_id, offsets = load_index_entries(tmp_path / "abc", raw)
+
+        assert by_id == index["by_id"]
+        assert offsets == index["offsets"]
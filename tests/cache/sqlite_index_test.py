@@ -0,0 +1,204 @@
+"""cache/sqlite_index モジュールのテスト"""
+
+import sqlite3
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from yet_another_figma_mcp.cache.index import build_index, save_sqlite_index
+from yet_another_figma_mcp.cache.sqlite_index import (
+    SqliteIndexError,
+    count_sqlite_index_nodes,
+    load_sqlite_index,
+    write_sqlite_index,
+)
+from yet_another_figma_mcp.cache.store import build_node_map, resolve_node_path
+
+_KEY_SECTIONS = ("by_name", "by_frame_title", "by_name_folded", "by_frame_title_folded")
+
+
+@pytest.fixture
+def db_path(tmp_path: Path, sample_design_system: dict[str, Any]) -> Path:
+    """サンプルファイルから作成した SQLite 形式のインデックス"""
+    path = tmp_path / "nodes_index.sqlite"
+    write_sqlite_index(sample_design_system, build_index(sample_design_system), path)
+    return path
+
+
+class TestSqliteIndexRoundTrip:
+    """書き込みと読み込みの往復のテスト"""
+
+    def test_by_id_matches(self, db_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """by_id の内容とキー順が一致する"""
+        expected = build_index(sample_design_system)["by_id"]
+        loaded = load_sqlite_index(db_path)["by_id"]
+        assert dict(loaded.items()) == expected
+        assert list(loaded) == list(expected)
+
+    @pytest.mark.parametrize("section", _KEY_SECTIONS)
+    def test_key_sections_match(
+        self, db_path: Path, sample_design_system: dict[str, Any], section: str
+    ) -> None:
+        """キー表の内容とキー順が一致する"""
+        expected = build_index(sample_design_system)[section]
+        loaded = load_sqlite_index(db_path)[section]
+        assert list(loaded) == list(expected)
+        assert len(loaded) == len(expected)
+        for key, node_ids in expected.items():
+            assert loaded[key] == node_ids
+
+    def test_top_level_sections_match(
+        self, db_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """pages / top_frames が一致する"""
+        expected = build_index(sample_design_system)
+        loaded = load_sqlite_index(db_path)
+        assert loaded["pages"] == expected["pages"]
+        assert loaded["top_frames"] == expected["top_frames"]
+
+    def test_resolve_path(self, db_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """祖先を辿った名前パスが JSON 形式と一致する"""
+        expected = build_index(sample_design_system)["by_id"]
+        loaded = load_sqlite_index(db_path)["by_id"]
+        for node_id in expected:
+            assert resolve_node_path(loaded, node_id) == resolve_node_path(expected, node_id)
+        assert loaded.resolve_path("missing") == []
+
+    def test_get_subtree(self, db_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """サブツリーが生 JSON のノードと一致する"""
+        loaded = load_sqlite_index(db_path)["by_id"]
+        for node_id, node in build_node_map(sample_design_system).items():
+            assert loaded.get_subtree(node_id) == node
+        assert loaded.get_subtree("missing") is None
+
+    def test_missing_key_raises(self, db_path: Path) -> None:
+        """存在しないキーは KeyError"""
+        loaded = load_sqlite_index(db_path)
+        assert loaded["by_id"].get("missing") is None
+        assert loaded["by_name"].get("missing") is None
+
+    def test_count_nodes(self, db_path: Path, sample_design_system: dict[str, Any]) -> None:
+        """ノード数を返す"""
+        expected = len(build_index(sample_design_system)["by_id"])
+        assert count_sqlite_index_nodes(db_path) == expected
+
+
+class TestSqliteIndexSearch:
+    """FTS5 を使った検索のテスト"""
+
+    @pytest.mark.parametrize("query", ["button", "BUTTON", "ボタン", "ic", "x"])
+    @pytest.mark.parametrize("section", ["by_name", "by_frame_title"])
+    def test_match_partial(
+        self, db_path: Path, sample_design_system: dict[str, Any], section: str, query: str
+    ) -> None:
+        """部分一致の結果が全キーの走査と一致する (3 文字未満のクエリを含む)"""
+        keys = build_index(sample_design_system)[section]
+        expected = [key for key in keys if query.casefold() in key.casefold()]
+        assert load_sqlite_index(db_path)[section].match_partial(query) == expected
+
+    @pytest.mark.parametrize("query", ["strasse", "STRASSE", "straße", "ss"])
+    def test_match_partial_casefold(self, tmp_path: Path, query: str) -> None:
+        """ß と ss のような casefold の違いも無視する"""
+        file_data: dict[str, Any] = {
+            "document": {
+                "id": "0:0",
+                "name": "Document",
+                "type": "DOCUMENT",
+                "children": [
+                    {"id": "1:1", "name": "Straße", "type": "FRAME"},
+                    {"id": "1:2", "name": "Road", "type": "FRAME"},
+                ],
+            }
+        }
+        path = tmp_path / "nodes_index.sqlite"
+        write_sqlite_index(file_data, build_index(file_data), path)
+        assert load_sqlite_index(path)["by_name"].match_partial(query) == ["Straße"]
+
+    def test_match_partial_escapes_quotes(self, db_path: Path) -> None:
+        """FTS5 の構文文字を含むクエリでもエラーにならない"""
+        assert load_sqlite_index(db_path)["by_name"].match_partial('"a" OR b*') == []
+
+
+class TestDuplicateIds:
+    """ID が重複するノードの扱いのテスト"""
+
+    def test_matches_json_index(self, tmp_path: Path) -> None:
+        """by_id は後勝ち、サブツリーは最初のノードを返す"""
+        file_data = {
+            "document": {
+                "id": "0:0",
+                "name": "Doc",
+                "type": "DOCUMENT",
+                "children": [
+                    {"id": "1:1", "name": "First", "type": "FRAME"},
+                    {"id": "1:1", "name": "Second", "type": "GROUP"},
+                ],
+            }
+        }
+        path = tmp_path / "nodes_index.sqlite"
+        index = build_index(file_data)
+        write_sqlite_index(file_data, index, path)
+        by_id = load_sqlite_index(path)["by_id"]
+        assert by_id["1:1"] == index["by_id"]["1:1"]
+        assert len(by_id) == len(index["by_id"])
+        subtree = by_id.get_subtree("1:1")
+        assert subtree is not None
+        assert subtree["name"] == "First"
+
+
+class TestLoadSqliteIndexErrors:
+    """読み込みエラーのテスト"""
+
+    def test_rejects_non_database(self, tmp_path: Path) -> None:
+        """SQLite の DB でなければ SqliteIndexError"""
+        path = tmp_path / "nodes_index.sqlite"
+        path.write_bytes(b"broken")
+        with pytest.raises(SqliteIndexError):
+            load_sqlite_index(path)
+
+    def test_rejects_unknown_version(self, db_path: Path) -> None:
+        """未対応のバージョンは SqliteIndexError"""
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("UPDATE meta SET value = '999' WHERE key = 'version'")
+        conn.close()
+        with pytest.raises(SqliteIndexError):
+            load_sqlite_index(db_path)
+
+
+class TestSaveSqliteIndex:
+    """save_sqlite_index 関数のテスト"""
+
+    def test_replaces_existing_file(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """既存のファイルを置き換え、一時ファイルを残さない"""
+        index = build_index(sample_design_system)
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir()
+        (file_dir / "nodes_index.sqlite").write_bytes(b"old")
+
+        save_sqlite_index(sample_design_system, index, tmp_path, "ds")
+
+        assert count_sqlite_index_nodes(file_dir / "nodes_index.sqlite") == len(index["by_id"])
+        assert not (file_dir / "nodes_index.sqlite.tmp").exists()
+
+    def test_sqlite_error_becomes_os_error(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """DB の書き出しに失敗した場合は OSError にして、一時ファイルを残さない"""
+
+        def fail(file_data: dict[str, Any], index: dict[str, Any], db_path: Path) -> None:
+            db_path.write_bytes(b"partial")
+            raise sqlite3.OperationalError("no such tokenizer: trigram")
+
+        with patch("yet_another_figma_mcp.cache.index.write_sqlite_index", fail):
+            with pytest.raises(OSError, match="no such tokenizer"):
+                save_sqlite_index(
+                    sample_design_system, build_index(sample_design_system), tmp_path, "ds"
+                )
+
+        assert not (tmp_path / "ds" / "nodes_index.sqlite.tmp").exists()
+        assert not (tmp_path / "ds" / "nodes_index.sqlite").exists()
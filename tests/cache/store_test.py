@@ -1,13 +1,41 @@
 """cache/store モジュールのテスト"""
 
 import json
+import os
+import sqlite3
 from pathlib import Path
 from typing import Any
 
 import pytest
 
-from yet_another_figma_mcp.cache.index import build_index
-from yet_another_figma_mcp.cache.store import CacheStore, InvalidFileIdError
+from yet_another_figma_mcp.cache.columnar_index import ColumnarNodeTable
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file
+from yet_another_figma_mcp.cache.generations import (
+    create_generation,
+    generation_root,
+    publish_generation,
+)
+from yet_another_figma_mcp.cache.index import (
+    build_index,
+    build_index_from_file,
+    save_binary_index,
+    save_index,
+    save_sqlite_index,
+    save_trigram_index,
+)
+from yet_another_figma_mcp.cache.offsets import build_node_offsets
+from yet_another_figma_mcp.cache.shards import write_page_shards
+from yet_another_figma_mcp.cache.store import (
+    CacheStore,
+    InvalidFileIdError,
+    build_node_map,
+    PartialField,
+    build_folded_map,
+    estimate_json_memory,
+    resolve_node_path,
+    share_index_strings,
+)
+from yet_another_figma_mcp.cache.trigram import build_trigram_index
 
 
 @pytest.fixture
@@ -144,3 +172,989 @@ class TestFileIdValidation:
         store = CacheStore()
         with pytest.raises(InvalidFileIdError):
             store.get_index("../../../etc/passwd")
+
+
+class TestCacheStoreGetNode:
+    """CacheStore.get_node のテスト"""
+
+    @pytest.fixture
+    def store(self, tmp_path: Path, sample_figma_file: dict[str, Any]) -> CacheStore:
+        """サンプルファイルを保存したストア"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "file_raw.json", "w") as f:
+            json.dump(sample_figma_file, f)
+        return CacheStore(tmp_path)
+
+    def test_get_node_returns_node(self, store: CacheStore) -> None:
+        """ID に対応するノードを返す"""
+        node = store.get_node("test123", "1:2")
+        assert node is not None
+        assert node["name"] == "Primary Button"
+
+    def test_get_node_matches_file_and_is_cached(self, store: CacheStore) -> None:
+        """ノードはファイル JSON の該当部分と等しく、2 回目以降は同じ dict を返す"""
+        file_data = store.get_file("test123")
+        assert file_data is not None
+        page = file_data["document"]["children"][0]
+        node = store.get_node("test123", "0:1")
+        assert node == page
+        assert store.get_node("test123", "0:1") is node
+
+    def test_get_node_builds_map_once(self, store: CacheStore) -> None:
+        """ノードマップは初回アクセス時に一度だけ構築される"""
+        store.get_node("test123", "1:1")
+        node_map = store.node_maps["test123"]
+        store.get_node("test123", "1:3")
+        assert store.node_maps["test123"] is node_map
+
+    def test_get_node_unknown_node_returns_none(self, store: CacheStore) -> None:
+        """存在しないノード ID は None"""
+        assert store.get_node("test123", "999:999") is None
+
+    def test_get_node_missing_file_returns_none(self, store: CacheStore) -> None:
+        """存在しないファイルは None"""
+        assert store.get_node("missing", "1:1") is None
+        assert "missing" not in store.node_maps
+
+    def test_get_node_validates_file_id(self, store: CacheStore) -> None:
+        """不正な file_id は拒否"""
+        with pytest.raises(InvalidFileIdError):
+            store.get_node("../etc", "1:1")
+
+
+class TestBuildNodeMap:
+    """build_node_map 関数のテスト"""
+
+    def test_build_node_map_contains_all_nodes(self, sample_figma_file: dict[str, Any]) -> None:
+        """全ノードがマップに登録される"""
+        node_map = build_node_map(sample_figma_file)
+        assert set(node_map) == {"0:0", "0:1", "1:1", "1:2", "1:3"}
+
+    def test_build_node_map_prefers_first_duplicate(self) -> None:
+        """ID 重複時は前順で最初のノードを優先する"""
+        file_data: dict[str, Any] = {
+            "document": {
+                "id": "0:0",
+                "children": [
+                    {"id": "1:1", "name": "First", "children": [{"id": "9:9", "name": "A"}]},
+                    {"id": "9:9", "name": "B"},
+                ],
+            }
+        }
+        assert build_node_map(file_data)["9:9"]["name"] == "A"
+
+    def test_build_node_map_handles_deep_tree(self) -> None:
+        """再帰上限を超える深さのツリーも処理できる"""
+        document: dict[str, Any] = {"id": "0:0", "children": []}
+        current = document
+        for i in range(5000):
+            child: dict[str, Any] = {"id": f"1:{i}", "children": []}
+            current["children"].append(child)
+            current = child
+        node_map = build_node_map({"document": document})
+        assert "1:4999" in node_map
+
+
+class TestCacheStoreGetNodeFromOffsets:
+    """バイトオフセットを使った CacheStore.get_node のテスト"""
+
+    @pytest.fixture
+    def store(self, tmp_path: Path, sample_figma_file: dict[str, Any]) -> CacheStore:
+        """オフセット付きインデックスを保存したストア"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        raw_path = file_dir / "file_raw.json"
+        with open(raw_path, "w") as f:
+            json.dump(sample_figma_file, f, indent=2)
+
+        index = build_index(sample_figma_file)
+        index["offsets"] = build_node_offsets(raw_path)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(index, f)
+        return CacheStore(tmp_path)
+
+    def test_get_node_does_not_load_whole_file(self, store: CacheStore) -> None:
+        """オフセットがあればファイル全体をロードせずにノードを返す"""
+        node = store.get_node("test123", "1:1")
+        assert node is not None
+        assert node["name"] == "Login Screen"
+        assert node["children"][0]["id"] == "1:2"
+        assert "test123" not in store.files
+
+    def test_get_node_unknown_node_does_not_load_whole_file(self, store: CacheStore) -> None:
+        """オフセットにない ID は全体ロードせずに None"""
+        assert store.get_node("test123", "999:999") is None
+        assert "test123" not in store.files
+
+    def test_get_node_falls_back_on_mismatch(
+        self, store: CacheStore, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """生 JSON とオフセットが食い違う場合は全体ロードにフォールバックする"""
+        raw_path = tmp_path / "test123" / "file_raw.json"
+        raw_path.write_text(json.dumps(sample_figma_file))  # インデントなしで書き直す
+
+        node = store.get_node("test123", "1:3")
+        assert node is not None
+        assert node["name"] == "Sign Up Screen"
+        assert "test123" in store.files
+
+    def test_has_file_does_not_load_file(self, store: CacheStore) -> None:
+        """has_file はファイルをロードしない"""
+        assert store.has_file("test123")
+        assert not store.has_file("missing")
+        assert "test123" not in store.files
+
+
+class TestCacheStoreMemoryBudget:
+    """メモリ上限と LRU 退避のテスト"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, sample_figma_file: dict[str, Any]) -> Path:
+        """3 ファイル分のキャッシュディレクトリ"""
+        for file_id in ("file_a", "file_b", "file_c"):
+            file_dir = tmp_path / file_id
+            file_dir.mkdir(parents=True)
+            with open(file_dir / "file_raw.json", "w") as f:
+                json.dump(sample_figma_file, f)
+            with open(file_dir / "nodes_index.json", "w") as f:
+                json.dump(build_index(sample_figma_file), f)
+        return tmp_path
+
+    @staticmethod
+    def _file_size(cache_dir: Path) -> int:
+        # ロードした生 JSON はデコードするまでバイト列の大きさで計上される
+        return (cache_dir / "file_a" / "file_raw.json").stat().st_size
+
+    def test_unbounded_store_keeps_everything(self, cache_dir: Path) -> None:
+        """上限なしでは退避しない"""
+        store = CacheStore(cache_dir)
+        for file_id in ("file_a", "file_b", "file_c"):
+            store.get_file(file_id)
+            store.get_index(file_id)
+        assert set(store.files) == {"file_a", "file_b", "file_c"}
+        assert store.stats.file_evictions == 0
+        assert store.stats.index_evictions == 0
+        assert store.stats.loads == 6
+
+    def test_evicts_least_recently_used_file(self, cache_dir: Path) -> None:
+        """上限を超えると最も長く使われていないファイルを退避する"""
+        store = CacheStore(cache_dir, max_memory=self._file_size(cache_dir) * 2)
+        store.get_file("file_a")
+        store.get_file("file_b")
+        store.get_file("file_a")  # file_a を最近使ったものにする
+        store.get_file("file_c")
+
+        assert set(store.files) == {"file_a", "file_c"}
+        assert store.stats.file_evictions == 1
+        assert store.stats.current_bytes <= self._file_size(cache_dir) * 2
+
+    def test_files_and_indexes_are_evicted_separately(self, cache_dir: Path) -> None:
+        """生 JSON とインデックスは独立して退避される"""
+        file_size = self._file_size(cache_dir)
+        store = CacheStore(cache_dir, max_memory=file_size)
+        store.get_index("file_a")
+        store.get_file("file_a")
+
+        # インデックスが退避されても生 JSON は残る
+        assert "file_a" in store.files
+        assert "file_a" not in store.indexes
+        assert store.stats.index_evictions == 1
+        assert store.stats.file_evictions == 0
+
+    def test_evicting_file_drops_node_map(self, cache_dir: Path) -> None:
+        """生 JSON の退避時はノードマップも破棄される"""
+        store = CacheStore(cache_dir, max_memory=self._file_size(cache_dir))
+        store.get_node("file_a", "1:1")
+        assert "file_a" in store.node_maps
+        store.get_file("file_b")
+        assert "file_a" not in store.node_maps
+
+    def test_reload_is_counted(self, cache_dir: Path) -> None:
+        """退避後の再ロードがカウントされ、データは正しく返る"""
+        store = CacheStore(cache_dir, max_memory=self._file_size(cache_dir))
+        store.get_file("file_a")
+        store.get_file("file_b")
+        file_data = store.get_file("file_a")
+
+        assert file_data is not None
+        assert file_data["name"] == "Test Design"
+        assert store.stats.reloads == 1
+        assert store.get_stats()["reloads"] == 1
+
+    @pytest.mark.parametrize("with_index", [True, False])
+    def test_decoded_nodes_are_counted_once(self, cache_dir: Path, with_index: bool) -> None:
+        """デコードしたノードを加えても、バイト列とデコード後の推定の合計を超えない"""
+        if not with_index:
+            (cache_dir / "file_a" / "nodes_index.json").unlink()
+        raw = (cache_dir / "file_a" / "file_raw.json").read_bytes()
+        store = CacheStore(cache_dir)
+        store.get_index("file_a")
+        index_bytes = store.stats.current_bytes
+        store.get_file("file_a")
+        assert store.stats.current_bytes == index_bytes + len(raw)
+
+        store.get_node("file_a", "1:1")
+        store.get_node("file_a", "2:1")
+
+        file_bytes = store.stats.current_bytes - index_bytes
+        assert len(raw) < file_bytes <= len(raw) + estimate_json_memory(raw) + 1024
+
+    def test_oversized_entry_is_kept(self, cache_dir: Path) -> None:
+        """単体で上限を超えるエントリもロード直後は保持される"""
+        store = CacheStore(cache_dir, max_memory=1)
+        file_data = store.get_file("file_a")
+        assert file_data is not None
+        assert "file_a" in store.files
+        assert store.stats.peak_bytes == store.stats.current_bytes
+
+
+class TestEstimateJsonMemory:
+    """estimate_json_memory 関数のテスト"""
+
+    def test_ignores_indentation(self, sample_figma_file: dict[str, Any]) -> None:
+        """インデントの有無で推定値が大きく変わらない"""
+        compact = estimate_json_memory(json.dumps(sample_figma_file).encode())
+        indented = estimate_json_memory(json.dumps(sample_figma_file, indent=2).encode())
+        assert indented <= compact
+        assert indented > compact * 0.8
+
+
+class TestCacheStoreHotReload:
+    """ディスク上のキャッシュ更新の検知テスト"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, sample_figma_file: dict[str, Any]) -> Path:
+        """メタデータ付きのキャッシュディレクトリ"""
+        self._write_cache(tmp_path, sample_figma_file, cached_at=1000.0)
+        return tmp_path
+
+    @staticmethod
+    def _write_cache(cache_dir: Path, file_data: dict[str, Any], cached_at: float) -> None:
+        file_dir = cache_dir / "test123"
+        file_dir.mkdir(parents=True, exist_ok=True)
+        with open(file_dir / "file_raw.json", "w") as f:
+            json.dump(file_data, f)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(build_index(file_data), f)
+        with open(file_dir / "cache_meta.json", "w") as f:
+            json.dump({"cached_at_unix": cached_at}, f)
+
+    @staticmethod
+    def _renamed(file_data: dict[str, Any]) -> dict[str, Any]:
+        renamed = json.loads(json.dumps(file_data))
+        renamed["name"] = "Refreshed Design"
+        renamed["document"]["children"][0]["children"][0]["name"] = "Welcome Screen"
+        return renamed
+
+    def test_reloads_refreshed_cache(
+        self, cache_dir: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """cached_at_unix が変わると新しい生 JSON とインデックスをロードする"""
+        store = CacheStore(cache_dir, reload_interval=0)
+        old_file = store.get_file("test123")
+        old_index = store.get_index("test123")
+        assert old_file is not None
+        assert old_index is not None
+
+        self._write_cache(cache_dir, self._renamed(sample_figma_file), cached_at=2000.0)
+
+        new_file = store.get_file("test123")
+        new_index = store.get_index("test123")
+        assert new_file is not None
+        assert new_index is not None
+        assert new_file["name"] == "Refreshed Design"
+        assert "Welcome Screen" in new_index["by_name"]
+        assert store.stats.hot_reloads == 1
+
+        # 処理中の呼び出しが保持している古い世代はそのまま使える
+        assert old_file["name"] == "Test Design"
+        assert "Login Screen" in old_index["by_name"]
+
+    def test_reload_drops_node_map(
+        self, cache_dir: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """更新後のノード取得は新しい世代から行われる"""
+        store = CacheStore(cache_dir, reload_interval=0)
+        node = store.get_node("test123", "1:1")
+        assert node is not None
+        assert node["name"] == "Login Screen"
+
+        self._write_cache(cache_dir, self._renamed(sample_figma_file), cached_at=2000.0)
+
+        node = store.get_node("test123", "1:1")
+        assert node is not None
+        assert node["name"] == "Welcome Screen"
+
+    def test_unchanged_cache_is_not_reloaded(self, cache_dir: Path) -> None:
+        """スタンプが変わらなければ再ロードしない"""
+        store = CacheStore(cache_dir, reload_interval=0)
+        file_data = store.get_file("test123")
+        assert store.get_file("test123") is file_data
+        assert store.stats.hot_reloads == 0
+        assert store.stats.loads == 1
+
+    def test_checks_at_most_once_per_interval(
+        self, cache_dir: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """確認間隔内は更新があってもディスクを確認しない"""
+        store = CacheStore(cache_dir, reload_interval=3600)
+        file_data = store.get_file("test123")
+
+        self._write_cache(cache_dir, self._renamed(sample_figma_file), cached_at=2000.0)
+
+        assert store.get_file("test123") is file_data
+        assert store.stats.hot_reloads == 0
+
+    def test_reload_disabled(self, cache_dir: Path, sample_figma_file: dict[str, Any]) -> None:
+        """reload_interval=None では更新を確認しない"""
+        store = CacheStore(cache_dir, reload_interval=None)
+        file_data = store.get_file("test123")
+
+        self._write_cache(cache_dir, self._renamed(sample_figma_file), cached_at=2000.0)
+
+        assert store.get_file("test123") is file_data
+
+    def test_falls_back_to_mtime_without_metadata(
+        self, cache_dir: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """メタデータがない場合は mtime の変化で検知する"""
+        (cache_dir / "test123" / "cache_meta.json").unlink()
+        store = CacheStore(cache_dir, reload_interval=0)
+        store.get_file("test123")
+
+        raw_path = cache_dir / "test123" / "file_raw.json"
+        raw_path.write_text(json.dumps(self._renamed(sample_figma_file)))
+        stat = raw_path.stat()
+        os.utime(raw_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        file_data = store.get_file("test123")
+        assert file_data is not None
+        assert file_data["name"] == "Refreshed Design"
+
+    def test_reads_switched_generation(
+        self, cache_dir: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """ロード済みのエントリは元の世代から読み続け、更新の確認時に新しい世代へ切り替える"""
+        store = CacheStore(cache_dir, reload_interval=3600)
+        assert store.get_index("test123") is not None
+
+        # cached_at_unix が同じでも、CURRENT が別の世代を指せば更新として扱う
+        generation = create_generation(cache_dir, "test123")
+        self._write_cache(
+            generation_root(cache_dir, generation), self._renamed(sample_figma_file), 1000.0
+        )
+        publish_generation(cache_dir, "test123", generation)
+
+        # インデックスと同じ世代の生 JSON を組み合わせる
+        file_data = store.get_file("test123")
+        assert file_data is not None
+        assert file_data["name"] == "Test Design"
+
+        store.reload_interval = 0
+        file_data = store.get_file("test123")
+        assert file_data is not None
+        assert file_data["name"] == "Refreshed Design"
+        assert store.stats.hot_reloads == 1
+
+    def test_invalidate_releases_memory_accounting(self, cache_dir: Path) -> None:
+        """invalidate で推定メモリ使用量も解放される"""
+        store = CacheStore(cache_dir)
+        store.get_file("test123")
+        store.get_index("test123")
+        store.invalidate("test123")
+        assert store.stats.current_bytes == 0
+        assert "test123" not in store.files
+        assert "test123" not in store.indexes
+
+
+class TestCacheStoreMatchPartial:
+    """CacheStore.match_partial のテスト"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> Path:
+        """トライグラムインデックスなしのキャッシュディレクトリ"""
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(build_index(sample_design_system), f)
+        return tmp_path
+
+    @pytest.mark.parametrize("field", ["by_name", "by_frame_title"])
+    @pytest.mark.parametrize("query", ["button", "BUTTON", "in", "Screen", "ogin s", "zzz", ""])
+    def test_matches_linear_scan(self, cache_dir: Path, field: PartialField, query: str) -> None:
+        """全キー走査と同じ結果を同じ順序で返す"""
+        store = CacheStore(cache_dir)
+        index = store.get_index("ds")
+        assert index is not None
+        expected = [key for key in index[field] if query.casefold() in key.casefold()]
+        assert store.match_partial("ds", index, field, query) == expected
+
+    @pytest.mark.parametrize("query", ["strasse", "STRASSE", "straße", "sse"])
+    def test_matches_casefolded_keys(self, tmp_path: Path, query: str) -> None:
+        """大文字小文字の区別だけでなく、ß と ss のような casefold の違いも無視する"""
+        file_data = {
+            "document": {
+                "id": "0:0",
+                "name": "Document",
+                "type": "DOCUMENT",
+                "children": [
+                    {"id": "1:1", "name": "Straße", "type": "FRAME"},
+                    {"id": "1:2", "name": "Road", "type": "FRAME"},
+                ],
+            }
+        }
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir()
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(build_index(file_data), f)
+
+        store = CacheStore(tmp_path)
+        index = store.get_index("ds")
+        assert index is not None
+        assert store.match_partial("ds", index, "by_name", query) == ["Straße"]
+
+    def test_builds_trigram_index_lazily(self, cache_dir: Path) -> None:
+        """trigram_index.json がなければメモリ上に構築する"""
+        store = CacheStore(cache_dir)
+        index = store.get_index("ds")
+        assert index is not None
+        assert "trigram_index" not in index
+        store.match_partial("ds", index, "by_name", "button")
+        assert "trigram_index" in index
+
+    def test_uses_persisted_trigram_index(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """保存済みのトライグラムインデックスを使う"""
+        index = build_index(sample_design_system)
+        trigram_index = build_trigram_index(index)
+        # 保存済みのものが使われたことを確認するため、転置リストを空にしておく
+        trigram_index["by_name"]["postings"] = {}
+        save_trigram_index(trigram_index, cache_dir, "ds")
+
+        store = CacheStore(cache_dir)
+        loaded = store.get_index("ds")
+        assert loaded is not None
+        assert store.match_partial("ds", loaded, "by_name", "button") == []
+
+    def test_ignores_stale_trigram_index(
+        self, cache_dir: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """ノードインデックスと対応しないトライグラムインデックスは使わない"""
+        stale = build_trigram_index(build_index(sample_figma_file))
+        save_trigram_index(stale, cache_dir, "ds")
+
+        store = CacheStore(cache_dir)
+        index = store.get_index("ds")
+        assert index is not None
+        assert store.match_partial("ds", index, "by_name", "primary button") == ["Primary Button"]
+
+
+class TestCacheStoreFoldedMaps:
+    """casefold 済みマップの遅延構築のテスト"""
+
+    def test_adds_folded_maps_to_legacy_index(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """casefold 済みマップがないインデックスはロード時に補われる"""
+        index = build_index(sample_design_system)
+        expected = {
+            field: index.pop(field) for field in ("by_name_folded", "by_frame_title_folded")
+        }
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(index, f)
+
+        loaded = CacheStore(tmp_path).get_index("ds")
+        assert loaded is not None
+        assert loaded["by_name_folded"] == expected["by_name_folded"]
+        assert loaded["by_frame_title_folded"] == expected["by_frame_title_folded"]
+
+    def test_build_folded_map(self) -> None:
+        """casefold した名前ごとにノード ID をまとめる"""
+        folded = build_folded_map({"Button": ["1:1"], "BUTTON": ["1:2"], "Icon": ["1:3"]})
+        assert folded == {"button": ["1:1", "1:2"], "icon": ["1:3"]}
+
+
+class TestResolveNodePath:
+    """resolve_node_path 関数のテスト"""
+
+    @pytest.fixture
+    def by_id(self) -> dict[str, dict[str, Any]]:
+        """親ポインタのみを持つ by_id"""
+        return {
+            "0:0": {"name": "Document", "type": "DOCUMENT", "parent_id": None},
+            "0:1": {"name": "Page 1", "type": "CANVAS", "parent_id": "0:0"},
+            "1:1": {"name": "Frame", "type": "FRAME", "parent_id": "0:1"},
+        }
+
+    def test_resolves_from_parents(self, by_id: dict[str, dict[str, Any]]) -> None:
+        """parent_id を辿ってルートからのパスを返す"""
+        assert resolve_node_path(by_id, "1:1") == ["Document", "Page 1", "Frame"]
+
+    def test_missing_node_returns_empty(self, by_id: dict[str, dict[str, Any]]) -> None:
+        """存在しないノードは空"""
+        assert resolve_node_path(by_id, "9:9") == []
+
+    def test_uses_stored_path_of_legacy_index(self) -> None:
+        """path を保存していた古いインデックスはその値を使う"""
+        by_id: dict[str, dict[str, Any]] = {
+            "1:1": {"name": "Frame", "type": "FRAME", "parent_id": "0:1", "path": ["D", "P", "F"]}
+        }
+        assert resolve_node_path(by_id, "1:1") == ["D", "P", "F"]
+
+    def test_stops_on_cycle(self) -> None:
+        """重複 ID などで親ポインタが循環しても停止する"""
+        by_id: dict[str, dict[str, Any]] = {
+            "1:1": {"name": "A", "type": "FRAME", "parent_id": "1:2"},
+            "1:2": {"name": "B", "type": "FRAME", "parent_id": "1:1"},
+        }
+        assert resolve_node_path(by_id, "1:1") == ["B", "A"]
+
+
+class TestShareIndexStrings:
+    """share_index_strings 関数のテスト"""
+
+    def test_names_share_by_name_keys(self, sample_design_system: dict[str, Any]) -> None:
+        """by_id の名前が by_name のキーと同一オブジェクトになる"""
+        index = json.loads(json.dumps(build_index(sample_design_system)))
+        share_index_strings(index)
+        keys = {name: name for name in index["by_name"]}
+        for entry in index["by_id"].values():
+            if entry["name"]:
+                assert entry["name"] is keys[entry["name"]]
+
+
+class TestCacheStoreTopLevelSections:
+    """pages / top_frames の遅延構築のテスト"""
+
+    def test_adds_sections_to_legacy_index(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """pages / top_frames がないインデックスはロード時に補われる"""
+        index = build_index(sample_design_system)
+        expected = {field: index.pop(field) for field in ("pages", "top_frames")}
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(index, f)
+
+        loaded = CacheStore(tmp_path).get_index("ds")
+        assert loaded is not None
+        assert loaded["pages"] == expected["pages"]
+        assert loaded["top_frames"] == expected["top_frames"]
+        assert loaded["pages"]
+
+
+class TestCacheStoreFileMetadata:
+    """CacheStore.get_file_metadata のテスト"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, sample_figma_file: dict[str, Any]) -> Path:
+        """生 JSON とインデックスのみのキャッシュディレクトリ"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "file_raw.json", "w") as f:
+            json.dump(sample_figma_file, f)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(build_index(sample_figma_file), f)
+        return tmp_path
+
+    @staticmethod
+    def _write_meta(cache_dir: Path, **fields: Any) -> None:
+        with open(cache_dir / "test123" / "cache_meta.json", "w") as f:
+            json.dump({"cached_at_unix": 1000.0, **fields}, f)
+
+    def test_reads_sidecar_without_loading_file(self, cache_dir: Path) -> None:
+        """cache_meta.json から返し、生 JSON はロードしない"""
+        self._write_meta(
+            cache_dir, name="Sidecar Name", lastModified="2024-02-02T00:00:00Z", version="7"
+        )
+        store = CacheStore(cache_dir)
+
+        metadata = store.get_file_metadata("test123")
+
+        assert metadata is not None
+        assert metadata["name"] == "Sidecar Name"
+        assert metadata["version"] == "7"
+        assert "test123" not in store.files
+
+    def test_falls_back_to_raw_file_for_legacy_meta(self, cache_dir: Path) -> None:
+        """ファイル情報を持たない古いメタデータは生 JSON から補う"""
+        self._write_meta(cache_dir)
+        store = CacheStore(cache_dir)
+
+        metadata = store.get_file_metadata("test123")
+
+        assert metadata == {
+            "name": "Test Design",
+            "lastModified": "2024-01-01T00:00:00Z",
+            "version": "1",
+            "fetch_profile": "full",
+        }
+
+    def test_keeps_recorded_fetch_profile(self, cache_dir: Path) -> None:
+        """記録された取得プロファイルはそのまま返し、ない場合は full とする"""
+        self._write_meta(
+            cache_dir, name="Outline", lastModified=None, version="3", fetch_profile="outline"
+        )
+        metadata = CacheStore(cache_dir).get_file_metadata("test123")
+        assert metadata is not None
+        assert metadata["fetch_profile"] == "outline"
+
+    def test_returns_none_for_missing_file(self, tmp_path: Path) -> None:
+        """キャッシュがない場合は None"""
+        assert CacheStore(tmp_path).get_file_metadata("nonexistent") is None
+
+    def test_reloads_refreshed_metadata(self, cache_dir: Path) -> None:
+        """cached_at_unix が変わると新しいメタデータを返す"""
+        self._write_meta(cache_dir, name="Old", lastModified=None, version="1")
+        store = CacheStore(cache_dir, reload_interval=0)
+        assert store.get_file_metadata("test123") == {
+            "cached_at_unix": 1000.0,
+            "name": "Old",
+            "lastModified": None,
+            "version": "1",
+            "fetch_profile": "full",
+        }
+
+        with open(cache_dir / "test123" / "cache_meta.json", "w") as f:
+            json.dump(
+                {"cached_at_unix": 2000.0, "name": "New", "lastModified": None, "version": "2"}, f
+            )
+
+        metadata = store.get_file_metadata("test123")
+        assert metadata is not None
+        assert metadata["name"] == "New"
+
+
+class TestCacheStoreBinaryIndex:
+    """バイナリ形式のインデックスの読み込みのテスト"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> Path:
+        """生 JSON とバイナリ形式のインデックスを持つキャッシュディレクトリ"""
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir(parents=True)
+        raw_path = file_dir / "file_raw.json"
+        with open(raw_path, "w", encoding="utf-8") as f:
+            json.dump(sample_design_system, f, ensure_ascii=False, indent=2)
+        index = build_index(sample_design_system)
+        index["offsets"] = build_node_offsets(raw_path)
+        save_binary_index(index, tmp_path, "ds")
+        return tmp_path
+
+    def test_detects_binary_index(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """nodes_index.bin があればそれを読み込む"""
+        index = CacheStore(cache_dir).get_index("ds")
+        assert index is not None
+        assert dict(index["by_name"]) == build_index(sample_design_system)["by_name"]
+
+    def test_prefers_binary_over_json(self, cache_dir: Path) -> None:
+        """両方ある場合はバイナリ形式を優先する"""
+        with open(cache_dir / "ds" / "nodes_index.json", "w") as f:
+            json.dump({"by_id": {}, "by_name": {}, "by_frame_title": {}}, f)
+        index = CacheStore(cache_dir).get_index("ds")
+        assert index is not None
+        assert len(index["by_id"]) > 0
+
+    def test_falls_back_to_json_when_corrupt(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """バイナリ形式が壊れていれば nodes_index.json を読む"""
+        (cache_dir / "ds" / "nodes_index.bin").write_bytes(b"broken")
+        with open(cache_dir / "ds" / "nodes_index.json", "w") as f:
+            json.dump(build_index(sample_design_system), f)
+        index = CacheStore(cache_dir).get_index("ds")
+        assert index is not None
+        assert isinstance(index["by_id"], ColumnarNodeTable)
+
+    def test_get_node_uses_binary_offsets(self, cache_dir: Path) -> None:
+        """バイナリ形式のバイト範囲で単一ノードを読み込む"""
+        store = CacheStore(cache_dir)
+        node = store.get_node("ds", "1:2")
+        assert node is not None
+        assert node["id"] == "1:2"
+        assert "ds" not in store.files
+
+    def test_partial_match_on_binary_index(self, cache_dir: Path) -> None:
+        """トライグラムによる部分一致検索も使える"""
+        store = CacheStore(cache_dir)
+        index = store.get_index("ds")
+        assert index is not None
+        expected = [key for key in index["by_name"] if "button" in key.lower()]
+        assert expected
+        assert store.match_partial("ds", index, "by_name", "button") == expected
+
+
+class TestCacheStoreSqliteIndex:
+    """SQLite 形式のインデックスの読み込みのテスト"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> Path:
+        """生 JSON と SQLite 形式のインデックスを持つキャッシュディレクトリ"""
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "file_raw.json", "w", encoding="utf-8") as f:
+            json.dump(sample_design_system, f, ensure_ascii=False, indent=2)
+        save_sqlite_index(sample_design_system, build_index(sample_design_system), tmp_path, "ds")
+        return tmp_path
+
+    def test_detects_sqlite_index(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """nodes_index.sqlite があればそれを読み込む"""
+        index = CacheStore(cache_dir).get_index("ds")
+        assert index is not None
+        assert dict(index["by_name"]) == build_index(sample_design_system)["by_name"]
+
+    def test_prefers_sqlite_over_other_formats(self, cache_dir: Path) -> None:
+        """他の形式のインデックスがあっても SQLite 形式を優先する"""
+        with open(cache_dir / "ds" / "nodes_index.json", "w") as f:
+            json.dump({"by_id": {}, "by_name": {}, "by_frame_title": {}}, f)
+        index = CacheStore(cache_dir).get_index("ds")
+        assert index is not None
+        assert len(index["by_id"]) > 0
+
+    def test_falls_back_to_json_when_corrupt(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """SQLite 形式が壊れていれば nodes_index.json を読む"""
+        (cache_dir / "ds" / "nodes_index.sqlite").write_bytes(b"broken")
+        with open(cache_dir / "ds" / "nodes_index.json", "w") as f:
+            json.dump(build_index(sample_design_system), f)
+        index = CacheStore(cache_dir).get_index("ds")
+        assert index is not None
+        assert isinstance(index["by_id"], ColumnarNodeTable)
+
+    def test_get_node_reads_from_database(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """生 JSON をロードせずに DB からサブツリーを組み立てる"""
+        store = CacheStore(cache_dir)
+        assert store.get_node("ds", "1:2") == build_node_map(sample_design_system)["1:2"]
+        assert store.get_node("ds", "missing") is None
+        assert "ds" not in store.files
+
+    def test_partial_match_without_trigram_file(self, cache_dir: Path) -> None:
+        """部分一致検索は FTS5 で行い、トライグラムインデックスを作らない"""
+        store = CacheStore(cache_dir)
+        index = store.get_index("ds")
+        assert index is not None
+        expected = [key for key in index["by_name"] if "button" in key.lower()]
+        assert expected
+        assert store.match_partial("ds", index, "by_name", "button") == expected
+        assert "trigram_index" not in index
+
+    def test_reloads_when_database_replaced(
+        self, cache_dir: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """DB が置き換えられたら次のアクセスで読み直す"""
+        store = CacheStore(cache_dir, reload_interval=0)
+        first = store.get_index("ds")
+        sqlite_path = cache_dir / "ds" / "nodes_index.sqlite"
+        stat = sqlite_path.stat()
+        os.utime(sqlite_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert store.get_index("ds") is not first
+
+    def test_close_closes_database(self, cache_dir: Path) -> None:
+        """close で DB の接続を閉じ、次のアクセスで開き直す"""
+        store = CacheStore(cache_dir)
+        first = store.get_index("ds")
+        assert first is not None
+        store.close()
+
+        assert "ds" not in store.indexes
+        assert store.stats.current_bytes == 0
+        with pytest.raises(sqlite3.ProgrammingError):
+            len(first["by_id"])
+        second = store.get_index("ds")
+        assert second is not None
+        assert len(second["by_id"]) > 0
+        store.close()
+
+
+class TestCacheStoreCompressedFiles:
+    """圧縮されたキャッシュファイルの読み込みのテスト"""
+
+    @pytest.mark.parametrize("compression", [Compression.GZIP, Compression.LZMA])
+    def test_loads_compressed_files(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any], compression: Compression
+    ) -> None:
+        """圧縮された生 JSON・インデックス・トライグラムを展開して読み込む"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        with create_cache_file(file_dir / "file_raw.json", compression) as f:
+            json.dump(sample_figma_file, f)
+        index = build_index(sample_figma_file)
+        save_index(index, tmp_path, "test123", compression)
+        save_trigram_index(build_trigram_index(index), tmp_path, "test123", compression)
+
+        store = CacheStore(tmp_path)
+        assert store.get_file("test123") == sample_figma_file
+        loaded = store.get_index("test123")
+        assert loaded is not None
+        assert loaded["by_name"] == index["by_name"]
+        assert store.match_partial("test123", loaded, "by_name", "screen") == [
+            "Login Screen",
+            "Sign Up Screen",
+        ]
+        node = store.get_node("test123", "1:2")
+        assert node is not None
+        assert node["name"] == "Primary Button"
+
+    def test_get_node_decodes_only_path(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """オフセットがなくても経路上のノードだけをデコードし、兄弟のページは読まない"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        with create_cache_file(file_dir / "file_raw.json", Compression.GZIP) as f:
+            json.dump(sample_design_system, f)
+        save_index(build_index(sample_design_system), tmp_path, "test123", Compression.GZIP)
+        first_page = sample_design_system["document"]["children"][0]
+        target = first_page["children"][0]
+
+        store = CacheStore(tmp_path)
+        node = store.get_node("test123", target["id"])
+
+        assert node == target
+        assert store.get_node("test123", target["id"]) is node
+        file_data = store.get_file("test123")
+        assert file_data is not None
+        pages = file_data["document"]["children"]
+        assert all(page._members is None for page in pages[1:])  # pyright: ignore[reportPrivateUsage]
+        assert store.get_node("test123", "missing") is None
+
+    def test_get_node_uses_offsets_of_compressed_file(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """圧縮された生 JSON でもインデックスのバイト範囲でビューを辿る"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        raw_path = file_dir / "file_raw.json"
+        with create_cache_file(raw_path, Compression.LZMA) as f:
+            json.dump(sample_design_system, f)
+        index, _ = build_index_from_file(raw_path)
+        save_index(index, tmp_path, "test123")
+        target = sample_design_system["document"]["children"][-1]["children"][0]
+
+        store = CacheStore(tmp_path)
+
+        assert store.get_node("test123", target["id"]) == target
+        assert "test123" in store.files
+        assert store.get_node("test123", "missing") is None
+
+    def test_get_node_with_legacy_path_index(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """parent_id を持たない古いインデックスではファイル全体から探す"""
+        file_dir = tmp_path / "test123"
+        file_dir.mkdir(parents=True)
+        with create_cache_file(file_dir / "file_raw.json", Compression.GZIP) as f:
+            json.dump(sample_figma_file, f)
+        index = build_index(sample_figma_file)
+        for entry in index["by_id"].values():
+            entry.pop("parent_id")
+        save_index(index, tmp_path, "test123")
+
+        store = CacheStore(tmp_path)
+        node = store.get_node("test123", "1:2")
+
+        assert node is not None
+        assert node["name"] == "Primary Button"
+
+
+class TestCacheStoreShardedPages:
+    """ページ単位に分割したキャッシュの読み込みのテスト"""
+
+    def _write_sharded_cache(
+        self,
+        cache_dir: Path,
+        file_data: dict[str, Any],
+        compression: Compression = Compression.NONE,
+    ) -> dict[str, Any]:
+        """シャードに分割したキャッシュを書き出し、インデックスを返す"""
+        file_dir = cache_dir / "test123"
+        file_dir.mkdir(parents=True)
+        raw_path = file_dir / "file_raw.json"
+        with create_cache_file(raw_path, compression) as f:
+            json.dump(file_data, f, ensure_ascii=False, indent=2)
+        index = build_index(file_data)
+        if compression is Compression.NONE:
+            index["offsets"] = build_node_offsets(raw_path)
+        write_page_shards(raw_path, file_dir, compression)
+        raw_path.unlink()
+        save_index(index, cache_dir, "test123")
+        return index
+
+    def test_get_node_reads_only_the_page_shard(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """バイト範囲でシャードから該当ノードだけを読み、ファイル全体はロードしない"""
+        self._write_sharded_cache(tmp_path, sample_design_system)
+        store = CacheStore(tmp_path)
+
+        assert store.has_file("test123")
+        for node_id, node in build_node_map(sample_design_system).items():
+            assert store.get_node("test123", node_id) == node
+        assert store.get_node("test123", "missing") is None
+        assert "test123" in store.files  # ドキュメントのルートだけは全体を組み立てる
+        assert store.pages == {}
+
+    @pytest.mark.parametrize("compression", [Compression.GZIP, Compression.LZMA])
+    def test_get_node_loads_compressed_page(
+        self, tmp_path: Path, sample_design_system: dict[str, Any], compression: Compression
+    ) -> None:
+        """バイト範囲がない場合は該当ページのシャードだけをロードする"""
+        self._write_sharded_cache(tmp_path, sample_design_system, compression)
+        store = CacheStore(tmp_path)
+        second_page = sample_design_system["document"]["children"][1]
+        node_map = build_node_map({"document": second_page})
+        node_id = list(node_map)[-1]
+
+        assert store.get_node("test123", node_id) == node_map[node_id]
+        assert list(store.pages) == [("test123", second_page["id"])]
+        assert "test123" not in store.files
+
+    def test_get_file_assembles_pages(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """get_file はシャードを結合して元のファイルと同じ内容を返す"""
+        self._write_sharded_cache(tmp_path, sample_design_system)
+        store = CacheStore(tmp_path)
+        assert store.get_file("test123") == sample_design_system
+
+    def test_pages_are_evicted_independently(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """ページは個別のエントリとして退避・再ロードされる"""
+        self._write_sharded_cache(tmp_path, sample_design_system, Compression.GZIP)
+        pages = sample_design_system["document"]["children"]
+        store = CacheStore(tmp_path, max_memory=1)
+
+        store.get_node("test123", pages[0]["id"])
+        store.get_node("test123", pages[1]["id"])
+        assert list(store.pages) == [("test123", pages[1]["id"])]
+        assert store.stats.page_evictions == 1
+
+        assert store.get_node("test123", pages[0]["id"]) == pages[0]
+        assert list(store.pages) == [("test123", pages[0]["id"])]
+        assert store.stats.page_evictions == 2
+
+    def test_invalidate_drops_pages(
+        self, tmp_path: Path, sample_design_system: dict[str, Any]
+    ) -> None:
+        """invalidate でロード済みのページも破棄する"""
+        self._write_sharded_cache(tmp_path, sample_design_system, Compression.GZIP)
+        store = CacheStore(tmp_path)
+        store.get_node("test123", sample_design_system["document"]["children"][0]["id"])
+
+        store.invalidate("test123")
+
+        assert store.pages == {}
+        assert store.stats.current_bytes == 0
@@ -0,0 +1,106 @@
+"""cache/trigram モジュールのテスト"""
+
+from typing import Any
+
+import pytest
+
+from yet_another_figma_mcp.cache.index import build_index
+from yet_another_figma_mcp.cache.trigram import (
+    build_postings,
+    build_trigram_index,
+    candidate_ordinals,
+    is_compatible,
+    iter_trigrams,
+)
+
+
+class TestIterTrigrams:
+    """iter_trigrams 関数のテスト"""
+
+    def test_returns_all_trigrams(self) -> None:
+        """3 文字ずつの部分文字列を返す"""
+        assert iter_trigrams("button") == {"but", "utt", "tto", "ton"}
+
+    @pytest.mark.parametrize("text", ["", "a", "ab"])
+    def test_short_text_has_no_trigrams(self, text: str) -> None:
+        """3 文字未満は空"""
+        assert iter_trigrams(text) == set()
+
+
+class TestBuildPostings:
+    """build_postings 関数のテスト"""
+
+    def test_postings_are_sorted_ordinals(self) -> None:
+        """転置リストはキー番号の昇順"""
+        postings = build_postings(["Primary Button", "Icon", "Secondary Button"])
+        assert postings["but"] == [0, 2]
+        assert postings["ico"] == [1]
+
+    def test_postings_are_case_insensitive(self) -> None:
+        """casefold したキーから生成される"""
+        postings = build_postings(["LOGIN", "Straße"])
+        assert "log" in postings
+        assert "LOG" not in postings
+        assert postings["ass"] == [1]
+
+    def test_repeated_trigram_is_listed_once(self) -> None:
+        """同じキー内で繰り返すトライグラムも 1 回だけ登録される"""
+        assert build_postings(["aaaaa"])["aaa"] == [0]
+
+
+class TestCandidateOrdinals:
+    """candidate_ordinals 関数のテスト"""
+
+    @pytest.fixture
+    def postings(self) -> dict[str, list[int]]:
+        """テスト用の転置リスト"""
+        return build_postings(["Primary Button", "Button Group", "Icon Button", "Badge"])
+
+    def test_intersects_postings(self, postings: dict[str, list[int]]) -> None:
+        """全トライグラムを含む候補だけを返す"""
+        assert candidate_ordinals(postings, "button") == [0, 1, 2]
+        assert candidate_ordinals(postings, "icon b") == [2]
+
+    def test_unknown_trigram_returns_empty(self, postings: dict[str, list[int]]) -> None:
+        """存在しないトライグラムを含むと候補なし"""
+        assert candidate_ordinals(postings, "xyz") == []
+
+    def test_short_literal_returns_none(self, postings: dict[str, list[int]]) -> None:
+        """3 文字未満は絞り込めないので None"""
+        assert candidate_ordinals(postings, "bu") is None
+
+    def test_candidates_may_need_verification(self) -> None:
+        """候補はトライグラムを全て含むだけで、部分文字列とは限らない"""
+        postings = build_postings(["abcXbcd"])
+        assert candidate_ordinals(postings, "abcd") == [0]
+
+
+class TestTrigramIndex:
+    """build_trigram_index / is_compatible 関数のテスト"""
+
+    def test_builds_sections(self, sample_design_system: dict[str, Any]) -> None:
+        """by_name と by_frame_title の両方のセクションを生成する"""
+        index = build_index(sample_design_system)
+        trigram_index = build_trigram_index(index)
+        assert trigram_index["by_name"]["key_count"] == len(index["by_name"])
+        assert trigram_index["by_frame_title"]["key_count"] == len(index["by_frame_title"])
+
+    def test_compatible_with_source_index(self, sample_design_system: dict[str, Any]) -> None:
+        """生成元のインデックスとは対応する"""
+        index = build_index(sample_design_system)
+        assert is_compatible(build_trigram_index(index), index)
+
+    def test_incompatible_when_keys_differ(self, sample_design_system: dict[str, Any]) -> None:
+        """キー数が異なるインデックスとは対応しない"""
+        index = build_index(sample_design_system)
+        trigram_index = build_trigram_index(index)
+        index["by_name"]["Brand New Name"] = ["9:9"]
+        assert not is_compatible(trigram_index, index)
+
+    @pytest.mark.parametrize(
+        "trigram_index",
+        [{}, {"version": 0}, {"version": 1, "by_name": [], "by_frame_title": {}}],
+    )
+    def test_incompatible_when_malformed(self, trigram_index: dict[str, Any]) -> None:
+        """形式が異なるものは対応しない"""
+        assert not is_compatible(trigram_index, {"by_name": {}, "by_frame_title": {}})
@@ -2,25 +2,88 @@
 
 # pyright: reportPrivateUsage=false
 
+import asyncio
+import gzip
+import io
 import json
+import sqlite3
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 from unittest.mock import MagicMock, patch
 
 import pytest
 from typer.testing import CliRunner
 
+from yet_another_figma_mcp.cache import CacheStore
+from yet_another_figma_mcp.cache.binary_index import is_binary_index
+from yet_another_figma_mcp.cache.compression import (
+    Compression,
+    detect_compression,
+    read_cache_bytes,
+)
+from yet_another_figma_mcp.cache.generations import resolve_file_dir
+from yet_another_figma_mcp.cache.manifest import hash_cache_file, load_manifest
+from yet_another_figma_mcp.cache.shards import write_page_shards
+from yet_another_figma_mcp.cache.sqlite_index import load_sqlite_index
 from yet_another_figma_mcp.cli import app
 from yet_another_figma_mcp.cli import i18n
 from yet_another_figma_mcp.figma import (
+    FetchProfile,
+    FigmaAPIError,
     FigmaAuthenticationError,
     FigmaFileNotFoundError,
     FigmaRateLimitError,
 )
+from yet_another_figma_mcp.figma.rate_limit import RATE_LIMIT_STATE_NAME, RateLimiter
 
 runner = CliRunner()
 
 
+def respond_with_body(body: bytes) -> Callable[[str, BinaryIO, FetchProfile], int]:
+    """FigmaClient.download_file のモック: レスポンス本文として body を書き込む"""
+
+    def download_file(
+        file_id: str, out: BinaryIO, profile: FetchProfile = FetchProfile.FULL
+    ) -> int:
+        return out.write(body)
+
+    return download_file
+
+
+def respond_with(data: dict[str, Any]) -> Callable[[str, BinaryIO, FetchProfile], int]:
+    """FigmaClient.download_file のモック: レスポンス本文として data の JSON を書き込む"""
+    return respond_with_body(json.dumps(data).encode())
+
+
+class FakeAsyncFigmaClient:
+    """AsyncFigmaClient のモック: 同時に受信中のファイル数の最大値を記録する"""
+
+    def __init__(self, download_file: Callable[[str, BinaryIO, FetchProfile], int]) -> None:
+        self._download_file = download_file
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self) -> "FakeAsyncFigmaClient":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        return None
+
+    async def download_file(
+        self, file_id: str, out: BinaryIO, profile: FetchProfile = FetchProfile.FULL
+    ) -> int:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self._download_file(file_id, out, profile)
+        finally:
+            self.in_flight -= 1
+
+
 @pytest.fixture(autouse=True)
 def reset_language_to_english() -> None:
     """Reset language to English for all tests in this module"""
@@ -90,7 +153,7 @@ class TestCacheCommandSuccess:
         """単一ファイルのキャッシュ"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.return_value = mock_figma_response
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -103,14 +166,15 @@ class TestCacheCommandSuccess:
         assert "Complete" in result.stdout
 
         # ファイルが保存されていることを確認
-        file_path = tmp_path / "abc123" / "file_raw.json"
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        file_path = file_dir / "file_raw.json"
         assert file_path.exists()
         with open(file_path) as f:
             saved_data = json.load(f)
         assert saved_data["name"] == "Test Design"
 
         # インデックスが生成されていることを確認
-        index_path = tmp_path / "abc123" / "nodes_index.json"
+        index_path = file_dir / "nodes_index.json"
         assert index_path.exists()
         with open(index_path) as f:
             index_data = json.load(f)
@@ -118,13 +182,289 @@ class TestCacheCommandSuccess:
         assert "by_name" in index_data
         assert "by_frame_title" in index_data
 
+        # 保存済みファイル内のノードのバイト範囲が記録されていることを確認
+        raw = file_path.read_bytes()
+        start, end = index_data["offsets"]["2:1"]
+        assert json.loads(raw[start:end])["name"] == "Frame 1"
+
+        # 部分一致検索用のトライグラムインデックスが生成されていることを確認
+        trigram_path = file_dir / "trigram_index.json"
+        assert trigram_path.exists()
+        with open(trigram_path) as f:
+            trigram_data = json.load(f)
+        assert trigram_data["by_name"]["key_count"] == len(index_data["by_name"])
+
+    def test_cache_passes_workers_to_build_index(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """--workers がインデックス生成の並列数として渡される"""
+        from yet_another_figma_mcp.cache.index import build_index
+
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch(
+                "yet_another_figma_mcp.cli.cache.build_index", wraps=build_index
+            ) as mock_build_index,
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-w", "2"])
+
+        assert result.exit_code == 0
+        assert mock_build_index.call_args.kwargs["workers"] == 2
+
+    def test_cache_streams_index_without_parsing_file(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """並列化しない場合は file_raw.json をツリーに展開せずにインデックスを生成する"""
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch("yet_another_figma_mcp.cli.cache.build_index") as mock_build_index,
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "Test Design" in result.stdout
+        mock_build_index.assert_not_called()
+        with open(resolve_file_dir(tmp_path, "abc123") / "cache_meta.json") as f:
+            metadata = json.load(f)
+        assert metadata["name"] == "Test Design"
+        assert metadata["node_count"] > 0
+
+    def test_cache_binary_index_format(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """--index-format binary で nodes_index.bin を保存し、古い JSON 形式は削除する"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir(parents=True)
+        (file_dir / "nodes_index.json").write_text("{}")
+
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app,
+                ["cache", "-f", "abc123", "-d", str(tmp_path), "-r", "--index-format", "binary"],
+            )
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        assert is_binary_index((file_dir / "nodes_index.bin").read_bytes())
+        assert not (file_dir / "nodes_index.json").exists()
+
+    def test_cache_sqlite_index_format(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """--index-format sqlite で nodes_index.sqlite を保存し、他の形式とトライグラムは削除する"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir(parents=True)
+        (file_dir / "nodes_index.json").write_text("{}")
+        (file_dir / "trigram_index.json").write_text("{}")
+
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app,
+                ["cache", "-f", "abc123", "-d", str(tmp_path), "-r", "--index-format", "sqlite"],
+            )
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        by_id = load_sqlite_index(file_dir / "nodes_index.sqlite")["by_id"]
+        try:
+            assert len(by_id) > 0
+        finally:
+            by_id.close()
+        assert not (file_dir / "nodes_index.json").exists()
+        assert not (file_dir / "trigram_index.json").exists()
+
+    def test_cache_sqlite_index_write_error(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """SQLite のインデックスを書き出せない場合はそのファイルの失敗として報告する"""
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch(
+                "yet_another_figma_mcp.cache.index.write_sqlite_index",
+                side_effect=sqlite3.OperationalError("no such tokenizer: trigram"),
+            ),
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app,
+                ["cache", "-f", "abc123", "-d", str(tmp_path), "-r", "--index-format", "sqlite"],
+            )
+
+        assert result.exit_code == 1
+        assert result.exception is None or isinstance(result.exception, SystemExit)
+        assert "no such tokenizer" in result.stdout
+        assert list(tmp_path.rglob("*.tmp")) == []
+
+    def test_cache_shard_pages(self, tmp_path: Path, mock_figma_response: dict[str, Any]) -> None:
+        """--shard-pages でページ単位のシャードとルートファイルに分割し、file_raw.json は残さない"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir(parents=True)
+        (file_dir / "file_raw.json").write_text("{}")
+
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-r", "--shard-pages"]
+            )
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        assert not (file_dir / "file_raw.json").exists()
+        assert not (file_dir / "file_raw.json.tmp").exists()
+        assert (file_dir / "file_root.json").exists()
+        page = mock_figma_response["document"]["children"][0]
+        assert json.loads((file_dir / "pages" / "0.json").read_text()) == page
+        store = CacheStore(tmp_path)
+        assert store.get_node("abc123", "2:1") == page["children"][0]
+
+        # 分割しない形式に戻すとシャードは削除される
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client_class.return_value = mock_client
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-r"])
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        assert (file_dir / "file_raw.json").exists()
+        assert not (file_dir / "file_root.json").exists()
+        assert not (file_dir / "pages").exists()
+
+    def test_cache_saves_response_verbatim(self, tmp_path: Path) -> None:
+        """レスポンス本文を整形し直さずにそのまま保存し、ノードのバイト範囲も記録する"""
+        body = (
+            b'{"name":"Compact","document":{"id":"0:0","name":"Document","type":"DOCUMENT",'
+            b'"children":[{"id":"1:1","name":"Page","type":"CANVAS","children":[]}]}}'
+        )
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with_body(body)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        assert (file_dir / "file_raw.json").read_bytes() == body
+        assert not (file_dir / "file_raw.json.tmp").exists()
+        with open(file_dir / "nodes_index.json") as f:
+            offsets = json.load(f)["offsets"]
+        start, end = offsets["1:1"]
+        assert json.loads(body[start:end])["id"] == "1:1"
+
+    def test_cache_rejects_invalid_response(self, tmp_path: Path) -> None:
+        """JSON として読めないレスポンスは失敗とし、既存のキャッシュを残す"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir()
+        (file_dir / "file_raw.json").write_text('{"name": "Old"}')
+
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with_body(b"<html>")
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-r"])
+
+        assert result.exit_code == 1
+        assert resolve_file_dir(tmp_path, "abc123") == file_dir
+        assert (file_dir / "file_raw.json").read_text() == '{"name": "Old"}'
+        assert not (file_dir / "file_raw.json.tmp").exists()
+        # 書きかけの世代は削除される
+        assert not list((tmp_path / ".generations").iterdir())
+
+    @pytest.mark.parametrize("compression", ["gzip", "lzma"])
+    def test_cache_compressed(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any], compression: str
+    ) -> None:
+        """--compression で file_raw.json とインデックスを圧縮し、展開後のバイト範囲を記録する"""
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app,
+                [
+                    "cache",
+                    "-f",
+                    "abc123",
+                    "-d",
+                    str(tmp_path),
+                    "--compression",
+                    compression,
+                    "--compression-level",
+                    "1",
+                ],
+            )
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        for name in ("file_raw.json", "nodes_index.json", "trigram_index.json"):
+            path = file_dir / name
+            assert detect_compression(path.read_bytes()[:8]) == compression
+        raw = read_cache_bytes(file_dir / "file_raw.json")
+        assert json.loads(raw) == mock_figma_response
+        index = json.loads(read_cache_bytes(file_dir / "nodes_index.json"))
+        start, end = index["offsets"]["2:1"]
+        assert json.loads(raw[start:end])["name"] == "Frame 1"
+
+    def test_cache_rejects_invalid_compression_level(self, tmp_path: Path) -> None:
+        """--compression-level は 0-9"""
+        result = runner.invoke(
+            app, ["cache", "-f", "abc123", "-d", str(tmp_path), "--compression-level", "10"]
+        )
+        assert result.exit_code != 0
+
+    def test_cache_rejects_zero_workers(self, tmp_path: Path) -> None:
+        """--workers は 1 以上"""
+        result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-w", "0"])
+        assert result.exit_code != 0
+
     def test_cache_multiple_files(
         self, tmp_path: Path, mock_figma_response: dict[str, Any]
     ) -> None:
         """複数ファイルのキャッシュ"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.return_value = mock_figma_response
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -135,8 +475,8 @@ class TestCacheCommandSuccess:
             )
 
         assert result.exit_code == 0
-        assert (tmp_path / "file1" / "file_raw.json").exists()
-        assert (tmp_path / "file2" / "file_raw.json").exists()
+        assert (resolve_file_dir(tmp_path, "file1") / "file_raw.json").exists()
+        assert (resolve_file_dir(tmp_path, "file2") / "file_raw.json").exists()
 
     def test_cache_shows_progress(
         self, tmp_path: Path, mock_figma_response: dict[str, Any]
@@ -144,7 +484,7 @@ class TestCacheCommandSuccess:
         """複数ファイルキャッシュ時に進捗表示される"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.return_value = mock_figma_response
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -166,7 +506,7 @@ class TestCacheCommandSuccess:
         """キャッシュ時にタイムスタンプを含むメタデータが保存される"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.return_value = mock_figma_response
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -176,7 +516,8 @@ class TestCacheCommandSuccess:
         assert result.exit_code == 0
 
         # メタデータファイルが保存されていることを確認
-        meta_path = tmp_path / "abc123" / "cache_meta.json"
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        meta_path = file_dir / "cache_meta.json"
         assert meta_path.exists()
 
         with open(meta_path) as f:
@@ -190,6 +531,43 @@ class TestCacheCommandSuccess:
         # Unix タイムスタンプ
         assert isinstance(meta["cached_at_unix"], float)
 
+        # ファイル概要と件数が記録されていることを確認
+        assert meta["name"] == "Test Design"
+        assert "lastModified" in meta
+        assert "version" in meta
+        with open(file_dir / "nodes_index.json") as f:
+            index_data = json.load(f)
+        assert meta["node_count"] == len(index_data["by_id"])
+        assert meta["page_count"] == len(index_data["pages"])
+        assert meta["frame_count"] == sum(len(ids) for ids in index_data["by_frame_title"].values())
+
+    def test_cache_updates_manifest(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """キャッシュしたファイルを index.json に記録する"""
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        files = load_manifest(tmp_path)
+        assert files is not None
+        entry = files["abc123"]
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        with open(file_dir / "cache_meta.json") as f:
+            meta = json.load(f)
+        assert entry["name"] == "Test Design"
+        assert entry["node_count"] == meta["node_count"]
+        assert entry["cached_at"] == meta["cached_at"]
+        assert entry["content_hash"] == hash_cache_file(file_dir / "file_raw.json")
+        assert entry["sizes"]["file_raw.json"] == (file_dir / "file_raw.json").stat().st_size
+        assert entry["total_size"] == sum(entry["sizes"].values())
+
     def test_cache_from_file_list(
         self, tmp_path: Path, mock_figma_response: dict[str, Any]
     ) -> None:
@@ -200,7 +578,7 @@ class TestCacheCommandSuccess:
 
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.return_value = mock_figma_response
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -208,9 +586,9 @@ class TestCacheCommandSuccess:
             result = runner.invoke(app, ["cache", "-l", str(file_list), "-d", str(tmp_path)])
 
         assert result.exit_code == 0
-        assert (tmp_path / "file1" / "file_raw.json").exists()
-        assert (tmp_path / "file2" / "file_raw.json").exists()
-        assert (tmp_path / "file3" / "file_raw.json").exists()
+        assert (resolve_file_dir(tmp_path, "file1") / "file_raw.json").exists()
+        assert (resolve_file_dir(tmp_path, "file2") / "file_raw.json").exists()
+        assert (resolve_file_dir(tmp_path, "file3") / "file_raw.json").exists()
 
     def test_skip_cached_file_without_refresh(self, tmp_path: Path) -> None:
         """refresh なしでキャッシュ済みファイルをスキップ"""
@@ -230,7 +608,7 @@ class TestCacheCommandSuccess:
         assert result.exit_code == 0
         assert "Already cached" in result.stdout
         # API は呼ばれない
-        mock_client.get_file.assert_not_called()
+        mock_client.download_file.assert_not_called()
 
     def test_refresh_overwrites_cache(
         self, tmp_path: Path, mock_figma_response: dict[str, Any]
@@ -243,7 +621,7 @@ class TestCacheCommandSuccess:
 
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.return_value = mock_figma_response
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -252,12 +630,506 @@ class TestCacheCommandSuccess:
 
         assert result.exit_code == 0
         # API が呼ばれる
-        mock_client.get_file.assert_called_once()
+        mock_client.download_file.assert_called_once()
         # 新しいデータで上書き
-        with open(cache_dir / "file_raw.json") as f:
+        with open(resolve_file_dir(tmp_path, "abc123") / "file_raw.json") as f:
             data = json.load(f)
         assert data["name"] == "Test Design"
 
+    def test_refresh_switches_generation(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """refresh は新しい世代に書き出してから切り替え、現在と直前の世代だけを残す"""
+        store = CacheStore(tmp_path, reload_interval=3600)
+        generations: list[Path] = []
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            for n in range(3):
+                # 内容が同じなら書き直さないので、毎回バージョンを変える
+                mock_client.download_file.side_effect = respond_with(
+                    {**mock_figma_response, "version": str(n)}
+                )
+                result = runner.invoke(app, ["cache", "-f", "abc123", "-r", "-d", str(tmp_path)])
+                assert result.exit_code == 0
+                generations.append(resolve_file_dir(tmp_path, "abc123"))
+                if len(generations) == 1:
+                    # 稼働中のサーバーが 1 世代目を読み込む
+                    assert store.get_index("abc123") is not None
+
+        assert len(set(generations)) == 3
+        assert not generations[0].exists()
+        assert (generations[1] / "file_raw.json").exists()
+        assert sorted(path.name for path in (tmp_path / ".generations").iterdir()) == sorted(
+            path.parent.name for path in generations[1:]
+        )
+        # 読み込み済みの世代が削除されていれば、現在の世代から読み直す
+        assert store.get_node("abc123", "2:1") is not None
+        assert (tmp_path / ".lock").exists()
+
+    @staticmethod
+    def _refresh(
+        tmp_path: Path,
+        response: dict[str, Any],
+        remote_version: dict[str, Any],
+        *args: str,
+    ) -> tuple[MagicMock, Any]:
+        """--refresh で再取得する (get_file_version は remote_version を返す)"""
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.get_file_version.return_value = remote_version
+            mock_client.download_file.side_effect = respond_with(response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-r", "-d", str(tmp_path), *args])
+        return mock_client, result
+
+    def test_refresh_skips_unchanged_version(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """バージョンと最終更新日時が同じならファイル全体を取得しない"""
+        response = {**mock_figma_response, "version": "42"}
+        self._refresh(tmp_path, response, {})
+        before = resolve_file_dir(tmp_path, "abc123")
+
+        remote = {"name": "Test Design", "version": "42", "lastModified": "2024-01-01T00:00:00Z"}
+        mock_client, result = self._refresh(tmp_path, response, remote)
+
+        assert result.exit_code == 0
+        assert "Unchanged (version 42)" in result.stdout
+        mock_client.get_file_version.assert_called_once_with("abc123")
+        mock_client.download_file.assert_not_called()
+        assert resolve_file_dir(tmp_path, "abc123") == before
+
+    def test_refresh_skips_identical_content(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """取得した内容のハッシュが同じなら生 JSON もインデックスも書き直さない"""
+        self._refresh(tmp_path, mock_figma_response, {})
+        before = resolve_file_dir(tmp_path, "abc123")
+        meta_before = (before / "cache_meta.json").read_text()
+
+        mock_client, result = self._refresh(
+            tmp_path, mock_figma_response, {"version": "new", "lastModified": "2025-01-01"}
+        )
+
+        assert result.exit_code == 0
+        assert "Unchanged" in result.stdout
+        mock_client.download_file.assert_called_once()
+        assert resolve_file_dir(tmp_path, "abc123") == before
+        assert (before / "cache_meta.json").read_text() == meta_before
+        assert [path.name for path in (tmp_path / ".generations").iterdir()] == [before.parent.name]
+
+    def test_refresh_rewrites_when_format_changes(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """保存形式を切り替える場合は内容が同じでも確認せずに書き直す"""
+        response = {**mock_figma_response, "version": "42"}
+        self._refresh(tmp_path, response, {})
+        before = resolve_file_dir(tmp_path, "abc123")
+
+        remote = {"version": "42", "lastModified": "2024-01-01T00:00:00Z"}
+        mock_client, result = self._refresh(tmp_path, response, remote, "--index-format", "binary")
+
+        assert result.exit_code == 0
+        mock_client.get_file_version.assert_not_called()
+        after = resolve_file_dir(tmp_path, "abc123")
+        assert after != before
+        assert (after / "nodes_index.bin").exists()
+
+    def test_records_fetch_profile(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """--profile で取得の詳細度を指定し、メタデータとマニフェストに記録する"""
+        mock_client, result = self._refresh(tmp_path, mock_figma_response, {}, "-p", "outline")
+
+        assert result.exit_code == 0
+        mock_client.download_file.assert_called_once()
+        assert mock_client.download_file.call_args.args[2] is FetchProfile.OUTLINE
+        metadata = json.loads(
+            (resolve_file_dir(tmp_path, "abc123") / "cache_meta.json").read_text()
+        )
+        assert metadata["fetch_profile"] == "outline"
+        files = load_manifest(tmp_path)
+        assert files is not None
+        assert files["abc123"]["fetch_profile"] == "outline"
+
+    def test_refresh_rewrites_when_profile_changes(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """プロファイルを切り替える場合はバージョンが同じでも取得し直す"""
+        response = {**mock_figma_response, "version": "42"}
+        self._refresh(tmp_path, response, {}, "--profile", "outline")
+
+        remote = {"version": "42", "lastModified": "2024-01-01T00:00:00Z"}
+        mock_client, result = self._refresh(tmp_path, response, remote, "--profile", "full")
+
+        assert result.exit_code == 0
+        mock_client.get_file_version.assert_not_called()
+        metadata = json.loads(
+            (resolve_file_dir(tmp_path, "abc123") / "cache_meta.json").read_text()
+        )
+        assert metadata["fetch_profile"] == "full"
+
+    def test_waits_for_lock(self, tmp_path: Path, mock_figma_response: dict[str, Any]) -> None:
+        """他の cache / reindex コマンドがロックを持っていれば、待っている旨を表示する"""
+        from yet_another_figma_mcp.cli import cache as cache_module
+
+        calls: list[Path] = []
+
+        @contextmanager
+        def contended_lock(
+            cache_dir: Path, on_wait: Callable[[], None] | None = None
+        ) -> Generator[None]:
+            calls.append(cache_dir)
+            assert on_wait is not None
+            on_wait()
+            yield
+
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch.object(cache_module, "cache_lock", contended_lock),
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert calls == [tmp_path]
+        assert "Waiting for another cache / reindex command" in result.stdout
+
+
+class TestCacheCommandJobs:
+    """cache コマンドの --jobs (並行取得) のテスト"""
+
+    def test_caches_files_concurrently(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """最大 --jobs 件を並行して取得し、すべてのファイルをキャッシュする"""
+        client = FakeAsyncFigmaClient(respond_with(mock_figma_response))
+        file_ids = ["file1", "file2", "file3", "file4"]
+        args = [arg for fid in file_ids for arg in ("-f", fid)]
+
+        with patch("yet_another_figma_mcp.cli.cache.AsyncFigmaClient", return_value=client):
+            result = runner.invoke(app, ["cache", *args, "-d", str(tmp_path), "--jobs", "2"])
+
+        assert result.exit_code == 0
+        assert client.max_in_flight == 2
+        for fid in file_ids:
+            file_dir = resolve_file_dir(tmp_path, fid)
+            assert (file_dir / "file_raw.json").exists()
+            assert (file_dir / "nodes_index.json").exists()
+        files = load_manifest(tmp_path)
+        assert files is not None
+        assert set(files) == set(file_ids)
+        assert "(4/4)" in result.stdout
+        assert "Cached 4 file(s)" in result.stdout
+
+    def test_summary_counts_failures(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """失敗したファイルがあってもサマリーの件数が正しい"""
+
+        def download_file(
+            file_id: str, out: BinaryIO, profile: FetchProfile = FetchProfile.FULL
+        ) -> int:
+            if file_id == "file2":
+                raise FigmaFileNotFoundError(file_id)
+            if file_id == "file3":
+                raise FigmaAPIError("Connection reset")
+            return respond_with(mock_figma_response)(file_id, out, profile)
+
+        client = FakeAsyncFigmaClient(download_file)
+        with patch("yet_another_figma_mcp.cli.cache.AsyncFigmaClient", return_value=client):
+            result = runner.invoke(
+                app,
+                [
+                    "cache",
+                    "-f",
+                    "file1",
+                    "-f",
+                    "file2",
+                    "-f",
+                    "file3",
+                    "-d",
+                    str(tmp_path),
+                    "-j",
+                    "3",
+                ],
+            )
+
+        assert result.exit_code == 1
+        assert "1 succeeded" in result.stdout
+        assert "2 failed" in result.stdout
+        assert "File not found" in result.stdout
+        assert not resolve_file_dir(tmp_path, "file2").exists()
+        assert not list((tmp_path / ".generations").glob("*/file3"))
+
+    def test_local_errors_do_not_cancel_other_files(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """書き込みの失敗や想定外の例外はそのファイルの失敗として記録し、他のファイルは続ける"""
+
+        def download_file(
+            file_id: str, out: BinaryIO, profile: FetchProfile = FetchProfile.FULL
+        ) -> int:
+            if file_id == "file2":
+                raise OSError(28, "No space left on device")
+            if file_id == "file3":
+                raise RuntimeError("boom")
+            return respond_with(mock_figma_response)(file_id, out, profile)
+
+        client = FakeAsyncFigmaClient(download_file)
+        args = [arg for fid in ("file1", "file2", "file3", "file4") for arg in ("-f", fid)]
+        with patch("yet_another_figma_mcp.cli.cache.AsyncFigmaClient", return_value=client):
+            result = runner.invoke(app, ["cache", *args, "-d", str(tmp_path), "-j", "2"])
+
+        assert result.exit_code == 1
+        assert "2 succeeded" in result.stdout
+        assert "2 failed" in result.stdout
+        assert "No space left on device" in result.stdout
+        assert "Unexpected error" in result.stdout
+        assert (resolve_file_dir(tmp_path, "file4") / "file_raw.json").exists()
+        assert not list((tmp_path / ".generations").glob("*/file2"))
+
+    def test_compresses_after_download(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """受信中は圧縮せず、保存前に --compression の形式で圧縮する"""
+        writers: list[type] = []
+
+        def download_file(
+            file_id: str, out: BinaryIO, profile: FetchProfile = FetchProfile.FULL
+        ) -> int:
+            writers.append(type(out))
+            return respond_with(mock_figma_response)(file_id, out, profile)
+
+        client = FakeAsyncFigmaClient(download_file)
+        with patch("yet_another_figma_mcp.cli.cache.AsyncFigmaClient", return_value=client):
+            result = runner.invoke(
+                app,
+                ["cache", "-f", "file1", "-f", "file2", "-d", str(tmp_path), "-j", "2"]
+                + ["--compression", "gzip"],
+            )
+
+        assert result.exit_code == 0
+        assert writers == [io.BufferedWriter, io.BufferedWriter]
+        for fid in ("file1", "file2"):
+            raw_path = resolve_file_dir(tmp_path, fid) / "file_raw.json"
+            assert detect_compression(raw_path.read_bytes()[:8]) is Compression.GZIP
+            assert json.loads(read_cache_bytes(raw_path)) == mock_figma_response
+
+    def test_single_file_uses_sync_client(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """対象が 1 件なら --jobs を指定しても同期クライアントで取得する"""
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch("yet_another_figma_mcp.cli.cache.AsyncFigmaClient") as mock_async_class,
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-j", "4"])
+
+        assert result.exit_code == 0
+        mock_async_class.assert_not_called()
+
+    def test_shares_rate_limiter_state(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """--requests-per-minute の制限をクライアントに渡し、前回の 429 による一時停止を引き継ぐ"""
+        (tmp_path / RATE_LIMIT_STATE_NAME).write_text(
+            json.dumps({"tat": 0, "paused_until": time.time() + 120})
+        )
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch.object(RateLimiter, "save", autospec=True) as mock_save,
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app,
+                ["cache", "-f", "abc123", "-d", str(tmp_path), "--requests-per-minute", "30"],
+            )
+
+        assert result.exit_code == 0
+        assert "Rate limited by the Figma API" in result.stdout
+        rate_limiter = mock_client_class.call_args.kwargs["rate_limiter"]
+        assert rate_limiter.requests_per_minute == 30
+        assert rate_limiter.paused_for() > 100
+        # 使った枠は終了時にまとめて保存し、次の実行に引き継ぐ
+        mock_save.assert_called_once_with(rate_limiter)
+
+    def test_rejects_zero_jobs(self, tmp_path: Path) -> None:
+        """--jobs は 1 以上"""
+        result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), "-j", "0"])
+        assert result.exit_code != 0
+
+
+class TestCacheCommandNodeId:
+    """cache コマンドの --node-id (ノード単位の部分更新) のテスト"""
+
+    @staticmethod
+    def _cache(tmp_path: Path, response: dict[str, Any], *args: str) -> None:
+        """ファイル全体をキャッシュする"""
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(response)
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), *args])
+        assert result.exit_code == 0
+
+    @staticmethod
+    def _refresh_nodes(tmp_path: Path, nodes: dict[str, Any], *args: str) -> tuple[MagicMock, Any]:
+        """--node-id で部分更新する (get_nodes は nodes を "nodes" として返す)"""
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.get_nodes.return_value = {"name": "Test Design", "nodes": nodes}
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+            result = runner.invoke(app, ["cache", "-f", "abc123", "-d", str(tmp_path), *args])
+        return mock_client, result
+
+    @staticmethod
+    def _updated_frame() -> dict[str, Any]:
+        return {
+            "id": "2:1",
+            "name": "Frame 1 (updated)",
+            "type": "FRAME",
+            "children": [{"id": "3:1", "name": "Label", "type": "TEXT", "characters": "新しい"}],
+        }
+
+    @pytest.mark.parametrize(
+        "cache_args",
+        [
+            [],
+            ["--index-format", "binary"],
+            ["--index-format", "sqlite"],
+            ["--shard-pages", "--compression", "gzip"],
+        ],
+    )
+    def test_splices_node(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any], cache_args: list[str]
+    ) -> None:
+        """指定したノードだけを取得して差し替え、既存キャッシュの保存形式を引き継ぐ"""
+        response = {**mock_figma_response, "version": "42"}
+        self._cache(tmp_path, response, *cache_args)
+        before = resolve_file_dir(tmp_path, "abc123")
+        files_before = sorted(path.name for path in before.iterdir())
+
+        frame = self._updated_frame()
+        mock_client, result = self._refresh_nodes(
+            tmp_path, {"2:1": {"document": frame}}, "--node-id", "2:1"
+        )
+
+        assert result.exit_code == 0, result.stdout
+        assert "1 node(s) refreshed" in result.stdout
+        mock_client.get_nodes.assert_called_once_with("abc123", ["2:1"], profile=FetchProfile.FULL)
+        mock_client.download_file.assert_not_called()
+        after = resolve_file_dir(tmp_path, "abc123")
+        assert after != before
+        assert sorted(path.name for path in after.iterdir()) == files_before
+
+        store = CacheStore(tmp_path)
+        try:
+            assert store.get_node("abc123", "3:1") == frame["children"][0]
+            assert store.get_node("abc123", "2:1") == frame
+            assert store.get_node("abc123", "1:1") is not None
+        finally:
+            store.close()
+        # 次の --refresh でファイル全体の変更を確認するよう、バージョンは引き継ぐ
+        metadata = json.loads((after / "cache_meta.json").read_text())
+        assert metadata["version"] == "42"
+        assert metadata["node_count"] == 4
+
+    def test_nested_node_ids(self, tmp_path: Path, mock_figma_response: dict[str, Any]) -> None:
+        """祖先と子孫を両方指定した場合は祖先のサブツリーで差し替える"""
+        self._cache(tmp_path, mock_figma_response)
+        page = {**mock_figma_response["document"]["children"][0], "name": "Page 1 (updated)"}
+        page["children"] = [self._updated_frame()]
+
+        _, result = self._refresh_nodes(
+            tmp_path,
+            {"1:1": {"document": page}, "2:1": {"document": self._updated_frame()}},
+            "--node-id",
+            "1:1",
+            "--node-id",
+            "2:1",
+        )
+
+        assert result.exit_code == 0, result.stdout
+        raw = json.loads((resolve_file_dir(tmp_path, "abc123") / "file_raw.json").read_text())
+        assert raw["document"]["children"] == [page]
+
+    def test_node_not_found(self, tmp_path: Path, mock_figma_response: dict[str, Any]) -> None:
+        """API がノードを返さない場合は失敗し、キャッシュを変更しない"""
+        self._cache(tmp_path, mock_figma_response)
+        before = resolve_file_dir(tmp_path, "abc123")
+
+        _, result = self._refresh_nodes(tmp_path, {"9:9": None}, "--node-id", "9:9")
+
+        assert result.exit_code == 1
+        assert "Node 9:9 not found" in result.stdout
+        assert resolve_file_dir(tmp_path, "abc123") == before
+        assert [path.name for path in (tmp_path / ".generations").iterdir()] == [before.parent.name]
+
+    def test_node_not_in_cache(self, tmp_path: Path, mock_figma_response: dict[str, Any]) -> None:
+        """キャッシュにないノードは差し込む位置がないため失敗する"""
+        self._cache(tmp_path, mock_figma_response)
+        node = {"id": "9:9", "name": "New", "type": "FRAME"}
+
+        _, result = self._refresh_nodes(tmp_path, {"9:9": {"document": node}}, "--node-id", "9:9")
+
+        assert result.exit_code == 1
+        assert "Node 9:9 is not in the cache" in result.stdout
+
+    def test_rejects_outline_cache(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """outline プロファイルのキャッシュにはサブツリーを差し込まない"""
+        self._cache(tmp_path, mock_figma_response, "--profile", "outline")
+
+        mock_client, result = self._refresh_nodes(tmp_path, {}, "--node-id", "2:1")
+
+        assert result.exit_code == 1
+        assert "outline profile" in result.stdout
+        mock_client.get_nodes.assert_not_called()
+
+    def test_requires_cache(self, tmp_path: Path) -> None:
+        """キャッシュされていないファイルは部分更新できない"""
+        mock_client, result = self._refresh_nodes(tmp_path, {}, "--node-id", "2:1")
+
+        assert result.exit_code == 1
+        assert "Not cached" in result.stdout
+        mock_client.get_nodes.assert_not_called()
+
+    def test_requires_single_file(self, tmp_path: Path) -> None:
+        """複数のファイルを指定した場合はエラー"""
+        _, result = self._refresh_nodes(tmp_path, {}, "-f", "def456", "--node-id", "2:1")
+
+        assert result.exit_code == 1
+        assert "--node-id requires exactly one file ID" in result.stdout
+
 
 class TestCacheCommandErrors:
     """cache コマンドのエラー系テスト"""
@@ -266,7 +1138,7 @@ class TestCacheCommandErrors:
         """認証エラー"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.side_effect = FigmaAuthenticationError()
+            mock_client.download_file.side_effect = FigmaAuthenticationError()
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -280,7 +1152,7 @@ class TestCacheCommandErrors:
         """ファイル未存在エラー"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.side_effect = FigmaFileNotFoundError("abc123")
+            mock_client.download_file.side_effect = FigmaFileNotFoundError("abc123")
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -294,7 +1166,7 @@ class TestCacheCommandErrors:
         """レート制限エラー"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
-            mock_client.get_file.side_effect = FigmaRateLimitError(retry_after=60)
+            mock_client.download_file.side_effect = FigmaRateLimitError(retry_after=60)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -309,11 +1181,46 @@ class TestCacheCommandErrors:
         """一部失敗時のサマリー"""
         with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
             mock_client = MagicMock()
+
             # 1つ目は成功、2つ目は失敗
-            mock_client.get_file.side_effect = [
-                mock_figma_response,
-                FigmaFileNotFoundError("file2"),
-            ]
+            def download_file(
+                file_id: str, out: BinaryIO, profile: FetchProfile = FetchProfile.FULL
+            ) -> int:
+                if file_id == "file2":
+                    raise FigmaFileNotFoundError(file_id)
+                return respond_with(mock_figma_response)(file_id, out, profile)
+
+            mock_client.download_file.side_effect = download_file
+            mock_client.__enter__ = MagicMock(return_value=mock_client)
+            mock_client.__exit__ = MagicMock(return_value=False)
+            mock_client_class.return_value = mock_client
+
+            result = runner.invoke(
+                app,
+                ["cache", "-f", "file1", "-f", "file2", "-d", str(tmp_path)],
+            )
+
+        assert result.exit_code == 1
+        assert "1 succeeded" in result.stdout
+        assert "1 failed" in result.stdout
+
+    def test_publish_failure_continues_with_next_file(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """世代の切り替えに失敗したファイルは失敗として報告し、後のファイルは続けてキャッシュする"""
+        from yet_another_figma_mcp.cache.generations import publish_generation
+
+        def publish(cache_dir: Path, file_id: str, generation: str) -> str | None:
+            if file_id == "file1":
+                raise PermissionError(13, "Permission denied")
+            return publish_generation(cache_dir, file_id, generation)
+
+        with (
+            patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class,
+            patch("yet_another_figma_mcp.cli.cache.publish_generation", side_effect=publish),
+        ):
+            mock_client = MagicMock()
+            mock_client.download_file.side_effect = respond_with(mock_figma_response)
             mock_client.__enter__ = MagicMock(return_value=mock_client)
             mock_client.__exit__ = MagicMock(return_value=False)
             mock_client_class.return_value = mock_client
@@ -324,5 +1231,134 @@ class TestCacheCommandErrors:
             )
 
         assert result.exit_code == 1
+        assert result.exception is None or isinstance(result.exception, SystemExit)
+        assert "Permission denied" in result.stdout
         assert "1 succeeded" in result.stdout
         assert "1 failed" in result.stdout
+        assert (resolve_file_dir(tmp_path, "file2") / "file_raw.json").exists()
+        assert not list((tmp_path / ".generations").glob("*/file1"))
+
+
+class TestReindexCommand:
+    """reindex コマンドのテスト"""
+
+    @pytest.fixture
+    def cached_file(self, tmp_path: Path, mock_figma_response: dict[str, Any]) -> Path:
+        """file_raw.json だけを持つキャッシュディレクトリ"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir()
+        (file_dir / "file_raw.json").write_text(json.dumps(mock_figma_response))
+        return file_dir
+
+    def test_reindex_all_cached_files(self, tmp_path: Path, cached_file: Path) -> None:
+        """API を呼ばずに全キャッシュのインデックスとメタデータを生成する"""
+        with patch("yet_another_figma_mcp.cli.cache.FigmaClient") as mock_client_class:
+            result = runner.invoke(app, ["reindex", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "Reindexed 1 file(s)" in result.stdout
+        mock_client_class.assert_not_called()
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        with open(file_dir / "nodes_index.json") as f:
+            index_data = json.load(f)
+        raw = (file_dir / "file_raw.json").read_bytes()
+        start, end = index_data["offsets"]["2:1"]
+        assert json.loads(raw[start:end])["name"] == "Frame 1"
+        assert (file_dir / "trigram_index.json").exists()
+        with open(file_dir / "cache_meta.json") as f:
+            assert json.load(f)["name"] == "Test Design"
+
+    def test_reindex_keeps_fetch_profile(self, tmp_path: Path, cached_file: Path) -> None:
+        """メタデータに記録した取得プロファイルを引き継ぐ"""
+        (cached_file / "cache_meta.json").write_text(json.dumps({"fetch_profile": "outline"}))
+
+        result = runner.invoke(app, ["reindex", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        metadata = json.loads(
+            (resolve_file_dir(tmp_path, "abc123") / "cache_meta.json").read_text()
+        )
+        assert metadata["fetch_profile"] == "outline"
+
+    def test_reindex_updates_manifest(self, tmp_path: Path, cached_file: Path) -> None:
+        """再生成したファイルのエントリを index.json に記録する"""
+        result = runner.invoke(app, ["reindex", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        files = load_manifest(tmp_path)
+        assert files is not None
+        assert files["abc123"]["name"] == "Test Design"
+        assert files["abc123"]["content_hash"] == hash_cache_file(cached_file / "file_raw.json")
+        assert "nodes_index.json" in files["abc123"]["sizes"]
+
+    def test_reindex_switches_format(self, tmp_path: Path, cached_file: Path) -> None:
+        """--index-format で形式を切り替え、古い形式のファイルを削除する"""
+        (cached_file / "nodes_index.json").write_text("{}")
+
+        result = runner.invoke(
+            app, ["reindex", "-f", "abc123", "-d", str(tmp_path), "--index-format", "sqlite"]
+        )
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        assert len(load_sqlite_index(file_dir / "nodes_index.sqlite")["by_id"]) > 0
+        assert not (file_dir / "nodes_index.json").exists()
+
+    def test_reindex_keeps_compression(
+        self, tmp_path: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """インデックスは file_raw.json と同じ圧縮形式で保存する"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir()
+        (file_dir / "file_raw.json").write_bytes(
+            gzip.compress(json.dumps(mock_figma_response).encode())
+        )
+
+        result = runner.invoke(app, ["reindex", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        file_dir = resolve_file_dir(tmp_path, "abc123")
+        index_bytes = (file_dir / "nodes_index.json").read_bytes()
+        assert detect_compression(index_bytes[:8]) is Compression.GZIP
+        offsets = json.loads(read_cache_bytes(file_dir / "nodes_index.json"))["offsets"]
+        start, end = offsets["2:1"]
+        assert json.loads(read_cache_bytes(file_dir / "file_raw.json")[start:end])["id"] == "2:1"
+
+    def test_reindex_sharded_cache(
+        self, tmp_path: Path, cached_file: Path, mock_figma_response: dict[str, Any]
+    ) -> None:
+        """ページ単位に分割したキャッシュもシャードを結合して再生成する"""
+        raw_path = cached_file / "file_raw.json"
+        write_page_shards(raw_path, cached_file)
+        raw_path.unlink()
+
+        result = runner.invoke(app, ["reindex", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "Test Design" in result.stdout
+        assert not raw_path.exists()
+        assert not (cached_file / "file_raw.json.tmp").exists()
+        store = CacheStore(tmp_path)
+        page = mock_figma_response["document"]["children"][0]
+        assert store.get_node("abc123", "2:1") == page["children"][0]
+
+    def test_reindex_reports_failures(self, tmp_path: Path, cached_file: Path) -> None:
+        """キャッシュがない・壊れているファイルは失敗として数える"""
+        broken_dir = tmp_path / "broken"
+        broken_dir.mkdir()
+        (broken_dir / "file_raw.json").write_text("<html>")
+
+        result = runner.invoke(
+            app, ["reindex", "-f", "abc123", "-f", "broken", "-f", "missing", "-d", str(tmp_path)]
+        )
+
+        assert result.exit_code == 1
+        assert "missing: Not cached" in result.stdout
+        assert "broken: Failed to build index" in result.stdout
+        assert "1 succeeded" in result.stdout
+
+    def test_reindex_without_cache(self, tmp_path: Path) -> None:
+        """キャッシュがなければエラー"""
+        result = runner.invoke(app, ["reindex", "-d", str(tmp_path / "none")])
+        assert result.exit_code == 1
+        assert "No cached files found" in result.stdout
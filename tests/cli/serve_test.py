@@ -4,9 +4,13 @@ import signal
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+import typer
 from typer.testing import CliRunner
 
+from yet_another_figma_mcp.cache.store import DEFAULT_RELOAD_INTERVAL
 from yet_another_figma_mcp.cli import app
+from yet_another_figma_mcp.cli.serve import parse_memory_size
 
 runner = CliRunner()
 
@@ -86,6 +90,90 @@ class TestServeCommand:
         call_kwargs = mock_basic_config.call_args[1]
         assert call_kwargs["level"] == logging.DEBUG
 
+    def test_serve_passes_max_memory(self, tmp_path: Path) -> None:
+        """--max-memory がバイト数に変換されてストア設定に渡される"""
+        with (
+            patch("yet_another_figma_mcp.cli.serve.asyncio.run") as mock_asyncio_run,
+            patch("yet_another_figma_mcp.server.set_cache_dir"),
+            patch("yet_another_figma_mcp.server.set_store_options") as mock_set_store_options,
+        ):
+            mock_asyncio_run.return_value = None
+
+            result = runner.invoke(app, ["serve", "-d", str(tmp_path), "--max-memory", "2GB"])
+
+        assert result.exit_code == 0
+        mock_set_store_options.assert_called_once()
+        assert mock_set_store_options.call_args.kwargs["max_memory"] == 2 * 1024**3
+
+    def test_serve_without_max_memory_is_unbounded(self, tmp_path: Path) -> None:
+        """--max-memory 未指定時は上限なし"""
+        with (
+            patch("yet_another_figma_mcp.cli.serve.asyncio.run") as mock_asyncio_run,
+            patch("yet_another_figma_mcp.server.set_cache_dir"),
+            patch("yet_another_figma_mcp.server.set_store_options") as mock_set_store_options,
+        ):
+            mock_asyncio_run.return_value = None
+
+            result = runner.invoke(app, ["serve", "-d", str(tmp_path)])
+
+        assert result.exit_code == 0
+        mock_set_store_options.assert_called_once_with(
+            max_memory=None, reload_interval=DEFAULT_RELOAD_INTERVAL
+        )
+
+    def test_serve_passes_reload_interval(self, tmp_path: Path) -> None:
+        """--reload-interval がストア設定に渡される"""
+        with (
+            patch("yet_another_figma_mcp.cli.serve.asyncio.run") as mock_asyncio_run,
+            patch("yet_another_figma_mcp.server.set_cache_dir"),
+            patch("yet_another_figma_mcp.server.set_store_options") as mock_set_store_options,
+        ):
+            mock_asyncio_run.return_value = None
+
+            result = runner.invoke(app, ["serve", "-d", str(tmp_path), "--reload-interval", "30"])
+
+        assert result.exit_code == 0
+        assert mock_set_store_options.call_args.kwargs["reload_interval"] == 30.0
+
+    def test_serve_rejects_invalid_max_memory(self, tmp_path: Path) -> None:
+        """解釈できないサイズ指定はエラー"""
+        with patch("yet_another_figma_mcp.cli.serve.asyncio.run") as mock_asyncio_run:
+            result = runner.invoke(app, ["serve", "-d", str(tmp_path), "--max-memory", "lots"])
+
+        assert result.exit_code != 0
+        mock_asyncio_run.assert_not_called()
+
+
+class TestParseMemorySize:
+    """parse_memory_size 関数のテスト"""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            ("1024", 1024),
+            ("512B", 512),
+            ("64K", 64 * 1024),
+            ("512MB", 512 * 1024**2),
+            ("512MiB", 512 * 1024**2),
+            ("2GB", 2 * 1024**3),
+            ("1.5g", int(1.5 * 1024**3)),
+            (" 1 TB ", 1024**4),
+        ],
+    )
+    def test_parses_sizes(self, value: str, expected: int) -> None:
+        """単位付きのサイズ指定をバイト数に変換する"""
+        assert parse_memory_size(value) == expected
+
+    def test_none_is_unbounded(self) -> None:
+        """未指定は None"""
+        assert parse_memory_size(None) is None
+
+    @pytest.mark.parametrize("value", ["", "GB", "2XB", "-1GB", "two"])
+    def test_rejects_invalid(self, value: str) -> None:
+        """解釈できない形式は BadParameter"""
+        with pytest.raises(typer.BadParameter):
+            parse_memory_size(value)
+
 
 class TestServeCommandSignalHandling:
     """serve コマンドのシグナルハンドリングテスト"""
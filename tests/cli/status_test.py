@@ -7,7 +7,15 @@ from typing import Any
 import pytest
 from typer.testing import CliRunner
 
-from yet_another_figma_mcp.cache.index import build_index
+from yet_another_figma_mcp.cache.compression import Compression, create_cache_file
+from yet_another_figma_mcp.cache.index import (
+    build_index,
+    save_binary_index,
+    save_index,
+    save_sqlite_index,
+)
+from yet_another_figma_mcp.cache.manifest import load_manifest, write_manifest
+from yet_another_figma_mcp.cache.shards import write_page_shards
 from yet_another_figma_mcp.cli import app
 from yet_another_figma_mcp.cli import i18n
 
@@ -179,6 +187,77 @@ class TestStatusCommand:
         assert data[0]["file_id"] == "noindex"
         assert data[0]["node_count"] == 0
 
+    def test_status_counts_nodes_of_binary_index(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """バイナリ形式のインデックスからもノード数を取得する"""
+        file_dir = tmp_path / "binary"
+        file_dir.mkdir(parents=True)
+
+        with open(file_dir / "file_raw.json", "w") as f:
+            json.dump(sample_figma_file, f)
+        index = build_index(sample_figma_file)
+        save_binary_index(index, tmp_path, "binary")
+
+        result = runner.invoke(app, ["status", "--cache-dir", str(tmp_path), "--json"])
+
+        data = json.loads(result.output)
+        assert data[0]["node_count"] == len(index["by_id"])
+
+    def test_status_counts_nodes_of_sqlite_index(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """SQLite 形式のインデックスからもノード数を取得する"""
+        file_dir = tmp_path / "sqlite"
+        file_dir.mkdir(parents=True)
+
+        with open(file_dir / "file_raw.json", "w") as f:
+            json.dump(sample_figma_file, f)
+        index = build_index(sample_figma_file)
+        save_sqlite_index(sample_figma_file, index, tmp_path, "sqlite")
+
+        result = runner.invoke(app, ["status", "--cache-dir", str(tmp_path), "--json"])
+
+        data = json.loads(result.output)
+        assert data[0]["node_count"] == len(index["by_id"])
+
+    def test_status_reads_compressed_cache(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """圧縮された file_raw.json とインデックスも読み込む"""
+        file_dir = tmp_path / "compressed"
+        file_dir.mkdir(parents=True)
+
+        with create_cache_file(file_dir / "file_raw.json", Compression.GZIP) as f:
+            json.dump(sample_figma_file, f)
+        index = build_index(sample_figma_file)
+        save_index(index, tmp_path, "compressed", Compression.LZMA)
+
+        result = runner.invoke(app, ["status", "--cache-dir", str(tmp_path), "--json"])
+
+        data = json.loads(result.output)
+        assert data[0]["name"] == sample_figma_file["name"]
+        assert data[0]["node_count"] == len(index["by_id"])
+
+    def test_status_reads_sharded_cache(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """ページ単位に分割したキャッシュはルートファイルからファイル名を読む"""
+        file_dir = tmp_path / "sharded"
+        file_dir.mkdir(parents=True)
+        raw_path = file_dir / "file_raw.json"
+        raw_path.write_text(json.dumps(sample_figma_file))
+        write_page_shards(raw_path, file_dir)
+        raw_path.unlink()
+        index = build_index(sample_figma_file)
+        save_index(index, tmp_path, "sharded")
+
+        result = runner.invoke(app, ["status", "--cache-dir", str(tmp_path), "--json"])
+
+        data = json.loads(result.output)
+        assert data[0]["name"] == sample_figma_file["name"]
+        assert data[0]["node_count"] == len(index["by_id"])
+
     def test_status_handles_missing_meta(
         self, tmp_path: Path, sample_figma_file: dict[str, Any]
     ) -> None:
@@ -347,3 +426,67 @@ class TestStatusCommand:
         assert "abc123" in result.output
         # 不正な日時はそのまま表示される
         assert "not-a-valid-date" in result.output
+
+    def test_status_reads_manifest_only(self, tmp_path: Path) -> None:
+        """index.json があれば各ファイルのキャッシュは開かずに一覧を表示する"""
+        file_dir = tmp_path / "abc123"
+        file_dir.mkdir()
+        (file_dir / "file_raw.json").write_text("broken")
+        write_manifest(
+            tmp_path,
+            {
+                "abc123": {
+                    "name": "From Manifest",
+                    "cached_at": "2024-01-15T10:00:00+00:00",
+                    "node_count": 7,
+                    "total_size": 2048,
+                }
+            },
+        )
+
+        result = runner.invoke(app, ["status", "--cache-dir", str(tmp_path), "--json"])
+
+        assert result.exit_code == 0
+        assert json.loads(result.output) == [
+            {
+                "file_id": "abc123",
+                "name": "From Manifest",
+                "cached_at": "2024-01-15T10:00:00+00:00",
+                "node_count": 7,
+                "total_size": 2048,
+            }
+        ]
+
+    def test_status_shows_size(self, tmp_path: Path) -> None:
+        """テーブル出力にキャッシュのサイズを表示する"""
+        write_manifest(
+            tmp_path,
+            {
+                "abc123": {
+                    "name": "Sized",
+                    "cached_at": "2024-01-15T10:00:00+00:00",
+                    "node_count": 1,
+                    "total_size": 3 * 1024 * 1024,
+                }
+            },
+        )
+
+        result = runner.invoke(app, ["status", "--cache-dir", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "3.0 MB" in result.output
+
+    def test_status_rebuild_manifest(self, cache_with_files: Path) -> None:
+        """--rebuild-manifest でディスク上のキャッシュから index.json を作り直す"""
+        write_manifest(cache_with_files, {"stale": {"name": "Stale"}})
+
+        result = runner.invoke(
+            app, ["status", "--cache-dir", str(cache_with_files), "--rebuild-manifest", "--json"]
+        )
+
+        assert result.exit_code == 0
+        assert {item["file_id"] for item in json.loads(result.output)} == {"abc123", "xyz789"}
+        files = load_manifest(cache_with_files)
+        assert files is not None
+        assert set(files) == {"abc123", "xyz789"}
+        assert files["abc123"]["content_hash"].startswith("sha256:")
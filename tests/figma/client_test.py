@@ -3,8 +3,12 @@
 # pyright: reportPrivateUsage=false
 # ruff: noqa: S105, S106  # Test tokens are not real secrets
 
+import io
 import platform
-from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from collections.abc import Callable, Generator
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import httpx
@@ -13,12 +17,15 @@ import pytest
 from yet_another_figma_mcp import __version__
 from yet_another_figma_mcp.cache import InvalidFileIdError
 from yet_another_figma_mcp.figma import (
+    AsyncFigmaClient,
+    FetchProfile,
     FigmaAPIError,
     FigmaAuthenticationError,
     FigmaClient,
     FigmaFileNotFoundError,
     FigmaRateLimitError,
     FigmaServerError,
+    RateLimiter,
 )
 from yet_another_figma_mcp.figma.client import build_user_agent
 
@@ -125,13 +132,23 @@ class TestFigmaClientParseRetryAfterHeader:
         result = FigmaClient._parse_retry_after_header(response)
         assert result is None
 
-    def test_parse_http_date_returns_none(self) -> None:
-        """HTTP-date 形式は未サポートで None を返す"""
+    def test_parse_http_date(self) -> None:
+        """HTTP-date 形式は現在時刻からの秒数に変換する"""
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=90)
+        response = MagicMock(spec=httpx.Response)
+        response.headers = {"Retry-After": format_datetime(retry_at, usegmt=True)}
+
+        result = FigmaClient._parse_retry_after_header(response)
+        assert result is not None
+        assert 88 <= result <= 91
+
+    def test_parse_past_http_date_returns_zero(self) -> None:
+        """過去の HTTP-date は 0 秒"""
         response = MagicMock(spec=httpx.Response)
         response.headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
 
         result = FigmaClient._parse_retry_after_header(response)
-        assert result is None
+        assert result == 0
 
     def test_parse_invalid_value_returns_none(self) -> None:
         """無効な値は None を返す"""
@@ -262,9 +279,32 @@ class TestFigmaClientGetFile:
             result = client.get_file("file123")
 
             assert result["name"] == "Test File"
-            mock_request.assert_called_once_with("GET", "/files/file123", file_id="file123")
+            mock_request.assert_called_once_with(
+                "GET", "/files/file123", file_id="file123", params={}
+            )
             client.close()
 
+    @pytest.mark.parametrize(
+        ("profile", "expected"),
+        [
+            (FetchProfile.OUTLINE, {"depth": "2"}),
+            (FetchProfile.FULL, {}),
+            (FetchProfile.FULL_GEOMETRY, {"geometry": "paths"}),
+        ],
+    )
+    def test_fetch_profile_params(self, profile: FetchProfile, expected: dict[str, str]) -> None:
+        """プロファイルに応じたクエリを付けて取得する"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert dict(request.url.params) == expected
+            return httpx.Response(200, content=b'{"name":"Test"}')
+
+        with TestFigmaClientDownloadFile._client_with_transport(handler) as client:
+            assert client.get_file("file123", profile) == {"name": "Test"}
+            out = io.BytesIO()
+            client.download_file("file123", out, profile)
+            assert out.getvalue() == b'{"name":"Test"}'
+
     def test_get_file_validates_file_id(self) -> None:
         """file_id のバリデーション"""
         client = FigmaClient(token="test-token")
@@ -281,6 +321,133 @@ class TestFigmaClientGetFile:
         client.close()
 
 
+class TestFigmaClientDownloadFile:
+    """download_file メソッドのテスト"""
+
+    @staticmethod
+    def _client_with_transport(
+        handler: Callable[[httpx.Request], httpx.Response], **kwargs: Any
+    ) -> FigmaClient:
+        """MockTransport でレスポンスを返すクライアント"""
+        client = FigmaClient(token="test-token", **kwargs)
+        client._client.close()
+        client._client = httpx.Client(
+            base_url=FigmaClient.BASE_URL, transport=httpx.MockTransport(handler)
+        )
+        return client
+
+    def test_writes_body_verbatim(self) -> None:
+        """レスポンス本文をパースせずにそのまま書き込む"""
+        body = b'{"name":"Test File","document":{"id":"0:0"}}'
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/files/file123"
+            return httpx.Response(200, content=body)
+
+        out = io.BytesIO()
+        with self._client_with_transport(handler) as client:
+            written = client.download_file("file123", out)
+
+        assert out.getvalue() == body
+        assert written == len(body)
+
+    def test_retries_then_streams(self) -> None:
+        """リトライ対象のエラー後に成功すれば本文を書き込む"""
+        responses = iter([httpx.Response(503), httpx.Response(200, content=b'{"name":"Test"}')])
+
+        out = io.BytesIO()
+        with self._client_with_transport(
+            lambda request: next(responses), max_retries=2, retry_base_delay=0.01
+        ) as client:
+            client.download_file("file123", out)
+
+        assert out.getvalue() == b'{"name":"Test"}'
+
+    def test_error_status_raises(self) -> None:
+        """エラーレスポンスは例外にし、本文を書き込まない"""
+        out = io.BytesIO()
+        with self._client_with_transport(lambda request: httpx.Response(404)) as client:
+            with pytest.raises(FigmaFileNotFoundError):
+                client.download_file("file123", out)
+
+        assert out.getvalue() == b""
+
+    def test_validates_file_id(self) -> None:
+        """file_id のバリデーション"""
+        with FigmaClient(token="test-token") as client:
+            with pytest.raises(InvalidFileIdError):
+                client.download_file("../etc/passwd", io.BytesIO())
+
+
+class TestFigmaClientGetFileVersion:
+    """get_file_version メソッドのテスト"""
+
+    def test_requests_minimal_depth(self) -> None:
+        """ドキュメントツリーを 1 階層に絞って取得し、バージョンの項目だけを返す"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/files/file123"
+            assert request.url.params["depth"] == "1"
+            return httpx.Response(
+                200,
+                json={
+                    "name": "Test",
+                    "version": "42",
+                    "lastModified": "2024-01-01T00:00:00Z",
+                    "document": {"id": "0:0", "children": []},
+                },
+            )
+
+        with TestFigmaClientDownloadFile._client_with_transport(handler) as client:
+            result = client.get_file_version("file123")
+
+        assert result == {"name": "Test", "version": "42", "lastModified": "2024-01-01T00:00:00Z"}
+
+    def test_invalid_response(self) -> None:
+        """JSON オブジェクトでないレスポンスは FigmaAPIError"""
+        with TestFigmaClientDownloadFile._client_with_transport(
+            lambda request: httpx.Response(200, content=b"[]")
+        ) as client:
+            with pytest.raises(FigmaAPIError):
+                client.get_file_version("file123")
+
+
+class TestFigmaClientGetNodes:
+    """get_nodes メソッドのテスト"""
+
+    def test_requests_selected_nodes(self) -> None:
+        """ID をカンマ区切りで指定し、レスポンスをそのまま返す"""
+        body = {"name": "Test", "nodes": {"1:2": {"document": {"id": "1:2"}}, "3:4": None}}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/files/file123/nodes"
+            assert request.url.params["ids"] == "1:2,3:4"
+            assert request.url.params["depth"] == "2"
+            return httpx.Response(200, json=body)
+
+        with TestFigmaClientDownloadFile._client_with_transport(handler) as client:
+            assert client.get_nodes("file123", ["1:2", "3:4"], depth=2) == body
+
+    def test_omits_depth_by_default(self) -> None:
+        """depth を指定しなければサブツリー全体を取得する"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert "depth" not in request.url.params
+            return httpx.Response(200, json={"nodes": {}})
+
+        with TestFigmaClientDownloadFile._client_with_transport(handler) as client:
+            client.get_nodes("file123", ["1:2"])
+
+    @pytest.mark.parametrize("ids", [[], ["1:2,3:4"], [""]])
+    def test_invalid_ids(self, ids: list[str]) -> None:
+        """空の ID 一覧や、カンマを含む ID は送らない"""
+        with TestFigmaClientDownloadFile._client_with_transport(
+            lambda request: httpx.Response(200, json={})
+        ) as client:
+            with pytest.raises(ValueError):
+                client.get_nodes("file123", ids)
+
+
 class TestFigmaClientRetry:
     """リトライロジックのテスト"""
 
@@ -356,6 +523,168 @@ class TestFigmaClientRetry:
                 assert mock_request.call_count == 2
 
 
+class TestFigmaClientRateLimiter:
+    """RateLimiter を共有するクライアントのテスト"""
+
+    def test_reserves_before_each_request(self) -> None:
+        """リクエストごとに送信枠を予約し、返された秒数だけ待つ"""
+        limiter = RateLimiter(60, burst=1)
+        client = TestFigmaClientDownloadFile._client_with_transport(
+            lambda request: httpx.Response(200, json={"name": "Test"}), rate_limiter=limiter
+        )
+        with client, patch("yet_another_figma_mcp.figma.client.time.sleep") as mock_sleep:
+            client.get_file("file1")
+            client.get_file("file2")
+
+        mock_sleep.assert_called_once()
+        assert 0.9 <= mock_sleep.call_args.args[0] <= 1.0
+
+    def test_429_pauses_shared_limiter(self) -> None:
+        """Retry-After 付きの 429 は共有している他のリクエストもまとめて待たせる"""
+        limiter = RateLimiter()
+        responses = iter(
+            [
+                httpx.Response(429, headers={"Retry-After": "30"}),
+                httpx.Response(200, json={"name": "Test"}),
+            ]
+        )
+        client = TestFigmaClientDownloadFile._client_with_transport(
+            lambda request: next(responses), max_retries=1, rate_limiter=limiter
+        )
+        with client, patch("yet_another_figma_mcp.figma.client.time.sleep") as mock_sleep:
+            assert client.get_file("file1") == {"name": "Test"}
+
+        # リトライ前の待機は RateLimiter の予約による 1 回だけ
+        mock_sleep.assert_called_once()
+        assert 29 <= mock_sleep.call_args.args[0] <= 30
+        # 同じ RateLimiter を使う他のクライアントも一時停止の終わりまで待つ
+        assert 29 <= limiter.reserve() <= 30
+
+    def test_429_without_retries_still_pauses(self) -> None:
+        """リトライ回数を超えた 429 でも一時停止は共有する"""
+        limiter = RateLimiter()
+        client = TestFigmaClientDownloadFile._client_with_transport(
+            lambda request: httpx.Response(429, headers={"Retry-After": "30"}),
+            max_retries=0,
+            rate_limiter=limiter,
+        )
+        with client, pytest.raises(FigmaRateLimitError):
+            client.get_file("file1")
+
+        assert limiter.paused_for() > 29
+
+
+class TestAsyncFigmaClient:
+    """AsyncFigmaClient のテスト"""
+
+    @staticmethod
+    def _client_with_transport(
+        handler: Callable[[httpx.Request], httpx.Response], **kwargs: Any
+    ) -> AsyncFigmaClient:
+        """MockTransport でレスポンスを返すクライアント"""
+        client = AsyncFigmaClient(token="test-token", **kwargs)
+        client._client = httpx.AsyncClient(
+            base_url=AsyncFigmaClient.BASE_URL, transport=httpx.MockTransport(handler)
+        )
+        return client
+
+    def test_sets_same_headers(self) -> None:
+        """FigmaClient と同じヘッダーを送る"""
+        client = AsyncFigmaClient(token="test-token")
+        assert client._client.headers["X-Figma-Token"] == "test-token"
+        assert client._client.headers["User-Agent"] == build_user_agent()
+
+    async def test_get_file(self) -> None:
+        """ファイルを取得してパースする"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/files/file123"
+            return httpx.Response(200, json={"name": "Test File"})
+
+        async with self._client_with_transport(handler) as client:
+            assert await client.get_file("file123") == {"name": "Test File"}
+
+    async def test_get_file_version(self) -> None:
+        """ドキュメントツリーを 1 階層に絞ってバージョンを取得する"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.params["depth"] == "1"
+            return httpx.Response(200, json={"version": "42", "lastModified": "2024"})
+
+        async with self._client_with_transport(handler) as client:
+            result = await client.get_file_version("file123")
+
+        assert result == {"name": None, "version": "42", "lastModified": "2024"}
+
+    async def test_get_nodes(self) -> None:
+        """指定したノードだけを取得する"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/files/file123/nodes"
+            assert request.url.params["ids"] == "1:2"
+            return httpx.Response(200, json={"nodes": {"1:2": None}})
+
+        async with self._client_with_transport(handler) as client:
+            assert await client.get_nodes("file123", ["1:2"]) == {"nodes": {"1:2": None}}
+
+    async def test_download_retries_then_streams(self) -> None:
+        """リトライ対象のエラー後に成功すれば本文をそのまま書き込む"""
+        responses = iter([httpx.Response(503), httpx.Response(200, content=b'{"name":"Test"}')])
+
+        out = io.BytesIO()
+        async with self._client_with_transport(
+            lambda request: next(responses), max_retries=2, retry_base_delay=0.01
+        ) as client:
+            written = await client.download_file("file123", out)
+
+        assert out.getvalue() == b'{"name":"Test"}'
+        assert written == len(out.getvalue())
+
+    @pytest.mark.parametrize(
+        ("status_code", "error_class"),
+        [
+            (403, FigmaAuthenticationError),
+            (404, FigmaFileNotFoundError),
+            (429, FigmaRateLimitError),
+            (500, FigmaServerError),
+        ],
+    )
+    async def test_maps_errors_like_sync_client(
+        self, status_code: int, error_class: type[FigmaAPIError]
+    ) -> None:
+        """エラーレスポンスは FigmaClient と同じ例外にし、本文を書き込まない"""
+        out = io.BytesIO()
+        async with self._client_with_transport(
+            lambda request: httpx.Response(status_code), max_retries=0
+        ) as client:
+            with pytest.raises(error_class):
+                await client.download_file("file123", out)
+
+        assert out.getvalue() == b""
+
+    async def test_retry_exhausted_on_timeout(self) -> None:
+        """タイムアウトが続けばリトライ後に FigmaAPIError"""
+        calls: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            raise httpx.ReadTimeout("Timeout", request=request)
+
+        async with self._client_with_transport(
+            handler, max_retries=1, retry_base_delay=0.01
+        ) as client:
+            with pytest.raises(FigmaAPIError, match="timed out after 2 attempts"):
+                await client.get_file("file123")
+
+        assert len(calls) == 2
+
+    async def test_validates_file_id(self) -> None:
+        """file_id のバリデーション"""
+        async with AsyncFigmaClient(token="test-token") as client:
+            with pytest.raises(InvalidFileIdError):
+                await client.download_file("../etc/passwd", io.BytesIO())
+
+
 class TestFigmaExceptions:
     """例外クラスのテスト"""
 
@@ -0,0 +1,143 @@
+"""figma/rate_limit モジュールのテスト"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from yet_another_figma_mcp.figma.rate_limit import RATE_LIMIT_STATE_NAME, RateLimiter
+
+
+class FakeClock:
+    """進めた分だけ時刻が変わる時計"""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimiter:
+    """RateLimiter クラスのテスト"""
+
+    def test_allows_burst_then_spaces_requests(self) -> None:
+        """容量分は待たずに送り、その後は 1 分あたりの上限から決まる間隔を空ける"""
+        limiter = RateLimiter(60, burst=2, clock=FakeClock())
+
+        assert [limiter.reserve() for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+
+    def test_refills_over_time(self) -> None:
+        """時間が経てば枠が補充される"""
+        clock = FakeClock()
+        limiter = RateLimiter(30, burst=1, clock=clock)
+
+        assert limiter.reserve() == 0.0
+        clock.now += 2.0
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == 2.0
+
+    def test_unlimited(self) -> None:
+        """上限を指定しなければ待たない"""
+        limiter = RateLimiter(clock=FakeClock())
+        assert [limiter.reserve() for _ in range(100)] == [0.0] * 100
+
+    def test_pause_delays_all_reservations(self) -> None:
+        """一時停止中の予約は終了時刻まで待ち、再開後は間隔を空けて送る"""
+        limiter = RateLimiter(60, burst=5, clock=FakeClock())
+
+        limiter.pause(30)
+
+        assert limiter.paused_for() == 30.0
+        assert [limiter.reserve() for _ in range(3)] == [30.0, 31.0, 32.0]
+
+    def test_shorter_pause_does_not_shorten(self) -> None:
+        """短い一時停止で既存の一時停止を縮めない"""
+        limiter = RateLimiter(clock=FakeClock())
+
+        limiter.pause(30)
+        limiter.pause(5)
+
+        assert limiter.reserve() == 30.0
+
+    def test_rejects_invalid_settings(self) -> None:
+        """1 分あたりの上限と容量は正の値"""
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+        with pytest.raises(ValueError):
+            RateLimiter(60, burst=0)
+
+
+class TestRateLimiterState:
+    """状態ファイルの保存と引き継ぎのテスト"""
+
+    def test_next_run_shares_budget(self, tmp_path: Path) -> None:
+        """続けて作成した RateLimiter は使い切った枠を引き継ぐ"""
+        clock = FakeClock()
+        state_path = tmp_path / RATE_LIMIT_STATE_NAME
+        first = RateLimiter(60, burst=2, state_path=state_path, clock=clock)
+        first.reserve()
+        first.reserve()
+        first.save()
+
+        second = RateLimiter(60, burst=2, state_path=state_path, clock=clock)
+
+        assert second.reserve() == 1.0
+
+    def test_reserve_does_not_write_state(self, tmp_path: Path) -> None:
+        """予約のたびには状態ファイルを書かず、save で書く"""
+        state_path = tmp_path / RATE_LIMIT_STATE_NAME
+        limiter = RateLimiter(60, state_path=state_path, clock=FakeClock())
+
+        limiter.reserve()
+        assert not state_path.exists()
+
+        limiter.save()
+        assert json.loads(state_path.read_text())["tat"] > 0
+
+    def test_save_keeps_later_state_of_other_process(self, tmp_path: Path) -> None:
+        """別のプロセスが保存したより遅い時刻は巻き戻さない"""
+        clock = FakeClock()
+        state_path = tmp_path / RATE_LIMIT_STATE_NAME
+        limiter = RateLimiter(60, state_path=state_path, clock=clock)
+        other = {"tat": clock.now + 30, "paused_until": clock.now + 10}
+        state_path.write_text(json.dumps(other))
+
+        limiter.reserve()
+        limiter.save()
+
+        assert json.loads(state_path.read_text()) == other
+
+    def test_next_run_keeps_pause(self, tmp_path: Path) -> None:
+        """429 による一時停止を引き継ぐ"""
+        clock = FakeClock()
+        state_path = tmp_path / RATE_LIMIT_STATE_NAME
+        RateLimiter(state_path=state_path, clock=clock).pause(60)
+        clock.now += 20
+
+        limiter = RateLimiter(60, state_path=state_path, clock=clock)
+
+        assert limiter.paused_for() == 40.0
+        assert limiter.reserve() == 40.0
+
+    def test_caps_carried_over_reservations(self, tmp_path: Path) -> None:
+        """引き継ぐ予約は満杯のバケット 1 つ分まで"""
+        clock = FakeClock()
+        state_path = tmp_path / RATE_LIMIT_STATE_NAME
+        state_path.write_text(json.dumps({"tat": clock.now + 3600, "paused_until": 0}))
+
+        limiter = RateLimiter(60, burst=1, state_path=state_path, clock=clock)
+
+        assert limiter.reserve() == 1.0
+
+    @pytest.mark.parametrize("content", ["not json", "[]", '{"tat": "soon"}'])
+    def test_ignores_invalid_state(self, tmp_path: Path, content: str) -> None:
+        """読めない・不正な状態ファイルは無視する"""
+        state_path = tmp_path / RATE_LIMIT_STATE_NAME
+        state_path.write_text(content)
+
+        limiter = RateLimiter(60, state_path=state_path, clock=FakeClock())
+
+        assert limiter.reserve() == 0.0
+        limiter.save()
+        assert json.loads(state_path.read_text())["tat"] > 0
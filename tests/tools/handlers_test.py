@@ -6,7 +6,14 @@ from typing import Any
 
 import pytest
 
-from yet_another_figma_mcp.cache.index import build_index
+from yet_another_figma_mcp.cache.index import (
+    build_index,
+    save_binary_index,
+    save_index,
+    save_sqlite_index,
+)
+from yet_another_figma_mcp.cache import store as store_module
+from yet_another_figma_mcp.cache.manifest import write_manifest
 from yet_another_figma_mcp.cache.store import CacheStore
 from yet_another_figma_mcp.tools import (
     get_cached_figma_file,
@@ -90,6 +97,18 @@ class TestGetCachedFigmaFile:
         assert "message" in result
         assert result["file_id"] == "nonexistent"
 
+    def test_missing_file_error_lists_cached_files(self, store_with_data: CacheStore) -> None:
+        """index.json があればキャッシュ済みのファイルをエラーに含める"""
+        assert "cached_files" not in get_cached_figma_file(store_with_data, "nonexistent")
+
+        write_manifest(store_with_data.cache_dir, {"test123": {"name": "Test Design"}})
+
+        result = get_cached_figma_file(store_with_data, "nonexistent")
+        assert result["error"] == "file_not_found"
+        assert result["cached_files"] == [{"file_id": "test123", "name": "Test Design"}]
+        node_result = get_cached_figma_node(store_with_data, "nonexistent", "1:1")
+        assert node_result["cached_files"] == result["cached_files"]
+
     def test_returns_error_for_invalid_file_id(self, store_with_data: CacheStore) -> None:
         """無効な file_id はエラーを返す"""
         result = get_cached_figma_file(store_with_data, "../invalid")
@@ -114,6 +133,33 @@ class TestGetCachedFigmaFile:
         assert result["error"] == "file_data_missing"
         assert result["file_id"] == file_id
 
+    def test_answers_from_metadata_sidecar(self, store_with_data: CacheStore) -> None:
+        """メタデータがあれば生 JSON をロードせずに応答する"""
+        with open(store_with_data.cache_dir / "test123" / "cache_meta.json", "w") as f:
+            json.dump({"name": "Test Design", "lastModified": "2024-01-01", "version": "1"}, f)
+
+        result = get_cached_figma_file(store_with_data, "test123")
+
+        assert result["name"] == "Test Design"
+        assert result["version"] == "1"
+        assert result["fetch_profile"] == "full"
+        assert "test123" not in store_with_data.files
+
+    def test_reports_fetch_profile(self, store_with_data: CacheStore) -> None:
+        """メタデータに記録した取得プロファイルを返す"""
+        with open(store_with_data.cache_dir / "test123" / "cache_meta.json", "w") as f:
+            json.dump(
+                {
+                    "name": "Test Design",
+                    "lastModified": "2024-01-01",
+                    "version": "1",
+                    "fetch_profile": "outline",
+                },
+                f,
+            )
+
+        assert get_cached_figma_file(store_with_data, "test123")["fetch_profile"] == "outline"
+
 
 class TestGetCachedFigmaNode:
     def test_returns_error_for_invalid_file_id(self, store_with_data: CacheStore) -> None:
@@ -156,6 +202,19 @@ class TestSearchFigmaNodesByName:
         assert len(results) == 1
         assert results[0]["name"] == "Primary Button"
 
+    def test_result_includes_resolved_path(self, store_with_data: CacheStore) -> None:
+        """検索結果には parent_id から復元した path が含まれる"""
+        results = search_figma_nodes_by_name(store_with_data, "test123", "Primary Button", "exact")
+        assert results == [
+            {
+                "id": "1:2",
+                "name": "Primary Button",
+                "type": "COMPONENT",
+                "parent_id": "1:1",
+                "path": ["Document", "Page 1", "Login Screen", "Primary Button"],
+            }
+        ]
+
     def test_partial_match(self, store_with_data: CacheStore) -> None:
         results = search_figma_nodes_by_name(store_with_data, "test123", "Button", "partial")
         assert len(results) >= 1
@@ -179,6 +238,22 @@ class TestSearchFigmaNodesByName:
         assert len(results) == 1
         assert results[0]["name"] == "Primary Button"
 
+    def test_exact_match_ignore_case_without_folded_map(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """casefold 済みマップを持たない古いインデックスでも大文字小文字を無視できる"""
+        index = build_index(sample_figma_file)
+        del index["by_name_folded"], index["by_frame_title_folded"]
+        file_dir = tmp_path / "legacy"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(index, f)
+
+        results = search_figma_nodes_by_name(
+            CacheStore(tmp_path), "legacy", "PRIMARY BUTTON", "exact", ignore_case=True
+        )
+        assert [r["name"] for r in results] == ["Primary Button"]
+
     def test_partial_match_always_case_insensitive(self, store_with_data: CacheStore) -> None:
         """partial モードは常に大文字小文字を無視する"""
         results = search_figma_nodes_by_name(store_with_data, "test123", "button", "partial")
@@ -234,6 +309,27 @@ class TestSearchFigmaFramesByTitle:
         assert "Login Screen" in names
         assert "Sign Up Screen" in names
 
+    def test_lists_top_frames_of_legacy_index(
+        self, tmp_path: Path, sample_figma_file: dict[str, Any]
+    ) -> None:
+        """pages / top_frames を持たない古いインデックスでも同じ結果を返す"""
+        index = build_index(sample_figma_file)
+        del index["pages"], index["top_frames"]
+        file_dir = tmp_path / "legacy"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "nodes_index.json", "w") as f:
+            json.dump(index, f)
+
+        results = list_figma_frames(CacheStore(tmp_path), "legacy")
+        assert results == [
+            {"id": "1:1", "name": "Login Screen", "path": ["Document", "Page 1", "Login Screen"]},
+            {
+                "id": "1:3",
+                "name": "Sign Up Screen",
+                "path": ["Document", "Page 1", "Sign Up Screen"],
+            },
+        ]
+
 
 class TestListFigmaFrames:
     def test_returns_empty_for_invalid_file_id(self, store_with_data: CacheStore) -> None:
@@ -252,3 +348,172 @@ class TestListFigmaFrames:
         names = [r["name"] for r in results]
         assert "Login Screen" in names
         assert "Sign Up Screen" in names
+
+
+class TestBinaryIndexResults:
+    """バイナリ形式のインデックスでも JSON 形式と同じ結果を返すことのテスト"""
+
+    @pytest.fixture
+    def stores(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> list[CacheStore]:
+        """同じファイルを JSON 形式・バイナリ形式でキャッシュしたストア"""
+        index = build_index(sample_design_system)
+        stores: list[CacheStore] = []
+        for index_format in ("json", "binary"):
+            cache_dir = tmp_path / index_format
+            file_dir = cache_dir / "ds"
+            file_dir.mkdir(parents=True)
+            with open(file_dir / "file_raw.json", "w") as f:
+                json.dump(sample_design_system, f)
+            if index_format == "json":
+                save_index(index, cache_dir, "ds")
+            else:
+                save_binary_index(index, cache_dir, "ds")
+            stores.append(CacheStore(cache_dir))
+        return stores
+
+    @pytest.mark.parametrize(
+        ("name", "match_mode", "ignore_case"),
+        [
+            ("Primary Button", "exact", False),
+            ("primary button", "exact", True),
+            ("button", "partial", False),
+            ("ボタン", "partial", False),
+            ("ic", "partial", False),
+        ],
+    )
+    def test_search_nodes(
+        self, stores: list[CacheStore], name: str, match_mode: Any, ignore_case: bool
+    ) -> None:
+        json_store, binary_store = stores
+        expected = search_figma_nodes_by_name(json_store, "ds", name, match_mode, None, ignore_case)
+        assert expected
+        assert (
+            search_figma_nodes_by_name(binary_store, "ds", name, match_mode, None, ignore_case)
+            == expected
+        )
+
+    def test_search_frames(self, stores: list[CacheStore]) -> None:
+        json_store, binary_store = stores
+        expected = search_figma_frames_by_title(json_store, "ds", "button", "partial")
+        assert search_figma_frames_by_title(binary_store, "ds", "button", "partial") == expected
+
+    def test_list_frames_and_file(self, stores: list[CacheStore]) -> None:
+        json_store, binary_store = stores
+        assert list_figma_frames(binary_store, "ds") == list_figma_frames(json_store, "ds")
+        assert get_cached_figma_file(binary_store, "ds") == get_cached_figma_file(json_store, "ds")
+
+
+class TestSqliteIndexResults:
+    """SQLite 形式のインデックスでも JSON 形式と同じ結果を返すことのテスト"""
+
+    @pytest.fixture
+    def stores(self, tmp_path: Path, sample_design_system: dict[str, Any]) -> list[CacheStore]:
+        """同じファイルを JSON 形式・SQLite 形式でキャッシュしたストア"""
+        index = build_index(sample_design_system)
+        stores: list[CacheStore] = []
+        for index_format in ("json", "sqlite"):
+            cache_dir = tmp_path / index_format
+            file_dir = cache_dir / "ds"
+            file_dir.mkdir(parents=True)
+            with open(file_dir / "file_raw.json", "w") as f:
+                json.dump(sample_design_system, f)
+            if index_format == "json":
+                save_index(index, cache_dir, "ds")
+            else:
+                save_sqlite_index(sample_design_system, index, cache_dir, "ds")
+            stores.append(CacheStore(cache_dir))
+        return stores
+
+    @pytest.mark.parametrize(
+        ("name", "match_mode", "ignore_case"),
+        [
+            ("Primary Button", "exact", False),
+            ("primary button", "exact", True),
+            ("button", "partial", False),
+            ("ボタン", "partial", False),
+            ("ic", "partial", False),
+        ],
+    )
+    def test_search_nodes(
+        self, stores: list[CacheStore], name: str, match_mode: Any, ignore_case: bool
+    ) -> None:
+        json_store, sqlite_store = stores
+        expected = search_figma_nodes_by_name(json_store, "ds", name, match_mode, None, ignore_case)
+        assert expected
+        assert (
+            search_figma_nodes_by_name(sqlite_store, "ds", name, match_mode, None, ignore_case)
+            == expected
+        )
+
+    def test_search_frames(self, stores: list[CacheStore]) -> None:
+        json_store, sqlite_store = stores
+        expected = search_figma_frames_by_title(json_store, "ds", "button", "partial")
+        assert search_figma_frames_by_title(sqlite_store, "ds", "button", "partial") == expected
+
+    def test_list_frames_and_file(self, stores: list[CacheStore]) -> None:
+        json_store, sqlite_store = stores
+        assert list_figma_frames(sqlite_store, "ds") == list_figma_frames(json_store, "ds")
+        assert get_cached_figma_file(sqlite_store, "ds") == get_cached_figma_file(json_store, "ds")
+
+    def test_get_node(self, stores: list[CacheStore]) -> None:
+        json_store, sqlite_store = stores
+        expected = get_cached_figma_node(json_store, "ds", "1:2")
+        assert get_cached_figma_node(sqlite_store, "ds", "1:2") == expected
+
+
+class TestColumnarIndexResults:
+    """列指向に変換したインデックスでも dict のままと同じ結果を返すことのテスト"""
+
+    @pytest.fixture
+    def stores(
+        self, tmp_path: Path, sample_design_system: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+    ) -> list[CacheStore]:
+        """同じ JSON 形式のキャッシュを dict のまま・列指向で読むストア"""
+        file_dir = tmp_path / "ds"
+        file_dir.mkdir(parents=True)
+        with open(file_dir / "file_raw.json", "w") as f:
+            json.dump(sample_design_system, f)
+        save_index(build_index(sample_design_system), tmp_path, "ds")
+
+        columnar_store = CacheStore(tmp_path)
+        assert columnar_store.get_index("ds") is not None
+
+        def build_nothing(index: dict[str, Any]) -> None:
+            return None
+
+        monkeypatch.setattr(store_module, "build_columnar_index", build_nothing)
+        dict_store = CacheStore(tmp_path)
+        assert isinstance(dict_store.get_index("ds")["by_id"], dict)  # type: ignore[index]
+        return [dict_store, columnar_store]
+
+    @pytest.mark.parametrize(
+        ("name", "match_mode", "ignore_case"),
+        [
+            ("Primary Button", "exact", False),
+            ("primary button", "exact", True),
+            ("button", "partial", False),
+            ("ボタン", "partial", False),
+            ("ic", "partial", False),
+        ],
+    )
+    def test_search_nodes(
+        self, stores: list[CacheStore], name: str, match_mode: Any, ignore_case: bool
+    ) -> None:
+        dict_store, columnar_store = stores
+        expected = search_figma_nodes_by_name(dict_store, "ds", name, match_mode, None, ignore_case)
+        assert expected
+        assert (
+            search_figma_nodes_by_name(columnar_store, "ds", name, match_mode, None, ignore_case)
+            == expected
+        )
+
+    def test_search_frames(self, stores: list[CacheStore]) -> None:
+        dict_store, columnar_store = stores
+        expected = search_figma_frames_by_title(dict_store, "ds", "button", "partial")
+        assert search_figma_frames_by_title(columnar_store, "ds", "button", "partial") == expected
+
+    def test_list_frames_and_node(self, stores: list[CacheStore]) -> None:
+        dict_store, columnar_store = stores
+        assert list_figma_frames(columnar_store, "ds") == list_figma_frames(dict_store, "ds")
+        expected = get_cached_figma_node(dict_store, "ds", "1:2")
+        assert get_cached_figma_node(columnar_store, "ds", "1:2") == expected